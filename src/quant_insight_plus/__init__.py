@@ -1,10 +1,14 @@
-"""ClaudeCode integration for mixseek-quant-insight."""
+"""ClaudeCode integration for mixseek-quant-insight.
+
+``ClaudeCodeLocalCodeExecutorAgent`` 等のエージェント関連の名前は、mixseek-core /
+pydantic-ai のインポートを伴うため、最初の参照時にインポートする（PEP 562）。
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from quant_insight_plus.agents.agent import (
-    AGENT_TYPE_NAME,
-    ClaudeCodeLocalCodeExecutorAgent,
-    register_claudecode_quant_agents,
-)
 from quant_insight_plus.agents.output_models import (
     FileAnalyzerOutput,
     FileSubmitterOutput,
@@ -22,6 +26,19 @@ from quant_insight_plus.submission_relay import (
     reset_submission_relay_patch,
 )
 
+if TYPE_CHECKING:
+    from quant_insight_plus.agents.agent import (
+        AGENT_TYPE_NAME,
+        ClaudeCodeLocalCodeExecutorAgent,
+        register_claudecode_quant_agents,
+    )
+
+_LAZY_ATTRIBUTES = {
+    "AGENT_TYPE_NAME": "quant_insight_plus.agents.agent",
+    "ClaudeCodeLocalCodeExecutorAgent": "quant_insight_plus.agents.agent",
+    "register_claudecode_quant_agents": "quant_insight_plus.agents.agent",
+}
+
 __all__ = [
     "AGENT_TYPE_NAME",
     "ANALYSIS_FILENAME",
@@ -39,3 +56,18 @@ __all__ = [
     "register_claudecode_quant_agents",
     "reset_submission_relay_patch",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """エージェント関連の名前を最初の参照時にインポートする。"""
+    module_path = _LAZY_ATTRIBUTES.get(name)
+    if module_path is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module(module_path), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
@@ -0,0 +1,5 @@
+"""``python -m quant_insight_plus`` で qip CLI を起動する（``qip worker`` のサブプロセス実行用）。"""
+
+from quant_insight_plus.cli import main
+
+main()
@@ -5,13 +5,15 @@ pydantic-ai のカスタムツールセットは登録しない。
 ファイルシステムを介してコードを管理する。
 """
 
+import asyncio
+import logging
 import os
+import time
 from pathlib import Path
 from typing import Any
 
 from mixseek.agents.member.base import BaseMemberAgent
 from mixseek.agents.member.factory import MemberAgentFactory
-from mixseek.core import auth
 from mixseek.models.member_agent import AgentType, MemberAgentConfig, MemberAgentResult, ResultStatus
 from pydantic import BaseModel
 from pydantic_ai import Agent
@@ -19,18 +21,56 @@ from quant_insight.agents.local_code_executor.agent import LocalCodeExecutorAgen
 from quant_insight.agents.local_code_executor.models import ImplementationContext, LocalCodeExecutorConfig
 
 from quant_insight_plus.agents.output_models import FileAnalyzerOutput, FileSubmitterOutput
-from quant_insight_plus.submission_relay import ensure_round_dir, get_round_dir
+from quant_insight_plus.cpu_budget import current_allocation, substitute_python_command
+from quant_insight_plus.kernel import member_session_id, with_session
+from quant_insight_plus.phase_timeouts import PHASE_MEMBER, phase_deadline
+from quant_insight_plus.preflight import (
+    SubmissionPreflightError,
+    build_retry_prompt,
+    check_static,
+    load_preflight_settings,
+    validate_submission,
+)
+from quant_insight_plus.prompt_layout import build_artifacts_section, build_data_catalog, compose_task_prompt
+from quant_insight_plus.runtime_config import load_runtime_settings
+from quant_insight_plus.salvage import SALVAGED_NOTICE, backoff_delay, find_fresh_artifact, load_retry_settings
+from quant_insight_plus.session_limit import resolve_member_model
+from quant_insight_plus.submission_relay import (
+    ANALYSIS_FILENAME,
+    SUBMISSION_FILENAME,
+    ensure_round_dir,
+    get_round_dir,
+)
+from quant_insight_plus.submission_watch import validate_cached
+from quant_insight_plus.turn_budget import (
+    append_turn_usage,
+    build_turn_usage_record,
+    get_turn_usage_path,
+    is_turn_limit_error,
+    load_turn_budget_settings,
+    load_turn_history,
+    resolve_max_turns,
+)
+from quant_insight_plus.usage import ROLE_MEMBER, build_usage_record, get_usage_recorder
 
 AGENT_TYPE_NAME = "claudecode_local_code_executor"
 
 _WORKSPACE_ENV_VAR = "MIXSEEK_WORKSPACE"
 
+# 出力型ごとに回収対象とする成果物ファイル
+_SALVAGE_FILENAMES: dict[type[BaseModel], str] = {
+    FileSubmitterOutput: SUBMISSION_FILENAME,
+    FileAnalyzerOutput: ANALYSIS_FILENAME,
+}
+
+logger = logging.getLogger(__name__)
+
 
 class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[misc]
     """ClaudeCode版 LocalCodeExecutorAgent（FS ベース版）。
 
     LocalCodeExecutorAgent を継承し、以下をオーバーライド:
-    - __init__: create_authenticated_model() でモデルを解決し、ツールセットなしで Agent を構築
+    - __init__: resolve_member_model() でモデルを解決し、ツールセットなしで Agent を構築
     - _format_output_content(): FileSubmitterOutput/FileAnalyzerOutput をフォーマット
     - execute(): FS ベースのフロー（_ensure_round_directory + _enrich_task_with_workspace_context）
     """
@@ -50,22 +90,75 @@ class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[
 
         # 親クラスのヘルパーメソッドを再利用
         self.executor_config = self._build_executor_config(config)
+        instructions = self._apply_cpu_budget(self._apply_kernel_session(self.config.system_instruction))
+        self.turn_budget = load_turn_budget_settings(config.metadata)
+        self.preflight = load_preflight_settings(config.metadata)
+        self.retry = load_retry_settings(config.metadata)
+        self.member_timeout_seconds = load_runtime_settings().phase_timeouts.member_seconds
         output_type = self._resolve_output_type()
+        self._salvage_filename = _SALVAGE_FILENAMES.get(output_type) if isinstance(output_type, type) else None
         model_settings = self._create_model_settings()
 
         # create_authenticated_model で claudecode: プレフィックスを解決
-        model = auth.create_authenticated_model(self.config.model)
+        # （[session_limit] 有効時は同時実行上限内で実行する LimitedModel）
+        model = resolve_member_model(self.config.model)
 
         # ツールセットなし — Claude Code の組み込みツールを使用
         self.agent: Agent[LocalCodeExecutorConfig, Any] = Agent(
             model=model,
             deps_type=LocalCodeExecutorConfig,
             output_type=output_type,
-            instructions=self.config.system_instruction,
+            instructions=instructions,
             model_settings=model_settings,
             retries=self.config.max_retries,
         )
 
+    def _apply_kernel_session(self, instructions: str | None) -> str | None:
+        """``qip kernel exec`` の ``python_command`` にチーム・メンバーごとのセッション ID を付加する。
+
+        チーム間・メンバー間でカーネルの名前空間を共有しないよう、``QIP_KERNEL_SESSION`` を
+        設定したコマンドを ``executor_config`` とシステム指示に反映する。
+
+        Args:
+            instructions: システム指示。
+
+        Returns:
+            コマンドを置き換えたシステム指示（ラウンド外・カーネル不使用の場合はそのまま）。
+        """
+        session = member_session_id(self.config.name)
+        if session is None:
+            return instructions
+        original = self.executor_config.python_command
+        scoped = with_session(original, session)
+        if scoped == original:
+            return instructions
+        self.executor_config = self.executor_config.model_copy(update={"python_command": scoped})
+        if instructions is None:
+            return None
+        return substitute_python_command(instructions, original, scoped)
+
+    def _apply_cpu_budget(self, instructions: str | None) -> str | None:
+        """ラウンドの CPU 予算を ``python_command`` に付加する。
+
+        ``[cpu_budget]`` 有効時は ``env POLARS_MAX_THREADS=N [taskset -c CPUS]`` を付加した
+        コマンドを ``executor_config`` とシステム指示に反映する。
+
+        Args:
+            instructions: システム指示。
+
+        Returns:
+            コマンドを置き換えたシステム指示（予算が無い場合はそのまま）。
+        """
+        allocation = current_allocation()
+        if allocation is None:
+            return instructions
+        original = self.executor_config.python_command
+        budgeted = allocation.wrap_command(original)
+        self.executor_config = self.executor_config.model_copy(update={"python_command": budgeted})
+        if instructions is None:
+            return None
+        return substitute_python_command(instructions, original, budgeted)
+
     def _get_workspace_path(self) -> Path:
         """MIXSEEK_WORKSPACE 環境変数からパスを取得。
 
@@ -81,48 +174,270 @@ class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[
             raise RuntimeError(msg)
         return Path(workspace)
 
-    def _ensure_round_directory(self) -> None:
-        """ラウンドディレクトリを作成。ImplementationContext 未設定時は何もしない。"""
-        impl_ctx = self.executor_config.implementation_context
+    def _build_invocation_config(self, context: dict[str, Any] | None) -> LocalCodeExecutorConfig:
+        """呼び出し単位の LocalCodeExecutorConfig を構築する。
+
+        共有の ``self.executor_config`` は変更せず、ImplementationContext を
+        設定したコピーを返す。同一インスタンスへの並列委譲でも
+        ラウンドコンテキストが競合しない。
+
+        Args:
+            context: execute() に渡された実行コンテキスト。
+
+        Returns:
+            この呼び出し専用の設定（context 未指定時は共有設定そのもの）。
+        """
+        if context is None:
+            return self.executor_config
+        impl_ctx = ImplementationContext(
+            execution_id=context.get("execution_id", ""),
+            team_id=context.get("team_id", ""),
+            round_number=context.get("round_number", 0),
+            member_agent_name=self.config.name,
+        )
+        return self.executor_config.model_copy(update={"implementation_context": impl_ctx})
+
+    def _ensure_round_directory(self, implementation_context: ImplementationContext | None = None) -> None:
+        """ラウンドディレクトリを作成。ImplementationContext 未設定時は何もしない。
+
+        Args:
+            implementation_context: 呼び出し単位のコンテキスト（未指定時は共有設定の値）。
+        """
+        impl_ctx = implementation_context or self.executor_config.implementation_context
         if impl_ctx is None:
             return
         workspace = self._get_workspace_path()
         ensure_round_dir(workspace, impl_ctx.round_number)
 
-    def _enrich_task_with_workspace_context(self, task: str) -> str:
-        """ラウンドディレクトリ内のファイル内容をタスクプロンプトに埋め込む。
+    def _enrich_task_with_workspace_context(
+        self,
+        task: str,
+        implementation_context: ImplementationContext | None = None,
+    ) -> str:
+        """データカタログとラウンドディレクトリ内のファイル内容をタスクプロンプトに埋め込む。
+
+        プロンプトキャッシュが効くよう、呼び出し間で変化しないデータカタログ、
+        ラウンド成果物、タスクの順に配置する（``prompt_layout`` 参照）。
 
         Args:
             task: 元のタスク文字列。
+            implementation_context: 呼び出し単位のコンテキスト（未指定時は共有設定の値）。
 
         Returns:
-            ファイル内容がフッタに埋め込まれたタスク文字列。
+            データカタログ・ファイル内容の後にタスクを配置した文字列。
 
         Raises:
             RuntimeError: MIXSEEK_WORKSPACE 未設定時。
         """
-        impl_ctx = self.executor_config.implementation_context
+        impl_ctx = implementation_context or self.executor_config.implementation_context
         if impl_ctx is None:
             return task
 
         workspace = self._get_workspace_path()
         round_dir = get_round_dir(workspace, impl_ctx.round_number)
+        return compose_task_prompt(
+            task,
+            catalog=build_data_catalog(workspace, self.executor_config.available_data_paths),
+            artifacts=build_artifacts_section(round_dir),
+        )
 
-        if not round_dir.is_dir():
-            return task
+    def _resolve_max_turns(self) -> int | None:
+        """この実行に適用する max_turns を決定する（adaptive 時は履歴から算出）。"""
+        if not self.turn_budget.adaptive:
+            return self.turn_budget.max_turns
+        workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+        history: list[int] = []
+        if workspace is not None:
+            history = load_turn_history(
+                get_turn_usage_path(Path(workspace)), self.config.name, self.turn_budget.history_size
+            )
+        return resolve_max_turns(self.turn_budget, history)
 
-        sections: list[str] = []
-        for file_path in sorted(round_dir.iterdir()):
-            if file_path.is_file():
-                content = file_path.read_text()
-                if content.strip():
-                    sections.append(f"### {file_path.name}\n```\n{content}\n```")
+    def _record_turn_usage(
+        self,
+        messages: list[Any],
+        max_turns: int | None,
+        context: dict[str, Any] | None,
+        *,
+        limit_reached: bool = False,
+    ) -> None:
+        """使用ターン数を ``logs/turn_usage.jsonl`` に記録する（ワークスペース未設定時は何もしない）。
+
+        ``max_turns`` に達した実行は上限値で打ち切り（``censored``）として記録する。
+        """
+        workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+        if workspace is None:
+            return
+        record = build_turn_usage_record(
+            agent_name=self.config.name,
+            model=self.config.model,
+            messages=messages,
+            max_turns=max_turns,
+            context=context,
+            limit_reached=limit_reached,
+        )
+        append_turn_usage(get_turn_usage_path(Path(workspace)), record)
 
-        if not sections:
-            return task
+    def _record_usage(
+        self,
+        messages: list[Any],
+        context: dict[str, Any] | None,
+        wall_seconds: float,
+        status: str,
+    ) -> None:
+        """使用量をプロセス内の UsageRecorder に蓄積する（context 未指定時は何もしない）。
+
+        蓄積分はラウンド終了時に Submission Relay が DuckDB へ一括書き込みする。
+        """
+        if context is None:
+            return
+        get_usage_recorder().add(
+            build_usage_record(
+                messages,
+                execution_id=context.get("execution_id", ""),
+                team_id=context.get("team_id", ""),
+                round_number=context.get("round_number", 0),
+                agent_name=self.config.name,
+                agent_role=ROLE_MEMBER,
+                model=self.config.model,
+                wall_seconds=wall_seconds,
+                status=status,
+            )
+        )
+
+    async def _preflight_submission(
+        self,
+        result: Any,
+        executor_config: LocalCodeExecutorConfig,
+        run_kwargs: dict[str, Any],
+    ) -> Any:
+        """FileSubmitterOutput の submission.py を検証し、失敗時は同一セッションで修正させる。
+
+        検証エラーを ``message_history`` 付きでエージェントに差し戻し、
+        ``max_retries`` 回まで再実行する。
+
+        Args:
+            result: ``agent.run()`` の実行結果。
+            executor_config: 呼び出し単位の設定。
+            run_kwargs: ``agent.run()`` に渡す追加引数。
+
+        Returns:
+            検証に成功した（または検証対象外の）実行結果。
+
+        Raises:
+            SubmissionPreflightError: リトライ後も検証に失敗した場合。
+        """
+        if not self.preflight.enabled:
+            return result
+
+        workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+        retries = 0
+        while isinstance(result.output, FileSubmitterOutput):
+            submission_path = Path(result.output.submission_path)
+            if workspace is not None:
+                # ラウンド実行中の早期検証（submission_watch）と同じ内容の検証結果は再利用する
+                check = await asyncio.to_thread(validate_cached, Path(workspace), submission_path, self.preflight)
+            else:
+                check = await asyncio.to_thread(validate_submission, submission_path, None, self.preflight)
+            if check.ok:
+                break
+            if retries >= self.preflight.max_retries:
+                msg = f"submission.py の提出前検証に失敗しました（{check.stage}）: {check.error}"
+                raise SubmissionPreflightError(msg)
+            retries += 1
+            result = await self.agent.run(
+                build_retry_prompt(check),
+                deps=executor_config,
+                message_history=result.all_messages(),
+                **run_kwargs,
+            )
+        return result
+
+    def _find_salvageable_artifact(
+        self,
+        implementation_context: ImplementationContext | None,
+        since: float,
+    ) -> Path | None:
+        """実行開始後に書き込まれた、回収可能な成果物を返す。
 
-        footer = "\n\n---\n## ワークスペースファイル\n\n" + "\n\n".join(sections)
-        return task + footer
+        出力型が FileSubmitterOutput の場合は ``submission.py``、FileAnalyzerOutput の
+        場合は ``analysis.md`` を対象とする。``submission.py`` は静的検証
+        （コンパイル・シグネチャ）に成功したものに限る。
+
+        Args:
+            implementation_context: 呼び出し単位のコンテキスト。
+            since: 実行開始時刻（``time.time()``）。
+
+        Returns:
+            成果物のパス（回収対象が無い場合は None）。
+        """
+        if implementation_context is None or self._salvage_filename is None:
+            return None
+        workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+        if workspace is None:
+            return None
+        round_dir = get_round_dir(Path(workspace), implementation_context.round_number)
+        artifact = find_fresh_artifact(round_dir, self._salvage_filename, since)
+        if artifact is None:
+            return None
+        if artifact.name == SUBMISSION_FILENAME and not check_static(artifact).ok:
+            return None
+        return artifact
+
+    def _format_salvaged_content(self, artifact: Path) -> str:
+        """回収した成果物を部分結果としてフォーマットする。"""
+        if artifact.name == SUBMISSION_FILENAME:
+            body = self._format_output_content(
+                FileSubmitterOutput(submission_path=str(artifact.resolve()), description=SALVAGED_NOTICE)
+            )
+        else:
+            body = f"## {artifact.name}\n\nファイルパス: {artifact}\n\n{artifact.read_text()}"
+        return f"{SALVAGED_NOTICE}\n\n{body}"
+
+    async def _run_with_retry(
+        self,
+        enriched_task: str,
+        executor_config: LocalCodeExecutorConfig,
+        run_kwargs: dict[str, Any],
+        since: float,
+    ) -> Any:
+        """エージェントを実行し、失敗時は指数バックオフ（ジッター付き）で再実行する。
+
+        回収可能な成果物が既に書き込まれている場合は再実行せず例外を送出し、
+        ``execute()`` 側で部分結果として返す。
+
+        Args:
+            enriched_task: エンリッチ済みタスク。
+            executor_config: 呼び出し単位の設定。
+            run_kwargs: ``agent.run()`` に渡す追加引数。
+            since: 実行開始時刻（``time.time()``）。
+
+        Returns:
+            ``agent.run()`` の実行結果（プリフライト検証済み）。
+        """
+        attempt = 0
+        while True:
+            try:
+                result = await self.agent.run(enriched_task, deps=executor_config, **run_kwargs)
+                return await self._preflight_submission(result, executor_config, run_kwargs)
+            except SubmissionPreflightError:
+                raise
+            except Exception as e:
+                if attempt >= self.retry.max_retries:
+                    raise
+                if self._find_salvageable_artifact(executor_config.implementation_context, since) is not None:
+                    raise
+                delay = backoff_delay(attempt, self.retry)
+                logger.warning(
+                    "%s の実行に失敗しました（%d/%d 回目の再実行まで %.1f 秒待機）: %s",
+                    self.config.name,
+                    attempt + 1,
+                    self.retry.max_retries,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
 
     def _format_output_content(self, output: BaseModel | str) -> str:
         """構造化出力をリーダーエージェント向けにフォーマット。
@@ -155,11 +470,17 @@ class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[
         """エージェントタスクを実行（FS ベース版）。
 
         FS ベースのフロー:
-        1. ImplementationContext を設定
+        1. 呼び出し単位の ImplementationContext を構築（共有設定は変更しない）
         2. ラウンドディレクトリを作成
         3. ワークスペースコンテキストでタスクをエンリッチ
-        4. エージェントを実行
-        5. 出力をフォーマットして返す
+        4. エージェントを実行（turn_budget 設定時は max_turns を指定）
+        5. FileSubmitterOutput の場合は submission.py を事前検証（失敗時は同一セッションで修正）
+        6. 使用ターン数・使用量を記録（max_turns に達して失敗した実行は打ち切りとして記録）
+        7. 出力をフォーマットして返す
+
+        実行に失敗した場合は指数バックオフで再実行する。実行開始後に書き込まれた
+        成果物があれば再実行せず、部分結果（WARNING）として返す。
+        runtime.toml の ``[phase_timeouts] member_seconds`` を超えた場合も同様に扱う。
 
         NOTE: 親クラス LocalCodeExecutorAgent.execute()
         (mixseek-quant-insight==0.1.0) のロジックを基に、
@@ -175,19 +496,26 @@ class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[
         """
         _ = kwargs
 
-        if context is not None:
-            self.executor_config.implementation_context = ImplementationContext(
-                execution_id=context.get("execution_id", ""),
-                team_id=context.get("team_id", ""),
-                round_number=context.get("round_number", 0),
-                member_agent_name=self.config.name,
-            )
+        executor_config = self._build_invocation_config(context)
+        impl_ctx = executor_config.implementation_context
+        started = time.perf_counter()
+        run_started_at = time.time()
+        max_turns: int | None = None
 
         try:
-            self._ensure_round_directory()
-            enriched_task = self._enrich_task_with_workspace_context(task)
-            result = await self.agent.run(enriched_task, deps=self.executor_config)
+            self._ensure_round_directory(impl_ctx)
+            enriched_task = self._enrich_task_with_workspace_context(task, impl_ctx)
+            max_turns = self._resolve_max_turns()
+            run_kwargs: dict[str, Any] = {}
+            if max_turns is not None:
+                # claudecode-model の ModelSettings 拡張キー（エージェント設定とマージされる）
+                run_kwargs["model_settings"] = {"max_turns": max_turns}
+            # 委譲 1 回（再実行・プリフライトを含む）の期限。期限切れ時は成果物の回収へ進む
+            async with phase_deadline(PHASE_MEMBER, self.member_timeout_seconds):
+                result = await self._run_with_retry(enriched_task, executor_config, run_kwargs, run_started_at)
             all_messages = result.all_messages()
+            self._record_turn_usage(all_messages, max_turns, context)
+            self._record_usage(all_messages, context, time.perf_counter() - started, "success")
 
             content = self._format_output_content(result.output)
 
@@ -200,6 +528,22 @@ class ClaudeCodeLocalCodeExecutorAgent(LocalCodeExecutorAgent):  # type: ignore[
             )
 
         except Exception as e:
+            if max_turns is not None and is_turn_limit_error(e):
+                self._record_turn_usage([], max_turns, context, limit_reached=True)
+            artifact = None
+            if not isinstance(e, SubmissionPreflightError):
+                artifact = self._find_salvageable_artifact(impl_ctx, run_started_at)
+            if artifact is not None:
+                self._record_usage([], context, time.perf_counter() - started, "salvaged")
+                return MemberAgentResult(
+                    status=ResultStatus.WARNING,
+                    content=self._format_salvaged_content(artifact),
+                    agent_name=self.config.name,
+                    agent_type=str(AgentType.CUSTOM),
+                    error_message=str(e),
+                )
+
+            self._record_usage([], context, time.perf_counter() - started, "error")
             return MemberAgentResult(
                 status=ResultStatus.ERROR,
                 content=f"タスク実行エラー: {e!s}",
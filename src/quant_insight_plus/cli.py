@@ -3,72 +3,166 @@
 mixseek-plus CLI をラップし、ClaudeCode 版 quant-insight エージェントを
 自動登録する CLI エントリーポイント。
 
-インポート順序が重要:
+起動を速くするため、重い依存（mixseek-core, mixseek-plus, claudecode-model,
+quant-insight, pydantic-ai）のインポートとパッチの適用は、サブコマンドの
+解決時まで遅延する:
+
+- ``qip --version``: 依存をインポートしない
+- quant-insight-plus 独自サブコマンド（kernel, leaderboard, queue, scheduler, setup, usage, worker）:
+  当該モジュールのみインポートする
+- data, db: mixseek-core CLI アプリを構築する（エージェント登録・パッチなし）
+- 上記以外（member, team, exec 等のエージェントを実行するコマンド）:
+  ``bootstrap_agents()`` の後に mixseek-core CLI アプリを構築する
+
+``bootstrap_agents()`` の適用順序が重要:
 1. patch_core() で claudecode: プレフィックスを有効化
 2. mixseek-plus のエージェント登録
 3. quant-insight-plus のエージェント登録
 4. patch_submission_relay() で提出リレーを有効化
 5. claudecode-model の DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA パッチ
 6. OrchestratorSettings.timeout_per_team_seconds の上限緩和パッチ
-7. mixseek-core CLI アプリのインポート
-7. quant-insight サブコマンド（data, db, export）の統合
+
+``get_core_app()`` は mixseek-core CLI アプリ（exec に --resume オプションを追加）に
+quant-insight サブコマンド（data, db, export）と quant-insight-plus 独自サブコマンド
+（data compact, kernel, leaderboard, queue, scheduler, setup, usage, worker）を統合する。
+モジュール属性 ``app`` は ``bootstrap_agents()`` 適用済みのこのアプリ（テスト・ライブラリ用）。
 """
 
-import shutil
+from __future__ import annotations
+
+import importlib
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import typer
-from mixseek_plus.agents import register_claudecode_agents, register_groq_agents
-from mixseek_plus.core_patch import patch_core
+from typer.core import TyperGroup
 
-from quant_insight_plus.agents.agent import register_claudecode_quant_agents
-from quant_insight_plus.submission_relay import SUBMISSIONS_DIR_NAME, patch_submission_relay
+from quant_insight_plus.submission_relay import SUBMISSIONS_DIR_NAME
 
-patch_core()
-register_groq_agents()
-register_claudecode_agents()
-register_claudecode_quant_agents()
-patch_submission_relay()
-
-# claudecode-model の構造化出力時デフォルト max_turns を引き上げ。
-# オリジナル値 3 では ClaudeCode セッションが StructuredOutput ツール呼び出しを
-# 完了できず error_max_turns → リトライループが発生する。
-# Member Agent はデータ分析等の実作業後に StructuredOutput を呼ぶため、
-# 十分なターン数が必要。タイムアウト（timeout_per_team_seconds）が安全装置として機能する。
-import claudecode_model.model as _claudecode_model_module  # noqa: E402
+if TYPE_CHECKING:
+    import click
 
+# --- 名前付き定数 ---
 _STRUCTURED_OUTPUT_MAX_TURNS = 50
-_claudecode_model_module.DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA = _STRUCTURED_OUTPUT_MAX_TURNS  # type: ignore[attr-defined]
+_TIMEOUT_UPPER_LIMIT_SECONDS = 14400
 
-# OrchestratorSettings.timeout_per_team_seconds の上限を緩和。
-# mixseek-core のスキーマでは le=3600（1時間）に制限されているが、
-# ClaudeCode チーム実行では MCP セッション起動遅延等により 3600s を超えることがある。
-# upstream 修正までの暫定パッチとして上限を 14400s（4時間）に引き上げる。
-from mixseek.config.schema import OrchestratorSettings  # noqa: E402
+# quant-insight-plus 独自サブコマンド: (モジュール, 属性)。属性は Typer アプリまたはコマンド関数
+_OWN_COMMANDS: dict[str, tuple[str, str]] = {
+    "ensemble": ("quant_insight_plus.commands.ensemble", "ensemble"),
+    "kernel": ("quant_insight_plus.commands.kernel", "kernel_app"),
+    "leaderboard": ("quant_insight_plus.commands.leaderboard", "leaderboard"),
+    "proxy-score": ("quant_insight_plus.commands.proxy_score", "proxy_score"),
+    "queue": ("quant_insight_plus.commands.queue", "queue_app"),
+    "scheduler": ("quant_insight_plus.commands.scheduler", "scheduler_app"),
+    "setup": ("quant_insight_plus.cli", "setup"),
+    "submissions": ("quant_insight_plus.commands.submissions", "submissions_app"),
+    "usage": ("quant_insight_plus.commands.usage", "usage"),
+    "worker": ("quant_insight_plus.commands.queue", "worker"),
+}
+# エージェントを実行しない mixseek-core / quant-insight のサブコマンド
+# （export は orchestrator.toml とチーム設定を検証するためパッチが必要）
+_NO_AGENT_CORE_COMMANDS = frozenset({"data", "db"})
+
+_agents_bootstrapped = False
+_core_app: typer.Typer | None = None
+
+
+def bootstrap_agents() -> None:
+    """エージェント実行に必要な登録・パッチを適用する（冪等）。"""
+    global _agents_bootstrapped  # noqa: PLW0603
+    if _agents_bootstrapped:
+        return
+
+    from mixseek_plus.agents import register_claudecode_agents, register_groq_agents
+    from mixseek_plus.core_patch import patch_core
+
+    from quant_insight_plus.agents.agent import register_claudecode_quant_agents
+    from quant_insight_plus.submission_relay import patch_submission_relay
+
+    patch_core()
+    register_groq_agents()
+    register_claudecode_agents()
+    register_claudecode_quant_agents()
+    patch_submission_relay()
+
+    # claudecode-model の構造化出力時デフォルト max_turns を引き上げ。
+    # オリジナル値 3 では ClaudeCode セッションが StructuredOutput ツール呼び出しを
+    # 完了できず error_max_turns → リトライループが発生する。
+    # Member Agent はデータ分析等の実作業後に StructuredOutput を呼ぶため、
+    # 十分なターン数が必要。タイムアウト（timeout_per_team_seconds）が安全装置として機能する。
+    import claudecode_model.model as claudecode_model_module
+
+    claudecode_model_module.DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA = (  # type: ignore[attr-defined]
+        _STRUCTURED_OUTPUT_MAX_TURNS
+    )
 
-_TIMEOUT_UPPER_LIMIT_SECONDS = 14400
-_timeout_field = OrchestratorSettings.model_fields["timeout_per_team_seconds"]
-_timeout_field.metadata = [
-    m if not hasattr(m, "le") else type(m)(le=_TIMEOUT_UPPER_LIMIT_SECONDS) for m in _timeout_field.metadata
-]
-OrchestratorSettings.model_rebuild(force=True)
+    # OrchestratorSettings.timeout_per_team_seconds の上限を緩和。
+    # mixseek-core のスキーマでは le=3600（1時間）に制限されているが、
+    # ClaudeCode チーム実行では MCP セッション起動遅延等により 3600s を超えることがある。
+    # upstream 修正までの暫定パッチとして上限を 14400s（4時間）に引き上げる。
+    from mixseek.config.schema import OrchestratorSettings
+
+    timeout_field = OrchestratorSettings.model_fields["timeout_per_team_seconds"]
+    timeout_field.metadata = [
+        m if not hasattr(m, "le") else type(m)(le=_TIMEOUT_UPPER_LIMIT_SECONDS) for m in timeout_field.metadata
+    ]
+    OrchestratorSettings.model_rebuild(force=True)
 
-from importlib.metadata import PackageNotFoundError, version  # noqa: E402
+    _agents_bootstrapped = True
 
-from mixseek.cli.main import app as core_app  # noqa: E402
-from mixseek.models.workspace import WorkspaceStructure  # noqa: E402
-from quant_insight.cli.commands import data_app, db_app, export_app  # noqa: E402
-from quant_insight.utils.env import get_workspace  # noqa: E402
 
-# quant-insight サブコマンドを core_app に統合
-core_app.add_typer(data_app, name="data")
-core_app.add_typer(db_app, name="db")
-core_app.add_typer(export_app, name="export")
+def _load_own_command(name: str) -> Any:
+    """独自サブコマンドの Typer アプリまたはコマンド関数をインポートする。"""
+    module_path, attr = _OWN_COMMANDS[name]
+    return getattr(importlib.import_module(module_path), attr)
+
+
+def get_core_app() -> typer.Typer:
+    """全サブコマンドを統合した mixseek-core CLI アプリを返す（初回のみ構築）。
+
+    エージェントを実行するコマンドでは、先に ``bootstrap_agents()`` を適用すること。
+
+    Returns:
+        CLI アプリ。
+    """
+    global _core_app  # noqa: PLW0603
+    if _core_app is not None:
+        return _core_app
+
+    from mixseek.cli.main import app as core_app
+    from quant_insight.cli.commands import data_app, db_app, export_app
+    from quant_insight.utils.env import get_workspace
+
+    from quant_insight_plus.commands import data as data_commands
+    from quant_insight_plus.resume import add_resume_option
+
+    # qip exec --resume: 中断した実行の完了済みラウンドを復元して再開
+    add_resume_option(core_app, get_workspace)
+
+    # quant-insight サブコマンドを core_app に統合
+    core_app.add_typer(data_app, name="data")
+    core_app.add_typer(db_app, name="db")
+    core_app.add_typer(export_app, name="export")
+
+    # quant-insight-plus 独自のサブコマンドを統合
+    data_app.command(name="compact")(data_commands.compact)
+    for name in _OWN_COMMANDS:
+        target = _load_own_command(name)
+        if isinstance(target, typer.Typer):
+            core_app.add_typer(target, name=name)
+        else:
+            core_app.command(name=name)(target)
+
+    core_app.callback()(main_callback)
+    _core_app = core_app
+    return core_app
+
 
 _TEMPLATES_DIR = Path(__file__).parent / "templates"
 
 
-def _init_workspace(workspace: Path) -> None:
+def _init_workspace(workspace: Path, *, assume_yes: bool = False) -> None:
     """ワークスペースのディレクトリ構造を作成。
 
     mixseek_init() を使わず、WorkspaceStructure で
@@ -76,10 +170,13 @@ def _init_workspace(workspace: Path) -> None:
 
     Args:
         workspace: ワークスペースパス
+        assume_yes: True の場合、既存ワークスペースの確認を省略
     """
+    from mixseek.models.workspace import WorkspaceStructure
+
     structure = WorkspaceStructure.create(workspace)
 
-    if structure.exists:
+    if structure.exists and not assume_yes:
         if not typer.confirm(
             f"ワークスペースが既に存在します: {workspace}。上書きしますか？",
             default=False,
@@ -91,33 +188,47 @@ def _init_workspace(workspace: Path) -> None:
     typer.echo(f"ワークスペースを初期化しました: {workspace}")
 
 
-def _install_templates(workspace: Path) -> list[Path]:
-    """テンプレート設定をワークスペースにコピー。
+def _install_templates(workspace: Path, *, dry_run: bool = False) -> list[Path]:
+    """テンプレート設定をワークスペースに配置。
+
+    テンプレートマニフェストと比較し、変更のあったファイルのみ書き込む。
+    ユーザーが編集したファイルは保持し、テンプレートも変更されていた場合は
+    ``<name>.new`` に書き出す。
 
     Args:
         workspace: ワークスペースパス
+        dry_run: True の場合は判定結果の表示のみ行う
 
     Returns:
-        コピーされたファイルの相対パスリスト
+        コピー（追加・更新）されたファイルの相対パスリスト
 
     Raises:
         FileNotFoundError: templates ディレクトリが見つからない場合
     """
+    from quant_insight_plus.provisioning import (
+        ACTION_CONFLICT,
+        ACTION_KEPT,
+        ACTION_UNCHANGED,
+        CONFLICT_SUFFIX,
+        sync_templates,
+    )
+
     if not _TEMPLATES_DIR.is_dir():
         msg = f"templates ディレクトリが見つかりません: {_TEMPLATES_DIR}"
         raise FileNotFoundError(msg)
 
-    configs_dir = workspace / "configs"
-    copied_files: list[Path] = []
-
-    for src_file in _TEMPLATES_DIR.rglob("*.toml"):
-        rel_path = src_file.relative_to(_TEMPLATES_DIR)
-        dest_file = configs_dir / rel_path
-        dest_file.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src_file, dest_file)
-        copied_files.append(rel_path)
-
-    return copied_files
+    report = sync_templates(_TEMPLATES_DIR, workspace, dry_run=dry_run)
+    for action in report.actions:
+        if action.action == ACTION_UNCHANGED:
+            continue
+        line = f"  {action.action:<9} configs/{action.rel_path.as_posix()}"
+        if action.action == ACTION_CONFLICT:
+            line += f" （編集を保持し、テンプレートを {action.rel_path.name}{CONFLICT_SUFFIX} に出力）"
+        elif action.action == ACTION_KEPT:
+            line += " （編集を保持）"
+        typer.echo(line)
+    typer.echo(f"  変更なし: {len(report.paths(ACTION_UNCHANGED))} ファイル")
+    return report.written
 
 
 _DATA_INPUT_DIRS = ("ohlcv", "returns", "master")
@@ -163,7 +274,6 @@ def _print_next_steps(workspace: Path) -> None:
     )
 
 
-@core_app.command(name="setup")
 def setup(
     workspace: Path | None = typer.Option(
         None,
@@ -171,20 +281,52 @@ def setup(
         "-w",
         help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
     ),
+    yes: bool = typer.Option(
+        False,
+        "--yes",
+        "-y",
+        help="既存ワークスペースの上書き確認を省略",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="テンプレートの配置内容を表示のみ（ファイルを書き込まない）",
+    ),
+    share_data_from: Path | None = typer.Option(
+        None,
+        "--share-data-from",
+        help="data/inputs/ をハードリンクで共有する元のワークスペース",
+    ),
 ) -> None:
     """環境を一括セットアップ。
 
-    ワークスペース初期化 → テンプレートコピー → submissions ディレクトリ作成 →
-    データディレクトリ作成。patch_submission_relay() はモジュールレベルで実行済み。
+    ワークスペース初期化 → テンプレート配置 → submissions ディレクトリ作成 →
+    データディレクトリ作成。エージェント登録・パッチは適用しない。
+    再実行時は変更のあったテンプレートのみ書き込む。
     """
+    from quant_insight.utils.env import get_workspace
+
+    from quant_insight_plus.provisioning import DATA_INPUTS_DIR, share_data_files
+
     ws = workspace or get_workspace()
+    if share_data_from is not None and not (share_data_from / DATA_INPUTS_DIR).is_dir():
+        typer.echo(f"共有元のデータディレクトリが見つかりません: {share_data_from / DATA_INPUTS_DIR}", err=True)
+        raise typer.Exit(code=1)
+
+    if dry_run:
+        typer.echo(f"dry-run: {ws} のファイルは変更しません")
+        _install_templates(ws, dry_run=True)
+        if share_data_from is not None:
+            shared = share_data_files(share_data_from, ws, dry_run=True)
+            typer.echo(f"  data/inputs: {len(shared)} ファイルを共有予定")
+        return
 
     # Step 1: ワークスペース構造を作成
     typer.echo("Step 1/4: ワークスペース構造を作成...")
-    _init_workspace(ws)
+    _init_workspace(ws, assume_yes=yes)
 
-    # Step 2: テンプレート設定をコピー
-    typer.echo("Step 2/4: テンプレート設定をコピー...")
+    # Step 2: テンプレート設定を配置
+    typer.echo("Step 2/4: テンプレート設定を配置...")
     copied = _install_templates(ws)
     typer.echo(f"  {len(copied)} ファイルをコピーしました")
 
@@ -198,6 +340,9 @@ def setup(
     typer.echo("Step 4/4: データディレクトリを作成...")
     _create_data_dirs(ws)
     typer.echo("  data/inputs/{ohlcv,returns,master}")
+    if share_data_from is not None:
+        shared = share_data_files(share_data_from, ws)
+        typer.echo(f"  {len(shared)} ファイルを {share_data_from} から共有しました")
 
     _print_next_steps(ws)
 
@@ -207,8 +352,6 @@ try:
 except PackageNotFoundError:
     __version__ = "0.0.0.dev0"
 
-app = core_app
-
 
 def version_callback(value: bool | None) -> None:
     """バージョン情報を表示。"""
@@ -217,7 +360,6 @@ def version_callback(value: bool | None) -> None:
         raise typer.Exit(code=0)
 
 
-@app.callback()
 def main_callback(
     _version: bool | None = typer.Option(
         None,
@@ -231,9 +373,67 @@ def main_callback(
     """Quant-Insight-Plus CLI - ClaudeCode 対応 quant-insight エージェント。"""
 
 
+def _to_click_command(name: str, target: Any) -> click.Command:
+    """Typer アプリまたはコマンド関数を click コマンドに変換する。"""
+    holder = typer.Typer()
+    if isinstance(target, typer.Typer):
+        holder.add_typer(target, name=name)
+        group = typer.main.get_command(holder)
+        return group.commands[name]  # type: ignore[attr-defined,no-any-return]
+    holder.command(name=name)(target)
+    return typer.main.get_command(holder)
+
+
+_core_group: click.Group | None = None
+
+
+def _get_core_group() -> click.Group:
+    global _core_group  # noqa: PLW0603
+    if _core_group is None:
+        _core_group = typer.main.get_command(get_core_app())  # type: ignore[assignment]
+    return _core_group  # type: ignore[return-value]
+
+
+class _LazyGroup(TyperGroup):
+    """サブコマンドを解決時にインポートするルートコマンド。"""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """全サブコマンド名（ヘルプ表示用のため全アプリを構築する）。"""
+        bootstrap_agents()
+        return sorted(_get_core_group().list_commands(ctx))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """サブコマンドを解決し、必要な依存のみインポートする。"""
+        if cmd_name in _OWN_COMMANDS:
+            return _to_click_command(cmd_name, _load_own_command(cmd_name))
+        if cmd_name not in _NO_AGENT_CORE_COMMANDS:
+            bootstrap_agents()
+        return _get_core_group().get_command(ctx, cmd_name)
+
+
+def build_cli() -> typer.Typer:
+    """サブコマンドを遅延解決するルート CLI アプリを構築する。
+
+    Returns:
+        ``qip`` / ``quant-insight-plus`` のルートアプリ。
+    """
+    cli = typer.Typer(cls=_LazyGroup)
+    cli.callback()(main_callback)
+    return cli
+
+
+def __getattr__(name: str) -> Any:
+    """``app`` 属性の参照時にのみ全パッチ適用済みの CLI アプリを構築する（PEP 562）。"""
+    if name == "app":
+        bootstrap_agents()
+        return get_core_app()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
 def main() -> None:
     """CLI エントリーポイント。
 
     quant-insight-plus コマンドで呼び出される。
     """
-    app()
+    build_cli()()
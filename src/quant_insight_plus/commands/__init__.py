@@ -0,0 +1 @@
+"""quant-insight-plus 独自の CLI サブコマンド。"""
@@ -0,0 +1,77 @@
+"""``qip data`` に追加するサブコマンド。"""
+
+import tomllib
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.data_compaction import (
+    DEFAULT_FLOAT32_RELATIVE_TOLERANCE,
+    DEFAULT_SPLITS,
+    compact_split_outputs,
+)
+
+
+def _load_dataset_names(config: Path) -> list[str]:
+    """competition.toml から ``[[competition.data]]`` のデータセット名を読み取る。
+
+    Args:
+        config: competition.toml のパス。
+
+    Returns:
+        データセット名のリスト。
+
+    Raises:
+        typer.BadParameter: データセット定義が存在しない場合。
+    """
+    with config.open("rb") as f:
+        data = tomllib.load(f)
+    datasets = data.get("competition", {}).get("data", [])
+    names = [d["name"] for d in datasets if "name" in d]
+    if not names:
+        msg = f"[[competition.data]] が定義されていません: {config}"
+        raise typer.BadParameter(msg)
+    return names
+
+
+def compact(
+    config: Path = typer.Option(..., "--config", "-c", help="competition.toml のパス"),
+    split: list[str] = typer.Option(
+        list(DEFAULT_SPLITS),
+        "--split",
+        "-s",
+        help="対象とする分割（複数指定可）。test を含めると評価用データも変換される",
+    ),
+    tolerance: float = typer.Option(
+        DEFAULT_FLOAT32_RELATIVE_TOLERANCE,
+        "--tolerance",
+        help="Float32 変換を許容する最大相対誤差",
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", help="ファイルを書き換えずレポートのみ表示"),
+) -> None:
+    """分割済みデータをコンパクト dtype プロファイルに変換（qip data split の後に実行）。"""
+    names = _load_dataset_names(config)
+    inputs_dir = get_workspace() / "data" / "inputs"
+    reports = compact_split_outputs(
+        inputs_dir,
+        names,
+        splits=tuple(split),
+        rel_tolerance=tolerance,
+        dry_run=dry_run,
+    )
+
+    if not reports:
+        typer.echo("対象の parquet ファイルが見つかりません。先に qip data split を実行してください。", err=True)
+        raise typer.Exit(code=1)
+
+    for report in reports:
+        typer.echo(
+            f"{report.path}: {report.bytes_before:,} → {report.bytes_after:,} bytes"
+            f" ({report.reduction_ratio:.0%} 削減)"
+        )
+        for col in report.columns:
+            line = f"  {col.column}: {col.original_dtype} → {col.compact_dtype}"
+            if col.max_abs_error or col.max_rel_error:
+                line += f" (max_abs_err={col.max_abs_error:.3g}, max_rel_err={col.max_rel_error:.3g})"
+            typer.echo(line)
@@ -0,0 +1,60 @@
+"""``qip ensemble`` コマンド: 上位提出のシグナルの順位平均アンサンブル。"""
+
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.ensemble import WEIGHTING_EQUAL, run_ensemble
+from quant_insight_plus.leaderboard import latest_snapshot_execution_id
+
+
+def ensemble(
+    execution_id: str | None = typer.Argument(None, help="実行 ID（未指定時はリーダーボードで最後に更新された実行）"),
+    top_k: int = typer.Option(5, "--top", "-k", min=1, help="合成する上位の提出数"),
+    weighting: str = typer.Option(
+        WEIGHTING_EQUAL,
+        "--weighting",
+        help="equal（順位平均）または score（スコア加重の順位平均）",
+    ),
+    per_team: bool = typer.Option(False, "--per-team", help="各チームの最高スコアの提出のみを対象にする"),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="キャッシュに無いシグナルを計算するプロセス数（未指定時は [scheduler] の cpu_slots）",
+    ),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        "-w",
+        help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
+    ),
+) -> None:
+    """上位 K 件の提出のシグナルを合成・採点し、リーダーボードに合成エントリとして記録。"""
+    ws = workspace or get_workspace()
+    execution_id = execution_id or latest_snapshot_execution_id(ws)
+    if execution_id is None:
+        typer.echo("実行 ID を指定してください（リーダーボードのスナップショットがありません）", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        result = run_ensemble(ws, execution_id, top_k=top_k, weighting=weighting, per_team=per_team, jobs=jobs)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+
+    typer.echo(f"=== アンサンブル: {result.team_id} ({execution_id}) ===")
+    for member in result.members:
+        source = "キャッシュ" if member.cached else "計算"
+        typer.echo(
+            f"  {member.team_id} round {member.round_number}: score={member.score:.4f}, "
+            f"weight={member.weight:.4f} ({source})"
+        )
+    score = result.score
+    std = f"{score.std_correlation:.4f}" if score.std_correlation is not None else "-"
+    typer.echo(
+        f"スコア: {score.sharpe_ratio:.4f} (mean={score.mean_correlation:.4f}, std={std}, {score.iterations} 日)"
+    )
+    typer.echo(f"シグナル: {result.signal_path}")
@@ -0,0 +1,78 @@
+"""``qip kernel`` サブコマンド: 常駐 Python カーネルの起動とスクリプト実行。"""
+
+import sys
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.kernel import (
+    DEFAULT_SESSION_ID,
+    SESSION_ENV_VAR,
+    get_default_socket_path,
+    load_kernel_settings,
+    run_in_kernel,
+    serve,
+)
+
+kernel_app = typer.Typer(help="常駐 Python カーネル（Member Agent のスクリプト実行高速化）")
+
+
+@kernel_app.command(name="serve")
+def serve_command(
+    config: Path = typer.Option(..., "--config", "-c", help="Member Agent 設定ファイルのパス"),
+    socket_path: Path | None = typer.Option(
+        None,
+        "--socket",
+        help="ソケットパス（未指定時は $MIXSEEK_WORKSPACE/.qip/kernel.sock）",
+    ),
+) -> None:
+    """カーネルサービスを起動（available_data_paths を事前ロード）。"""
+    settings = load_kernel_settings(config, get_workspace(), socket_path)
+    typer.echo(f"カーネルサービスを起動します: {settings.socket_path}")
+    serve(settings)
+
+
+@kernel_app.command(
+    name="exec",
+    # スクリプトの --flag を qip のオプションとして解釈せずに args へ渡す
+    context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
+)
+def exec_command(
+    script: str | None = typer.Argument(None, help="実行するスクリプトのパス（-m 指定時はモジュールへの最初の引数）"),
+    args: list[str] | None = typer.Argument(None, help="スクリプトに渡す引数（--flag 形式も可）"),
+    module: str | None = typer.Option(
+        None,
+        "-m",
+        help="python -m と同様にモジュールを実行（例: -m quant_insight_plus proxy-score submission.py）",
+    ),
+    session: str = typer.Option(
+        DEFAULT_SESSION_ID,
+        "--session",
+        envvar=SESSION_ENV_VAR,
+        help="セッション ID（同一セッションは名前空間を共有する）",
+    ),
+    socket_path: Path | None = typer.Option(None, "--socket", help="ソケットパス"),
+) -> None:
+    """カーネルサービスでスクリプトを実行（python_command の代替）。"""
+    argv = list(args or [])
+    if module is not None:
+        # python -m module arg ... と同様に、スクリプト位置の引数もモジュールへの引数とする
+        target = module
+        argv = [script, *argv] if script is not None else argv
+    elif script is not None:
+        target = script
+    else:
+        typer.echo("実行するスクリプトのパスか -m でモジュールを指定してください", err=True)
+        raise typer.Exit(code=2)
+
+    path = socket_path or get_default_socket_path(get_workspace())
+    try:
+        response = run_in_kernel(path, target, argv, session=session, module=module is not None)
+    except FileNotFoundError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+
+    sys.stdout.write(response.stdout)
+    sys.stderr.write(response.stderr)
+    raise typer.Exit(code=response.exit_code)
@@ -0,0 +1,55 @@
+"""``qip leaderboard`` コマンド: チーム別最高スコアの順位表。"""
+
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.leaderboard import latest_snapshot_execution_id, load_standings, refresh_leaderboard
+
+
+def leaderboard(
+    execution_id: str | None = typer.Argument(None, help="実行 ID（未指定時は最後に更新された実行）"),
+    limit: int | None = typer.Option(None, "--limit", "-n", min=1, help="上位の表示件数"),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="mixseek.db から再集計してスナップショットを作り直す（実行中の Orchestrator とロックを取り合う）",
+    ),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        "-w",
+        help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
+    ),
+) -> None:
+    """チーム別の最高スコアを表示（読み取り用スナップショットから読み込む）。"""
+    ws = workspace or get_workspace()
+    if refresh:
+        if execution_id is None:
+            typer.echo("--refresh には実行 ID を指定してください", err=True)
+            raise typer.Exit(code=1)
+        if refresh_leaderboard(ws, execution_id) is None:
+            typer.echo(f"leader_board が見つかりません: {ws}", err=True)
+            raise typer.Exit(code=1)
+
+    execution_id = execution_id or latest_snapshot_execution_id(ws)
+    if execution_id is None:
+        typer.echo("リーダーボードのスナップショットがありません", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        standings = load_standings(ws, execution_id, limit)
+    except FileNotFoundError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+
+    typer.echo(f"=== リーダーボード: {execution_id} ===")
+    for rank, row in enumerate(standings, start=1):
+        name = f" ({row.team_name})" if row.team_name and row.team_name != row.team_id else ""
+        typer.echo(
+            f"{rank:>3}. {row.team_id}{name}: best={row.best_score:.4f} (round {row.best_round}), "
+            f"latest={row.latest_score:.4f} (round {row.latest_round}), {row.rounds} ラウンド"
+        )
+    if standings:
+        typer.echo(f"更新: {max(row.updated_at for row in standings):%Y-%m-%d %H:%M:%S}")
@@ -0,0 +1,57 @@
+"""``qip proxy-score`` コマンド: valid 分割の日時の層化サンプルによる代理スコア。"""
+
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.proxy_score import run_proxy_score
+from quant_insight_plus.runtime_config import load_runtime_settings
+
+
+def proxy_score(
+    submission: Path = typer.Argument(..., help="採点する submission.py のパス"),
+    dates: int | None = typer.Option(
+        None, "--dates", "-n", min=2, help="抽出する日時数（未指定時は [proxy_score] の sample_dates）"
+    ),
+    budget: float | None = typer.Option(
+        None, "--budget", min=0.1, help="時間予算（秒、未指定時は [proxy_score] の time_budget_seconds）"
+    ),
+    full: bool = typer.Option(False, "--full", help="valid 分割の全日時を時間予算なしで採点する"),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        "-w",
+        help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
+    ),
+) -> None:
+    """submission.py を valid 分割の日時の層化サンプルで採点（計算済みの日時はキャッシュを再利用）。"""
+    ws = workspace or get_workspace()
+    settings = load_runtime_settings(ws).proxy_score
+    updates = {"sample_dates": dates, "time_budget_seconds": budget}
+    settings = settings.model_copy(update={key: value for key, value in updates.items() if value is not None})
+    if not submission.is_file():
+        typer.echo(f"submission.py が見つかりません: {submission}", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        result = run_proxy_score(ws, submission.read_text(), settings, full=full)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+    except Exception as e:
+        # generate_signal（ユーザーコード）の例外はトレースバックを出さずに要約する
+        typer.echo(f"generate_signal の実行に失敗しました: {type(e).__name__}: {e}", err=True)
+        raise typer.Exit(code=1) from e
+
+    score = result.score
+    std = f"{score.std_correlation:.4f}" if score.std_correlation is not None else "-"
+    typer.echo(
+        f"代理スコア: {score.sharpe_ratio:.4f} (mean={score.mean_correlation:.4f}, std={std}, {score.iterations} 日)"
+    )
+    typer.echo(
+        f"日時: {result.sampled_dates} / {result.total_dates} 日を抽出 "
+        f"(計算 {result.evaluated_dates}, キャッシュ {result.cached_dates}, {result.elapsed_seconds:.1f} 秒)"
+    )
+    if result.budget_exhausted:
+        typer.echo("時間予算を超えたため、抽出した日時の一部で採点しました（再実行で残りを計算します）")
@@ -0,0 +1,92 @@
+"""``qip queue`` / ``qip worker`` サブコマンド: ワークスペース共有キューによる分散チーム実行。"""
+
+from collections import Counter
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    STATUSES,
+    WorkQueue,
+    default_worker_id,
+    get_queue_dir,
+    load_orchestrator_teams,
+    run_worker,
+)
+
+queue_app = typer.Typer(help="チーム実行ジョブのキュー（qip worker で分散実行）")
+
+_WORKSPACE_OPTION_HELP = "ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）"
+
+
+@queue_app.command(name="submit")
+def submit_command(
+    task: str = typer.Argument(..., help="各チームに渡すタスク"),
+    config: Path = typer.Option(..., "--config", "-c", help="orchestrator.toml のパス"),
+    max_attempts: int = typer.Option(1, "--max-attempts", min=1, help="ワーカー異常終了時を含めた最大試行回数"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """orchestrator.toml のチームをジョブとしてキューに登録。"""
+    ws = workspace or get_workspace()
+    try:
+        team_configs, timeout = load_orchestrator_teams(config)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+
+    jobs = WorkQueue(get_queue_dir(ws)).enqueue(task, team_configs, timeout_seconds=timeout, max_attempts=max_attempts)
+    typer.echo(f"バッチ {jobs[0].batch_id}: {len(jobs)} ジョブを登録しました")
+    for job in jobs:
+        typer.echo(f"  {job.job_id}  {job.team_config}")
+
+
+@queue_app.command(name="status")
+def status_command(
+    batch_id: str | None = typer.Option(None, "--batch", help="表示するバッチ ID"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """キュー上のジョブの状態を表示。"""
+    ws = workspace or get_workspace()
+    jobs = WorkQueue(get_queue_dir(ws)).list_jobs(batch_id)
+    if not jobs:
+        typer.echo("ジョブがありません", err=True)
+        raise typer.Exit(code=1)
+
+    counts = Counter(job.status for job in jobs)
+    typer.echo(", ".join(f"{status}={counts[status]}" for status in STATUSES))
+    for job in jobs:
+        line = f"{job.job_id}  {job.status:<8}  {job.team_config}"
+        if job.worker_id:
+            line += f"  worker={job.worker_id}"
+        if job.error:
+            line += f"  error={job.error}"
+        typer.echo(line)
+
+
+def worker(
+    worker_id: str | None = typer.Option(None, "--worker-id", help="ワーカー ID（未指定時は ホスト名-PID）"),
+    poll_interval: float = typer.Option(
+        DEFAULT_POLL_INTERVAL_SECONDS, "--poll-interval", help="ジョブが無い場合の再確認間隔（秒）"
+    ),
+    lease_seconds: float = typer.Option(
+        DEFAULT_LEASE_SECONDS, "--lease", help="ハートビートが途絶えたジョブを回収するまでの秒数"
+    ),
+    once: bool = typer.Option(False, "--once", help="pending のジョブが無くなったら終了"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """キューからジョブを取得し、qip team で実行。"""
+    ws = workspace or get_workspace()
+    worker_id = worker_id or default_worker_id()
+    typer.echo(f"ワーカー {worker_id} を開始します: {get_queue_dir(ws)}")
+    queue = WorkQueue(get_queue_dir(ws), lease_seconds=lease_seconds)
+    try:
+        finished = run_worker(queue, ws, worker_id=worker_id, poll_interval=poll_interval, once=once)
+    except KeyboardInterrupt:
+        typer.echo("ワーカーを停止しました", err=True)
+        return
+
+    for job in finished:
+        typer.echo(f"{job.job_id}  {job.status}  {job.team_config}")
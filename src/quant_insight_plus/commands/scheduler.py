@@ -0,0 +1,51 @@
+"""``qip scheduler`` サブコマンド: 複数チーム実行のキュー待ちメトリクス。"""
+
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.runtime_config import load_runtime_settings
+from quant_insight_plus.scheduler import load_queue_metrics, summarize_queue_waits
+
+scheduler_app = typer.Typer(help="複数チーム実行のスケジューラ（LLM / CPU 容量プール）")
+
+
+@scheduler_app.command(name="stats")
+def stats_command(
+    team: bool = typer.Option(False, "--team", help="チーム別の待ち時間も表示"),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        "-w",
+        help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
+    ),
+) -> None:
+    """容量プールごとのキュー待ち時間を表示。"""
+    ws = workspace or get_workspace()
+    settings = load_runtime_settings(ws).scheduler
+    if settings.metrics_path is None:
+        typer.echo("runtime.toml の [scheduler] metrics_path が設定されていません", err=True)
+        raise typer.Exit(code=1)
+
+    metrics = load_queue_metrics(ws / settings.metrics_path)
+    if not metrics:
+        typer.echo(f"キュー待ちメトリクスがありません: {ws / settings.metrics_path}", err=True)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"=== キュー待ち（llm_slots={settings.llm_slots}, cpu_slots={settings.cpu_slots}） ===")
+    for pool, summary in summarize_queue_waits(metrics).items():
+        typer.echo(
+            f"{pool}: {summary['acquisitions']:.0f} 回, 待ち p50={summary['wait_p50']:.1f}s "
+            f"p95={summary['wait_p95']:.1f}s max={summary['wait_max']:.1f}s, 保持 p50={summary['hold_p50']:.1f}s"
+        )
+
+    if team:
+        typer.echo("")
+        for team_id in sorted({m.team_id for m in metrics}):
+            team_metrics = [m for m in metrics if m.team_id == team_id]
+            for pool, summary in summarize_queue_waits(team_metrics).items():
+                typer.echo(
+                    f"{team_id} / {pool}: {summary['acquisitions']:.0f} 回, "
+                    f"待ち p50={summary['wait_p50']:.1f}s p95={summary['wait_p95']:.1f}s"
+                )
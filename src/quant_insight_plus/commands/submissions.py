@@ -0,0 +1,97 @@
+"""``qip submissions`` サブコマンド: ラウンドディレクトリの保持ポリシーとアーカイブ。"""
+
+import sys
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.round_archive import collect_garbage, list_archives, read_archived_file, restore_round
+from quant_insight_plus.runtime_config import load_runtime_settings
+
+submissions_app = typer.Typer(help="ラウンドディレクトリ（submissions/round_{N}）の保持とアーカイブ")
+
+_WORKSPACE_OPTION_HELP = "ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）"
+_BYTES_PER_MEGABYTE = 1024 * 1024
+
+
+@submissions_app.command(name="gc")
+def gc_command(
+    keep_last: int | None = typer.Option(
+        None, "--keep-last", min=1, help="そのまま残す新しいラウンド数（未指定時は runtime.toml）"
+    ),
+    keep_best: int | None = typer.Option(
+        None, "--keep-best", min=0, help="各チームのスコア上位として残すラウンド数（未指定時は runtime.toml）"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", help="計画のみ表示し、ファイルを変更しない"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """保持ポリシーに従い、古いラウンドディレクトリをアーカイブ。"""
+    ws = workspace or get_workspace()
+    settings = load_runtime_settings(ws).submission_retention
+    updates = {"keep_last_rounds": keep_last, "keep_best_per_team": keep_best}
+    settings = settings.model_copy(update={key: value for key, value in updates.items() if value is not None})
+
+    result = collect_garbage(ws, settings, dry_run=dry_run)
+    plan = result.plan
+    typer.echo(f"残す: {_format_rounds(plan.keep)}")
+    typer.echo(f"コンパクト化（{', '.join(settings.keep_files)} 以外をアーカイブ）: {_format_rounds(plan.compact)}")
+    typer.echo(f"アーカイブ: {_format_rounds(plan.archive)}")
+    if dry_run:
+        typer.echo("（--dry-run のため変更していません）")
+        return
+    files = sum(len(archive.files) for archive in result.archives)
+    typer.echo(f"{files} ファイル（{result.archived_bytes / _BYTES_PER_MEGABYTE:.1f} MB）をアーカイブしました")
+
+
+@submissions_app.command(name="archives")
+def archives_command(
+    round_number: int | None = typer.Option(None, "--round", "-r", help="ラウンド番号で絞り込む"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """アーカイブの一覧を表示。"""
+    archives = list_archives(workspace or get_workspace(), round_number)
+    if not archives:
+        typer.echo("アーカイブがありません")
+        return
+    for archive in archives:
+        kind = "コンパクト化" if archive.compacted else "ラウンド全体"
+        typer.echo(
+            f"{archive.archive_id}  {kind}  {len(archive.files)} ファイル  "
+            f"{archive.total_bytes / _BYTES_PER_MEGABYTE:.1f} MB"
+        )
+
+
+@submissions_app.command(name="cat")
+def cat_command(
+    archive_id: str = typer.Argument(..., help="アーカイブ ID（qip submissions archives で確認）"),
+    path: str = typer.Argument(..., help="ラウンドディレクトリからの相対パス（例: submission.py）"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """アーカイブしたファイルの内容を標準出力に書き出す。"""
+    try:
+        data = read_archived_file(workspace or get_workspace(), archive_id, path)
+    except FileNotFoundError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+
+
+@submissions_app.command(name="restore")
+def restore_command(
+    archive_id: str = typer.Argument(..., help="アーカイブ ID（qip submissions archives で確認）"),
+    output: Path | None = typer.Option(None, "--output", "-o", help="展開先（未指定時は ./{アーカイブ ID}）"),
+    workspace: Path | None = typer.Option(None, "--workspace", "-w", help=_WORKSPACE_OPTION_HELP),
+) -> None:
+    """アーカイブしたラウンドをディレクトリに展開。"""
+    try:
+        destination = restore_round(workspace or get_workspace(), archive_id, output or Path(archive_id))
+    except FileNotFoundError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+    typer.echo(f"展開しました: {destination}")
+
+
+def _format_rounds(rounds: list[int]) -> str:
+    return ", ".join(f"round_{n}" for n in rounds) if rounds else "なし"
@@ -0,0 +1,73 @@
+"""``qip usage`` コマンド: トークン使用量とスループットのレポート。"""
+
+from pathlib import Path
+
+import typer
+from quant_insight.utils.env import get_workspace
+
+from quant_insight_plus.db import connect, get_db_path
+from quant_insight_plus.usage import build_usage_report
+
+
+def usage(
+    execution_id: str = typer.Argument(..., help="実行 ID"),
+    workspace: Path | None = typer.Option(
+        None,
+        "--workspace",
+        "-w",
+        help="ワークスペースパス（未指定時は$MIXSEEK_WORKSPACE）",
+    ),
+) -> None:
+    """実行 ID 単位のトークン使用量・スループットを表示。"""
+    import duckdb
+
+    ws = workspace or get_workspace()
+    db_path = get_db_path(ws)
+    try:
+        conn = connect(db_path, read_only=True)
+    except FileNotFoundError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+    except duckdb.IOException as e:
+        # 実行中の qip exec が書き込みロックを保持している間は読み取り専用でも開けない
+        typer.echo(
+            f"データベースが使用中です（実行中の qip exec がロックを保持しています）。"
+            f"実行の終了後に再度お試しください: {db_path}",
+            err=True,
+        )
+        raise typer.Exit(code=1) from e
+
+    try:
+        report = build_usage_report(conn, execution_id)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+    finally:
+        conn.close()
+
+    if not report.rows:
+        typer.echo(f"使用量の記録がありません: {execution_id}", err=True)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"=== 使用量: {execution_id} ===")
+    for row in report.rows:
+        cost = f" ${row.cost_usd:.2f}" if row.cost_usd is not None else ""
+        cache_hit = row.cache_read_tokens / row.input_tokens if row.input_tokens else 0.0
+        typer.echo(
+            f"{row.team_id} / {row.agent_name} ({row.agent_role}, {row.model}): "
+            f"{row.executions} 回, in={row.input_tokens:,} out={row.output_tokens:,} "
+            f"cache_read={row.cache_read_tokens:,} cache_write={row.cache_write_tokens:,} "
+            f"(hit {cache_hit:.0%}), "
+            f"{row.wall_seconds:.0f}s{cost}"
+        )
+
+    typer.echo("")
+    typer.echo(f"合計トークン: {report.total_tokens:,}")
+    if report.total_cost_usd is not None:
+        typer.echo(f"合計コスト: ${report.total_cost_usd:.2f}")
+    typer.echo(f"採用提出数: {report.accepted_submissions}")
+    if report.tokens_per_accepted_submission is not None:
+        typer.echo(f"採用提出あたりトークン: {report.tokens_per_accepted_submission:,.0f}")
+    typer.echo(f"ラウンド数: {report.rounds}")
+    if report.rounds_per_hour is not None:
+        typer.echo(f"ラウンド/時: {report.rounds_per_hour:.2f}")
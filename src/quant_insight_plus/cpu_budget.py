@@ -0,0 +1,317 @@
+"""ホスト単位の CPU 予算（polars のスレッド数と CPU アフィニティ）。
+
+polars はプロセスごとに全コア分のスレッドプールを作るため、複数チームの Member Agent の
+スクリプト・評価が同時に走るとスレッド数がチーム数 × コア数になる。
+
+ホストの稼働チーム（ラウンド実行中のチーム）を ``{workspace}/.qip/cpu_budget/`` の
+リースファイルで数え、チームごとに次の割り当てを求める:
+
+    スレッド数 = (利用可能なコア数 - reserved_cores) // max(稼働チーム数, max_concurrent_teams)
+
+割り当てはラウンドの開始時に決まり、後から開始したチームがあっても変わらない。
+先に開始したチームが全コアを取らないよう、``max_concurrent_teams`` 分の枠で割る。
+
+割り当ては次の子プロセスに渡す:
+
+- Member Agent の ``python_command``（``env POLARS_MAX_THREADS=N [taskset -c CPUS] {python_command}``）
+- ``qip worker`` が起動する ``qip team``（環境変数とアフィニティ。プロセス内の Evaluator に適用される）
+- ``qip ensemble`` のシグナル計算ワーカー
+
+``qip exec`` の Evaluator はチーム間で 1 つのプロセス（1 つのスレッドプール）を共有するため対象外。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import shlex
+import shutil
+import socket
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+
+if TYPE_CHECKING:
+    from quant_insight_plus.runtime_config import CpuBudgetSettings
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+POLARS_THREADS_ENV_VAR = "POLARS_MAX_THREADS"
+CPU_BUDGET_DIR_NAME = "cpu_budget"
+LEASE_SUFFIX = ".json"
+TASKSET_COMMAND = "taskset"
+
+_current_allocation: contextvars.ContextVar[CpuAllocation | None] = contextvars.ContextVar(
+    "qip_cpu_allocation", default=None
+)
+
+
+class CpuAllocation(BaseModel):
+    """1 チーム（またはワーカー）への CPU の割り当て。"""
+
+    threads: int = Field(ge=1)
+    cores: list[int] = Field(default_factory=list)
+    active_teams: int = Field(ge=1)
+
+    def environment(self) -> dict[str, str]:
+        """子プロセスに渡す環境変数。"""
+        return {POLARS_THREADS_ENV_VAR: str(self.threads)}
+
+    def wrap_command(self, command: str) -> str:
+        """コマンドの前に環境変数と（アフィニティ指定時は）``taskset`` を付加する。
+
+        Args:
+            command: ``python_command``（例: ``"uv run python"``）。
+
+        Returns:
+            ``env POLARS_MAX_THREADS=N [taskset -c CPUS] {command}``。
+            ``taskset`` が無い環境ではアフィニティを省略する。
+        """
+        parts = ["env", *(f"{key}={shlex.quote(value)}" for key, value in self.environment().items())]
+        return " ".join([*parts, *self.affinity_prefix(), command])
+
+    def affinity_prefix(self) -> list[str]:
+        """アフィニティを指定するコマンドの接頭辞（``taskset -c CPUS``）。
+
+        Returns:
+            ``pin_affinity`` 無効時、または ``taskset`` が無い環境では空のリスト。
+        """
+        if not self.cores or shutil.which(TASKSET_COMMAND) is None:
+            return []
+        return [TASKSET_COMMAND, "-c", ",".join(str(core) for core in self.cores)]
+
+
+class TeamLease(BaseModel):
+    """稼働チームのリース（ラウンド実行中に存在する）。"""
+
+    host: str
+    pid: int
+    team_id: str
+    started_at: datetime
+
+
+def available_cores() -> list[int]:
+    """このプロセスが使用できる CPU 番号を返す。"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def allocate(
+    settings: CpuBudgetSettings,
+    *,
+    active_teams: int,
+    slot: int,
+    cores: list[int] | None = None,
+) -> CpuAllocation:
+    """稼働チーム数から、``slot`` 番目のチームの割り当てを求める。
+
+    稼働チーム数が ``max_concurrent_teams`` 以下の場合は ``max_concurrent_teams`` で割るため、
+    その後に稼働チームが増えても割り当ての合計は利用可能なコア数を超えない。
+
+    Args:
+        settings: ``[cpu_budget]`` の設定。
+        active_teams: ホストの稼働チーム数（1 未満は 1 とみなす）。
+        slot: チームの番号（0 始まり。アフィニティのコアの位置に使う）。
+        cores: 使用できる CPU 番号（未指定時は ``available_cores()``）。
+
+    Returns:
+        割り当て（``pin_affinity`` 無効時の ``cores`` は空）。
+    """
+    cores = cores if cores is not None else available_cores()
+    usable = cores[: max(1, len(cores) - settings.reserved_cores)]
+    active_teams = max(1, active_teams)
+    threads = max(1, len(usable) // max(active_teams, settings.max_concurrent_teams))
+    if settings.max_threads_per_team is not None:
+        threads = min(threads, settings.max_threads_per_team)
+    pinned: list[int] = []
+    if settings.pin_affinity:
+        start = (slot * threads) % len(usable)
+        pinned = sorted({usable[(start + i) % len(usable)] for i in range(threads)})
+    return CpuAllocation(threads=threads, cores=pinned, active_teams=active_teams)
+
+
+def get_cpu_budget_dir(workspace: Path) -> Path:
+    """リースファイルのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/cpu_budget``。
+    """
+    return workspace / KERNEL_DIR_NAME / CPU_BUDGET_DIR_NAME
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def live_leases(workspace: Path) -> list[TeamLease]:
+    """このホストの稼働チームのリースを開始順に返す（終了したプロセスのリースは削除する）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        リース。
+    """
+    host = socket.gethostname()
+    leases: list[TeamLease] = []
+    for path in get_cpu_budget_dir(workspace).glob(f"*{LEASE_SUFFIX}"):
+        try:
+            lease = TeamLease.model_validate_json(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if lease.host != host:
+            continue
+        if not _pid_alive(lease.pid):
+            path.unlink(missing_ok=True)
+            continue
+        leases.append(lease)
+    return sorted(leases, key=lambda lease: (lease.started_at, lease.pid, lease.team_id))
+
+
+def _lease_path(workspace: Path, team_id: str) -> Path:
+    digest = hashlib.sha256(team_id.encode()).hexdigest()[:12]
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", team_id)[:40]
+    return get_cpu_budget_dir(workspace) / f"{socket.gethostname()}-{os.getpid()}-{safe}-{digest}{LEASE_SUFFIX}"
+
+
+@contextlib.contextmanager
+def team_lease(workspace: Path, team_id: str, settings: CpuBudgetSettings) -> Iterator[CpuAllocation | None]:
+    """ラウンド実行中のチームをリースとして登録し、割り当てを ``current_allocation()`` に設定する。
+
+    ``[cpu_budget]`` 無効時は何もしない。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        team_id: チーム ID。
+        settings: ``[cpu_budget]`` の設定。
+
+    Yields:
+        割り当て（無効時は None）。
+    """
+    if not settings.enabled:
+        yield None
+        return
+    path = _lease_path(workspace, team_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lease = TeamLease(host=socket.gethostname(), pid=os.getpid(), team_id=team_id, started_at=datetime.now(UTC))
+    path.write_text(lease.model_dump_json() + "\n")
+    try:
+        leases = live_leases(workspace)
+        slot = next(
+            (i for i, other in enumerate(leases) if (other.pid, other.team_id) == (lease.pid, team_id)),
+            len(leases),
+        )
+        if len(leases) > settings.max_concurrent_teams:
+            logger.warning(
+                "CPU 予算: 稼働チーム %d が max_concurrent_teams %d を超えています"
+                "（割り当ての合計がコア数を超えます）",
+                len(leases),
+                settings.max_concurrent_teams,
+            )
+        allocation = allocate(settings, active_teams=len(leases), slot=slot)
+        logger.info(
+            "CPU 予算: team=%s, 稼働チーム %d, スレッド %d%s",
+            team_id,
+            allocation.active_teams,
+            allocation.threads,
+            f", CPU {allocation.cores}" if allocation.cores else "",
+        )
+        token = _current_allocation.set(allocation)
+        try:
+            yield allocation
+        finally:
+            _current_allocation.reset(token)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def current_allocation() -> CpuAllocation | None:
+    """実行中のラウンドの割り当てを返す（``team_lease()`` の外では None）。"""
+    return _current_allocation.get()
+
+
+def allocate_for_new_team(workspace: Path, settings: CpuBudgetSettings) -> CpuAllocation:
+    """これから起動するチームプロセス（``qip worker`` のジョブ）の割り当てを求める。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        settings: ``[cpu_budget]`` の設定。
+
+    Returns:
+        稼働チーム数を 1 つ増やした場合の、末尾のチームの割り当て。
+    """
+    return allocate_workers(workspace, settings, 1)
+
+
+def allocate_workers(workspace: Path, settings: CpuBudgetSettings, workers: int) -> CpuAllocation:
+    """稼働チームに加えて ``workers`` 個のワーカープロセスを起動する場合の割り当てを求める。
+
+    各ワーカーを 1 チームとして数える。``pin_affinity`` 有効時の ``cores`` は全ワーカーの
+    コアの和集合（ワーカー間では共有する）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        settings: ``[cpu_budget]`` の設定。
+        workers: 起動するワーカー数。
+
+    Returns:
+        ワーカー 1 つあたりの割り当て。
+    """
+    active = len(live_leases(workspace))
+    allocations = [
+        allocate(settings, active_teams=active + workers, slot=active + index) for index in range(max(1, workers))
+    ]
+    cores = sorted({core for allocation in allocations for core in allocation.cores})
+    return allocations[0].model_copy(update={"cores": cores})
+
+
+def apply_to_current_process(allocation: CpuAllocation) -> None:
+    """割り当てを現在のプロセスに適用する（子プロセスの初期化・``preexec_fn`` 用）。
+
+    polars のスレッド数はインポート時に決まるため、polars のインポート前に呼び出すこと。
+
+    Args:
+        allocation: 割り当て。
+    """
+    os.environ.update(allocation.environment())
+    if allocation.cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, allocation.cores)
+
+
+def substitute_python_command(instructions: str, original: str, budgeted: str) -> str:
+    """システム指示中の ``python_command`` を、割り当てを付加したコマンドに置き換える。
+
+    ``{python_command}`` プレースホルダーと、行頭にある展開済みのコマンドの両方を置き換える。
+
+    Args:
+        instructions: システム指示。
+        original: 元の ``python_command``。
+        budgeted: ``CpuAllocation.wrap_command()`` の戻り値。
+
+    Returns:
+        置き換え後のシステム指示。
+    """
+    instructions = instructions.replace("{python_command}", budgeted)
+    if not original:
+        return instructions
+    return re.sub(rf"(?m)^(\s*){re.escape(original)}(?=\s)", lambda m: f"{m.group(1)}{budgeted}", instructions)
@@ -0,0 +1,225 @@
+"""分割済みデータのメモリ効率化（コンパクト dtype プロファイル）。
+
+``qip data split`` が出力した parquet を以下の方針で書き換える（オプトイン）:
+
+- ``symbol`` やセクターコード等の繰り返し文字列 → ``Categorical``
+- ``Float64`` / ``Decimal`` の価格系カラム → 精度が許容範囲内なら ``Float32``
+- ``Datetime`` → マイクロ秒精度（``us``）に統一
+
+精度の損失はカラムごとに検証し、レポートとして返す。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# --- 名前付き定数 ---
+CATEGORICAL_COLUMNS = (
+    "symbol",
+    "sector17_code",
+    "sector17_name",
+    "sector33_code",
+    "sector33_name",
+    "scale_category",
+    "market_code",
+    "market_name",
+    "margin_code",
+    "margin_name",
+)
+DEFAULT_SPLITS = ("train", "valid")
+DEFAULT_FLOAT32_RELATIVE_TOLERANCE = 1e-6
+COMPACTION_REPORT_FILENAME = "compaction_report.json"
+
+
+class ColumnPrecisionReport(BaseModel):
+    """カラム単位の dtype 変換と精度損失の記録。"""
+
+    column: str
+    original_dtype: str
+    compact_dtype: str
+    max_abs_error: float = 0.0
+    max_rel_error: float = 0.0
+
+
+class CompactionReport(BaseModel):
+    """parquet ファイル単位のコンパクト化レポート。"""
+
+    path: str
+    rows: int
+    bytes_before: int
+    bytes_after: int
+    columns: list[ColumnPrecisionReport]
+
+    @property
+    def reduction_ratio(self) -> float:
+        """メモリ削減率（0.0〜1.0）。"""
+        if self.bytes_before == 0:
+            return 0.0
+        return 1.0 - self.bytes_after / self.bytes_before
+
+
+def _float_errors(original: pl.Series, compact: pl.Series) -> tuple[float, float]:
+    """Float64 と Float32 変換後の最大絶対誤差・最大相対誤差を返す。"""
+    import polars as pl
+
+    frame = pl.DataFrame({"ref": original.cast(pl.Float64), "restored": compact.cast(pl.Float64)})
+    abs_err = (pl.col("ref") - pl.col("restored")).abs().fill_nan(0.0)
+    stats = frame.select(
+        abs_err.max().alias("abs"),
+        pl.when(pl.col("ref") != 0).then(abs_err / pl.col("ref").abs()).otherwise(abs_err).max().alias("rel"),
+    ).row(0)
+    return (
+        float(stats[0]) if stats[0] is not None else 0.0,
+        float(stats[1]) if stats[1] is not None else 0.0,
+    )
+
+
+def compact_frame(
+    df: pl.DataFrame,
+    *,
+    rel_tolerance: float = DEFAULT_FLOAT32_RELATIVE_TOLERANCE,
+) -> tuple[pl.DataFrame, list[ColumnPrecisionReport]]:
+    """DataFrame をコンパクト dtype プロファイルに変換する。
+
+    浮動小数点カラムは Float32 へ変換した際の最大相対誤差が ``rel_tolerance``
+    以下の場合のみ変換し、それ以外（オーバーフロー等）は Float64 のまま残す。
+
+    Args:
+        df: 変換対象の DataFrame。
+        rel_tolerance: Float32 変換を許容する最大相対誤差。
+
+    Returns:
+        変換後の DataFrame と、dtype を変更したカラムのレポートのタプル。
+    """
+    import polars as pl
+
+    reports: list[ColumnPrecisionReport] = []
+    exprs: list[pl.Expr] = []
+
+    for name, dtype in df.schema.items():
+        series = df.get_column(name)
+        if name in CATEGORICAL_COLUMNS and dtype == pl.String:
+            exprs.append(pl.col(name).cast(pl.Categorical))
+            reports.append(ColumnPrecisionReport(column=name, original_dtype=str(dtype), compact_dtype="Categorical"))
+        elif dtype == pl.Float64 or isinstance(dtype, pl.Decimal):
+            candidate = series.cast(pl.Float32)
+            max_abs, max_rel = _float_errors(series, candidate)
+            if max_rel <= rel_tolerance:
+                exprs.append(pl.col(name).cast(pl.Float32))
+                compact_dtype = "Float32"
+            else:
+                exprs.append(pl.col(name).cast(pl.Float64))
+                compact_dtype = "Float64"
+            if compact_dtype != str(dtype):
+                reports.append(
+                    ColumnPrecisionReport(
+                        column=name,
+                        original_dtype=str(dtype),
+                        compact_dtype=compact_dtype,
+                        max_abs_error=max_abs,
+                        max_rel_error=max_rel,
+                    )
+                )
+        elif isinstance(dtype, pl.Datetime) and dtype.time_unit != "us":
+            exprs.append(pl.col(name).dt.cast_time_unit("us"))
+            reports.append(
+                ColumnPrecisionReport(
+                    column=name,
+                    original_dtype=str(dtype),
+                    compact_dtype=str(pl.Datetime("us", dtype.time_zone)),
+                )
+            )
+
+    if not exprs:
+        return df, reports
+    return df.with_columns(exprs), reports
+
+
+def compact_parquet(
+    path: Path,
+    *,
+    rel_tolerance: float = DEFAULT_FLOAT32_RELATIVE_TOLERANCE,
+    dry_run: bool = False,
+) -> CompactionReport:
+    """parquet ファイルをコンパクト dtype プロファイルで書き換える。
+
+    書き込みは一時ファイル経由で行い、``os.replace`` で原子的に置換する。
+
+    Args:
+        path: 対象の parquet ファイル。
+        rel_tolerance: Float32 変換を許容する最大相対誤差。
+        dry_run: True の場合はレポートのみ返し、ファイルを書き換えない。
+
+    Returns:
+        コンパクト化レポート。
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合。
+    """
+    import polars as pl
+
+    if not path.is_file():
+        msg = f"parquet ファイルが見つかりません: {path}"
+        raise FileNotFoundError(msg)
+
+    df = pl.read_parquet(path)
+    compact, columns = compact_frame(df, rel_tolerance=rel_tolerance)
+
+    if not dry_run and columns:
+        tmp_path = path.with_suffix(".parquet.tmp")
+        compact.write_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    return CompactionReport(
+        path=str(path),
+        rows=df.height,
+        bytes_before=df.estimated_size(),
+        bytes_after=compact.estimated_size(),
+        columns=columns,
+    )
+
+
+def compact_split_outputs(
+    inputs_dir: Path,
+    dataset_names: list[str],
+    *,
+    splits: tuple[str, ...] = DEFAULT_SPLITS,
+    rel_tolerance: float = DEFAULT_FLOAT32_RELATIVE_TOLERANCE,
+    dry_run: bool = False,
+) -> list[CompactionReport]:
+    """``data/inputs/{name}/{split}.parquet`` をまとめてコンパクト化する。
+
+    存在しない分割ファイルはスキップする。レポートは
+    ``{inputs_dir}/compaction_report.json`` にも書き出す（dry_run 時を除く）。
+
+    Args:
+        inputs_dir: ``$MIXSEEK_WORKSPACE/data/inputs`` のパス。
+        dataset_names: competition.toml の ``[[competition.data]]`` 名のリスト。
+        splits: 対象とする分割名。
+        rel_tolerance: Float32 変換を許容する最大相対誤差。
+        dry_run: True の場合はファイルを書き換えない。
+
+    Returns:
+        ファイルごとのコンパクト化レポートのリスト。
+    """
+    reports: list[CompactionReport] = []
+    for name in dataset_names:
+        for split in splits:
+            path = inputs_dir / name / f"{split}.parquet"
+            if not path.is_file():
+                continue
+            reports.append(compact_parquet(path, rel_tolerance=rel_tolerance, dry_run=dry_run))
+
+    if not dry_run and reports:
+        payload = [r.model_dump() for r in reports]
+        (inputs_dir / COMPACTION_REPORT_FILENAME).write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+
+    return reports
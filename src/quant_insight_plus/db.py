@@ -0,0 +1,58 @@
+"""ワークスペースの DuckDB（mixseek.db）への接続ヘルパー。
+
+mixseek-core の store と同じデータベースファイルに、quant-insight-plus
+独自のテーブルを追加・参照するために使用する。
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import duckdb
+
+# --- 名前付き定数 ---
+DB_FILENAME = "mixseek.db"
+
+
+def get_db_path(workspace: Path) -> Path:
+    """DuckDB ファイルのパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/mixseek.db`` のパス。
+    """
+    return workspace / DB_FILENAME
+
+
+def connect(db_path: Path, *, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    """DuckDB に接続する。
+
+    Args:
+        db_path: DuckDB ファイルのパス。
+        read_only: 読み取り専用で接続するか。
+
+    Returns:
+        DuckDB 接続。
+
+    Raises:
+        FileNotFoundError: read_only 指定時にファイルが存在しない場合。
+    """
+    import duckdb
+
+    if read_only and not db_path.is_file():
+        msg = f"データベースが見つかりません: {db_path}"
+        raise FileNotFoundError(msg)
+    return duckdb.connect(str(db_path), read_only=read_only)
+
+
+def table_exists(conn: duckdb.DuckDBPyConnection, table_name: str) -> bool:
+    """テーブルが存在するかを返す。"""
+    row = conn.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+        [table_name],
+    ).fetchone()
+    return row is not None and row[0] > 0
@@ -0,0 +1,247 @@
+"""提出間のシグナル相関（多様性）の要約。
+
+Leader Agent がラウンドをまたいでほぼ同じ仮説を繰り返さないよう、
+シグナルキャッシュ（``signal_cache``）に保存された同じ実行の提出について、
+日時ごとの断面順位の相関を求め、ラウンドディレクトリに要約を書き出す:
+
+    submissions/round_{N}/diversity.md
+
+ラウンドディレクトリのファイルは ``_enrich_task_with_workspace_context()`` が
+Member Agent のタスクプロンプトに埋め込む。
+
+相関は全提出の断面順位を 1 つの縦長 DataFrame にまとめ、``chunk_size`` 件ずつの提出を
+全提出と (datetime, symbol) で結合して求める（結合の大きさを chunk 単位に抑える）。
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from quant_insight_plus.runtime_config import DiversitySettings
+    from quant_insight_plus.signal_cache import SignalCacheEntry
+
+# --- 名前付き定数 ---
+DIVERSITY_FILENAME = "diversity.md"
+DIVERSITY_HEADING = "# 提出の多様性（シグナル相関）"
+
+
+class SubmissionDiversity(BaseModel):
+    """1 提出の最も相関の高い提出。"""
+
+    team_id: str
+    round_number: int
+    score: float
+    nearest_team_id: str | None
+    nearest_round: int | None
+    nearest_correlation: float | None
+
+
+class DiversitySummary(BaseModel):
+    """提出間のシグナル相関の要約。"""
+
+    execution_id: str
+    submissions: list[SubmissionDiversity]
+    mean_correlation: float | None
+    redundant_pairs: list[tuple[int, int, float]]
+    redundant_correlation: float
+
+
+def correlation_pairs(signals: list[pl.DataFrame], chunk_size: int) -> pl.DataFrame:
+    """提出の全ペアについて、日時ごとの断面順位の相関を求める。
+
+    Args:
+        signals: 提出ごとのシグナル（datetime, symbol, signal）。
+        chunk_size: 1 回の結合で扱う提出数。
+
+    Returns:
+        (member, other, correlation, observations)。``member < other`` のペアのみ。
+        順位が一定で相関を求められないペアの ``correlation`` は null。
+    """
+    import polars as pl
+
+    from quant_insight_plus.ensemble import stack_ranks
+
+    ranks = stack_ranks(signals).lazy()
+    others = ranks.rename({"member": "other", "rank": "other_rank"})
+    parts: list[pl.DataFrame] = []
+    for start in range(0, len(signals), chunk_size):
+        chunk = ranks.filter(pl.col("member").is_between(start, start + chunk_size - 1))
+        parts.append(
+            chunk.join(others, on=["datetime", "symbol"])
+            .filter(pl.col("other") > pl.col("member"))
+            .group_by("member", "other")
+            .agg(pl.corr("rank", "other_rank").alias("correlation"), pl.len().alias("observations"))
+            .with_columns(pl.col("correlation").fill_nan(None))
+            .collect()
+        )
+    schema = {"member": pl.UInt32, "other": pl.UInt32, "correlation": pl.Float64, "observations": pl.UInt32}
+    if not parts:
+        return pl.DataFrame(schema=schema)
+    return pl.concat(parts).cast(schema).sort("member", "other")  # type: ignore[arg-type]
+
+
+def summarize_diversity(
+    entries: list[SignalCacheEntry],
+    pairs: pl.DataFrame,
+    *,
+    execution_id: str,
+    redundant_correlation: float,
+) -> DiversitySummary:
+    """相関のペアから、提出ごとの最も近い提出と冗長なペアを求める。
+
+    Args:
+        entries: 提出（``pairs`` の ``member`` / ``other`` のインデックス順）。
+        pairs: ``correlation_pairs()`` の戻り値。
+        execution_id: 実行 ID。
+        redundant_correlation: 冗長とみなす相関の下限。
+
+    Returns:
+        要約。
+    """
+    valid = [
+        (member, other, correlation)
+        for member, other, correlation in pairs.select("member", "other", "correlation").iter_rows()
+        if correlation is not None
+    ]
+    nearest: dict[int, tuple[int, float]] = {}
+    for member, other, correlation in valid:
+        for a, b in ((member, other), (other, member)):
+            if a not in nearest or correlation > nearest[a][1]:
+                nearest[a] = (b, correlation)
+
+    submissions: list[SubmissionDiversity] = []
+    for index, entry in enumerate(entries):
+        neighbour = nearest.get(index)
+        submissions.append(
+            SubmissionDiversity(
+                team_id=entry.team_id,
+                round_number=entry.round_number,
+                score=entry.score,
+                nearest_team_id=entries[neighbour[0]].team_id if neighbour else None,
+                nearest_round=entries[neighbour[0]].round_number if neighbour else None,
+                nearest_correlation=neighbour[1] if neighbour else None,
+            )
+        )
+    redundant = sorted(
+        ((member, other, correlation) for member, other, correlation in valid if correlation >= redundant_correlation),
+        key=lambda pair: -pair[2],
+    )
+    return DiversitySummary(
+        execution_id=execution_id,
+        submissions=submissions,
+        mean_correlation=sum(c for _, _, c in valid) / len(valid) if valid else None,
+        redundant_pairs=redundant,
+        redundant_correlation=redundant_correlation,
+    )
+
+
+def _label(team_id: str | None, round_number: int | None) -> str:
+    return f"{team_id} R{round_number}" if team_id is not None else "-"
+
+
+def render_diversity(summary: DiversitySummary) -> str:
+    """要約を Markdown にする（スコア降順の表と冗長なペア）。
+
+    Args:
+        summary: ``summarize_diversity()`` の戻り値。
+
+    Returns:
+        Markdown。
+    """
+    mean = f"{summary.mean_correlation:.2f}" if summary.mean_correlation is not None else "-"
+    lines = [
+        DIVERSITY_HEADING,
+        "",
+        f"実行 {summary.execution_id} の評価済み提出 {len(summary.submissions)} 件の、"
+        "日時ごとの断面順位によるシグナル相関です。",
+        f"平均相関: {mean} / 相関 {summary.redundant_correlation:.2f} 以上のペア: {len(summary.redundant_pairs)}",
+        "相関の高い提出と同じ仮説の繰り返しを避け、相関の低い新しいシグナルを優先してください。",
+        "",
+        "| 提出 | スコア | 最も相関の高い提出 | 相関 |",
+        "|------|--------|--------------------|------|",
+    ]
+    for row in sorted(summary.submissions, key=lambda s: -s.score):
+        correlation = f"{row.nearest_correlation:.2f}" if row.nearest_correlation is not None else "-"
+        lines.append(
+            f"| {_label(row.team_id, row.round_number)} | {row.score:.4f} "
+            f"| {_label(row.nearest_team_id, row.nearest_round)} | {correlation} |"
+        )
+    if summary.redundant_pairs:
+        lines += ["", f"## 冗長なペア（相関 {summary.redundant_correlation:.2f} 以上）", ""]
+        for member, other, correlation in summary.redundant_pairs:
+            a, b = summary.submissions[member], summary.submissions[other]
+            lines.append(
+                f"- {_label(a.team_id, a.round_number)} ↔ {_label(b.team_id, b.round_number)}: {correlation:.2f}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def build_diversity_summary(
+    workspace: Path,
+    execution_id: str,
+    settings: DiversitySettings,
+) -> DiversitySummary | None:
+    """シグナルキャッシュの同じ実行・同じ評価データの提出から要約を作成する。
+
+    提出が ``max_submissions`` を超える場合はスコア上位を対象にする。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        settings: ``[diversity]`` の設定。
+
+    Returns:
+        要約（対象の提出が 2 件未満の場合は None）。
+    """
+    from quant_insight_plus.signal_cache import data_fingerprint, list_cached_signals, load_signals
+
+    data_hash = data_fingerprint(workspace)
+    entries = [
+        entry
+        for entry in list_cached_signals(workspace)
+        if entry.execution_id == execution_id and entry.data_fingerprint == data_hash
+    ]
+    entries = sorted(entries, key=lambda e: -e.score)[: settings.max_submissions]
+    if len(entries) < 2:
+        return None
+    entries.sort(key=lambda e: (e.team_id, e.round_number))
+    pairs = correlation_pairs([load_signals(workspace, entry.key) for entry in entries], settings.chunk_size)
+    return summarize_diversity(
+        entries, pairs, execution_id=execution_id, redundant_correlation=settings.redundant_correlation
+    )
+
+
+def write_diversity_summary(
+    workspace: Path,
+    round_dir: Path,
+    execution_id: str,
+    settings: DiversitySettings,
+) -> Path | None:
+    """要約をラウンドディレクトリの ``diversity.md`` に書き出す（一時ファイルから差し替え）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_dir: ラウンドディレクトリのパス。
+        execution_id: 実行 ID。
+        settings: ``[diversity]`` の設定。
+
+    Returns:
+        書き出したパス（対象の提出が 2 件未満の場合は None）。
+    """
+    summary = build_diversity_summary(workspace, execution_id, settings)
+    if summary is None:
+        return None
+    round_dir.mkdir(parents=True, exist_ok=True)
+    path = round_dir / DIVERSITY_FILENAME
+    tmp = round_dir / f".{DIVERSITY_FILENAME}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(render_diversity(summary))
+    os.replace(tmp, path)
+    return path
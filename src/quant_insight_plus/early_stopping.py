@@ -0,0 +1,457 @@
+"""successive halving による下位チームの早期打ち切り。
+
+``qip exec`` の各チームは ``min_rounds`` 〜 ``max_rounds`` のラウンドを実行するが、
+リーダーボードで大きく後れたチームのラウンドは最良スコアの改善にほぼ寄与しない。
+runtime.toml の ``[successive_halving]`` 有効時、チェックポイントのラウンド数に
+到達したチームを ``leader_board`` の最高スコアで順位付けし、下位のチームは
+以降のラウンドで Leader / Evaluator を実行せずに終了する。
+
+チームは非同期に進行するため、先に到達したチームは、同じ実行の全チーム
+（ラウンド開始時に登録し、打ち切り済みのチームを除く）がチェックポイントに到達するまで
+待機してから、全チームを 1 回で順位付けする。到達しないチーム（異常終了等）が
+あっても止まらないよう、``cohort_timeout_seconds`` を超えた場合は到達済みのチームで
+順位付けする。判定結果は ``{workspace}/.qip/successive_halving/{execution_id}/`` に
+書き込み、全チームで同じ判定を使う。判定後に到達したチームは、残ったチームの
+最低スコアを下回る場合に打ち切る。
+
+打ち切られたチームは以降 ``llm`` / ``cpu`` の容量プール（``scheduler``）を
+要求しないため、空いた容量は残ったチームに割り当てられる。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, get_db_path, table_exists
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+from quant_insight_plus.runtime_config import SuccessiveHalvingSettings, load_runtime_settings
+
+if TYPE_CHECKING:
+    import duckdb
+    from mixseek.round_controller.controller import RoundController
+    from mixseek.round_controller.models import RoundState
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+HALVING_DIR_NAME = "successive_halving"
+EXIT_REASON_ELIMINATED = "successive_halving"
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+_LEADER_BOARD_TABLE = "leader_board"
+_TEAMS_DIR_NAME = "teams"
+_ELIMINATED_DIR_NAME = "eliminated"
+_ELIMINATION_DETAILS_KEY = "successive_halving"
+
+
+class CheckpointDecision(BaseModel):
+    """チェックポイントでの順位付けの結果（同じ実行の全チームで共有する）。"""
+
+    checkpoint: int
+    ranking: list[tuple[str, float]]
+    survivors: list[str]
+    complete: bool
+
+
+class Elimination(BaseModel):
+    """successive halving で打ち切られたチームの記録。"""
+
+    team_id: str
+    checkpoint: int
+    round_number: int
+    rank: int | None
+    teams: int
+    best_score: float
+    message: str
+
+
+def get_halving_dir(workspace: Path, execution_id: str) -> Path:
+    """実行ごとの判定結果のディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+
+    Returns:
+        ``{workspace}/.qip/successive_halving/{execution_id}``。
+    """
+    return workspace / KERNEL_DIR_NAME / HALVING_DIR_NAME / execution_id
+
+
+def rank_teams_at_checkpoint(
+    conn: duckdb.DuckDBPyConnection,
+    execution_id: str,
+    checkpoint: int,
+) -> list[tuple[str, float]]:
+    """チェックポイントに到達済みのチームを最高スコアの降順で返す。
+
+    Args:
+        conn: DuckDB 接続。
+        execution_id: 実行 ID。
+        checkpoint: チェックポイントのラウンド数。
+
+    Returns:
+        ``(team_id, チェックポイントまでの最高スコア)`` のリスト（スコア降順、同点は team_id 順）。
+    """
+    if not table_exists(conn, _LEADER_BOARD_TABLE):
+        return []
+    rows = conn.execute(
+        f"""
+        SELECT team_id, MAX(score) AS best_score
+        FROM {_LEADER_BOARD_TABLE}
+        WHERE execution_id = ? AND round_number <= ?
+        GROUP BY team_id
+        HAVING MAX(round_number) >= ?
+        ORDER BY best_score DESC, team_id
+        """,
+        [execution_id, checkpoint, checkpoint],
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def select_survivors(ranking: list[tuple[str, float]], settings: SuccessiveHalvingSettings) -> set[str]:
+    """順位から継続するチームを選ぶ。
+
+    上位 ``ceil(チーム数 × keep_fraction)``（``min_teams`` 以上）を残す。
+    比較対象が ``min_compared`` 未満の場合は全チームを残す。
+
+    Args:
+        ranking: ``rank_teams_at_checkpoint()`` の結果。
+        settings: successive halving 設定。
+
+    Returns:
+        継続するチーム ID の集合。
+    """
+    if len(ranking) < settings.min_compared:
+        return {team_id for team_id, _ in ranking}
+    keep = max(settings.min_teams, math.ceil(len(ranking) * settings.keep_fraction))
+    return {team_id for team_id, _ in ranking[:keep]}
+
+
+def register_team(workspace: Path, execution_id: str, team_id: str) -> None:
+    """チームを順位付けの対象（全チームの到達を待つ対象）として登録する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+    """
+    teams_dir = get_halving_dir(workspace, execution_id) / _TEAMS_DIR_NAME
+    teams_dir.mkdir(parents=True, exist_ok=True)
+    (teams_dir / team_id).touch()
+
+
+def _team_ids(directory: Path, suffix: str = "") -> set[str]:
+    if not directory.is_dir():
+        return set()
+    return {path.name.removesuffix(suffix) for path in directory.iterdir() if path.name.endswith(suffix)}
+
+
+def load_elimination(workspace: Path, execution_id: str, team_id: str) -> Elimination | None:
+    """チームの打ち切りの記録を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+
+    Returns:
+        打ち切りの記録（打ち切られていない場合は None）。
+    """
+    path = get_halving_dir(workspace, execution_id) / _ELIMINATED_DIR_NAME / f"{team_id}.json"
+    try:
+        return Elimination.model_validate_json(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def record_elimination(workspace: Path, execution_id: str, elimination: Elimination) -> None:
+    """チームの打ち切りを記録する（以降のラウンドは ``load_elimination()`` で打ち切り済みとなる）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        elimination: 打ち切りの記録。
+    """
+    eliminated_dir = get_halving_dir(workspace, execution_id) / _ELIMINATED_DIR_NAME
+    eliminated_dir.mkdir(parents=True, exist_ok=True)
+    path = eliminated_dir / f"{elimination.team_id}.json"
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(elimination.model_dump_json(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _publish_decision(path: Path, decision: CheckpointDecision) -> CheckpointDecision:
+    """判定結果を書き込む（既に他のチームが書き込んでいる場合はそちらを返す）。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(decision.model_dump_json(), encoding="utf-8")
+    try:
+        # link は既存のファイルを上書きしないため、最初に書き込んだチームの判定が全チームで使われる
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        tmp.unlink()
+    return CheckpointDecision.model_validate_json(path.read_text(encoding="utf-8"))
+
+
+def decide_checkpoint(
+    workspace: Path,
+    execution_id: str,
+    checkpoint: int,
+    settings: SuccessiveHalvingSettings,
+    *,
+    force: bool = False,
+) -> CheckpointDecision | None:
+    """登録済みの全チームがチェックポイントに到達していれば、順位付けして判定する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        checkpoint: チェックポイントのラウンド数。
+        settings: successive halving 設定。
+        force: True の場合は未到達のチームがあっても到達済みのチームで判定する。
+
+    Returns:
+        判定結果（判定済みの場合はその結果。未到達のチームがあり ``force`` でない場合は None）。
+    """
+    base = get_halving_dir(workspace, execution_id)
+    path = base / f"checkpoint_{checkpoint}.json"
+    if path.is_file():
+        return CheckpointDecision.model_validate_json(path.read_text(encoding="utf-8"))
+
+    conn = connect(get_db_path(workspace))
+    try:
+        ranking = rank_teams_at_checkpoint(conn, execution_id, checkpoint)
+    finally:
+        conn.close()
+    # 打ち切り済みのチームも打ち切ったラウンドを leader_board に記録するため、順位付けから除く
+    eliminated = _team_ids(base / _ELIMINATED_DIR_NAME, ".json")
+    ranking = [(team_id, score) for team_id, score in ranking if team_id not in eliminated]
+    live = _team_ids(base / _TEAMS_DIR_NAME) - eliminated
+    complete = live <= {team_id for team_id, _ in ranking}
+    if not complete and not force:
+        return None
+    survivors = select_survivors(ranking, settings)
+    decision = CheckpointDecision(
+        checkpoint=checkpoint,
+        ranking=ranking,
+        survivors=[team_id for team_id, _ in ranking if team_id in survivors],
+        complete=complete,
+    )
+    return _publish_decision(path, decision)
+
+
+def judge_team(
+    decision: CheckpointDecision,
+    team_id: str,
+    best_score: float | None,
+    round_number: int,
+) -> Elimination | None:
+    """判定結果からチームを打ち切るかを決める。
+
+    判定の対象だったチームは順位で、判定後に到達したチームは残ったチームの最低スコアとの比較で決める。
+
+    Args:
+        decision: チェックポイントの判定結果。
+        team_id: チーム ID。
+        best_score: チェックポイントまでのチームの最高スコア（未到達の場合は None）。
+        round_number: これから開始するラウンド番号。
+
+    Returns:
+        打ち切る場合はその記録、継続する場合は None。
+    """
+    scores = dict(decision.ranking)
+    if team_id in decision.survivors or best_score is None:
+        return None
+    if team_id in scores:
+        rank: int | None = list(scores).index(team_id) + 1
+        position = f"{len(scores)} チーム中 {rank} 位"
+    else:
+        # 判定後に到達したチーム: 打ち切りがあった場合のみ、残ったチームの最低スコアと比較する
+        if len(decision.survivors) == len(scores) or not decision.survivors:
+            return None
+        cutoff = min(scores[survivor] for survivor in decision.survivors)
+        if best_score >= cutoff:
+            return None
+        rank = None
+        position = f"判定後に到達、残ったチームの最低スコア {cutoff:.4f} 未満"
+    message = (
+        f"successive halving によりチーム {team_id} を打ち切りました"
+        f"（ラウンド {decision.checkpoint} 時点で{position}、最高スコア {best_score:.4f}）"
+    )
+    return Elimination(
+        team_id=team_id,
+        checkpoint=decision.checkpoint,
+        round_number=round_number,
+        rank=rank,
+        teams=len(scores),
+        best_score=best_score,
+        message=message,
+    )
+
+
+async def check_successive_halving(
+    workspace: Path,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    settings: SuccessiveHalvingSettings | None = None,
+    *,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+) -> Elimination | None:
+    """ラウンド開始前に、チームが打ち切り対象かを判定する。
+
+    チームを登録し、直前のラウンド数（``round_number - 1``）がチェックポイントの場合は
+    全チームの到達（または ``cohort_timeout_seconds``）を待って判定する。
+    以前のチェックポイントで打ち切られたチームは、その記録を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: これから開始するラウンド番号。
+        settings: successive halving 設定（未指定時は runtime.toml から読み込む）。
+        poll_interval: 他のチームの到達を確認する間隔（秒）。
+
+    Returns:
+        打ち切る場合はその記録、継続する場合は None。
+    """
+    settings = settings or load_runtime_settings(workspace).successive_halving
+    if not settings.enabled:
+        return None
+    await asyncio.to_thread(register_team, workspace, execution_id, team_id)
+    eliminated = await asyncio.to_thread(load_elimination, workspace, execution_id, team_id)
+    if eliminated is not None:
+        return eliminated
+    checkpoint = round_number - 1
+    if checkpoint not in settings.checkpoints or not get_db_path(workspace).is_file():
+        return None
+
+    deadline = time.monotonic() + settings.cohort_timeout_seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        decision = await asyncio.to_thread(
+            decide_checkpoint, workspace, execution_id, checkpoint, settings, force=remaining <= 0
+        )
+        if decision is not None:
+            break
+        await asyncio.sleep(min(poll_interval, remaining))
+    if not decision.complete:
+        logger.warning(
+            "successive halving: %.0f 秒以内に全チームがラウンド %d に到達しなかったため、%d チームで判定しました",
+            settings.cohort_timeout_seconds,
+            checkpoint,
+            len(decision.ranking),
+        )
+
+    best_score = dict(decision.ranking).get(team_id)
+    if best_score is None:
+        conn = connect(get_db_path(workspace))
+        try:
+            best_score = dict(rank_teams_at_checkpoint(conn, execution_id, checkpoint)).get(team_id)
+        finally:
+            conn.close()
+    elimination = judge_team(decision, team_id, best_score, round_number)
+    if elimination is not None:
+        await asyncio.to_thread(record_elimination, workspace, execution_id, elimination)
+        logger.info(elimination.message)
+    return elimination
+
+
+def elimination_from_score_details(score_details: dict[str, Any]) -> Elimination | None:
+    """``end_eliminated_round()`` で終えたラウンドの ``score_details`` から打ち切りの記録を返す。
+
+    Args:
+        score_details: ラウンドの ``score_details``。
+
+    Returns:
+        打ち切りの記録（打ち切られたラウンドでない場合は None）。
+    """
+    if score_details.get("exit_reason") != EXIT_REASON_ELIMINATED:
+        return None
+    return Elimination.model_validate(score_details[_ELIMINATION_DETAILS_KEY])
+
+
+async def end_eliminated_round(
+    controller: RoundController,
+    round_number: int,
+    elimination: Elimination,
+    error_score: float,
+) -> RoundState:
+    """打ち切られたチームのラウンドを、Leader / Evaluator を実行せずに終える。
+
+    ラウンドは ``leader_board``（提出エラーのスコア、``exit_reason = "successive_halving"``）と
+    ``round_status``（``should_continue = False`` と終了理由）に終了済みとして記録する。
+    ``qip exec --resume`` はこのラウンドを完了済みとして復元し、再実行しない。
+    以降のチェックポイントの順位付けでは、打ち切り済みのチームを除く。
+
+    Args:
+        controller: ラウンドを実行する RoundController。
+        round_number: 開始しようとしているラウンド番号。
+        elimination: 打ち切りの記録。
+        error_score: ラウンドのスコア（最良のラウンドに選ばれないよう提出エラーのスコアを使う）。
+
+    Returns:
+        終了理由を ``score_details`` に記録した RoundState。
+    """
+    from mixseek.round_controller.models import RoundState
+
+    from quant_insight_plus.submission_relay import refresh_round_leaderboard
+
+    now = datetime.now(UTC)
+    score_details: dict[str, Any] = {
+        "overall_score": error_score,
+        "metrics": [],
+        "exit_reason": EXIT_REASON_ELIMINATED,
+        _ELIMINATION_DETAILS_KEY: elimination.model_dump(mode="json"),
+    }
+    if controller.store is not None:
+        execution_id = controller.task.execution_id
+        team_id = controller.team_config.team_id
+        await controller.store.save_to_leader_board(
+            execution_id=execution_id,
+            team_id=team_id,
+            team_name=controller.team_config.team_name,
+            round_number=round_number,
+            submission_content="",
+            submission_format="md",
+            score=error_score,
+            score_details=score_details,
+            final_submission=False,
+            exit_reason=EXIT_REASON_ELIMINATED,
+        )
+        await controller.store.save_round_status(
+            execution_id=execution_id,
+            team_id=team_id,
+            team_name=controller.team_config.team_name,
+            round_number=round_number,
+            should_continue=False,
+            reasoning=elimination.message,
+            confidence_score=None,
+            round_started_at=now.isoformat(),
+            round_ended_at=now.isoformat(),
+        )
+        await refresh_round_leaderboard(
+            controller.workspace, execution_id=execution_id, team_id=team_id, round_number=round_number
+        )
+    return RoundState(
+        round_number=round_number,
+        submission_content="",
+        evaluation_score=error_score,
+        score_details=score_details,
+        improvement_judgment=None,
+        round_started_at=now,
+        round_ended_at=now,
+        message_history=[],
+    )
@@ -0,0 +1,577 @@
+"""上位提出のシグナルの順位平均アンサンブル。
+
+``qip ensemble`` で、``leader_board`` のスコア上位 K 件の提出を次の手順で合成する:
+
+1. 各提出の日時ごとのシグナルを取得する（シグナルキャッシュに無い提出は
+   Evaluator と同じバックテストループでプロセス並列に計算する）
+2. 全提出のシグナルを 1 つの縦長 DataFrame に結合し、日時・提出ごとの断面順位
+   （0〜1 に正規化）の加重平均を 1 回の集計で求める
+3. 合成シグナルを Evaluator と同じ定義（日時ごとの Spearman 順位相関の
+   シャープレシオ）で採点する
+4. 結果を合成エントリとして ``team_best_scores`` とスナップショットに記録し、
+   合成シグナルを ``submissions/ensembles/`` に保存する
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, get_db_path, table_exists
+from quant_insight_plus.submission_relay import SUBMISSION_ERROR_SCORE, SUBMISSIONS_DIR_NAME
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import polars as pl
+
+    from quant_insight_plus.cpu_budget import CpuAllocation
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+WEIGHTING_EQUAL = "equal"
+WEIGHTING_SCORE = "score"
+WEIGHTINGS = (WEIGHTING_EQUAL, WEIGHTING_SCORE)
+ENSEMBLE_TEAM_PREFIX = "ensemble"
+ENSEMBLES_DIR_NAME = "ensembles"
+OHLCV_DATASET = "ohlcv"
+RETURNS_DATASET = "returns"
+EVALUATION_SPLIT = "test"
+_DATA_INPUTS_DIR = Path("data") / "inputs"
+_MIN_CROSS_SECTION = 2
+_CODE_BLOCK_PATTERN = re.compile(r"\A\s*```python\n(.*)\n```\s*\Z", re.DOTALL)
+
+
+class EnsembleMember(BaseModel):
+    """アンサンブルに採用した 1 提出。"""
+
+    team_id: str
+    team_name: str | None
+    round_number: int
+    score: float
+    weight: float
+    cached: bool = False
+
+
+class SignalScore(BaseModel):
+    """Spearman 順位相関系列とシャープレシオ。"""
+
+    sharpe_ratio: float
+    mean_correlation: float
+    std_correlation: float | None
+    iterations: int
+
+
+class EnsembleResult(BaseModel):
+    """``qip ensemble`` の結果。"""
+
+    execution_id: str
+    team_id: str
+    team_name: str
+    weighting: str
+    members: list[EnsembleMember]
+    score: SignalScore
+    signal_path: Path
+    created_at: datetime
+
+
+def extract_code(submission_content: str) -> str:
+    """提出内容（Python コードブロック）から submission.py のコードを取り出す。
+
+    Args:
+        submission_content: ``leader_board`` の ``submission_content``。
+
+    Returns:
+        コード（コードブロックでない場合は提出内容そのもの）。
+    """
+    match = _CODE_BLOCK_PATTERN.match(submission_content)
+    return match.group(1) if match else submission_content
+
+
+def select_submissions(
+    workspace: Path,
+    execution_id: str,
+    top_k: int,
+    *,
+    per_team: bool = False,
+) -> list[tuple[EnsembleMember, str]]:
+    """``leader_board`` からスコア上位の提出を選ぶ（エラー・同一コードの提出は除く）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        top_k: 選ぶ提出数。
+        per_team: True の場合は各チームの最高スコアの提出のみを対象にする。
+
+    Returns:
+        スコア降順の (提出, submission.py のコード)。
+
+    Raises:
+        FileNotFoundError: データベースが存在しない場合。
+    """
+    conn = connect(get_db_path(workspace), read_only=True)
+    try:
+        if not table_exists(conn, "leader_board"):
+            return []
+        rows = conn.execute(
+            """
+            SELECT team_id, team_name, round_number, score, submission_content
+            FROM leader_board
+            WHERE execution_id = ? AND score > ? AND coalesce(submission_content, '') <> ''
+            ORDER BY score DESC, round_number, team_id
+            """,
+            [execution_id, SUBMISSION_ERROR_SCORE],
+        ).fetchall()
+    finally:
+        conn.close()
+
+    selected: list[tuple[EnsembleMember, str]] = []
+    seen_codes: set[str] = set()
+    seen_teams: set[str] = set()
+    for team_id, team_name, round_number, score, content in rows:
+        code = extract_code(content)
+        if code in seen_codes or (per_team and team_id in seen_teams):
+            continue
+        seen_codes.add(code)
+        seen_teams.add(team_id)
+        member = EnsembleMember(
+            team_id=team_id, team_name=team_name, round_number=round_number, score=score, weight=1.0
+        )
+        selected.append((member, code))
+        if len(selected) == top_k:
+            break
+    return selected
+
+
+def read_split(workspace: Path, dataset: str, split: str = EVALUATION_SPLIT) -> pl.DataFrame:
+    """``data/inputs/{dataset}/{split}.parquet`` を読み込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        dataset: データセット名。
+        split: 分割名。
+
+    Returns:
+        データ。
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合。
+    """
+    import polars as pl
+
+    path = workspace / _DATA_INPUTS_DIR / dataset / f"{split}.parquet"
+    if not path.is_file():
+        msg = f"評価データが見つかりません: {path}"
+        raise FileNotFoundError(msg)
+    return pl.read_parquet(path)
+
+
+def load_split(workspace: Path, split: str = EVALUATION_SPLIT) -> tuple[pl.DataFrame, dict[str, pl.DataFrame]]:
+    """分割の OHLCV と追加データ（ohlcv・returns 以外のデータセット）を読み込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        split: 分割名。
+
+    Returns:
+        (OHLCV, データセット名 → 追加データ)。
+
+    Raises:
+        FileNotFoundError: OHLCV が存在しない場合。
+    """
+    import polars as pl
+
+    ohlcv = read_split(workspace, OHLCV_DATASET, split)
+    additional = {
+        path.parent.name: pl.read_parquet(path)
+        for path in sorted((workspace / _DATA_INPUTS_DIR).glob(f"*/{split}.parquet"))
+        if path.parent.name not in (OHLCV_DATASET, RETURNS_DATASET)
+    }
+    return ohlcv, additional
+
+
+def load_generate_signal(code: str) -> Callable[..., Any]:
+    """submission.py のコードを実行し、``generate_signal`` を返す。
+
+    Args:
+        code: submission.py の内容。
+
+    Returns:
+        ``generate_signal`` 関数。
+
+    Raises:
+        ValueError: コードに ``generate_signal`` が無い場合。
+    """
+    namespace: dict[str, Any] = {}
+    exec(compile(code, "submission.py", "exec"), namespace)  # noqa: S102
+    generate_signal = namespace.get("generate_signal")
+    if not callable(generate_signal):
+        msg = "submission.py に generate_signal がありません"
+        raise ValueError(msg)
+    return generate_signal  # type: ignore[no-any-return]
+
+
+def signal_at(
+    generate_signal: Callable[..., Any],
+    ohlcv: pl.DataFrame,
+    additional: dict[str, pl.DataFrame],
+    current: datetime,
+) -> pl.DataFrame:
+    """当該日時までのデータで ``generate_signal`` を呼び出し、当該日時の行を返す（Evaluator と同じ）。
+
+    Args:
+        generate_signal: ``load_generate_signal()`` の戻り値。
+        ohlcv: 分割の OHLCV。
+        additional: 分割の追加データ。
+        current: 日時。
+
+    Returns:
+        当該日時のシグナル（datetime, symbol, signal）。
+    """
+    import polars as pl
+
+    available = {
+        name: frame.filter(pl.col("datetime") <= current) if "datetime" in frame.columns else frame
+        for name, frame in additional.items()
+    }
+    signal = generate_signal(ohlcv.filter(pl.col("datetime") <= current), available)
+    frame = _normalize(signal if isinstance(signal, pl.DataFrame) else pl.from_pandas(signal))
+    return frame.filter(pl.col("datetime") == current)
+
+
+def compute_signals(workspace: Path, code: str) -> pl.DataFrame:
+    """Evaluator と同じバックテストループで、日時ごとのシグナルを計算する。
+
+    テストデータのユニーク日時ごとに、当該日時までのデータで ``generate_signal`` を呼び出し、
+    当該日時の行のみを採る。プロセス並列で実行できるよう、モジュールのトップレベルに置く。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+
+    Returns:
+        シグナル（datetime, symbol, signal）。
+
+    Raises:
+        FileNotFoundError: 評価データが存在しない場合。
+        ValueError: コードに ``generate_signal`` が無い場合。
+    """
+    import polars as pl
+
+    generate_signal = load_generate_signal(code)
+    ohlcv, additional = load_split(workspace)
+    parts = [
+        signal_at(generate_signal, ohlcv, additional, current)
+        for current in ohlcv.get_column("datetime").unique().sort()
+    ]
+    if not parts:
+        return pl.DataFrame(schema={"datetime": pl.Datetime("us"), "symbol": pl.String, "signal": pl.Float64})
+    return pl.concat(parts)
+
+
+def _normalize(signals: pl.DataFrame) -> pl.DataFrame:
+    import polars as pl
+
+    return signals.select(
+        pl.col("datetime").cast(pl.Datetime("us")),
+        pl.col("symbol").cast(pl.String),
+        pl.col("signal").cast(pl.Float64),
+    )
+
+
+def collect_signals(
+    workspace: Path,
+    submissions: list[tuple[EnsembleMember, str]],
+    *,
+    execution_id: str,
+    jobs: int,
+) -> list[pl.DataFrame]:
+    """各提出のシグナルを取得する（キャッシュに無い提出はプロセス並列に計算）。
+
+    ``[signal_cache]`` が有効な場合、計算したシグナルはキャッシュに保存する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        submissions: ``select_submissions()`` の戻り値（``cached`` を更新する）。
+        execution_id: 提出の実行 ID（キャッシュのメタデータに記録）。
+        jobs: 計算に使う最大プロセス数。
+
+    Returns:
+        提出と同じ順のシグナル。
+    """
+    from quant_insight_plus.runtime_config import load_runtime_settings
+    from quant_insight_plus.signal_cache import find_cached_signals, load_signals, store_signals
+
+    signals: dict[int, pl.DataFrame] = {}
+    missing: list[int] = []
+    for index, (member, code) in enumerate(submissions):
+        entry = find_cached_signals(workspace, code)
+        if entry is None:
+            missing.append(index)
+            continue
+        member.cached = True
+        signals[index] = _normalize(load_signals(workspace, entry.key))
+
+    if missing:
+        logger.info("シグナルキャッシュに無い %d 件の提出を計算します", len(missing))
+        codes = [submissions[index][1] for index in missing]
+        if jobs <= 1 or len(missing) == 1:
+            computed = [compute_signals(workspace, code) for code in codes]
+        else:
+            import multiprocessing
+
+            from quant_insight_plus.cpu_budget import allocate_workers, apply_to_current_process
+
+            workers = min(jobs, len(missing))
+            budget = load_runtime_settings(workspace).cpu_budget
+            initializer: Callable[[CpuAllocation], None] | None = None
+            initargs: tuple[CpuAllocation, ...] = ()
+            if budget.enabled:
+                # ワーカーのスレッド数・アフィニティを CPU 予算に合わせる
+                initializer = apply_to_current_process
+                initargs = (allocate_workers(workspace, budget, workers),)
+            # polars のスレッドプールを引き継がないよう spawn で起動する
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs
+            ) as pool:
+                computed = list(pool.map(compute_signals, [workspace] * len(codes), codes))
+        settings = load_runtime_settings(workspace).signal_cache
+        for index, frame in zip(missing, computed, strict=True):
+            signals[index] = frame
+            if settings.enabled:
+                member, code = submissions[index]
+                store_signals(
+                    workspace,
+                    code,
+                    frame,
+                    execution_id=execution_id,
+                    team_id=member.team_id,
+                    round_number=member.round_number,
+                    score=member.score,
+                    settings=settings,
+                )
+    return [signals[index] for index in range(len(submissions))]
+
+
+def stack_ranks(signals: list[pl.DataFrame]) -> pl.DataFrame:
+    """提出ごとのシグナルを日時の断面順位（件数で割って 0〜1 に正規化）の縦長 DataFrame にする。
+
+    NaN・null のシグナルは除外する。
+
+    Args:
+        signals: 提出ごとのシグナル（datetime, symbol, signal）。
+
+    Returns:
+        (datetime, symbol, member, rank)。``member`` は ``signals`` のインデックス。
+    """
+    import polars as pl
+
+    by_member = ["datetime", "member"]
+    return (
+        pl.concat(
+            [
+                _normalize(frame).with_columns(pl.lit(index, dtype=pl.UInt32).alias("member"))
+                for index, frame in enumerate(signals)
+            ]
+        )
+        .filter(pl.col("signal").is_not_null() & pl.col("signal").is_not_nan())
+        .select(
+            "datetime",
+            "symbol",
+            "member",
+            (pl.col("signal").rank("average").over(by_member) / pl.len().over(by_member)).alias("rank"),
+        )
+    )
+
+
+def blend_signals(signals: list[pl.DataFrame], weights: list[float]) -> pl.DataFrame:
+    """各提出の断面順位の加重平均を合成シグナルとする（1 回の集計で計算）。
+
+    提出ごとに日時の断面でシグナルを順位付けし、件数で割って 0〜1 に正規化する。
+    NaN・null のシグナルは除外し、銘柄ごとにシグナルのある提出の重みで平均する。
+
+    Args:
+        signals: 提出ごとのシグナル（datetime, symbol, signal）。
+        weights: 提出ごとの重み（0 以下の提出は除外）。
+
+    Returns:
+        合成シグナル（datetime, symbol, signal）。
+    """
+    import polars as pl
+
+    weight_frame = pl.DataFrame(
+        {"member": list(range(len(weights))), "weight": weights}, schema={"member": pl.UInt32, "weight": pl.Float64}
+    ).filter(pl.col("weight") > 0)
+    return (
+        stack_ranks(signals)
+        .join(weight_frame, on="member")
+        .group_by("datetime", "symbol")
+        .agg(((pl.col("rank") * pl.col("weight")).sum() / pl.col("weight").sum()).alias("signal"))
+        .sort("datetime", "symbol")
+    )
+
+
+def daily_correlations(signals: pl.DataFrame, returns: pl.DataFrame) -> pl.DataFrame:
+    """日時ごとの断面の Spearman 順位相関を求める（Evaluator と同じ欠損値の扱い）。
+
+    日時ごとにシグナルとリターンを (datetime, symbol) で内部結合する。リターンが欠損の銘柄は除外し、
+    シグナルの欠損は日時内の平均で補完する。
+
+    Args:
+        signals: シグナル（datetime, symbol, signal）。
+        returns: リターン（datetime, symbol, return_value）。
+
+    Returns:
+        (datetime, correlation, n)。有効データが 2 未満・相関を求められない日時の ``correlation`` は null。
+    """
+    import polars as pl
+
+    returns = returns.select(
+        pl.col("datetime").cast(pl.Datetime("us")),
+        pl.col("symbol").cast(pl.String),
+        pl.col("return_value").cast(pl.Float64),
+    )
+    return (
+        _normalize(signals)
+        .join(returns, on=["datetime", "symbol"], how="inner")
+        .filter(pl.col("return_value").is_not_null() & pl.col("return_value").is_not_nan())
+        .with_columns(pl.col("signal").fill_nan(None))
+        .with_columns(pl.col("signal").fill_null(pl.col("signal").mean().over("datetime")))
+        .group_by("datetime")
+        .agg(pl.corr("signal", "return_value", method="spearman").alias("correlation"), pl.len().alias("n"))
+        .with_columns(
+            pl.when(pl.col("n") >= _MIN_CROSS_SECTION)
+            .then(pl.col("correlation").fill_nan(None))
+            .otherwise(None)
+            .alias("correlation")
+        )
+        .sort("datetime")
+    )
+
+
+def summarize_correlations(correlations: pl.Series) -> SignalScore:
+    """日時ごとの相関の系列からシャープレシオを求める（null は除く）。
+
+    Args:
+        correlations: ``daily_correlations()`` の ``correlation``。
+
+    Returns:
+        採点結果（有効日時が 1 件・標準偏差 0 の場合のシャープレシオは 0.0）。
+
+    Raises:
+        ValueError: 有効な日時が無い場合。
+    """
+    correlations = correlations.drop_nulls()
+    if correlations.is_empty():
+        msg = "有効な相関を計算できる日時がありません"
+        raise ValueError(msg)
+    mean = float(correlations.mean())  # type: ignore[arg-type]
+    std = float(correlations.std(ddof=1)) if correlations.len() > 1 else None  # type: ignore[arg-type]
+    sharpe = mean / std if std else 0.0
+    return SignalScore(sharpe_ratio=sharpe, mean_correlation=mean, std_correlation=std, iterations=correlations.len())
+
+
+def score_signals(signals: pl.DataFrame, returns: pl.DataFrame) -> SignalScore:
+    """Evaluator と同じ定義でシグナルを採点する。
+
+    ``daily_correlations()`` の有効な日時の相関の平均 / 標準偏差をシャープレシオとする。
+
+    Args:
+        signals: シグナル（datetime, symbol, signal）。
+        returns: リターン（datetime, symbol, return_value）。
+
+    Returns:
+        採点結果（有効日時が 1 件・標準偏差 0 の場合のシャープレシオは 0.0）。
+
+    Raises:
+        ValueError: 有効な日時が無い場合。
+    """
+    return summarize_correlations(daily_correlations(signals, returns).get_column("correlation"))
+
+
+def get_ensembles_dir(workspace: Path) -> Path:
+    """合成シグナルの保存先ディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/submissions/ensembles``。
+    """
+    return workspace / SUBMISSIONS_DIR_NAME / ENSEMBLES_DIR_NAME
+
+
+def run_ensemble(
+    workspace: Path,
+    execution_id: str,
+    *,
+    top_k: int,
+    weighting: str = WEIGHTING_EQUAL,
+    per_team: bool = False,
+    jobs: int | None = None,
+) -> EnsembleResult:
+    """上位提出のアンサンブルを作成・採点し、合成エントリとして記録する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        top_k: 合成する提出数。
+        weighting: ``"equal"``（順位平均）または ``"score"``（スコア加重の順位平均）。
+        per_team: True の場合は各チームの最高スコアの提出のみを対象にする。
+        jobs: シグナル計算の最大プロセス数（未指定時は ``[scheduler]`` の ``cpu_slots``）。
+
+    Returns:
+        結果。
+
+    Raises:
+        FileNotFoundError: データベース・評価データが存在しない場合。
+        ValueError: 重み付けの指定が不正、対象の提出が無い、または採点できない場合。
+    """
+    from quant_insight_plus.leaderboard import record_synthetic_standing
+    from quant_insight_plus.runtime_config import load_runtime_settings
+
+    if weighting not in WEIGHTINGS:
+        msg = f"重み付けは {' / '.join(WEIGHTINGS)} のいずれかを指定してください: {weighting}"
+        raise ValueError(msg)
+    submissions = select_submissions(workspace, execution_id, top_k, per_team=per_team)
+    if not submissions:
+        msg = f"アンサンブルの対象となる提出がありません: {execution_id}"
+        raise ValueError(msg)
+    for member, _ in submissions:
+        member.weight = max(member.score, 0.0) if weighting == WEIGHTING_SCORE else 1.0
+    if not any(member.weight > 0 for member, _ in submissions):
+        msg = "スコア加重には正のスコアの提出が必要です"
+        raise ValueError(msg)
+
+    jobs = jobs or load_runtime_settings(workspace).scheduler.cpu_slots
+    signals = collect_signals(workspace, submissions, execution_id=execution_id, jobs=jobs)
+    blended = blend_signals(signals, [member.weight for member, _ in submissions])
+    score = score_signals(blended, read_split(workspace, RETURNS_DATASET))
+
+    members = [member for member, _ in submissions]
+    team_id = f"{ENSEMBLE_TEAM_PREFIX}-top{len(members)}-{weighting}"
+    team_name = f"Ensemble ({weighting}, top {len(members)})"
+    signal_path = get_ensembles_dir(workspace) / f"{execution_id}-{team_id}.parquet"
+    signal_path.parent.mkdir(parents=True, exist_ok=True)
+    blended.write_parquet(signal_path, compression="zstd")
+    result = EnsembleResult(
+        execution_id=execution_id,
+        team_id=team_id,
+        team_name=team_name,
+        weighting=weighting,
+        members=members,
+        score=score,
+        signal_path=signal_path,
+        created_at=datetime.now(UTC),
+    )
+    signal_path.with_suffix(".json").write_text(result.model_dump_json(indent=2) + "\n")
+    record_synthetic_standing(workspace, execution_id, team_id, team_name, score.sharpe_ratio)
+    return result
@@ -0,0 +1,509 @@
+"""Member Agent 向けの常駐 Python カーネル。
+
+``{python_command} script.py`` を毎回新しいインタープリタで実行すると、
+uv 環境の解決・polars のインポート・parquet の再読み込みが毎回発生する。
+本モジュールはこれらを事前にロードしたワーカープロセスを常駐させ、
+Unix ソケット経由でスクリプトを実行するサービスを提供する。
+
+- セッションごとに独立したワーカープロセス（＝独立した名前空間）を割り当てる
+- ワーカーは ``available_data_paths`` の parquet を起動時に読み込み、
+  ``polars.read_parquet`` を同一パスに対してキャッシュ済み DataFrame を返すよう差し替える
+- スクリプトは ``python script.py`` と同様に、スクリプトのディレクトリを ``sys.path[0]`` に置いて実行する。
+  ``qip kernel exec -m module`` は ``python -m module`` と同様に、実行ディレクトリを ``sys.path[0]`` に置いて
+  モジュールを ``__main__`` として実行する（``{python_command} -m quant_insight_plus proxy-score`` 等）。
+  ワークスペースから読み込んだモジュールは実行ごとに ``sys.modules`` から除き、次の実行で読み込み直す
+- 実行は ``timeout_seconds`` で打ち切り、タイムアウトしたワーカーは破棄する
+- 次のセッション用に事前ウォームアップ済みの予備ワーカーを 1 つ保持する
+- ``qip exec`` の各ラウンドで作成する Member Agent は、``python_command`` に
+  チーム・メンバーごとのセッション ID（``QIP_KERNEL_SESSION``）を付加する
+
+polars のスレッドプール初期化後の fork はデッドロックの原因になるため、
+ワーカーは spawn で起動する。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import importlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import runpy
+import shlex
+import socket
+import socketserver
+import sys
+import threading
+import tomllib
+import traceback
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+KERNEL_DIR_NAME = ".qip"
+KERNEL_SOCKET_FILENAME = "kernel.sock"
+DEFAULT_SESSION_ID = "default"
+SESSION_ENV_VAR = "QIP_KERNEL_SESSION"
+KERNEL_EXEC_COMMAND = "kernel exec"
+DEFAULT_PRELOAD_MODULES = ("polars", "numpy")
+DEFAULT_TIMEOUT_SECONDS = 120
+TIMEOUT_EXIT_CODE = 124
+_RECV_BUFFER_SIZE = 65536
+_INSTALLED_PACKAGE_DIR_NAMES = frozenset({"site-packages", "dist-packages"})
+
+_current_team: contextvars.ContextVar[str | None] = contextvars.ContextVar("qip_kernel_team", default=None)
+
+
+class KernelSettings(BaseModel):
+    """カーネルサービスの設定。"""
+
+    socket_path: str
+    data_paths: list[str] = Field(default_factory=list)
+    timeout_seconds: int = Field(default=DEFAULT_TIMEOUT_SECONDS, gt=0)
+    preload_modules: list[str] = Field(default_factory=lambda: list(DEFAULT_PRELOAD_MODULES))
+
+
+class KernelRequest(BaseModel):
+    """スクリプト実行リクエスト。"""
+
+    session: str = DEFAULT_SESSION_ID
+    script: str
+    argv: list[str] = Field(default_factory=list)
+    cwd: str
+    module: bool = False
+    """True の場合 ``script`` をモジュール名として ``python -m`` と同様に実行する。"""
+
+
+class KernelResponse(BaseModel):
+    """スクリプト実行結果。"""
+
+    stdout: str = ""
+    stderr: str = ""
+    exit_code: int = 0
+
+
+def get_default_socket_path(workspace: Path) -> Path:
+    """ワークスペース配下のデフォルトソケットパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/kernel.sock`` のパス。
+    """
+    return workspace / KERNEL_DIR_NAME / KERNEL_SOCKET_FILENAME
+
+
+@contextlib.contextmanager
+def team_session(team_id: str) -> Iterator[None]:
+    """ラウンド内で作成する Member Agent のカーネルセッションをチーム単位にする。
+
+    Args:
+        team_id: チーム ID。
+    """
+    token = _current_team.set(team_id)
+    try:
+        yield
+    finally:
+        _current_team.reset(token)
+
+
+def member_session_id(member_name: str) -> str | None:
+    """実行中のチームの Member Agent のセッション ID を返す。
+
+    Args:
+        member_name: Member Agent 名。
+
+    Returns:
+        ``{team_id}.{member_name}``（``team_session()`` の外では None）。
+    """
+    team_id = _current_team.get()
+    return None if team_id is None else f"{team_id}.{member_name}"
+
+
+def with_session(command: str, session: str) -> str:
+    """``qip kernel exec`` のコマンドにセッション ID の環境変数を付加する。
+
+    Args:
+        command: ``python_command``（例: ``"uv run qip kernel exec"``）。
+        session: セッション ID。
+
+    Returns:
+        ``env QIP_KERNEL_SESSION=... {command}``（カーネルを使わないコマンドはそのまま）。
+    """
+    if KERNEL_EXEC_COMMAND not in command:
+        return command
+    return f"env {SESSION_ENV_VAR}={shlex.quote(session)} {command}"
+
+
+def load_kernel_settings(member_config: Path, workspace: Path, socket_path: Path | None = None) -> KernelSettings:
+    """Member Agent の TOML からカーネル設定を構築する。
+
+    ``[agent.metadata.tool_settings.local_code_executor]`` の
+    ``available_data_paths`` と ``timeout_seconds`` を引き継ぐ。
+
+    Args:
+        member_config: Member Agent 設定ファイルのパス。
+        workspace: ワークスペースのルートパス（データパスの基準）。
+        socket_path: ソケットパス（未指定時はワークスペース配下のデフォルト）。
+
+    Returns:
+        カーネル設定。
+    """
+    with member_config.open("rb") as f:
+        data = tomllib.load(f)
+    executor = data.get("agent", {}).get("metadata", {}).get("tool_settings", {}).get("local_code_executor", {})
+    return KernelSettings(
+        socket_path=str(socket_path or get_default_socket_path(workspace)),
+        data_paths=[str((workspace / p).resolve()) for p in executor.get("available_data_paths", [])],
+        timeout_seconds=executor.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS),
+    )
+
+
+# --- ワーカープロセス ---
+
+
+def _install_parquet_cache(cache: dict[str, Any]) -> None:
+    """``polars.read_parquet`` をキャッシュ参照版に差し替える。
+
+    追加引数なしで事前ロード済みパスが指定された場合のみキャッシュを返し、
+    それ以外は元の関数に委譲する。
+    """
+    import polars as pl
+
+    original = pl.read_parquet
+
+    def _cached_read_parquet(source: Any, *args: Any, **kwargs: Any) -> Any:
+        if not args and not kwargs and isinstance(source, str | os.PathLike):
+            cached = cache.get(str(Path(source).resolve()))
+            if cached is not None:
+                return cached.clone()
+        return original(source, *args, **kwargs)
+
+    pl.read_parquet = _cached_read_parquet  # type: ignore[assignment]
+
+
+def _is_script_module(module: Any, roots: tuple[Path, ...]) -> bool:
+    """スクリプトのディレクトリ・実行ディレクトリ配下から読み込まれたモジュールか（インストール済みパッケージは除く）。"""
+    file = getattr(module, "__file__", None)
+    if not file:
+        return False
+    path = Path(file).resolve()
+    if _INSTALLED_PACKAGE_DIR_NAMES.intersection(path.parts):
+        return False
+    return any(path.is_relative_to(root) for root in roots)
+
+
+def _execute_script(request: KernelRequest, namespace: dict[str, Any]) -> KernelResponse:
+    """セッション名前空間でスクリプトを実行し、出力を捕捉して返す。
+
+    ``python script.py`` と同様にスクリプトのディレクトリを ``sys.path[0]`` に置く
+    （``request.module`` の場合は ``python -m`` と同様に実行ディレクトリを置き、モジュールを実行する）。
+    実行後は ``sys.path`` / ``sys.argv`` / カレントディレクトリを元に戻し、実行中に
+    ワークスペースから読み込まれたモジュール（同じディレクトリの補助モジュールなど）を
+    ``sys.modules`` から除く（編集後の補助モジュールが次の実行で読み込み直されるように）。
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    script_path = Path(request.cwd) / request.script
+    script_dir = Path(request.cwd) if request.module else script_path.parent
+
+    saved_cwd = os.getcwd()
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    loaded_modules = set(sys.modules)
+    os.chdir(request.cwd)
+    sys.argv = [request.script if request.module else str(script_path), *request.argv]
+    sys.path.insert(0, str(script_dir))
+    importlib.invalidate_caches()
+
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if request.module:
+                    runpy.run_module(request.script, run_name="__main__", alter_sys=True)
+                else:
+                    namespace["__file__"] = str(script_path)
+                    namespace["__name__"] = "__main__"
+                    code = compile(script_path.read_text(), str(script_path), "exec")
+                    exec(code, namespace)  # noqa: S102
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    exit_code = e.code
+                elif e.code is not None:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        roots = (script_dir.resolve(), Path(request.cwd).resolve())
+        for name in set(sys.modules) - loaded_modules:
+            if _is_script_module(sys.modules.get(name), roots):
+                del sys.modules[name]
+        sys.path[:] = saved_path
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+
+    return KernelResponse(stdout=stdout.getvalue(), stderr=stderr.getvalue(), exit_code=exit_code)
+
+
+def _worker_main(conn: Connection, settings_payload: dict[str, Any]) -> None:
+    """ワーカープロセスのエントリーポイント（spawn で起動）。
+
+    モジュールとデータを事前ロードして ``ready`` を通知した後、
+    親プロセスからのリクエストを逐次実行する。``None`` を受信したら終了する。
+    """
+    settings = KernelSettings.model_validate(settings_payload)
+    for module in settings.preload_modules:
+        with contextlib.suppress(ImportError):
+            importlib.import_module(module)
+
+    cache: dict[str, Any] = {}
+    if settings.data_paths:
+        import polars as pl
+
+        for path in settings.data_paths:
+            if Path(path).is_file():
+                cache[path] = pl.read_parquet(path)
+        _install_parquet_cache(cache)
+
+    namespace: dict[str, Any] = {"__builtins__": __builtins__, "qip_data": dict(cache)}
+    conn.send({"ready": True})
+
+    while True:
+        payload = conn.recv()
+        if payload is None:
+            break
+        response = _execute_script(KernelRequest.model_validate(payload), namespace)
+        conn.send(response.model_dump())
+
+
+class _SessionWorker:
+    """1 セッションに対応するワーカープロセスのハンドル。"""
+
+    def __init__(self, settings: KernelSettings) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process: BaseProcess = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, settings.model_dump()),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._ready = False
+        self.lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """ワーカープロセスが生存しているか。"""
+        return self._process.is_alive()
+
+    def run(self, request: KernelRequest, timeout_seconds: int) -> KernelResponse:
+        """リクエストを実行する。ウォームアップ時間はタイムアウトに含めない。
+
+        Raises:
+            TimeoutError: ``timeout_seconds`` 以内に完了しなかった場合。
+        """
+        if not self._ready:
+            self._conn.recv()
+            self._ready = True
+        self._conn.send(request.model_dump())
+        if not self._conn.poll(timeout_seconds):
+            msg = f"スクリプト実行が {timeout_seconds} 秒でタイムアウトしました: {request.script}"
+            raise TimeoutError(msg)
+        return KernelResponse.model_validate(self._conn.recv())
+
+    def close(self) -> None:
+        """ワーカープロセスを終了する。"""
+        if self._process.is_alive():
+            with contextlib.suppress(OSError, BrokenPipeError):
+                self._conn.send(None)
+            self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+
+
+class KernelServer:
+    """セッションごとのワーカーを管理し、スクリプト実行を仲介する。"""
+
+    def __init__(self, settings: KernelSettings) -> None:
+        self.settings = settings
+        self._sessions: dict[str, _SessionWorker] = {}
+        self._lock = threading.Lock()
+        self._spare: _SessionWorker | None = _SessionWorker(settings)
+
+    def _acquire_worker(self, session: str) -> _SessionWorker:
+        """セッションのワーカーを返す。未割り当てなら予備ワーカーを割り当てる。"""
+        with self._lock:
+            worker = self._sessions.get(session)
+            if worker is not None and worker.alive:
+                return worker
+            worker = self._spare or _SessionWorker(self.settings)
+            self._spare = _SessionWorker(self.settings)
+            self._sessions[session] = worker
+            return worker
+
+    def _discard_session(self, session: str) -> None:
+        """セッションのワーカーを破棄する（次回は新しい名前空間で開始）。"""
+        with self._lock:
+            worker = self._sessions.pop(session, None)
+        if worker is not None:
+            worker.close()
+
+    def handle(self, request: KernelRequest) -> KernelResponse:
+        """リクエストをセッションのワーカーで実行する。
+
+        タイムアウトしたワーカーは強制終了し、セッションを破棄する。
+
+        Args:
+            request: 実行リクエスト。
+
+        Returns:
+            実行結果。タイムアウト時は終了コード 124。
+        """
+        worker = self._acquire_worker(request.session)
+        with worker.lock:
+            try:
+                return worker.run(request, self.settings.timeout_seconds)
+            except TimeoutError as e:
+                logger.warning("%s (session=%s)", e, request.session)
+                self._discard_session(request.session)
+                return KernelResponse(stderr=f"{e}\n", exit_code=TIMEOUT_EXIT_CODE)
+            except (EOFError, OSError) as e:
+                self._discard_session(request.session)
+                return KernelResponse(stderr=f"カーネルワーカーが異常終了しました: {e}\n", exit_code=1)
+
+    def close_session(self, session: str) -> None:
+        """セッションを明示的に終了する。"""
+        self._discard_session(session)
+
+    def shutdown(self) -> None:
+        """全ワーカーを終了する。"""
+        with self._lock:
+            workers = list(self._sessions.values())
+            self._sessions.clear()
+            if self._spare is not None:
+                workers.append(self._spare)
+                self._spare = None
+        for worker in workers:
+            worker.close()
+
+
+# --- ソケットサービス ---
+
+
+def _recv_line(sock: socket.socket) -> bytes:
+    """改行までのデータを受信する。"""
+    chunks: list[bytes] = []
+    while True:
+        chunk = sock.recv(_RECV_BUFFER_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+class _KernelRequestHandler(socketserver.BaseRequestHandler):
+    """1 接続 = 1 リクエストの JSON Lines ハンドラ。"""
+
+    server: _KernelSocketServer
+
+    def handle(self) -> None:
+        raw = _recv_line(self.request)
+        if not raw.strip():
+            return
+        payload = json.loads(raw)
+        if payload.get("close_session"):
+            self.server.kernel.close_session(payload["close_session"])
+            response = KernelResponse()
+        else:
+            response = self.server.kernel.handle(KernelRequest.model_validate(payload))
+        self.request.sendall(response.model_dump_json().encode() + b"\n")
+
+
+class _KernelSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, kernel: KernelServer) -> None:
+        self.kernel = kernel
+        super().__init__(socket_path, _KernelRequestHandler)
+
+
+def serve(settings: KernelSettings) -> None:
+    """カーネルサービスを起動し、終了シグナルまでブロックする。
+
+    Args:
+        settings: カーネル設定。
+    """
+    socket_path = Path(settings.socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+
+    kernel = KernelServer(settings)
+    with _KernelSocketServer(str(socket_path), kernel) as server:
+        try:
+            server.serve_forever()
+        finally:
+            kernel.shutdown()
+            socket_path.unlink(missing_ok=True)
+
+
+def run_in_kernel(
+    socket_path: Path,
+    script: str,
+    argv: list[str] | None = None,
+    *,
+    session: str = DEFAULT_SESSION_ID,
+    cwd: Path | None = None,
+    module: bool = False,
+) -> KernelResponse:
+    """カーネルサービスにスクリプト実行を依頼する。
+
+    Args:
+        socket_path: カーネルサービスのソケットパス。
+        script: 実行するスクリプトのパス（``cwd`` からの相対パス可）。``module`` の場合はモジュール名。
+        argv: スクリプトに渡す引数。
+        session: セッション ID（同一セッションは名前空間を共有する）。
+        cwd: 実行ディレクトリ（未指定時はカレントディレクトリ）。
+        module: True の場合 ``python -m script`` と同様にモジュールを実行する。
+
+    Returns:
+        実行結果。
+
+    Raises:
+        FileNotFoundError: カーネルサービスが起動していない場合。
+    """
+    if not socket_path.exists():
+        msg = f"カーネルサービスが起動していません: {socket_path}（qip kernel serve で起動してください）"
+        raise FileNotFoundError(msg)
+
+    request = KernelRequest(
+        session=session,
+        script=script,
+        argv=argv or [],
+        cwd=str((cwd or Path.cwd()).resolve()),
+        module=module,
+    )
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(request.model_dump_json().encode() + b"\n")
+        return KernelResponse.model_validate_json(_recv_line(sock))
@@ -0,0 +1,280 @@
+"""チーム別最高スコアの実体化テーブルと読み取り用スナップショット。
+
+順位の確認のたびに ``mixseek.db`` の ``leader_board`` を集計すると、
+Orchestrator の書き込みと DuckDB のファイルロックを取り合う。
+
+ラウンドの結果を保存するたびに（``patch_submission_relay()`` の置換メソッド）:
+
+1. ``leader_board`` に ``(execution_id, team_id, round_number)`` のインデックスを作成する（初回のみ）
+2. 当該チームの行を ``team_best_scores`` テーブルに再集計する（実体化ビュー）
+3. 当該実行の ``team_best_scores`` を ``{workspace}/.qip/leaderboard/{execution_id}.parquet``
+   に書き出す（一時ファイルからの ``os.replace()`` で差し替え）
+
+``qip leaderboard`` はスナップショットの parquet のみを読むため、
+実行中の Orchestrator をブロックしない。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, get_db_path, table_exists
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+
+if TYPE_CHECKING:
+    import duckdb
+
+# --- 名前付き定数 ---
+LEADER_BOARD_TABLE = "leader_board"
+BEST_SCORES_TABLE = "team_best_scores"
+LEADER_BOARD_INDEX = "idx_leader_board_execution_team_round"
+SNAPSHOT_DIR_NAME = "leaderboard"
+SNAPSHOT_SUFFIX = ".parquet"
+
+_CREATE_BEST_SCORES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {BEST_SCORES_TABLE} (
+    execution_id VARCHAR NOT NULL,
+    team_id VARCHAR NOT NULL,
+    team_name VARCHAR,
+    best_score DOUBLE NOT NULL,
+    best_round INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    latest_round INTEGER NOT NULL,
+    latest_score DOUBLE NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (execution_id, team_id)
+)
+"""
+
+# 最高スコアが同点の場合は早いラウンドを採る
+_REFRESH_SQL = f"""
+INSERT OR REPLACE INTO {BEST_SCORES_TABLE}
+WITH team_rows AS (
+    SELECT * FROM {LEADER_BOARD_TABLE} WHERE execution_id = ? AND team_id = ?
+),
+best AS (
+    SELECT execution_id, team_id, team_name, score, round_number
+    FROM team_rows ORDER BY score DESC, round_number LIMIT 1
+),
+totals AS (
+    SELECT count(DISTINCT round_number) AS rounds,
+           max(round_number) AS latest_round,
+           arg_max(score, round_number) AS latest_score
+    FROM team_rows
+)
+SELECT best.execution_id, best.team_id, best.team_name, best.score, best.round_number,
+       totals.rounds, totals.latest_round, totals.latest_score, now()::TIMESTAMP
+FROM best, totals
+"""
+
+_SNAPSHOT_COLUMNS = "team_id, team_name, best_score, best_round, rounds, latest_round, latest_score, updated_at"
+
+# 同一プロセス内（複数チームのラウンド）での再集計・スナップショット書き出しを直列化する
+_refresh_lock = threading.Lock()
+
+
+class TeamStanding(BaseModel):
+    """リーダーボードの 1 チーム分の行。"""
+
+    team_id: str
+    team_name: str | None
+    best_score: float
+    best_round: int
+    rounds: int
+    latest_round: int
+    latest_score: float
+    updated_at: datetime
+
+
+def get_snapshot_dir(workspace: Path) -> Path:
+    """スナップショットのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/leaderboard``。
+    """
+    return workspace / KERNEL_DIR_NAME / SNAPSHOT_DIR_NAME
+
+
+def get_snapshot_path(workspace: Path, execution_id: str) -> Path:
+    """実行のスナップショットのパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+
+    Returns:
+        ``{workspace}/.qip/leaderboard/{execution_id}.parquet``。
+    """
+    return get_snapshot_dir(workspace) / f"{execution_id}{SNAPSHOT_SUFFIX}"
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def ensure_leaderboard_schema(conn: duckdb.DuckDBPyConnection) -> None:
+    """``leader_board`` のインデックスと ``team_best_scores`` テーブルを作成する（冪等）。
+
+    Args:
+        conn: DuckDB 接続。
+    """
+    conn.execute(_CREATE_BEST_SCORES_SQL)
+    if table_exists(conn, LEADER_BOARD_TABLE):
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {LEADER_BOARD_INDEX} "
+            f"ON {LEADER_BOARD_TABLE} (execution_id, team_id, round_number)"
+        )
+
+
+def write_snapshot(conn: duckdb.DuckDBPyConnection, workspace: Path, execution_id: str) -> Path:
+    """実行の ``team_best_scores`` を parquet のスナップショットに書き出す。
+
+    Args:
+        conn: DuckDB 接続。
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+
+    Returns:
+        スナップショットのパス。
+    """
+    path = get_snapshot_path(workspace, execution_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp")
+    conn.execute(
+        f"COPY (SELECT {_SNAPSHOT_COLUMNS} FROM {BEST_SCORES_TABLE} "
+        f"WHERE execution_id = {_sql_literal(execution_id)}) "
+        f"TO {_sql_literal(str(tmp))} (FORMAT PARQUET)"
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def refresh_leaderboard(workspace: Path, execution_id: str, team_id: str | None = None) -> Path | None:
+    """``team_best_scores`` を再集計し、スナップショットを更新する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: 指定時はそのチームのみ再集計する（未指定時は実行の全チーム）。
+
+    Returns:
+        スナップショットのパス（データベース・``leader_board`` が無い場合は None）。
+    """
+    db_path = get_db_path(workspace)
+    if not db_path.is_file():
+        return None
+    with _refresh_lock:
+        # Orchestrator の store と同一プロセスで開くため、接続設定を store に揃える（read_only にしない）
+        conn = connect(db_path)
+        try:
+            if not table_exists(conn, LEADER_BOARD_TABLE):
+                return None
+            ensure_leaderboard_schema(conn)
+            if team_id is None:
+                team_ids = [
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT DISTINCT team_id FROM {LEADER_BOARD_TABLE} WHERE execution_id = ?",
+                        [execution_id],
+                    ).fetchall()
+                ]
+            else:
+                team_ids = [team_id]
+            for tid in team_ids:
+                conn.execute(_REFRESH_SQL, [execution_id, tid])
+            return write_snapshot(conn, workspace, execution_id)
+        finally:
+            conn.close()
+
+
+def record_synthetic_standing(
+    workspace: Path,
+    execution_id: str,
+    team_id: str,
+    team_name: str,
+    score: float,
+) -> Path:
+    """``leader_board`` に対応しない合成エントリ（``qip ensemble`` の結果等）を記録する。
+
+    合成エントリはラウンド番号 0 として ``team_best_scores`` に書き込み、スナップショットを更新する。
+    ``refresh_leaderboard()`` は ``leader_board`` のチームのみ再集計するため、合成エントリは保持される。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: 合成エントリの ID。
+        team_name: 表示名。
+        score: スコア。
+
+    Returns:
+        スナップショットのパス。
+    """
+    with _refresh_lock:
+        conn = connect(get_db_path(workspace))
+        try:
+            ensure_leaderboard_schema(conn)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {BEST_SCORES_TABLE} VALUES (?, ?, ?, ?, 0, 0, 0, ?, now()::TIMESTAMP)",
+                [execution_id, team_id, team_name, score, score],
+            )
+            return write_snapshot(conn, workspace, execution_id)
+        finally:
+            conn.close()
+
+
+def latest_snapshot_execution_id(workspace: Path) -> str | None:
+    """最後に更新されたスナップショットの実行 ID を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        実行 ID（スナップショットが無い場合は None）。
+    """
+    snapshots = list(get_snapshot_dir(workspace).glob(f"*{SNAPSHOT_SUFFIX}"))
+    if not snapshots:
+        return None
+    return max(snapshots, key=lambda p: p.stat().st_mtime).stem
+
+
+def load_standings(workspace: Path, execution_id: str, limit: int | None = None) -> list[TeamStanding]:
+    """スナップショットからリーダーボードを読み込む（``mixseek.db`` は開かない）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        limit: 上位の件数（None の場合は全チーム）。
+
+    Returns:
+        最高スコア降順のチーム一覧。
+
+    Raises:
+        FileNotFoundError: スナップショットが存在しない場合。
+    """
+    import duckdb
+
+    path = get_snapshot_path(workspace, execution_id)
+    if not path.is_file():
+        msg = f"リーダーボードのスナップショットが見つかりません: {path}"
+        raise FileNotFoundError(msg)
+    sql = f"SELECT {_SNAPSHOT_COLUMNS} FROM read_parquet(?) ORDER BY best_score DESC, best_round, team_id"
+    params: list[object] = [str(path)]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    conn = duckdb.connect()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return [TeamStanding(**dict(zip(TeamStanding.model_fields, row, strict=True))) for row in rows]
@@ -0,0 +1,93 @@
+"""ラウンド内のフェーズ単位の期限。
+
+orchestrator.toml の ``timeout_per_team_seconds`` はチームの全ラウンドを通した
+1 つの期限のため、1 つの Member セッションの停止でチームの残り時間を使い切る。
+runtime.toml の ``[phase_timeouts]`` で、ラウンド内の各フェーズに個別の期限を設定する:
+
+- ``leader``: Leader Agent の実行（期限切れ時はラウンドディレクトリの成果物で評価を続行）
+- ``member``: Member Agent への 1 回の委譲（期限切れ時は成果物を回収して部分結果を返す）
+- ``evaluation``: Evaluator による評価（期限切れ時は提出エラー値をスコアとする）
+- ``persistence``: DuckDB への保存（期限切れ時は待機を打ち切って続行する）
+
+期限切れのフェーズはタスクのキャンセルで中断する。``asyncio.to_thread()`` で
+実行中の処理はスレッド自体は停止しないため、待機のみを打ち切る。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+PHASE_LEADER = "leader"
+PHASE_MEMBER = "member"
+PHASE_EVALUATION = "evaluation"
+PHASE_PERSISTENCE = "persistence"
+
+
+class PhaseTimeoutError(TimeoutError):
+    """ラウンド内のフェーズが期限を超えた場合に送出。"""
+
+    def __init__(self, phase: str, seconds: float) -> None:
+        """例外を初期化する。
+
+        Args:
+            phase: フェーズ名。
+            seconds: 期限（秒）。
+        """
+        super().__init__(f"{phase} フェーズが期限 {seconds:.0f} 秒を超えたため中断しました")
+        self.phase = phase
+        self.seconds = seconds
+
+
+@asynccontextmanager
+async def phase_deadline(phase: str, seconds: float | None) -> AsyncIterator[None]:
+    """ブロックを期限付きで実行する（``seconds`` が None の場合は期限なし）。
+
+    Args:
+        phase: フェーズ名（エラーメッセージ用）。
+        seconds: 期限（秒）。
+
+    Yields:
+        None。
+
+    Raises:
+        PhaseTimeoutError: 期限を超えた場合。
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = asyncio.timeout(seconds)
+    try:
+        async with deadline:
+            yield
+    except TimeoutError as e:
+        # ブロック内で送出された TimeoutError はそのまま伝播させる
+        if not deadline.expired():
+            raise
+        raise PhaseTimeoutError(phase, seconds) from e
+
+
+async def persist_with_deadline(description: str, seconds: float | None, awaitable: Awaitable[Any]) -> bool:
+    """保存処理を期限付きで待機し、期限切れの場合は警告ログに留めて続行する。
+
+    Args:
+        description: 保存内容の説明（ログ用）。
+        seconds: persistence フェーズの期限（秒）。
+        awaitable: 保存処理。
+
+    Returns:
+        期限内に完了した場合は True。
+    """
+    try:
+        async with phase_deadline(PHASE_PERSISTENCE, seconds):
+            await awaitable
+    except PhaseTimeoutError as e:
+        logger.warning("%s の保存を打ち切りました: %s", description, e)
+        return False
+    return True
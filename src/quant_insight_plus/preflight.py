@@ -0,0 +1,228 @@
+"""submission.py の事前検証（プリフライト）。
+
+submission-creator が ``FileSubmitterOutput`` を返す前に、Evaluator と同じ前提で
+submission.py を検証する。壊れた submission.py がそのまま Evaluator に渡ると
+ラウンド全体が提出エラー（-100.0）になるため、同一セッション内で修正させる。
+
+検証段階:
+1. ファイルが存在し空でない
+2. コンパイルできる
+3. トップレベルに引数 2 つの ``generate_signal`` が定義されている
+4. valid 分割の直近 K 日でサブプロセス実行できる（タイムアウト付き）
+"""
+
+from __future__ import annotations
+
+import ast
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError
+
+# --- 名前付き定数 ---
+PREFLIGHT_METADATA_KEY = "preflight"
+SIGNAL_FUNCTION_NAME = "generate_signal"
+SIGNAL_FUNCTION_ARITY = 2
+SMOKE_SPLIT = "valid"
+_OHLCV_DATASET = "ohlcv"
+_MAX_ERROR_CHARS = 4000
+
+STAGE_EXISTS = "exists"
+STAGE_COMPILE = "compile"
+STAGE_SIGNATURE = "signature"
+STAGE_SMOKE = "smoke"
+
+# サブプロセスで実行するスモークテスト。評価と同様に「各日時までのデータ」を渡す。
+_SMOKE_HARNESS = """
+import importlib.util
+import sys
+from pathlib import Path
+
+import polars as pl
+
+submission, inputs_dir, days = Path(sys.argv[1]), Path(sys.argv[2]), int(sys.argv[3])
+spec = importlib.util.spec_from_file_location("submission", submission)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+
+ohlcv = pl.read_parquet(inputs_dir / "ohlcv" / "valid.parquet")
+additional = {}
+for d in sorted(inputs_dir.iterdir()):
+    path = d / "valid.parquet"
+    if d.name not in ("ohlcv", "returns") and path.is_file():
+        additional[d.name] = pl.read_parquet(path)
+
+for current in ohlcv.get_column("datetime").unique().sort().tail(days):
+    available_additional = {
+        name: df.filter(pl.col("datetime") <= current) if "datetime" in df.columns else df
+        for name, df in additional.items()
+    }
+    signal = module.generate_signal(ohlcv.filter(pl.col("datetime") <= current), available_additional)
+    if not isinstance(signal, pl.DataFrame):
+        signal = pl.from_pandas(signal)
+    missing = {"datetime", "symbol", "signal"} - set(signal.columns)
+    if missing:
+        raise ValueError(f"{current}: 必須カラムが不足しています: {sorted(missing)}")
+    if not signal.schema["signal"].is_numeric():
+        raise TypeError(f"{current}: signal カラムが数値型ではありません: {signal.schema['signal']}")
+"""
+
+
+class PreflightSettings(BaseModel):
+    """``[agent.metadata.preflight]`` セクションの設定。"""
+
+    enabled: bool = True
+    smoke_days: int = Field(default=5, ge=1)
+    timeout_seconds: int = Field(default=120, gt=0)
+    max_retries: int = Field(default=2, ge=0)
+
+
+class PreflightResult(BaseModel):
+    """プリフライト検証の結果。"""
+
+    ok: bool
+    stage: str | None = None
+    error: str | None = None
+    smoke_skipped: bool = False
+
+
+class SubmissionPreflightError(RuntimeError):
+    """リトライ後もプリフライト検証に失敗した場合に送出。"""
+
+
+def load_preflight_settings(metadata: dict[str, Any]) -> PreflightSettings:
+    """MemberAgentConfig.metadata から preflight 設定を読み込む。
+
+    Args:
+        metadata: Member Agent TOML の ``[agent.metadata]``。
+
+    Returns:
+        preflight 設定（未指定時はデフォルト値）。
+
+    Raises:
+        ValueError: 設定値が不正な場合。
+    """
+    raw = metadata.get(PREFLIGHT_METADATA_KEY, {})
+    try:
+        return PreflightSettings.model_validate(raw)
+    except ValidationError as e:
+        msg = f"[agent.metadata.{PREFLIGHT_METADATA_KEY}] の設定が不正です: {e}"
+        raise ValueError(msg) from e
+
+
+def _failure(stage: str, error: str) -> PreflightResult:
+    return PreflightResult(ok=False, stage=stage, error=error[-_MAX_ERROR_CHARS:])
+
+
+def check_static(submission_path: Path) -> PreflightResult:
+    """存在・コンパイル・generate_signal のシグネチャを検証する。
+
+    Args:
+        submission_path: submission.py のパス。
+
+    Returns:
+        検証結果。
+    """
+    if not submission_path.is_file():
+        return _failure(STAGE_EXISTS, f"ファイルが見つかりません: {submission_path}")
+    source = submission_path.read_text()
+    if not source.strip():
+        return _failure(STAGE_EXISTS, f"ファイルが空です: {submission_path}")
+
+    try:
+        tree = ast.parse(source, filename=str(submission_path))
+        compile(tree, str(submission_path), "exec")
+    except SyntaxError as e:
+        return _failure(STAGE_COMPILE, f"{type(e).__name__}: {e}")
+
+    func = next(
+        (n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == SIGNAL_FUNCTION_NAME),
+        None,
+    )
+    if func is None:
+        return _failure(STAGE_SIGNATURE, f"トップレベルに {SIGNAL_FUNCTION_NAME} 関数が定義されていません")
+    positional = len(func.args.posonlyargs) + len(func.args.args)
+    required_kwonly = sum(default is None for default in func.args.kw_defaults)
+    if positional != SIGNAL_FUNCTION_ARITY or func.args.vararg is not None or required_kwonly:
+        return _failure(
+            STAGE_SIGNATURE,
+            f"{SIGNAL_FUNCTION_NAME} は引数 2 つ (ohlcv, additional_data) で定義してください"
+            f"（現在の位置引数: {positional}）",
+        )
+    return PreflightResult(ok=True)
+
+
+def run_smoke_test(submission_path: Path, inputs_dir: Path, settings: PreflightSettings) -> PreflightResult:
+    """valid 分割の直近 ``smoke_days`` 日で generate_signal をサブプロセス実行する。
+
+    valid 分割の OHLCV が存在しない場合はスキップ（成功扱い）する。
+
+    Args:
+        submission_path: submission.py のパス。
+        inputs_dir: ``$MIXSEEK_WORKSPACE/data/inputs`` のパス。
+        settings: preflight 設定。
+
+    Returns:
+        検証結果。
+    """
+    if not (inputs_dir / _OHLCV_DATASET / f"{SMOKE_SPLIT}.parquet").is_file():
+        return PreflightResult(ok=True, smoke_skipped=True)
+
+    try:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                _SMOKE_HARNESS,
+                str(submission_path),
+                str(inputs_dir),
+                str(settings.smoke_days),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=settings.timeout_seconds,
+            cwd=submission_path.parent,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        return _failure(
+            STAGE_SMOKE,
+            f"valid データ直近 {settings.smoke_days} 日の実行が {settings.timeout_seconds} 秒でタイムアウトしました",
+        )
+    if completed.returncode != 0:
+        return _failure(STAGE_SMOKE, completed.stderr or f"終了コード {completed.returncode}")
+    return PreflightResult(ok=True)
+
+
+def validate_submission(
+    submission_path: Path,
+    inputs_dir: Path | None,
+    settings: PreflightSettings,
+) -> PreflightResult:
+    """静的検証とスモークテストを順に実行する。
+
+    Args:
+        submission_path: submission.py のパス。
+        inputs_dir: データディレクトリ（None の場合はスモークテストをスキップ）。
+        settings: preflight 設定。
+
+    Returns:
+        最初に失敗した段階の結果、またはすべて成功した結果。
+    """
+    result = check_static(submission_path)
+    if not result.ok:
+        return result
+    if inputs_dir is None:
+        return PreflightResult(ok=True, smoke_skipped=True)
+    return run_smoke_test(submission_path, inputs_dir, settings)
+
+
+def build_retry_prompt(result: PreflightResult) -> str:
+    """検証失敗を同一セッションに差し戻すプロンプトを作成する。"""
+    return (
+        f"提出前検証（{result.stage}）で submission.py のエラーが検出されました。"
+        "同じファイルを修正し、再度 FileSubmitterOutput を返してください。\n\n"
+        f"```\n{result.error}\n```"
+    )
@@ -0,0 +1,101 @@
+"""プロンプトキャッシュに適した Member Agent タスクプロンプトの組み立て。
+
+プロバイダのプロンプトキャッシュは先頭一致で効くため、呼び出し間で変化しない部分を
+前に、変化する部分を後ろに配置する:
+
+1. system_instruction（``Agent`` の instructions として送信。エージェントごとに不変）
+2. データカタログ（``available_data_paths`` のスキーマ。実行中は不変）
+3. ラウンドディレクトリの成果物（ラウンド内では追記が中心）
+4. Leader Agent からのタスク（呼び出しごとに変化）
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+# --- 名前付き定数 ---
+DATA_CATALOG_HEADING = "## データカタログ"
+ARTIFACTS_HEADING = "## ワークスペースファイル"
+TASK_HEADING = "## タスク"
+SECTION_SEPARATOR = "\n\n---\n"
+_PARQUET_SUFFIX = ".parquet"
+
+
+@lru_cache(maxsize=64)
+def _describe_parquet(path: str, mtime_ns: int) -> str:
+    """parquet のスキーマと行数を記述する（メタデータのみ読み込み、mtime 単位でキャッシュ）。"""
+    import polars as pl
+
+    _ = mtime_ns
+    schema = pl.read_parquet_schema(path)
+    rows = pl.scan_parquet(path).select(pl.len()).collect().item()
+    columns = "\n".join(f"- `{name}`: {dtype}" for name, dtype in schema.items())
+    return f"行数: {rows:,}\n{columns}"
+
+
+def build_data_catalog(workspace: Path, data_paths: list[str]) -> str:
+    """``available_data_paths`` のスキーマ一覧を作成する。
+
+    存在しないパス・parquet 以外のファイルは省略する。出力は入力順で決定的であり、
+    データファイルが変更されない限り呼び出し間で同一になる。
+
+    Args:
+        workspace: ワークスペースのパス。
+        data_paths: ワークスペースからの相対パスリスト。
+
+    Returns:
+        Markdown 形式のデータカタログ（対象ファイルが無い場合は空文字列）。
+    """
+    sections: list[str] = []
+    for relative in data_paths:
+        path = workspace / relative
+        if path.suffix != _PARQUET_SUFFIX or not path.is_file():
+            continue
+        description = _describe_parquet(str(path), path.stat().st_mtime_ns)
+        sections.append(f"### {relative}\n{description}")
+    if not sections:
+        return ""
+    return f"{DATA_CATALOG_HEADING}\n\n" + "\n\n".join(sections)
+
+
+def build_artifacts_section(round_dir: Path) -> str:
+    """ラウンドディレクトリ内のファイル内容を埋め込んだセクションを作成する。
+
+    ファイル名順に並べるため、既存ファイルが変更されない限り先頭部分は変化しない。
+    サブディレクトリと空白のみのファイルは省略する。
+
+    Args:
+        round_dir: ラウンドディレクトリのパス。
+
+    Returns:
+        Markdown 形式のセクション（対象ファイルが無い場合は空文字列）。
+    """
+    if not round_dir.is_dir():
+        return ""
+    sections: list[str] = []
+    for file_path in sorted(round_dir.iterdir()):
+        if file_path.is_file():
+            content = file_path.read_text()
+            if content.strip():
+                sections.append(f"### {file_path.name}\n```\n{content}\n```")
+    if not sections:
+        return ""
+    return f"{ARTIFACTS_HEADING}\n\n" + "\n\n".join(sections)
+
+
+def compose_task_prompt(task: str, *, catalog: str = "", artifacts: str = "") -> str:
+    """不変部分を先頭、タスクを末尾に配置したプロンプトを作成する。
+
+    Args:
+        task: Leader Agent からのタスク。
+        catalog: ``build_data_catalog()`` の結果。
+        artifacts: ``build_artifacts_section()`` の結果。
+
+    Returns:
+        組み立てたプロンプト（catalog・artifacts がともに空の場合は task そのもの）。
+    """
+    prefix = [section for section in (catalog, artifacts) if section]
+    if not prefix:
+        return task
+    return SECTION_SEPARATOR.join([*prefix, f"{TASK_HEADING}\n\n{task}"])
@@ -0,0 +1,224 @@
+"""``qip setup`` の冪等なテンプレート配置とデータ共有。
+
+テンプレートを配置するたびに、各ファイルの SHA-256 を
+``{workspace}/.qip/template_manifest.json`` に記録する。再実行時は
+テンプレート・ワークスペースのファイル・マニフェストの 3 つのハッシュを比較し、
+変更のあったファイルのみを書き込む:
+
+- ``added``: ワークスペースに無い → コピー
+- ``unchanged``: ワークスペースのファイルがテンプレートと同一 → 何もしない
+- ``updated``: テンプレートのみ変更（ユーザー編集なし） → 上書き
+- ``kept``: ユーザーのみ編集（テンプレート変更なし） → 保持
+- ``conflict``: 両方が変更 → ユーザーのファイルを保持し、テンプレートを ``<name>.new`` に書き出す
+
+マニフェストの無いワークスペース（旧バージョンの setup で作成）では、
+テンプレートと異なるファイルはユーザー編集とみなして ``conflict`` とする。
+
+複数ワークスペースの一括作成では、``data/inputs/`` をハードリンクで共有し
+（別ファイルシステムの場合はコピー）、同じデータを重複して保存しない。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+
+# --- 名前付き定数 ---
+MANIFEST_FILENAME = "template_manifest.json"
+CONFLICT_SUFFIX = ".new"
+TEMPLATE_GLOB = "*.toml"
+DATA_INPUTS_DIR = Path("data") / "inputs"
+ACTION_ADDED = "added"
+ACTION_UNCHANGED = "unchanged"
+ACTION_UPDATED = "updated"
+ACTION_KEPT = "kept"
+ACTION_CONFLICT = "conflict"
+_WRITTEN_ACTIONS = (ACTION_ADDED, ACTION_UPDATED)
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+class TemplateAction(BaseModel):
+    """1 テンプレートファイルの配置結果。"""
+
+    rel_path: Path
+    action: str
+
+
+class TemplateSyncReport(BaseModel):
+    """テンプレート配置の結果。"""
+
+    actions: list[TemplateAction]
+
+    def paths(self, *actions: str) -> list[Path]:
+        """指定した結果のファイルの相対パスを返す。
+
+        Args:
+            *actions: ``ACTION_*`` 定数。
+
+        Returns:
+            相対パスのリスト。
+        """
+        return [a.rel_path for a in self.actions if a.action in actions]
+
+    @property
+    def written(self) -> list[Path]:
+        """書き込んだ（追加・更新した）ファイルの相対パス。"""
+        return self.paths(*_WRITTEN_ACTIONS)
+
+
+def file_sha256(path: Path) -> str:
+    """ファイルの SHA-256 を返す。
+
+    Args:
+        path: ファイルパス。
+
+    Returns:
+        16 進数のハッシュ文字列。
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_manifest_path(workspace: Path) -> Path:
+    """テンプレートマニフェストのパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/template_manifest.json``。
+    """
+    return workspace / KERNEL_DIR_NAME / MANIFEST_FILENAME
+
+
+def load_manifest(workspace: Path) -> dict[str, str]:
+    """テンプレートマニフェスト（相対パス → 配置時のテンプレートのハッシュ）を読み込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        マニフェスト（ファイルが無い場合は空）。
+    """
+    path = get_manifest_path(workspace)
+    if not path.is_file():
+        return {}
+    files: dict[str, str] = json.loads(path.read_text()).get("files", {})
+    return files
+
+
+def save_manifest(workspace: Path, manifest: dict[str, str]) -> None:
+    """テンプレートマニフェストを書き込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        manifest: 相対パス → テンプレートのハッシュ。
+    """
+    path = get_manifest_path(workspace)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps({"files": dict(sorted(manifest.items()))}, indent=2) + "\n")
+    tmp.replace(path)
+
+
+def _decide(template_hash: str, current_hash: str | None, installed_hash: str | None) -> str:
+    if current_hash is None:
+        return ACTION_ADDED
+    if current_hash == template_hash:
+        return ACTION_UNCHANGED
+    if current_hash == installed_hash:
+        return ACTION_UPDATED
+    if template_hash == installed_hash:
+        return ACTION_KEPT
+    return ACTION_CONFLICT
+
+
+def sync_templates(templates_dir: Path, workspace: Path, *, dry_run: bool = False) -> TemplateSyncReport:
+    """テンプレートを ``{workspace}/configs/`` に配置し、マニフェストを更新する。
+
+    Args:
+        templates_dir: テンプレートディレクトリ。
+        workspace: ワークスペースのルートパス。
+        dry_run: True の場合は判定のみ行い、ファイルを書き込まない。
+
+    Returns:
+        ファイルごとの配置結果。
+    """
+    configs_dir = workspace / "configs"
+    manifest = load_manifest(workspace)
+    actions: list[TemplateAction] = []
+
+    for src_file in sorted(templates_dir.rglob(TEMPLATE_GLOB)):
+        rel_path = src_file.relative_to(templates_dir)
+        key = rel_path.as_posix()
+        dest_file = configs_dir / rel_path
+        template_hash = file_sha256(src_file)
+        current_hash = file_sha256(dest_file) if dest_file.is_file() else None
+        action = _decide(template_hash, current_hash, manifest.get(key))
+        actions.append(TemplateAction(rel_path=rel_path, action=action))
+        if dry_run:
+            continue
+
+        if action in _WRITTEN_ACTIONS:
+            dest_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src_file, dest_file)
+        elif action == ACTION_CONFLICT:
+            shutil.copy2(src_file, dest_file.with_name(dest_file.name + CONFLICT_SUFFIX))
+        if action != ACTION_KEPT:
+            # conflict は .new で通知済みのため、以降はユーザーのファイルを新しいテンプレート基準の編集とみなす
+            manifest[key] = template_hash
+
+    if not dry_run:
+        save_manifest(workspace, manifest)
+    return TemplateSyncReport(actions=actions)
+
+
+def share_data_files(source_workspace: Path, workspace: Path, *, dry_run: bool = False) -> list[Path]:
+    """``data/inputs/`` のファイルを別ワークスペースからハードリンクで共有する。
+
+    既に存在するファイルは変更しない。ハードリンクできない場合（別ファイルシステム等）はコピーする。
+    共有したファイルは全ワークスペースで同一の実体となるため、``qip data split`` の
+    やり直しはリンク元のワークスペースで行う。
+
+    Args:
+        source_workspace: 共有元のワークスペース。
+        workspace: 共有先のワークスペース。
+        dry_run: True の場合は対象の列挙のみ行う。
+
+    Returns:
+        共有したファイルの ``data/inputs/`` からの相対パス。
+
+    Raises:
+        FileNotFoundError: 共有元の ``data/inputs/`` が存在しない場合。
+    """
+    source_dir = source_workspace / DATA_INPUTS_DIR
+    if not source_dir.is_dir():
+        msg = f"共有元のデータディレクトリが見つかりません: {source_dir}"
+        raise FileNotFoundError(msg)
+    dest_dir = workspace / DATA_INPUTS_DIR
+
+    shared: list[Path] = []
+    for src_file in sorted(p for p in source_dir.rglob("*") if p.is_file()):
+        rel_path = src_file.relative_to(source_dir)
+        dest_file = dest_dir / rel_path
+        if dest_file.exists():
+            continue
+        shared.append(rel_path)
+        if dry_run:
+            continue
+        dest_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src_file, dest_file)
+        except OSError:
+            shutil.copy2(src_file, dest_file)
+    return shared
@@ -0,0 +1,239 @@
+"""valid 分割の日時の層化サンプルによる代理スコア。
+
+Evaluator のバックテスト（評価期間の全日時で ``generate_signal`` を呼び出す）はラウンド中に
+繰り返すには遅いため、``qip proxy-score`` で次の手順の代理スコアを求める:
+
+1. valid 分割の日時を ``strata`` 個の連続した期間に分け、各期間から均等に日時を抽出する
+   （抽出はコードに依らない固定の乱数で行い、提出間で同じ日時を比較できるようにする）
+2. 期間を巡回する順に、当該日時までのデータで ``generate_signal`` を呼び出し、当該日時の
+   断面の Spearman 順位相関を求める（Evaluator と同じバックテストループ・欠損値の扱い）
+3. ``time_budget_seconds`` を超えた時点で打ち切り（各期間の 1 日目までは計算する）、
+   それまでの日時の相関のシャープレシオを返す
+
+日時ごとの相関はコード・valid 分割のデータのハッシュをキーに
+``{workspace}/.qip/proxy_scores/`` にキャッシュし、同じ提出の再実行と
+全期間での採点（``--full``）は計算済みの日時を再利用する。
+
+Member Agent がテストデータを参照しないよう、採点には valid 分割のみを使う。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from quant_insight_plus.ensemble import (
+    RETURNS_DATASET,
+    SignalScore,
+    daily_correlations,
+    load_generate_signal,
+    load_split,
+    read_split,
+    signal_at,
+    summarize_correlations,
+)
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from quant_insight_plus.runtime_config import ProxyScoreSettings
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+PROXY_SCORES_DIR_NAME = "proxy_scores"
+PROXY_SPLIT = "valid"
+_SAMPLE_SEED = 0
+
+
+class ProxyScore(BaseModel):
+    """``qip proxy-score`` の結果。"""
+
+    code_hash: str
+    split: str
+    score: SignalScore
+    total_dates: int
+    sampled_dates: int
+    evaluated_dates: int
+    cached_dates: int
+    budget_exhausted: bool
+    elapsed_seconds: float
+
+
+def get_proxy_scores_dir(workspace: Path) -> Path:
+    """日時ごとの相関のキャッシュのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/proxy_scores``。
+    """
+    return workspace / KERNEL_DIR_NAME / PROXY_SCORES_DIR_NAME
+
+
+def stratified_dates(dates: list[datetime], sample_dates: int, strata: int) -> list[datetime]:
+    """日時を連続した期間に分け、各期間から均等に抽出する。
+
+    各期間内の抽出・順序は固定の乱数で決める。戻り値は期間を巡回する順（期間 1 の 1 件目、期間 2 の
+    1 件目、…）に並べ、途中で打ち切っても全期間の日時が含まれるようにする。
+
+    Args:
+        dates: 昇順の日時。
+        sample_dates: 抽出する日時数（日時の総数以上の場合は全日時）。
+        strata: 期間数。
+
+    Returns:
+        抽出した日時（巡回順）。
+    """
+    strata = max(1, min(strata, len(dates)))
+    bounds = [len(dates) * i // strata for i in range(strata + 1)]
+    blocks = [dates[start:end] for start, end in zip(bounds, bounds[1:], strict=False)]
+    quotas = [sample_dates // strata + (1 if i < sample_dates % strata else 0) for i in range(strata)]
+    rng = random.Random(_SAMPLE_SEED)
+    samples = [rng.sample(block, min(quota, len(block))) for block, quota in zip(blocks, quotas, strict=True)]
+    ordered: list[datetime] = []
+    for i in range(max(len(sample) for sample in samples)):
+        ordered.extend(sample[i] for sample in samples if i < len(sample))
+    return ordered
+
+
+def _cache_path(workspace: Path, code: str) -> Path:
+    from quant_insight_plus.signal_cache import cache_key, code_fingerprint, data_fingerprint
+
+    key = cache_key(code_fingerprint(code), data_fingerprint(workspace, PROXY_SPLIT))
+    return get_proxy_scores_dir(workspace) / f"{key}.parquet"
+
+
+def load_cached_correlations(workspace: Path, code: str) -> pl.DataFrame | None:
+    """キャッシュした日時ごとの相関を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+
+    Returns:
+        (datetime, correlation, n)（キャッシュが無い場合は None）。
+    """
+    import polars as pl
+
+    path = _cache_path(workspace, code)
+    try:
+        return pl.read_parquet(path)
+    except (OSError, pl.exceptions.PolarsError):
+        return None
+
+
+def _store_correlations(path: Path, correlations: pl.DataFrame) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.parent / f".{path.stem}.{uuid.uuid4().hex}.tmp"
+    correlations.sort("datetime").write_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def run_proxy_score(
+    workspace: Path,
+    code: str,
+    settings: ProxyScoreSettings,
+    *,
+    full: bool = False,
+) -> ProxyScore:
+    """valid 分割の日時の層化サンプルで submission.py を採点する。
+
+    評価を打ち切った場合・``generate_signal`` が例外を送出した場合も、それまでに計算した
+    日時の相関はキャッシュに書き込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+        settings: ``[proxy_score]`` の設定。
+        full: True の場合は valid 分割の全日時を時間予算なしで採点する。
+
+    Returns:
+        採点結果。
+
+    Raises:
+        FileNotFoundError: valid 分割のデータが存在しない場合。
+        ValueError: コードに ``generate_signal`` が無い場合・有効な相関を計算できる日時が無い場合。
+    """
+    import polars as pl
+
+    from quant_insight_plus.signal_cache import code_fingerprint
+
+    started = time.monotonic()
+    ohlcv, additional = load_split(workspace, PROXY_SPLIT)
+    dates: list[datetime] = ohlcv.get_column("datetime").unique().sort().to_list()
+    sample = dates if full else stratified_dates(dates, settings.sample_dates, settings.strata)
+
+    path = _cache_path(workspace, code)
+    cached = load_cached_correlations(workspace, code)
+    known = set(cached.get_column("datetime").to_list()) if cached is not None else set()
+    pending = [current for current in sample if current not in known]
+
+    evaluated: list[pl.DataFrame] = []
+    budget_exhausted = False
+    if pending:
+        generate_signal = load_generate_signal(code)
+        returns = read_split(workspace, RETURNS_DATASET, PROXY_SPLIT)
+        try:
+            for current in pending:
+                # 時間予算を超えても、各期間の 1 日目（巡回順の先頭 strata 件）までは計算する
+                covered = len(known.intersection(sample)) + len(evaluated)
+                elapsed = time.monotonic() - started
+                if not full and covered >= settings.strata and elapsed > settings.time_budget_seconds:
+                    budget_exhausted = True
+                    break
+                signal = signal_at(generate_signal, ohlcv, additional, current)
+                correlation = daily_correlations(signal, returns.filter(pl.col("datetime") == current))
+                evaluated.append(correlation if not correlation.is_empty() else _missing_correlation(current))
+        finally:
+            if evaluated:
+                _store_correlations(path, _merge([cached, *evaluated]))
+    correlations = _merge([cached, *evaluated])
+    sampled = correlations.filter(pl.col("datetime").is_in(sample))
+    if budget_exhausted:
+        logger.info("時間予算を超えたため %d / %d 日時で採点しました", sampled.height, len(sample))
+
+    return ProxyScore(
+        code_hash=code_fingerprint(code),
+        split=PROXY_SPLIT,
+        score=summarize_correlations(sampled.get_column("correlation")),
+        total_dates=len(dates),
+        sampled_dates=len(sample),
+        evaluated_dates=len(evaluated),
+        cached_dates=len(known.intersection(sample)),
+        budget_exhausted=budget_exhausted,
+        elapsed_seconds=time.monotonic() - started,
+    )
+
+
+def _missing_correlation(current: datetime) -> pl.DataFrame:
+    """シグナル・リターンの無い日時の相関（再計算しないようキャッシュに残す）。"""
+    import polars as pl
+
+    return pl.DataFrame(
+        {"datetime": [current], "correlation": [None], "n": [0]},
+        schema={"datetime": pl.Datetime("us"), "correlation": pl.Float64, "n": pl.UInt32},
+    )
+
+
+def _merge(parts: list[pl.DataFrame | None]) -> pl.DataFrame:
+    import polars as pl
+
+    frames = [
+        part.select(pl.col("datetime").cast(pl.Datetime("us")), "correlation", pl.col("n").cast(pl.UInt32))
+        for part in parts
+        if part is not None
+    ]
+    if not frames:
+        return _missing_correlation(datetime.min).clear()
+    return pl.concat(frames).unique("datetime", keep="last").sort("datetime")
@@ -0,0 +1,386 @@
+"""中断した ``qip exec`` の完了済みラウンドからの再開。
+
+ホストの再起動等で ``qip exec`` が中断しても、完了したラウンドの結果は DuckDB の
+``leader_board`` / ``round_status`` と ``submissions/round_{N}/`` に残っている。
+``qip exec --resume <execution_id>`` は新しい実行として Orchestrator を起動し、
+各チームのラウンド開始時（``patch_submission_relay()`` の置換メソッド）に
+再開元の実行で完了済みのラウンドを ``RoundState`` として復元して返す。
+Leader / Evaluator は実行しないため、完了済みラウンドの LLM 実行を繰り返さない。
+
+復元したラウンドは新しい execution_id の ``leader_board`` / ``round_status`` にも
+書き込み、再開後の実行単体でリーダーボード・successive halving が成り立つようにする。
+``leader_board`` と ``round_status`` の両方に行があるラウンドのみ完了済みとみなす
+（評価の途中で中断したラウンドは再実行する）。successive halving で打ち切られたラウンドも
+終了済みとして復元し、打ち切りを新しい実行に引き継ぐ。
+
+再開元の完了済みラウンドは実行ごとに 1 回だけ読み込む。``submissions/round_{N}/`` は
+実行・チームをまたいで再利用されるため、``submission.py`` は同じ（チーム, 実行, ラウンド）の
+提出として記録されている場合のみ使う。
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, get_db_path, table_exists
+from quant_insight_plus.early_stopping import (
+    EXIT_REASON_ELIMINATED,
+    elimination_from_score_details,
+    record_elimination,
+)
+
+if TYPE_CHECKING:
+    import duckdb
+    import typer
+    from mixseek.round_controller.controller import RoundController
+    from mixseek.round_controller.models import RoundState
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+RESUME_ENV_VAR = "QIP_RESUME_EXECUTION_ID"
+EXEC_COMMAND_NAME = "exec"
+_RESUME_PARAMETER = "resume"
+
+_completed_rounds: dict[tuple[Path, str], dict[tuple[str, int], CompletedRound]] = {}
+_completed_rounds_lock = threading.Lock()
+
+
+class CompletedRound(BaseModel):
+    """再開元の実行で完了済みのラウンド。"""
+
+    team_id: str
+    round_number: int
+    submission_content: str
+    score: float
+    score_details: dict[str, Any]
+    round_started_at: datetime
+    round_ended_at: datetime
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def load_completed_rounds(
+    conn: duckdb.DuckDBPyConnection,
+    execution_id: str,
+    team_id: str | None = None,
+) -> list[CompletedRound]:
+    """``leader_board`` と ``round_status`` の両方に記録されたラウンドを返す。
+
+    Args:
+        conn: DuckDB 接続。
+        execution_id: 再開元の実行 ID。
+        team_id: 指定時はそのチームのラウンドのみ返す。
+
+    Returns:
+        完了済みラウンド（team_id, round_number 順）。
+    """
+    if not (table_exists(conn, "leader_board") and table_exists(conn, "round_status")):
+        return []
+    sql = """
+        SELECT lb.team_id, lb.round_number, lb.submission_content, lb.score, lb.score_details,
+               rs.round_started_at, rs.round_ended_at
+        FROM leader_board AS lb
+        JOIN round_status AS rs
+          ON rs.execution_id = lb.execution_id AND rs.team_id = lb.team_id AND rs.round_number = lb.round_number
+        WHERE lb.execution_id = ?
+    """
+    params: list[Any] = [execution_id]
+    if team_id is not None:
+        sql += " AND lb.team_id = ?"
+        params.append(team_id)
+    rows = conn.execute(sql + " ORDER BY lb.team_id, lb.round_number", params).fetchall()
+
+    completed: dict[tuple[str, int], CompletedRound] = {}
+    for row_team, round_number, content, score, details, started_at, ended_at in rows:
+        completed[(row_team, round_number)] = CompletedRound(
+            team_id=row_team,
+            round_number=round_number,
+            submission_content=content or "",
+            score=score,
+            score_details=json.loads(details) if isinstance(details, str) else dict(details or {}),
+            round_started_at=_as_datetime(started_at),
+            round_ended_at=_as_datetime(ended_at),
+        )
+    return list(completed.values())
+
+
+def get_completed_rounds(workspace: Path, execution_id: str) -> dict[tuple[str, int], CompletedRound]:
+    """再開元の実行で完了済みのラウンドを ``(team_id, round_number)`` ごとに返す。
+
+    再開元の実行は再開中に変わらないため、データベースは実行ごとに 1 回だけ読み込み、
+    全チーム・全ラウンドで共有する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 再開元の実行 ID。
+
+    Returns:
+        ``{(team_id, round_number): CompletedRound}``（データベース不在の場合は空）。
+    """
+    key = (workspace, execution_id)
+    with _completed_rounds_lock:
+        if key not in _completed_rounds:
+            db_path = get_db_path(workspace)
+            rounds: list[CompletedRound] = []
+            if db_path.is_file():
+                # Orchestrator の store と同一プロセスで開くため、接続設定を store に揃える（read_only にしない）
+                conn = connect(db_path)
+                try:
+                    rounds = load_completed_rounds(conn, execution_id)
+                finally:
+                    conn.close()
+            _completed_rounds[key] = {(r.team_id, r.round_number): r for r in rounds}
+        return _completed_rounds[key]
+
+
+def find_completed_round(
+    workspace: Path,
+    completed_rounds: dict[tuple[str, int], CompletedRound],
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+) -> CompletedRound | None:
+    """再開元の実行で完了済みのラウンドを返す。
+
+    ``leader_board`` の ``submission_content`` が空の場合は、ラウンドディレクトリの
+    ``submission.py`` が同じ（チーム, 実行, ラウンド）の提出として記録されている場合のみ復元する
+    （successive halving で打ち切られたラウンドは空のまま返す）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        completed_rounds: ``get_completed_rounds()`` の結果。
+        execution_id: 再開元の実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+
+    Returns:
+        完了済みラウンド（未完了・提出内容を復元できない場合は None）。
+    """
+    from quant_insight_plus.submission_relay import get_round_dir, read_stamped_submission
+
+    completed = completed_rounds.get((team_id, round_number))
+    if completed is None or completed.submission_content.strip():
+        return completed
+    if elimination_from_score_details(completed.score_details) is not None:
+        # successive halving で打ち切られたラウンドは提出内容を持たない
+        return completed
+    content = read_stamped_submission(
+        get_round_dir(workspace, round_number), execution_id=execution_id, team_id=team_id, round_number=round_number
+    )
+    if content is None:
+        # submissions/round_{N} は実行・チームをまたいで再利用されるため、記録と一致しない内容は使わない
+        logger.warning("ラウンド %d の提出内容を復元できないため再実行します (team=%s)", round_number, team_id)
+        return None
+    return completed.model_copy(update={"submission_content": content})
+
+
+def get_resume_execution_id() -> str | None:
+    """再開元の実行 ID（``qip exec --resume`` の指定値）を返す。"""
+    return os.environ.get(RESUME_ENV_VAR) or None
+
+
+@contextmanager
+def resume_from(execution_id: str | None) -> Iterator[None]:
+    """再開元の実行 ID を設定した状態でブロックを実行する（None の場合は何もしない）。
+
+    Args:
+        execution_id: 再開元の実行 ID。
+
+    Yields:
+        None。
+    """
+    if execution_id is None:
+        yield
+        return
+    previous = os.environ.get(RESUME_ENV_VAR)
+    os.environ[RESUME_ENV_VAR] = execution_id
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(RESUME_ENV_VAR, None)
+        else:
+            os.environ[RESUME_ENV_VAR] = previous
+
+
+async def restore_completed_round(controller: RoundController, round_number: int) -> RoundState | None:
+    """再開時、完了済みのラウンドを ``RoundState`` として復元する。
+
+    復元したラウンドは現在の実行 ID で ``leader_board`` / ``round_status`` に書き込み、
+    ``on_round_complete`` フックを呼び出す。
+
+    Args:
+        controller: ラウンドを実行する RoundController。
+        round_number: 開始しようとしているラウンド番号。
+
+    Returns:
+        復元した RoundState（再開中でない・未完了のラウンドの場合は None）。
+    """
+    import asyncio
+
+    source_execution_id = get_resume_execution_id()
+    if source_execution_id is None:
+        return None
+    team_id = controller.team_config.team_id
+    completed_rounds = await asyncio.to_thread(get_completed_rounds, controller.workspace, source_execution_id)
+    completed = await asyncio.to_thread(
+        find_completed_round, controller.workspace, completed_rounds, source_execution_id, team_id, round_number
+    )
+    if completed is None:
+        return None
+
+    from mixseek.round_controller.models import RoundState
+
+    from quant_insight_plus.submission_relay import refresh_round_leaderboard
+
+    logger.info(
+        "再開: 実行 %s のラウンド %d を復元しました (team=%s, score=%.4f)",
+        source_execution_id,
+        round_number,
+        team_id,
+        completed.score,
+    )
+    execution_id = controller.task.execution_id
+    elimination = elimination_from_score_details(completed.score_details)
+    if elimination is not None:
+        # 打ち切りを新しい実行にも記録し、復元できない以降のラウンドも打ち切り済みとして終える
+        await asyncio.to_thread(record_elimination, controller.workspace, execution_id, elimination)
+    if controller.store is not None and execution_id != source_execution_id:
+        await controller.store.save_to_leader_board(
+            execution_id=execution_id,
+            team_id=team_id,
+            team_name=controller.team_config.team_name,
+            round_number=round_number,
+            submission_content=completed.submission_content,
+            submission_format="md",
+            score=completed.score,
+            score_details=completed.score_details,
+            final_submission=False,
+            exit_reason=EXIT_REASON_ELIMINATED if elimination is not None else None,
+        )
+        await controller.store.save_round_status(
+            execution_id=execution_id,
+            team_id=team_id,
+            team_name=controller.team_config.team_name,
+            round_number=round_number,
+            should_continue=False if elimination is not None else None,
+            reasoning=elimination.message if elimination is not None else None,
+            confidence_score=None,
+            round_started_at=completed.round_started_at.isoformat(),
+            round_ended_at=completed.round_ended_at.isoformat(),
+        )
+        await refresh_round_leaderboard(
+            controller.workspace, execution_id=execution_id, team_id=team_id, round_number=round_number
+        )
+
+    round_state = RoundState(
+        round_number=round_number,
+        submission_content=completed.submission_content,
+        evaluation_score=completed.score,
+        score_details=completed.score_details,
+        improvement_judgment=None,
+        round_started_at=completed.round_started_at,
+        round_ended_at=completed.round_ended_at,
+        message_history=[],
+    )
+    if controller._on_round_complete:
+        try:
+            await controller._on_round_complete(round_state, [])
+        except Exception as e:
+            logger.warning("on_round_complete hook failed: %s", e, exc_info=True)
+    return round_state
+
+
+def summarize_resume_source(workspace: Path, execution_id: str) -> dict[str, list[int]]:
+    """再開元の実行で完了済みのラウンド番号をチームごとに返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 再開元の実行 ID。
+
+    Returns:
+        ``{team_id: [round_number, ...]}``。
+
+    Raises:
+        FileNotFoundError: データベースが存在しない場合。
+    """
+    conn = connect(get_db_path(workspace), read_only=True)
+    try:
+        rounds = load_completed_rounds(conn, execution_id)
+    finally:
+        conn.close()
+    summary: dict[str, list[int]] = defaultdict(list)
+    for completed in rounds:
+        summary[completed.team_id].append(completed.round_number)
+    return dict(summary)
+
+
+def add_resume_option(app: typer.Typer, workspace_resolver: Callable[[], Path]) -> None:
+    """mixseek-core の ``exec`` コマンドに ``--resume EXECUTION_ID`` オプションを追加する。
+
+    元のコマンド関数を、再開元の実行を検証・表示して ``RESUME_ENV_VAR`` を設定してから
+    呼び出すラッパーに置き換える。``exec`` コマンドが無い場合は何もしない。
+
+    Args:
+        app: mixseek-core の CLI アプリ。
+        workspace_resolver: ワークスペースパスを返す関数（``get_workspace``）。
+    """
+    import typer
+
+    for command in app.registered_commands:
+        original = command.callback
+        if original is None or (command.name or original.__name__) != EXEC_COMMAND_NAME:
+            continue
+        signature = inspect.signature(original)
+        if _RESUME_PARAMETER in signature.parameters:
+            return
+
+        @functools.wraps(original)
+        def exec_with_resume(*args: Any, _original: Callable[..., Any] = original, **kwargs: Any) -> Any:
+            resume: str | None = kwargs.pop(_RESUME_PARAMETER, None)
+            if resume is not None:
+                try:
+                    completed = summarize_resume_source(workspace_resolver(), resume)
+                except FileNotFoundError as e:
+                    typer.echo(str(e), err=True)
+                    raise typer.Exit(code=1) from e
+                if not completed:
+                    typer.echo(f"再開元の実行に完了済みのラウンドがありません: {resume}", err=True)
+                    raise typer.Exit(code=1)
+                for team_id, rounds in sorted(completed.items()):
+                    typer.echo(f"再開: {team_id} のラウンド {', '.join(map(str, rounds))} を復元します")
+            with resume_from(resume):
+                return _original(*args, **kwargs)
+
+        resume_parameter = inspect.Parameter(
+            _RESUME_PARAMETER,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=typer.Option(
+                None,
+                "--resume",
+                help="中断した実行の execution_id（完了済みラウンドを復元して再開）",
+            ),
+            annotation=str | None,
+        )
+        parameters = [p for p in signature.parameters.values() if p.kind != inspect.Parameter.VAR_KEYWORD]
+        new_signature = signature.replace(parameters=[*parameters, resume_parameter])
+        exec_with_resume.__signature__ = new_signature  # type: ignore[attr-defined]
+        exec_with_resume.__annotations__ = {**original.__annotations__, _RESUME_PARAMETER: str | None}
+        command.callback = exec_with_resume
+        return
@@ -0,0 +1,471 @@
+"""ラウンドディレクトリの保持ポリシーとアーカイブ。
+
+``submissions/round_{N}/`` は実行をまたいで再利用され、各ラウンドにはスクリプト・中間 CSV・
+ログが残る。保持はラウンド番号ではなく、実行ごとのラウンド（``round_status`` の
+``(execution_id, round_number)``）単位で判定する。ラウンドディレクトリの各ファイルは、
+更新時刻がラウンドの開始〜終了の間にある実行のラウンドに属するものとし
+（どの実行のラウンドにも属さないファイルは、ディレクトリごとに最終更新時刻の 1 単位とする）、
+``qip submissions gc`` で次のポリシーをファイルごとに適用する:
+
+- 開始時刻が新しい順に ``keep_last_rounds`` 件の実行のラウンドのファイルはそのまま残す
+- ``leader_board`` で各実行の各チームのスコア上位 ``keep_best_per_team`` 件の実行のラウンドは、
+  ``keep_files``（submission.py 等）のみ残し、その他のファイルをアーカイブする
+- それ以外のファイルはアーカイブし、ファイルが残らないディレクトリは削除する
+
+アーカイブはコンテンツアドレスのブロブストア（gzip 圧縮）とラウンドごとのマニフェストで構成する:
+
+    submissions/archive/blobs/{sha256[:2]}/{sha256}.gz
+    submissions/archive/rounds/{archive_id}.json
+
+同じ内容のファイル（繰り返し出力されるスクリプト等）はブロブを共有する。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, get_db_path, table_exists
+from quant_insight_plus.submission_relay import SUBMISSION_ERROR_SCORE, SUBMISSIONS_DIR_NAME, get_round_dir
+
+if TYPE_CHECKING:
+    from quant_insight_plus.runtime_config import SubmissionRetentionSettings
+
+# --- 名前付き定数 ---
+ARCHIVE_DIR_NAME = "archive"
+BLOBS_DIR_NAME = "blobs"
+MANIFESTS_DIR_NAME = "rounds"
+BLOB_SUFFIX = ".gz"
+_ROUND_DIR_PATTERN = re.compile(r"round_(\d+)")
+_ARCHIVE_ID_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+class ArchivedFile(BaseModel):
+    """アーカイブしたファイル（ラウンドディレクトリからの相対パス）。"""
+
+    path: str
+    sha256: str
+    size: int
+
+
+class RoundArchive(BaseModel):
+    """1 ラウンド分のアーカイブのマニフェスト。"""
+
+    archive_id: str
+    round_number: int
+    archived_at: datetime
+    compacted: bool
+    files: list[ArchivedFile]
+
+    @property
+    def total_bytes(self) -> int:
+        """アーカイブしたファイルの合計サイズ（圧縮前）。"""
+        return sum(f.size for f in self.files)
+
+
+class RoundRun(BaseModel):
+    """1 実行の 1 ラウンド（``round_status`` の全チームの最初の開始〜最後の終了）。"""
+
+    execution_id: str
+    round_number: int
+    started_at: datetime
+    ended_at: datetime
+
+
+class RoundPlan(BaseModel):
+    """1 ラウンドディレクトリの保持計画（ラウンドディレクトリからの相対パス）。"""
+
+    round_number: int
+    keep: list[str]
+    archive: list[str]
+
+
+class RetentionPlan(BaseModel):
+    """保持ポリシーの適用計画。"""
+
+    rounds: list[RoundPlan]
+
+    @property
+    def keep(self) -> list[int]:
+        """ファイルをアーカイブしないラウンド番号。"""
+        return [r.round_number for r in self.rounds if not r.archive]
+
+    @property
+    def compact(self) -> list[int]:
+        """一部のファイルのみアーカイブするラウンド番号。"""
+        return [r.round_number for r in self.rounds if r.archive and r.keep]
+
+    @property
+    def archive(self) -> list[int]:
+        """すべてのファイルをアーカイブし、ディレクトリを削除するラウンド番号。"""
+        return [r.round_number for r in self.rounds if r.archive and not r.keep]
+
+
+class GcResult(BaseModel):
+    """``collect_garbage()`` の結果。"""
+
+    plan: RetentionPlan
+    archives: list[RoundArchive]
+    dry_run: bool
+
+    @property
+    def archived_bytes(self) -> int:
+        """アーカイブしたファイルの合計サイズ（圧縮前）。"""
+        return sum(archive.total_bytes for archive in self.archives)
+
+
+def get_archive_dir(workspace: Path) -> Path:
+    """アーカイブのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/submissions/archive``。
+    """
+    return workspace / SUBMISSIONS_DIR_NAME / ARCHIVE_DIR_NAME
+
+
+def list_round_dirs(workspace: Path) -> dict[int, Path]:
+    """ラウンドディレクトリをラウンド番号順に返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ラウンド番号 → ディレクトリ。
+    """
+    submissions = workspace / SUBMISSIONS_DIR_NAME
+    if not submissions.is_dir():
+        return {}
+    rounds = {
+        int(match.group(1)): path
+        for path in submissions.iterdir()
+        if path.is_dir() and (match := _ROUND_DIR_PATTERN.fullmatch(path.name))
+    }
+    return dict(sorted(rounds.items()))
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def load_round_runs(workspace: Path) -> list[RoundRun]:
+    """``round_status`` から実行ごとのラウンドを開始時刻順に返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        実行ごとのラウンド（データベース・テーブルが無い場合は空）。
+    """
+    try:
+        conn = connect(get_db_path(workspace), read_only=True)
+    except FileNotFoundError:
+        return []
+    try:
+        if not table_exists(conn, "round_status"):
+            return []
+        rows = conn.execute(
+            """
+            SELECT execution_id, round_number, MIN(round_started_at), MAX(round_ended_at)
+            FROM round_status
+            GROUP BY execution_id, round_number
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+    runs = [
+        RoundRun(execution_id=row[0], round_number=row[1], started_at=_as_utc(row[2]), ended_at=_as_utc(row[3]))
+        for row in rows
+    ]
+    return sorted(runs, key=lambda run: run.started_at)
+
+
+def best_rounds_per_team(workspace: Path, keep_best: int) -> set[tuple[str, int]]:
+    """``leader_board`` で各実行の各チームのスコア上位 ``keep_best`` 件のラウンドを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        keep_best: 実行・チームごとの件数。
+
+    Returns:
+        ``(execution_id, round_number)``（データベース・テーブルが無い場合は空）。
+    """
+    if keep_best == 0:
+        return set()
+    try:
+        conn = connect(get_db_path(workspace), read_only=True)
+    except FileNotFoundError:
+        return set()
+    try:
+        if not table_exists(conn, "leader_board"):
+            return set()
+        rows = conn.execute(
+            """
+            SELECT execution_id, round_number
+            FROM leader_board
+            WHERE score > ?
+            QUALIFY row_number() OVER (
+                PARTITION BY execution_id, team_id ORDER BY score DESC, round_number DESC
+            ) <= ?
+            """,
+            [SUBMISSION_ERROR_SCORE, keep_best],
+        ).fetchall()
+    finally:
+        conn.close()
+    return {(execution_id, round_number) for execution_id, round_number in rows}
+
+
+def _owner(runs: list[RoundRun], modified: datetime) -> tuple[str, int] | None:
+    """ファイルの更新時刻が開始〜終了の間にある実行のラウンドを返す（無い場合は None）。"""
+    owner = next((run for run in reversed(runs) if run.started_at <= modified), None)
+    if owner is None or modified > owner.ended_at:
+        return None
+    return (owner.execution_id, owner.round_number)
+
+
+def plan_retention(workspace: Path, settings: SubmissionRetentionSettings) -> RetentionPlan:
+    """保持ポリシーからファイルごとの扱いを決める。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        settings: ``[submission_retention]`` の設定。
+
+    Returns:
+        ラウンドディレクトリごとの残す・アーカイブするファイル。
+    """
+    runs_by_round: dict[int, list[RoundRun]] = {}
+    for run in load_round_runs(workspace):
+        runs_by_round.setdefault(run.round_number, []).append(run)
+
+    # ファイル → 単位（実行のラウンド、またはどの実行にも属さないファイルのディレクトリ）
+    owners: dict[int, dict[str, tuple[str, int]]] = {}
+    unit_times: dict[tuple[str, int], datetime] = {
+        (run.execution_id, run.round_number): run.started_at for runs in runs_by_round.values() for run in runs
+    }
+    used: set[tuple[str, int]] = set()
+    for round_number, round_dir in list_round_dirs(workspace).items():
+        owners[round_number] = {}
+        for path in sorted(p for p in round_dir.rglob("*") if p.is_file()):
+            modified = datetime.fromtimestamp(path.stat().st_mtime, tz=UTC)
+            unit = _owner(runs_by_round.get(round_number, []), modified)
+            if unit is None:
+                unit = ("", round_number)
+                unit_times[unit] = max(unit_times.get(unit, modified), modified)
+            owners[round_number][path.relative_to(round_dir).as_posix()] = unit
+            used.add(unit)
+
+    newest = sorted(used, key=lambda unit: unit_times[unit], reverse=True)
+    keep = set(newest[: settings.keep_last_rounds])
+    best = best_rounds_per_team(workspace, settings.keep_best_per_team)
+    rounds: list[RoundPlan] = []
+    for round_number, files in owners.items():
+        kept = [path for path, unit in files.items() if unit in keep or (unit in best and path in settings.keep_files)]
+        rounds.append(
+            RoundPlan(round_number=round_number, keep=kept, archive=[path for path in files if path not in kept])
+        )
+    return RetentionPlan(rounds=rounds)
+
+
+def _blob_path(archive_dir: Path, sha256: str) -> Path:
+    return archive_dir / BLOBS_DIR_NAME / sha256[:2] / f"{sha256}{BLOB_SUFFIX}"
+
+
+def store_blob(archive_dir: Path, data: bytes) -> str:
+    """内容をブロブストアに保存する（同じ内容のブロブが有れば再利用）。
+
+    Args:
+        archive_dir: ``get_archive_dir()`` の戻り値。
+        data: ファイルの内容。
+
+    Returns:
+        内容の SHA-256。
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    path = _blob_path(archive_dir, sha256)
+    if path.is_file():
+        return sha256
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_bytes(gzip.compress(data, mtime=0))
+    os.replace(tmp, path)
+    return sha256
+
+
+def archive_round(workspace: Path, round_number: int, *, keep_files: list[str] | None = None) -> RoundArchive:
+    """ラウンドディレクトリのファイルをアーカイブし、アーカイブしたファイルを削除する。
+
+    マニフェストを書き出してからファイルを削除するため、途中で中断しても内容は失われない。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_number: ラウンド番号。
+        keep_files: 残すファイル（ラウンドディレクトリからの相対パス）。None の場合はディレクトリごと削除する。
+
+    Returns:
+        マニフェスト。
+
+    Raises:
+        FileNotFoundError: ラウンドディレクトリが存在しない場合。
+    """
+    round_dir = get_round_dir(workspace, round_number)
+    if not round_dir.is_dir():
+        msg = f"ラウンドディレクトリが見つかりません: {round_dir}"
+        raise FileNotFoundError(msg)
+    archive_dir = get_archive_dir(workspace)
+    kept = set(keep_files or ())
+    paths = sorted(p for p in round_dir.rglob("*") if p.is_file() and p.relative_to(round_dir).as_posix() not in kept)
+    files = [
+        ArchivedFile(
+            path=path.relative_to(round_dir).as_posix(),
+            sha256=store_blob(archive_dir, data := path.read_bytes()),
+            size=len(data),
+        )
+        for path in paths
+    ]
+    archived_at = datetime.now(UTC)
+    archive = RoundArchive(
+        archive_id=f"round_{round_number}-{archived_at.strftime(_ARCHIVE_ID_TIME_FORMAT)}",
+        round_number=round_number,
+        archived_at=archived_at,
+        compacted=keep_files is not None,
+        files=files,
+    )
+    manifest = archive_dir / MANIFESTS_DIR_NAME / f"{archive.archive_id}.json"
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text(archive.model_dump_json(indent=2) + "\n")
+
+    if keep_files is None:
+        shutil.rmtree(round_dir)
+        return archive
+    for path in paths:
+        path.unlink()
+    for directory in sorted((p for p in round_dir.rglob("*") if p.is_dir()), key=lambda p: -len(p.parts)):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+    return archive
+
+
+def collect_garbage(
+    workspace: Path,
+    settings: SubmissionRetentionSettings,
+    *,
+    dry_run: bool = False,
+) -> GcResult:
+    """保持ポリシーを適用する。
+
+    実行中のラウンドを対象にしないよう、``qip exec`` の実行中には使用しないこと
+    （新しいラウンドは ``keep_last_rounds`` で保護される）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        settings: ``[submission_retention]`` の設定。
+        dry_run: True の場合は計画のみ返し、ファイルを変更しない。
+
+    Returns:
+        計画とアーカイブのマニフェスト。
+    """
+    plan = plan_retention(workspace, settings)
+    archives: list[RoundArchive] = []
+    if not dry_run:
+        for round_plan in plan.rounds:
+            if not round_plan.archive:
+                continue
+            keep_files = round_plan.keep or None
+            archives.append(archive_round(workspace, round_plan.round_number, keep_files=keep_files))
+    return GcResult(plan=plan, archives=archives, dry_run=dry_run)
+
+
+def list_archives(workspace: Path, round_number: int | None = None) -> list[RoundArchive]:
+    """アーカイブのマニフェストを、ラウンド番号・アーカイブ時刻順に返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_number: 指定時はそのラウンドのアーカイブのみ返す。
+
+    Returns:
+        マニフェスト。
+    """
+    manifests = get_archive_dir(workspace) / MANIFESTS_DIR_NAME
+    if not manifests.is_dir():
+        return []
+    archives = [RoundArchive.model_validate_json(path.read_text()) for path in manifests.glob("*.json")]
+    if round_number is not None:
+        archives = [archive for archive in archives if archive.round_number == round_number]
+    return sorted(archives, key=lambda archive: (archive.round_number, archive.archived_at))
+
+
+def load_archive(workspace: Path, archive_id: str) -> RoundArchive:
+    """アーカイブのマニフェストを読み込む。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        archive_id: アーカイブ ID（``round_{N}-{時刻}``）。
+
+    Returns:
+        マニフェスト。
+
+    Raises:
+        FileNotFoundError: アーカイブが存在しない場合。
+    """
+    path = get_archive_dir(workspace) / MANIFESTS_DIR_NAME / f"{archive_id}.json"
+    if not path.is_file():
+        msg = f"アーカイブが見つかりません: {archive_id}"
+        raise FileNotFoundError(msg)
+    return RoundArchive.model_validate_json(path.read_text())
+
+
+def read_archived_file(workspace: Path, archive_id: str, path: str) -> bytes:
+    """アーカイブしたファイルの内容を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        archive_id: アーカイブ ID。
+        path: ラウンドディレクトリからの相対パス（例: ``"submission.py"``）。
+
+    Returns:
+        ファイルの内容。
+
+    Raises:
+        FileNotFoundError: アーカイブ・ファイルが存在しない場合。
+    """
+    archive = load_archive(workspace, archive_id)
+    entry = next((f for f in archive.files if f.path == path), None)
+    if entry is None:
+        msg = f"アーカイブ {archive_id} に {path} はありません"
+        raise FileNotFoundError(msg)
+    return gzip.decompress(_blob_path(get_archive_dir(workspace), entry.sha256).read_bytes())
+
+
+def restore_round(workspace: Path, archive_id: str, destination: Path) -> Path:
+    """アーカイブしたファイルをディレクトリに展開する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        archive_id: アーカイブ ID。
+        destination: 展開先（既存のファイルは上書きする）。
+
+    Returns:
+        展開先。
+
+    Raises:
+        FileNotFoundError: アーカイブ・ブロブが存在しない場合。
+    """
+    archive = load_archive(workspace, archive_id)
+    archive_dir = get_archive_dir(workspace)
+    for entry in archive.files:
+        target = destination / entry.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(gzip.decompress(_blob_path(archive_dir, entry.sha256).read_bytes()))
+    return destination
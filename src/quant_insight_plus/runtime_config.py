@@ -0,0 +1,251 @@
+"""quant-insight-plus 独自の実行時設定（runtime.toml）。
+
+mixseek-core の orchestrator.toml では表現できない、ホスト単位の実行時設定を
+``$MIXSEEK_WORKSPACE/configs/runtime.toml`` から読み込む。
+ファイルが存在しない場合は全項目がデフォルト値になる。
+"""
+
+from __future__ import annotations
+
+import os
+import tomllib
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+# --- 名前付き定数 ---
+RUNTIME_CONFIG_FILENAME = "runtime.toml"
+_WORKSPACE_ENV_VAR = "MIXSEEK_WORKSPACE"
+DEFAULT_MAX_MEMBER_SESSIONS = 4
+DEFAULT_SESSION_METRICS_PATH = "logs/session_metrics.jsonl"
+DEFAULT_LLM_SLOTS = 4
+DEFAULT_CPU_SLOTS = 2
+DEFAULT_SCHEDULER_METRICS_PATH = "logs/scheduler_metrics.jsonl"
+DEFAULT_HALVING_CHECKPOINTS = (2,)
+DEFAULT_KEEP_FRACTION = 0.5
+DEFAULT_COHORT_TIMEOUT_SECONDS = 600.0
+DEFAULT_SIGNAL_CACHE_MAX_ENTRIES = 500
+DEFAULT_SIGNAL_CACHE_MAX_MEGABYTES = 2048
+DEFAULT_DIVERSITY_MAX_SUBMISSIONS = 40
+DEFAULT_REDUNDANT_CORRELATION = 0.9
+DEFAULT_DIVERSITY_CHUNK_SIZE = 8
+DEFAULT_RESERVED_CORES = 1
+DEFAULT_MAX_CONCURRENT_TEAMS = 4
+DEFAULT_KEEP_LAST_ROUNDS = 10
+DEFAULT_KEEP_BEST_PER_TEAM = 3
+DEFAULT_RETAINED_FILES = ("submission.py", "analysis.md")
+DEFAULT_WATCH_POLL_INTERVAL_SECONDS = 1.0
+DEFAULT_WATCH_SETTLE_SECONDS = 2.0
+DEFAULT_WATCH_SMOKE_DAYS = 5
+DEFAULT_WATCH_TIMEOUT_SECONDS = 120
+DEFAULT_PROXY_SAMPLE_DATES = 40
+DEFAULT_PROXY_STRATA = 4
+DEFAULT_PROXY_TIME_BUDGET_SECONDS = 60.0
+DEFAULT_WALK_FORWARD_WINDOWS = 4
+DEFAULT_MIN_WINDOW_DATES = 5
+
+
+class SessionLimitSettings(BaseModel):
+    """``[session_limit]`` セクション: Member Agent の ClaudeCode セッションの同時実行上限。"""
+
+    enabled: bool = False
+    max_member_sessions: int = Field(default=DEFAULT_MAX_MEMBER_SESSIONS, ge=1)
+    metrics_path: str | None = DEFAULT_SESSION_METRICS_PATH
+
+
+class SchedulerSettings(BaseModel):
+    """``[scheduler]`` セクション: 複数チーム実行時の容量プールの設定。
+
+    ``llm_slots`` はラウンドの Leader 実行（Member への委譲を含む）を同時に
+    進められるチーム数、``cpu_slots`` は同時に実行できる評価（バックテスト）数。
+    ``team_timeout_seconds`` はスロット待ちの時間を除いたチームの持ち時間
+    （未指定時は orchestrator.toml の ``timeout_per_team_seconds``）。
+    """
+
+    enabled: bool = False
+    llm_slots: int = Field(default=DEFAULT_LLM_SLOTS, ge=1)
+    cpu_slots: int = Field(default=DEFAULT_CPU_SLOTS, ge=1)
+    team_timeout_seconds: float | None = Field(default=None, gt=0)
+    team_priorities: dict[str, int] = Field(default_factory=dict)
+    metrics_path: str | None = DEFAULT_SCHEDULER_METRICS_PATH
+
+
+class SuccessiveHalvingSettings(BaseModel):
+    """``[successive_halving]`` セクション: 下位チームの早期打ち切りの設定。
+
+    ``checkpoints`` の各ラウンド数に全チームが到達した時点（``cohort_timeout_seconds`` 経過時は
+    到達済みのチーム）を最高スコアで順位付けし、上位 ``keep_fraction`` 以外のチームは以降のラウンドを実行しない。
+    """
+
+    enabled: bool = False
+    checkpoints: list[int] = Field(default_factory=lambda: list(DEFAULT_HALVING_CHECKPOINTS))
+    keep_fraction: float = Field(default=DEFAULT_KEEP_FRACTION, gt=0, le=1)
+    min_teams: int = Field(default=1, ge=1)
+    min_compared: int = Field(default=2, ge=1)
+    cohort_timeout_seconds: float = Field(default=DEFAULT_COHORT_TIMEOUT_SECONDS, gt=0)
+
+
+class PhaseTimeoutSettings(BaseModel):
+    """``[phase_timeouts]`` セクション: ラウンド内のフェーズごとの期限（秒、未指定は期限なし）。
+
+    ``member_seconds`` は Member Agent への 1 回の委譲（再実行・プリフライトを含む）の期限。
+    いずれも orchestrator.toml の ``timeout_per_team_seconds`` の内側で適用される。
+    """
+
+    leader_seconds: float | None = Field(default=None, gt=0)
+    member_seconds: float | None = Field(default=None, gt=0)
+    evaluation_seconds: float | None = Field(default=None, gt=0)
+    persistence_seconds: float | None = Field(default=None, gt=0)
+
+
+class SignalCacheSettings(BaseModel):
+    """``[signal_cache]`` セクション: 評価時のシグナルのキャッシュの設定。
+
+    ``max_entries`` / ``max_megabytes`` を超えた場合は、最後に使用された時刻が古い順に削除する。
+    """
+
+    enabled: bool = False
+    max_entries: int = Field(default=DEFAULT_SIGNAL_CACHE_MAX_ENTRIES, ge=1)
+    max_megabytes: float = Field(default=DEFAULT_SIGNAL_CACHE_MAX_MEGABYTES, gt=0)
+
+
+class DiversitySettings(BaseModel):
+    """``[diversity]`` セクション: 提出間のシグナル相関の要約の設定。
+
+    ラウンド開始時に、シグナルキャッシュ（``[signal_cache]``）のうち同じ実行の提出の
+    相関を求め、ラウンドディレクトリに要約を書き出す。相関が ``redundant_correlation``
+    以上のペアを冗長とみなす。
+    """
+
+    enabled: bool = False
+    max_submissions: int = Field(default=DEFAULT_DIVERSITY_MAX_SUBMISSIONS, ge=2)
+    redundant_correlation: float = Field(default=DEFAULT_REDUNDANT_CORRELATION, gt=0, le=1)
+    chunk_size: int = Field(default=DEFAULT_DIVERSITY_CHUNK_SIZE, ge=1)
+
+
+class CpuBudgetSettings(BaseModel):
+    """``[cpu_budget]`` セクション: ホスト単位の CPU 予算の設定。
+
+    チームごとの polars のスレッド数（``POLARS_MAX_THREADS``）を
+    ``(コア数 - reserved_cores) // max(稼働チーム数, max_concurrent_teams)`` として求め、
+    Member Agent の ``python_command``・``qip worker`` のチームプロセス・``qip ensemble`` のワーカーに渡す。
+    割り当てはラウンドの開始時に決まるため、後から開始するチームの分も ``max_concurrent_teams`` で
+    見込んでおく（稼働チーム数が上限以下であれば、割り当ての合計は利用可能なコア数を超えない）。
+    ``pin_affinity`` 有効時はチームごとに異なるコアに固定する。
+    """
+
+    enabled: bool = False
+    reserved_cores: int = Field(default=DEFAULT_RESERVED_CORES, ge=0)
+    max_concurrent_teams: int = Field(default=DEFAULT_MAX_CONCURRENT_TEAMS, ge=1)
+    max_threads_per_team: int | None = Field(default=None, ge=1)
+    pin_affinity: bool = False
+
+
+class SubmissionRetentionSettings(BaseModel):
+    """``[submission_retention]`` セクション: ``qip submissions gc`` の保持ポリシー。
+
+    ファイルを書いた実行のラウンドごとに、開始時刻が新しい順に ``keep_last_rounds`` 件は
+    そのまま残し、各実行の各チームのスコア上位 ``keep_best_per_team`` 件は ``keep_files`` 以外を、
+    その他はすべてのファイルをアーカイブする。
+    """
+
+    keep_last_rounds: int = Field(default=DEFAULT_KEEP_LAST_ROUNDS, ge=1)
+    keep_best_per_team: int = Field(default=DEFAULT_KEEP_BEST_PER_TEAM, ge=0)
+    keep_files: list[str] = Field(default_factory=lambda: list(DEFAULT_RETAINED_FILES))
+
+
+class SubmissionWatchSettings(BaseModel):
+    """``[submission_watch]`` セクション: ラウンド実行中の submission.py の早期検証の設定。
+
+    Leader Agent の実行中に ``submission.py`` の更新をポーリングし、更新が
+    ``settle_seconds`` 止まった時点でプリフライト検証（valid 分割の直近 ``smoke_days`` 日の
+    スモークテストを含む）を行う。
+    """
+
+    enabled: bool = False
+    poll_interval_seconds: float = Field(default=DEFAULT_WATCH_POLL_INTERVAL_SECONDS, gt=0)
+    settle_seconds: float = Field(default=DEFAULT_WATCH_SETTLE_SECONDS, ge=0)
+    smoke_days: int = Field(default=DEFAULT_WATCH_SMOKE_DAYS, ge=1)
+    timeout_seconds: int = Field(default=DEFAULT_WATCH_TIMEOUT_SECONDS, gt=0)
+
+
+class ProxyScoreSettings(BaseModel):
+    """``[proxy_score]`` セクション: ``qip proxy-score`` の設定。
+
+    valid 分割の日時を ``strata`` 個の連続した期間に分け、各期間から均等に抽出した
+    ``sample_dates`` 日で Spearman 順位相関のシャープレシオを求める。
+    ``time_budget_seconds`` を超えた時点で、それまでの日時で採点する。
+    """
+
+    sample_dates: int = Field(default=DEFAULT_PROXY_SAMPLE_DATES, ge=2)
+    strata: int = Field(default=DEFAULT_PROXY_STRATA, ge=1)
+    time_budget_seconds: float = Field(default=DEFAULT_PROXY_TIME_BUDGET_SECONDS, gt=0)
+
+
+class WalkForwardSettings(BaseModel):
+    """``[walk_forward]`` セクション: 評価期間を分けた期間別の採点の設定。
+
+    評価時に記録したシグナル（``[signal_cache]``）から、評価した日時を連続した ``windows`` 個の
+    期間に等分し、期間ごとの Spearman 順位相関のシャープレシオと期間間の安定性を
+    ``score_details`` に記録する（``generate_signal`` は追加で呼び出さない）。
+    """
+
+    enabled: bool = False
+    windows: int = Field(default=DEFAULT_WALK_FORWARD_WINDOWS, ge=2)
+    min_window_dates: int = Field(default=DEFAULT_MIN_WINDOW_DATES, ge=2)
+
+
+class RuntimeSettings(BaseModel):
+    """runtime.toml 全体の設定。"""
+
+    session_limit: SessionLimitSettings = Field(default_factory=SessionLimitSettings)
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
+    successive_halving: SuccessiveHalvingSettings = Field(default_factory=SuccessiveHalvingSettings)
+    phase_timeouts: PhaseTimeoutSettings = Field(default_factory=PhaseTimeoutSettings)
+    signal_cache: SignalCacheSettings = Field(default_factory=SignalCacheSettings)
+    diversity: DiversitySettings = Field(default_factory=DiversitySettings)
+    cpu_budget: CpuBudgetSettings = Field(default_factory=CpuBudgetSettings)
+    submission_retention: SubmissionRetentionSettings = Field(default_factory=SubmissionRetentionSettings)
+    submission_watch: SubmissionWatchSettings = Field(default_factory=SubmissionWatchSettings)
+    proxy_score: ProxyScoreSettings = Field(default_factory=ProxyScoreSettings)
+    walk_forward: WalkForwardSettings = Field(default_factory=WalkForwardSettings)
+
+
+def get_runtime_config_path(workspace: Path) -> Path:
+    """runtime.toml のパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/configs/runtime.toml`` のパス。
+    """
+    return workspace / "configs" / RUNTIME_CONFIG_FILENAME
+
+
+def load_runtime_settings(workspace: Path | None = None) -> RuntimeSettings:
+    """runtime.toml を読み込む。
+
+    Args:
+        workspace: ワークスペースのルートパス（未指定時は $MIXSEEK_WORKSPACE）。
+
+    Returns:
+        実行時設定。ワークスペース未設定またはファイル不在時はデフォルト値。
+
+    Raises:
+        tomllib.TOMLDecodeError: TOML の構文が不正な場合。
+        pydantic.ValidationError: 設定値が不正な場合。
+    """
+    if workspace is None:
+        env_value = os.environ.get(_WORKSPACE_ENV_VAR)
+        if env_value is None:
+            return RuntimeSettings()
+        workspace = Path(env_value)
+
+    config_path = get_runtime_config_path(workspace)
+    if not config_path.is_file():
+        return RuntimeSettings()
+
+    with config_path.open("rb") as f:
+        data = tomllib.load(f)
+    return RuntimeSettings.model_validate(data)
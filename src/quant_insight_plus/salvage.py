@@ -0,0 +1,89 @@
+"""失敗した Member Agent 実行の成果物回収と再実行の待機時間。
+
+``agent.run()`` が例外で終了しても、ClaudeCode セッションが既に
+``submission.py`` / ``analysis.md`` を書き込んでいる場合がある（構造化出力の
+リトライ上限到達、タイムアウト等）。実行開始後に書き込まれた成果物があれば
+部分結果として Leader Agent に返し、Leader による最初からの再委譲を避ける。
+
+成果物が無い場合は、指数バックオフ（フルジッター）で待機してから再実行する。
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError
+
+# --- 名前付き定数 ---
+RETRY_METADATA_KEY = "retry"
+# ファイルシステムのタイムスタンプ粒度（カーネルの粗いクロック）による取りこぼしを防ぐ猶予
+_MTIME_TOLERANCE_SECONDS = 1.0
+SALVAGED_NOTICE = "（部分結果）エージェント実行はエラーで終了しましたが、実行中に書き込まれた成果物を回収しました。"
+
+
+class RetrySettings(BaseModel):
+    """``[agent.metadata.retry]`` セクションの設定。"""
+
+    max_retries: int = Field(default=1, ge=0)
+    base_delay_seconds: float = Field(default=1.0, gt=0)
+    max_delay_seconds: float = Field(default=30.0, gt=0)
+
+
+def load_retry_settings(metadata: dict[str, Any]) -> RetrySettings:
+    """MemberAgentConfig.metadata から retry 設定を読み込む。
+
+    Args:
+        metadata: Member Agent TOML の ``[agent.metadata]``。
+
+    Returns:
+        retry 設定（未指定時はデフォルト値）。
+
+    Raises:
+        ValueError: 設定値が不正な場合。
+    """
+    raw = metadata.get(RETRY_METADATA_KEY, {})
+    try:
+        return RetrySettings.model_validate(raw)
+    except ValidationError as e:
+        msg = f"[agent.metadata.{RETRY_METADATA_KEY}] の設定が不正です: {e}"
+        raise ValueError(msg) from e
+
+
+def backoff_delay(attempt: int, settings: RetrySettings, rng: random.Random | None = None) -> float:
+    """再実行前の待機秒数を返す（指数バックオフ + フルジッター）。
+
+    ``uniform(0, min(max_delay, base_delay * 2**attempt))`` とし、複数チームの
+    メンバーが同時に失敗した場合でも再実行の時刻が揃わないようにする。
+
+    Args:
+        attempt: 0 始まりの再実行回数。
+        settings: retry 設定。
+        rng: 乱数生成器（テスト用。未指定時はモジュールの乱数）。
+
+    Returns:
+        待機秒数。
+    """
+    cap = min(settings.max_delay_seconds, settings.base_delay_seconds * 2**attempt)
+    return (rng or random).uniform(0, cap)
+
+
+def find_fresh_artifact(round_dir: Path, filename: str, since: float) -> Path | None:
+    """``since`` 以降に書き込まれた空でない成果物ファイルを返す。
+
+    Args:
+        round_dir: ラウンドディレクトリのパス。
+        filename: 成果物のファイル名。
+        since: 実行開始時刻（``time.time()``）。
+
+    Returns:
+        成果物のパス（該当しない場合は None）。
+    """
+    path = round_dir / filename
+    if not path.is_file():
+        return None
+    stat = path.stat()
+    if stat.st_mtime < since - _MTIME_TOLERANCE_SECONDS or stat.st_size == 0 or not path.read_text().strip():
+        return None
+    return path
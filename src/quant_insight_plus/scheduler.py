@@ -0,0 +1,423 @@
+"""複数チーム実行のスケジューラ（容量プール）。
+
+``qip exec`` は全チームのラウンドを同時に開始するため、チーム数が多いと
+ClaudeCode セッションと polars のバックテストが同時に走りすぎる。
+ラウンド内の処理を 2 つの容量プールで制御する:
+
+- ``llm``: Leader Agent の実行（Member Agent への委譲を含む）
+- ``cpu``: Evaluator による評価（バックテスト）
+
+Leader 実行を終えたチームは ``llm`` スロットを解放してから ``cpu`` スロットを
+待つため、あるチームの評価中に別チームの LLM フェーズが進む。
+
+ラウンドディレクトリ（``submissions/round_{N}``）はチーム間で共有されるため、同じラウンド番号を
+同時に実行するチームは 1 つに限る（``round_dir`` プール。ラウンド番号ごとの容量 1 のプール）。
+チームはラウンドディレクトリを順に使い、あるチームがラウンド N を終えると次のチームがラウンド N に進む。
+
+空きを待つチームは「優先度の高い順 → これまでのスロット獲得回数の少ない順 →
+到着順」でスロットを獲得する（優先度付きフェアシェア）。各獲得の待ち時間は
+``QueueWaitMetric`` として記録する。
+
+``run_with_team_clock()`` はチームごとの ``TeamClock`` にスロット待ちの時間を積算し、
+持ち時間（``team_timeout_seconds``）をスロット待ちの分だけ延ばした期限でラウンドを実行する
+（期限を過ぎた時点で ``TimeoutError`` を送出する）。Orchestrator の ``timeout_per_team_seconds`` は
+壁時計の上限としてそのまま適用され、そのキャンセルは保留しない。
+
+容量プールは単一のイベントループ（Orchestrator が全チームを実行するループ）内での
+使用を前提とする。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.runtime_config import SchedulerSettings, load_runtime_settings
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+POOL_LLM = "llm"
+POOL_CPU = "cpu"
+POOL_ROUND_DIR = "round_dir"
+_WORKSPACE_ENV_VAR = "MIXSEEK_WORKSPACE"
+
+
+class QueueWaitMetric(BaseModel):
+    """1 回のスロット獲得の待ち時間・保持時間。"""
+
+    pool: str
+    team_id: str
+    round_number: int
+    priority: int
+    wait_seconds: float
+    hold_seconds: float
+    recorded_at: str
+
+
+class _Waiter:
+    """スロット待ちのエントリ。"""
+
+    def __init__(self, team_id: str, priority: int, seq: int) -> None:
+        self.team_id = team_id
+        self.priority = priority
+        self.seq = seq
+        self.future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+
+class CapacityPool:
+    """優先度付きフェアシェアの容量プール。"""
+
+    def __init__(self, name: str, capacity: int) -> None:
+        """容量プールを初期化する。
+
+        Args:
+            name: プール名（``llm`` / ``cpu``）。
+            capacity: 同時に保持できるスロット数。
+        """
+        self.name = name
+        self.capacity = capacity
+        self._in_use = 0
+        self._waiters: list[_Waiter] = []
+        self._granted: dict[str, int] = defaultdict(int)
+        self._seq = itertools.count()
+
+    @property
+    def in_use(self) -> int:
+        """使用中のスロット数。"""
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """スロット待ちの件数。"""
+        return len(self._waiters)
+
+    def _grant(self, team_id: str) -> None:
+        self._in_use += 1
+        self._granted[team_id] += 1
+
+    def _wake(self) -> None:
+        """空きスロットを待機中のエントリに優先順で割り当てる。"""
+        while self._waiters and self._in_use < self.capacity:
+            waiter = min(self._waiters, key=lambda w: (-w.priority, self._granted[w.team_id], w.seq))
+            self._waiters.remove(waiter)
+            self._grant(waiter.team_id)
+            waiter.future.set_result(None)
+
+    async def acquire(self, team_id: str, priority: int = 0) -> None:
+        """スロットを獲得する（空きが無い場合は待機する）。
+
+        Args:
+            team_id: 獲得するチームの ID。
+            priority: 優先度（大きいほど先に獲得する）。
+        """
+        if self._in_use < self.capacity and not self._waiters:
+            self._grant(team_id)
+            return
+        waiter = _Waiter(team_id, priority, next(self._seq))
+        self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # 割り当て直後にキャンセルされた場合はスロットを返却する
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """スロットを返却し、待機中のエントリに割り当てる。"""
+        self._in_use -= 1
+        self._wake()
+
+
+class TeamClock:
+    """チームの持ち時間からスロット待ちの時間を除く時計。
+
+    ``armed()`` の間だけ自身の ``asyncio.Timeout`` を設定し、``add_wait()`` のたびに期限を延ばす。
+    """
+
+    def __init__(self, timeout_seconds: float) -> None:
+        """最初のラウンドの開始時に時計を始める。
+
+        Args:
+            timeout_seconds: チームの持ち時間（秒）。
+        """
+        self.timeout_seconds = timeout_seconds
+        self.started_at = asyncio.get_running_loop().time()
+        self.waited_seconds = 0.0
+        self._timeouts: list[asyncio.Timeout] = []
+
+    @property
+    def deadline(self) -> float:
+        """スロット待ちの時間だけ延ばした期限（イベントループの時刻）。"""
+        return self.started_at + self.timeout_seconds + self.waited_seconds
+
+    @asynccontextmanager
+    async def armed(self) -> AsyncIterator[None]:
+        """延ばした期限を設定してブロックを実行する。
+
+        期限を過ぎると ``TimeoutError`` を送出する。外部からのキャンセル（Orchestrator の
+        チームタイムアウト・中断など）はそのまま伝播する。
+
+        Yields:
+            None。
+        """
+        async with asyncio.timeout_at(self.deadline) as timeout:
+            self._timeouts.append(timeout)
+            try:
+                yield
+            finally:
+                self._timeouts.remove(timeout)
+
+    def add_wait(self, seconds: float) -> None:
+        """スロット待ちの時間を積算し、設定中の期限を延ばす。"""
+        self.waited_seconds += seconds
+        for timeout in self._timeouts:
+            timeout.reschedule(self.deadline)
+
+
+_team_clock: ContextVar[TeamClock | None] = ContextVar("qip_team_clock", default=None)
+
+
+class Scheduler:
+    """``llm`` / ``cpu`` の容量プールとキュー待ちメトリクス。"""
+
+    def __init__(self, settings: SchedulerSettings, *, metrics_file: Path | None = None) -> None:
+        """スケジューラを初期化する。
+
+        Args:
+            settings: ``[scheduler]`` 設定。
+            metrics_file: メトリクスの JSONL 出力先（None で出力しない）。
+        """
+        self.settings = settings
+        self.metrics_file = metrics_file
+        self.pools = {
+            POOL_LLM: CapacityPool(POOL_LLM, settings.llm_slots),
+            POOL_CPU: CapacityPool(POOL_CPU, settings.cpu_slots),
+        }
+        self._metrics: list[QueueWaitMetric] = []
+        self._round_dirs: dict[int, CapacityPool] = {}
+        self._clocks: dict[tuple[str, str], TeamClock] = {}
+        self._lock = threading.Lock()
+
+    def team_clock(self, execution_id: str, team_id: str, timeout_seconds: float) -> TeamClock:
+        """チームの時計を返す（最初の呼び出しで時計を始める）。
+
+        Args:
+            execution_id: 実行 ID。
+            team_id: チーム ID。
+            timeout_seconds: ``team_timeout_seconds`` 未指定時の持ち時間（秒）。
+
+        Returns:
+            チームの時計。
+        """
+        key = (execution_id, team_id)
+        if key not in self._clocks:
+            self._clocks[key] = TeamClock(self.settings.team_timeout_seconds or timeout_seconds)
+        return self._clocks[key]
+
+    def _round_dir_pool(self, round_number: int) -> CapacityPool:
+        """ラウンド番号ごとの容量 1 のプール（ラウンドディレクトリを使うチームは 1 つ）。"""
+        if round_number not in self._round_dirs:
+            self._round_dirs[round_number] = CapacityPool(POOL_ROUND_DIR, 1)
+        return self._round_dirs[round_number]
+
+    @asynccontextmanager
+    async def slot(self, pool: str, team_id: str, round_number: int = 0) -> AsyncIterator[None]:
+        """指定プールのスロットを保持するコンテキストマネージャ。
+
+        Args:
+            pool: プール名（``llm`` / ``cpu`` / ``round_dir``）。
+            team_id: チーム ID（``team_priorities`` の参照とフェアシェアに使用）。
+            round_number: ラウンド番号（メトリクス用。``round_dir`` ではラウンドディレクトリの選択にも使用）。
+
+        Yields:
+            None。
+        """
+        capacity = self._round_dir_pool(round_number) if pool == POOL_ROUND_DIR else self.pools[pool]
+        priority = self.settings.team_priorities.get(team_id, 0)
+        queued_at = time.perf_counter()
+        await capacity.acquire(team_id, priority)
+        acquired_at = time.perf_counter()
+        clock = _team_clock.get()
+        if clock is not None:
+            clock.add_wait(acquired_at - queued_at)
+        try:
+            yield
+        finally:
+            capacity.release()
+            self.record(
+                QueueWaitMetric(
+                    pool=pool,
+                    team_id=team_id,
+                    round_number=round_number,
+                    priority=priority,
+                    wait_seconds=acquired_at - queued_at,
+                    hold_seconds=time.perf_counter() - acquired_at,
+                    recorded_at=datetime.now(UTC).isoformat(),
+                )
+            )
+
+    def record(self, metric: QueueWaitMetric) -> None:
+        """メトリクスを記録し、設定されていれば JSONL に追記する。"""
+        with self._lock:
+            self._metrics.append(metric)
+        if self.metrics_file is None:
+            return
+        try:
+            self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.metrics_file.open("a", encoding="utf-8") as f:
+                f.write(metric.model_dump_json() + "\n")
+        except OSError:
+            logger.warning("スケジューラメトリクスの書き込みに失敗しました: %s", self.metrics_file, exc_info=True)
+
+    def metrics(self) -> list[QueueWaitMetric]:
+        """記録済みメトリクスのコピーを返す。"""
+        with self._lock:
+            return list(self._metrics)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """ソート済みリストの最近傍パーセンタイル。"""
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_queue_waits(metrics: list[QueueWaitMetric]) -> dict[str, dict[str, float]]:
+    """プールごとのキュー待ち時間を集計する。
+
+    Args:
+        metrics: 集計対象のメトリクス。
+
+    Returns:
+        ``{pool: {"acquisitions", "wait_p50", "wait_p95", "wait_max", "hold_p50"}}``。
+    """
+    grouped: dict[str, list[QueueWaitMetric]] = defaultdict(list)
+    for metric in metrics:
+        grouped[metric.pool].append(metric)
+
+    result: dict[str, dict[str, float]] = {}
+    for pool, items in sorted(grouped.items()):
+        wait = sorted(m.wait_seconds for m in items)
+        result[pool] = {
+            "acquisitions": float(len(items)),
+            "wait_p50": statistics.median(wait),
+            "wait_p95": _percentile(wait, 0.95),
+            "wait_max": wait[-1],
+            "hold_p50": statistics.median(m.hold_seconds for m in items),
+        }
+    return result
+
+
+def load_queue_metrics(path: Path) -> list[QueueWaitMetric]:
+    """JSONL のキュー待ちメトリクスを読み込む（ファイル不在時は空リスト）。
+
+    Args:
+        path: メトリクスファイルのパス。
+
+    Returns:
+        読み込んだメトリクス。
+    """
+    if not path.is_file():
+        return []
+    metrics: list[QueueWaitMetric] = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                metrics.append(QueueWaitMetric.model_validate(json.loads(line)))
+    return metrics
+
+
+_scheduler: Scheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """プロセス共有の Scheduler を返す（初回呼び出し時に runtime.toml から構築）。"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            settings = load_runtime_settings().scheduler
+            metrics_file: Path | None = None
+            workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+            if settings.metrics_path is not None and workspace is not None:
+                metrics_file = Path(workspace) / settings.metrics_path
+            _scheduler = Scheduler(settings, metrics_file=metrics_file)
+        return _scheduler
+
+
+def reset_scheduler() -> None:
+    """プロセス共有の Scheduler を破棄する（テスト・設定再読み込み用）。"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
+
+
+async def run_with_team_clock[T](
+    execution_id: str,
+    team_id: str,
+    timeout_seconds: float,
+    round_coro: Coroutine[Any, Any, T],
+) -> T:
+    """チームのラウンドを、スロット待ちの時間を除いたチームの期限で実行する。
+
+    スケジューラが無効な場合はそのまま実行する。有効な場合はチームの ``TeamClock`` の期限
+    （持ち時間 + 積算したスロット待ちの時間）を設定して実行する。Orchestrator のチームタイムアウト
+    などの外部からのキャンセルは保留せずに伝播する。
+
+    Args:
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        timeout_seconds: ``team_timeout_seconds`` 未指定時のチームの持ち時間（``timeout_per_team_seconds``）。
+        round_coro: ラウンドを実行するコルーチン。
+
+    Returns:
+        ラウンドの結果。
+
+    Raises:
+        TimeoutError: 延ばした期限を過ぎた場合。
+    """
+    scheduler = get_scheduler()
+    if not scheduler.settings.enabled:
+        return await round_coro
+    clock = scheduler.team_clock(execution_id, team_id, timeout_seconds)
+    token = _team_clock.set(clock)
+    try:
+        async with clock.armed():
+            return await round_coro
+    finally:
+        _team_clock.reset(token)
+
+
+def scheduler_slot(pool: str, team_id: str, round_number: int = 0) -> AbstractAsyncContextManager[None]:
+    """スケジューラが有効な場合はスロットを、無効な場合は何もしないコンテキストを返す。
+
+    Args:
+        pool: プール名（``llm`` / ``cpu`` / ``round_dir``）。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+
+    Returns:
+        ``async with`` で使用するコンテキストマネージャ。
+    """
+    scheduler = get_scheduler()
+    if not scheduler.settings.enabled:
+        return nullcontext()
+    return scheduler.slot(pool, team_id, round_number)
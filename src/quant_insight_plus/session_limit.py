@@ -0,0 +1,265 @@
+"""Member Agent の ClaudeCode セッションの同時実行上限。
+
+Member Agent（``ClaudeCodeLocalCodeExecutorAgent``）が使用する ``claudecode:``
+モデルのリクエストを、ホスト（プロセス）あたり ``max_member_sessions`` 件までに制限し、
+リクエストごとに次のメトリクスを記録する:
+
+- 上限の空き待ち時間・所要時間
+- プロンプトキャッシュの読み書きトークン数
+
+セッションの起動（Claude Code CLI のプロセス生成）は claudecode-model の内部で
+リクエストごとに行われるため、本モジュールはセッションを事前に起動・維持しない
+（ウォームスタートは提供しない）。Member Agent の実行（``agent.run``）は非ストリーミングの
+``request`` を通り、応答全体が揃うまで最初のトークンの時刻は得られないため、TTFT も記録しない。
+
+Leader Agent のモデルは対象外。Leader の実行中に Member が呼び出されるため、
+Leader を上限に含めるとデッドロックする。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import statistics
+import threading
+import time
+import weakref
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from mixseek.core import auth
+from pydantic import BaseModel
+from pydantic_ai.models.wrapper import WrapperModel
+
+from quant_insight_plus.runtime_config import SessionLimitSettings, load_runtime_settings
+
+if TYPE_CHECKING:
+    from pydantic_ai.messages import ModelMessage, ModelResponse
+    from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+    from pydantic_ai.settings import ModelSettings
+    from pydantic_ai.usage import RequestUsage
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+CLAUDECODE_MODEL_PREFIX = "claudecode:"
+_WORKSPACE_ENV_VAR = "MIXSEEK_WORKSPACE"
+
+
+class SessionMetric(BaseModel):
+    """1 リクエスト分のセッションメトリクス。
+
+    ``cache_read_tokens`` / ``cache_write_tokens`` は ``input_tokens`` の内数。
+    """
+
+    model_id: str
+    wait_seconds: float
+    duration_seconds: float
+    streamed: bool = False
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    recorded_at: str
+
+
+class SessionLimiter:
+    """``claudecode:`` モデルのリクエストの同時実行上限とメトリクス。"""
+
+    def __init__(self, settings: SessionLimitSettings, *, metrics_file: Path | None = None) -> None:
+        """上限を初期化する。
+
+        Args:
+            settings: ``[session_limit]`` 設定。
+            metrics_file: メトリクスの JSONL 出力先（None で出力しない）。
+        """
+        self.settings = settings
+        self.metrics_file = metrics_file
+        self._lock = threading.Lock()
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._metrics: list[SessionMetric] = []
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.settings.max_member_sessions)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """上限内でリクエストを実行するコンテキストマネージャ。
+
+        Yields:
+            上限の空き待ち秒数。
+        """
+        queued_at = time.perf_counter()
+        async with self._semaphore():
+            yield time.perf_counter() - queued_at
+
+    def record(self, metric: SessionMetric) -> None:
+        """メトリクスを記録し、設定されていれば JSONL に追記する。"""
+        with self._lock:
+            self._metrics.append(metric)
+        if self.metrics_file is None:
+            return
+        try:
+            self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.metrics_file.open("a", encoding="utf-8") as f:
+                f.write(metric.model_dump_json() + "\n")
+        except OSError:
+            logger.warning("セッションメトリクスの書き込みに失敗しました: %s", self.metrics_file, exc_info=True)
+
+    def metrics(self) -> list[SessionMetric]:
+        """記録済みメトリクスのコピーを返す。"""
+        with self._lock:
+            return list(self._metrics)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """モデルごとの待ち時間・所要時間・キャッシュヒット率の集計を返す。
+
+        ``cache_hit_ratio`` は入力トークンのうちキャッシュから読まれた割合。
+
+        Returns:
+            ``{model_id: {"requests", "wait_p95", "duration_p50", "cache_hit_ratio"}}``。
+        """
+        grouped: dict[str, list[SessionMetric]] = defaultdict(list)
+        for metric in self.metrics():
+            grouped[metric.model_id].append(metric)
+
+        result: dict[str, dict[str, float]] = {}
+        for model_id, items in grouped.items():
+            wait = sorted(m.wait_seconds for m in items)
+            input_tokens = sum(m.input_tokens for m in items)
+            result[model_id] = {
+                "requests": float(len(items)),
+                "wait_p95": _percentile(wait, 0.95),
+                "duration_p50": statistics.median(m.duration_seconds for m in items),
+                "cache_hit_ratio": sum(m.cache_read_tokens for m in items) / input_tokens if input_tokens else 0.0,
+            }
+        return result
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """ソート済みリストの最近傍パーセンタイル。"""
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LimitedModel(WrapperModel):
+    """リクエストを SessionLimiter の上限内で実行し、メトリクスを記録する Model。"""
+
+    def __init__(self, limiter: SessionLimiter, model_id: str, wrapped: Model) -> None:
+        """LimitedModel を初期化する。
+
+        Args:
+            limiter: 同時実行上限。
+            model_id: ``claudecode:`` 付きのモデル ID。
+            wrapped: リクエストを実行するモデル。
+        """
+        super().__init__(wrapped)
+        self._limiter = limiter
+        self._limited_model_id = model_id
+
+    def _record(
+        self,
+        *,
+        wait: float,
+        started: float,
+        streamed: bool,
+        usage: RequestUsage,
+    ) -> None:
+        self._limiter.record(
+            SessionMetric(
+                model_id=self._limited_model_id,
+                wait_seconds=wait,
+                duration_seconds=time.perf_counter() - started,
+                streamed=streamed,
+                input_tokens=usage.input_tokens,
+                cache_read_tokens=usage.cache_read_tokens,
+                cache_write_tokens=usage.cache_write_tokens,
+                recorded_at=datetime.now(UTC).isoformat(),
+            )
+        )
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        """上限内でリクエストを実行する。"""
+        async with self._limiter.slot() as wait:
+            started = time.perf_counter()
+            response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+            self._record(wait=wait, started=started, streamed=False, usage=response.usage)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: Any = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        """上限内でストリーミングリクエストを実行する。"""
+        async with self._limiter.slot() as wait:
+            started = time.perf_counter()
+            async with self.wrapped.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as response_stream:
+                yield response_stream
+            self._record(wait=wait, started=started, streamed=True, usage=response_stream.get().usage)
+
+
+_limiter: SessionLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_session_limiter() -> SessionLimiter:
+    """プロセス共有の SessionLimiter を返す（初回呼び出し時に runtime.toml から構築）。"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            settings = load_runtime_settings().session_limit
+            metrics_file: Path | None = None
+            workspace = os.environ.get(_WORKSPACE_ENV_VAR)
+            if settings.metrics_path is not None and workspace is not None:
+                metrics_file = Path(workspace) / settings.metrics_path
+            _limiter = SessionLimiter(settings, metrics_file=metrics_file)
+        return _limiter
+
+
+def reset_session_limiter() -> None:
+    """プロセス共有の SessionLimiter を破棄する（設定の再読み込み用）。"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
+
+
+def resolve_member_model(model_id: str) -> Model:
+    """Member Agent 用のモデルを解決する。
+
+    ``[session_limit]`` が有効かつ ``claudecode:`` モデルの場合は LimitedModel を、
+    それ以外は ``auth.create_authenticated_model`` の結果をそのまま返す。
+
+    Args:
+        model_id: TOML の ``model`` 値。
+
+    Returns:
+        pydantic-ai Model。
+    """
+    model = auth.create_authenticated_model(model_id)
+    limiter = get_session_limiter()
+    if not limiter.settings.enabled or not model_id.startswith(CLAUDECODE_MODEL_PREFIX):
+        return model
+    return LimitedModel(limiter, model_id, model)
@@ -0,0 +1,464 @@
+"""評価時のシグナルのキャッシュ。
+
+Evaluator のバックテストは日時ごとに ``generate_signal`` を呼び出してシグナルを計算するが、
+スコア算出後にシグナルは破棄される。提出間の相関や回転率の分析のたびに
+``generate_signal`` を再実行しないよう、評価時のシグナルを parquet に保存する。
+
+``patch_submission_relay()`` の置換メソッドが、Evaluator に渡す提出内容の末尾に
+``generate_signal`` をラップするシムを付加する（leader_board には元の提出内容を保存する）。
+シムは各日時のシグナルのうち当該日時の行をメモリに記録し（バックテストのループ内では
+ファイルを書き出さない）、評価後に 1 ファイルに統合する:
+
+    submissions/signal_cache/{code_hash}-{data_fingerprint}.parquet  # datetime, symbol, signal
+    submissions/signal_cache/{code_hash}-{data_fingerprint}.json     # SignalCacheEntry
+
+キーは submission.py の SHA-256 と評価データ（``data/inputs/*/test.parquet``）の
+フィンガープリント。parquet はコンパクト dtype（``symbol`` → Categorical、
+``signal`` → Float32、``datetime`` → us）で保存する。
+runtime.toml の ``[signal_cache]`` の件数・容量の上限を超えた場合は、
+最後に使用された時刻が古い順に削除する。
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.submission_relay import SUBMISSIONS_DIR_NAME
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from quant_insight_plus.runtime_config import SignalCacheSettings
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+SIGNAL_CACHE_DIR_NAME = "signal_cache"
+EVALUATION_SPLIT = "test"
+SIGNAL_COLUMNS = ("datetime", "symbol", "signal")
+_HASH_LENGTH = 16
+_CAPTURE_DIR_PREFIX = ".capture-"
+_DATA_INPUTS_DIR = Path("data") / "inputs"
+_BYTES_PER_MEGABYTE = 1024 * 1024
+_CODE_BLOCK_END = "```"
+
+# Evaluator に渡す提出内容の末尾に付加するシム
+# （quant_insight_plus をインポートできない実行環境では元の generate_signal のまま評価する）
+_CAPTURE_SHIM = """
+
+# --- quant-insight-plus: シグナルキャッシュ（評価時のみ付加） ---
+def _qip_capture_generate_signal(func):
+    import functools
+
+    from quant_insight_plus.signal_cache import capture_signal
+
+    @functools.wraps(func)
+    def generate_signal_with_capture(*args, **kwargs):
+        signal = func(*args, **kwargs)
+        capture_signal(signal, args[0] if args else kwargs.get("ohlcv"), {capture_dir!r})
+        return signal
+
+    return generate_signal_with_capture
+
+
+if "generate_signal" in globals():
+    try:
+        generate_signal = _qip_capture_generate_signal(generate_signal)
+    except Exception:
+        pass
+"""
+
+# 評価中に記録したシグナル（記録先ディレクトリ → 日時ごとの行）。評価後に 1 ファイルに書き出す
+_capture_buffers: dict[str, list[pl.DataFrame]] = {}
+_capture_lock = threading.Lock()
+_flush_registered = False
+
+
+class SignalCacheEntry(BaseModel):
+    """キャッシュされた 1 提出分のシグナル。"""
+
+    key: str
+    code_hash: str
+    data_fingerprint: str
+    execution_id: str
+    team_id: str
+    round_number: int
+    score: float
+    rows: int
+    dates: int
+    created_at: datetime
+
+
+def get_signal_cache_dir(workspace: Path) -> Path:
+    """シグナルキャッシュのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/submissions/signal_cache``。
+    """
+    return workspace / SUBMISSIONS_DIR_NAME / SIGNAL_CACHE_DIR_NAME
+
+
+def code_fingerprint(code: str) -> str:
+    """submission.py のコードのハッシュを返す。
+
+    Args:
+        code: submission.py の内容。
+
+    Returns:
+        SHA-256 の先頭 16 文字。
+    """
+    return hashlib.sha256(code.encode()).hexdigest()[:_HASH_LENGTH]
+
+
+def data_fingerprint(workspace: Path, split: str = EVALUATION_SPLIT) -> str:
+    """評価データのフィンガープリントを返す（ファイル名・サイズ・更新時刻から算出）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        split: 評価に使用する分割。
+
+    Returns:
+        SHA-256 の先頭 16 文字。
+    """
+    digest = hashlib.sha256()
+    for path in sorted((workspace / _DATA_INPUTS_DIR).glob(f"*/{split}.parquet")):
+        stat = path.stat()
+        digest.update(f"{path.parent.name}/{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:_HASH_LENGTH]
+
+
+def cache_key(code_hash: str, data_hash: str) -> str:
+    """キャッシュのキー（ファイル名の語幹）を返す。"""
+    return f"{code_hash}-{data_hash}"
+
+
+def capture_signal(signal: Any, ohlcv: Any, capture_dir: str) -> None:
+    """シムから呼び出され、当該日時のシグナルをメモリに記録する。
+
+    バックテストの日時ごとにファイルを書き出さないよう、``flush_capture()``
+    （別プロセスで評価する場合はプロセス終了時）にまとめて書き出す。
+    評価を妨げないよう、例外は送出しない。
+
+    Args:
+        signal: ``generate_signal`` の戻り値（polars / pandas の DataFrame）。
+        ohlcv: ``generate_signal`` に渡された OHLCV（当該日時までのデータ）。
+        capture_dir: 書き出し先のディレクトリ。
+    """
+    global _flush_registered  # noqa: PLW0603
+    try:
+        import polars as pl
+
+        frame = signal if isinstance(signal, pl.DataFrame) else pl.from_pandas(signal)
+        prices = ohlcv if isinstance(ohlcv, pl.DataFrame) else pl.from_pandas(ohlcv)
+        current = prices.get_column("datetime").cast(pl.Datetime("us")).max()
+        frame = frame.select(
+            pl.col("datetime").cast(pl.Datetime("us")),
+            pl.col("symbol").cast(pl.String),
+            pl.col("signal").cast(pl.Float64),
+        ).filter(pl.col("datetime") == current)
+        if frame.is_empty():
+            return
+        with _capture_lock:
+            _capture_buffers.setdefault(capture_dir, []).append(frame)
+            if not _flush_registered:
+                atexit.register(_flush_all_captures)
+                _flush_registered = True
+    except Exception:
+        logger.debug("シグナルの記録に失敗しました", exc_info=True)
+
+
+def flush_capture(capture_dir: str) -> None:
+    """メモリに記録したシグナルを記録先ディレクトリに 1 ファイルで書き出す。
+
+    Args:
+        capture_dir: 記録先のディレクトリ。
+    """
+    import polars as pl
+
+    with _capture_lock:
+        frames = _capture_buffers.pop(capture_dir, None)
+    if not frames or not Path(capture_dir).is_dir():
+        return
+    pl.concat(frames).write_parquet(Path(capture_dir) / f"{uuid.uuid4().hex}.parquet")
+
+
+def _flush_all_captures() -> None:
+    for capture_dir in list(_capture_buffers):
+        try:
+            flush_capture(capture_dir)
+        except Exception:
+            logger.debug("シグナルの書き出しに失敗しました", exc_info=True)
+
+
+class SignalCapture:
+    """1 回の評価のシグナル記録。"""
+
+    def __init__(self, workspace: Path, code: str, settings: SignalCacheSettings) -> None:
+        """記録を初期化し、一時ディレクトリを作成する。
+
+        Args:
+            workspace: ワークスペースのルートパス。
+            code: submission.py の内容。
+            settings: ``[signal_cache]`` の設定。
+        """
+        self.workspace = workspace
+        self.settings = settings
+        self.code_hash = code_fingerprint(code)
+        self.data_hash = data_fingerprint(workspace)
+        self.cache_dir = get_signal_cache_dir(workspace)
+        self.capture_dir = self.cache_dir / f"{_CAPTURE_DIR_PREFIX}{uuid.uuid4().hex}"
+        self.capture_dir.mkdir(parents=True)
+
+    @property
+    def key(self) -> str:
+        """キャッシュのキー。"""
+        return cache_key(self.code_hash, self.data_hash)
+
+    def instrument(self, submission_content: str) -> str:
+        """提出内容（Python コードブロック）の末尾にシムを付加する。
+
+        Args:
+            submission_content: ``get_submission_content()`` の戻り値。
+
+        Returns:
+            シムを付加した提出内容。
+        """
+        shim = _CAPTURE_SHIM.format(capture_dir=str(self.capture_dir))
+        body = submission_content.rstrip()
+        if body.endswith(_CODE_BLOCK_END):
+            return f"{body.removesuffix(_CODE_BLOCK_END).rstrip()}\n{shim}\n{_CODE_BLOCK_END}"
+        return f"{body}\n{shim}"
+
+    def finalize(self, *, execution_id: str, team_id: str, round_number: int, score: float) -> SignalCacheEntry | None:
+        """記録したシグナルを 1 ファイルに統合してキャッシュに保存する。
+
+        Args:
+            execution_id: 実行 ID。
+            team_id: チーム ID。
+            round_number: ラウンド番号。
+            score: 評価スコア。
+
+        Returns:
+            保存したエントリ（記録が無い場合は None）。
+        """
+        try:
+            signals = self.collect()
+            if signals is None:
+                logger.info("評価時のシグナルが記録されませんでした (round=%d)", round_number)
+                return None
+            entry = _write_entry(
+                self.cache_dir,
+                signals,
+                code_hash=self.code_hash,
+                data_hash=self.data_hash,
+                execution_id=execution_id,
+                team_id=team_id,
+                round_number=round_number,
+                score=score,
+            )
+        finally:
+            self.discard()
+        enforce_retention(self.cache_dir, self.settings, keep={self.key})
+        return entry
+
+    def collect(self) -> pl.DataFrame | None:
+        """記録したシグナルを結合して返す（一時ディレクトリは残す）。
+
+        Returns:
+            シグナル（datetime, symbol, signal）。記録が無い場合は None。
+        """
+        import polars as pl
+
+        flush_capture(str(self.capture_dir))
+        parts = sorted(self.capture_dir.glob("*.parquet"))
+        if not parts:
+            return None
+        return pl.concat([pl.read_parquet(p) for p in parts])
+
+    def discard(self) -> None:
+        """メモリの記録と一時ディレクトリを削除する。"""
+        with _capture_lock:
+            _capture_buffers.pop(str(self.capture_dir), None)
+        shutil.rmtree(self.capture_dir, ignore_errors=True)
+
+
+def _write_entry(
+    cache_dir: Path,
+    signals: pl.DataFrame,
+    *,
+    code_hash: str,
+    data_hash: str,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    score: float,
+) -> SignalCacheEntry:
+    """シグナルをコンパクト dtype の parquet とメタデータ JSON に書き出す。"""
+    import polars as pl
+
+    key = cache_key(code_hash, data_hash)
+    frame = (
+        signals.select(SIGNAL_COLUMNS)
+        .unique(subset=["datetime", "symbol"], keep="last")
+        .sort("datetime", "symbol")
+        .with_columns(pl.col("symbol").cast(pl.Categorical), pl.col("signal").cast(pl.Float32))
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{key}.parquet"
+    tmp = cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+    frame.write_parquet(tmp, compression="zstd")
+    os.replace(tmp, path)
+    entry = SignalCacheEntry(
+        key=key,
+        code_hash=code_hash,
+        data_fingerprint=data_hash,
+        execution_id=execution_id,
+        team_id=team_id,
+        round_number=round_number,
+        score=score,
+        rows=frame.height,
+        dates=frame.get_column("datetime").n_unique(),
+        created_at=datetime.now(UTC),
+    )
+    path.with_suffix(".json").write_text(entry.model_dump_json(indent=2) + "\n")
+    return entry
+
+
+def store_signals(
+    workspace: Path,
+    code: str,
+    signals: pl.DataFrame,
+    *,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    score: float,
+    settings: SignalCacheSettings,
+) -> SignalCacheEntry:
+    """評価外で計算したシグナル（``qip ensemble`` 等）をキャッシュに保存する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+        signals: シグナル（datetime, symbol, signal）。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+        score: 評価スコア。
+        settings: ``[signal_cache]`` の設定。
+
+    Returns:
+        保存したエントリ。
+    """
+    cache_dir = get_signal_cache_dir(workspace)
+    entry = _write_entry(
+        cache_dir,
+        signals,
+        code_hash=code_fingerprint(code),
+        data_hash=data_fingerprint(workspace),
+        execution_id=execution_id,
+        team_id=team_id,
+        round_number=round_number,
+        score=score,
+    )
+    enforce_retention(cache_dir, settings, keep={entry.key})
+    return entry
+
+
+def enforce_retention(cache_dir: Path, settings: SignalCacheSettings, keep: set[str] | None = None) -> list[str]:
+    """件数・容量の上限を超えたエントリを、最後に使用された時刻が古い順に削除する。
+
+    Args:
+        cache_dir: シグナルキャッシュのディレクトリ。
+        settings: ``[signal_cache]`` の設定。
+        keep: 削除しないキー。
+
+    Returns:
+        削除したキー。
+    """
+    entries = sorted(cache_dir.glob("*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
+    max_bytes = settings.max_megabytes * _BYTES_PER_MEGABYTE
+    removed: list[str] = []
+    total_bytes = 0
+    for index, path in enumerate(entries):
+        total_bytes += path.stat().st_size
+        if path.stem in (keep or set()) or (index < settings.max_entries and total_bytes <= max_bytes):
+            continue
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+        removed.append(path.stem)
+    return removed
+
+
+def list_cached_signals(workspace: Path) -> list[SignalCacheEntry]:
+    """キャッシュされたシグナルの一覧を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        エントリ（execution_id, team_id, round_number 順）。
+    """
+    entries: list[SignalCacheEntry] = []
+    for meta in get_signal_cache_dir(workspace).glob("*.json"):
+        if meta.with_suffix(".parquet").is_file():
+            entries.append(SignalCacheEntry.model_validate_json(meta.read_text()))
+    return sorted(entries, key=lambda e: (e.execution_id, e.team_id, e.round_number))
+
+
+def find_cached_signals(workspace: Path, code: str, data_hash: str | None = None) -> SignalCacheEntry | None:
+    """submission.py のコードに対応するキャッシュを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+        data_hash: 評価データのフィンガープリント（未指定時は現在の評価データ）。
+
+    Returns:
+        エントリ（キャッシュが無い場合は None）。
+    """
+    key = cache_key(code_fingerprint(code), data_hash or data_fingerprint(workspace))
+    meta = get_signal_cache_dir(workspace) / f"{key}.json"
+    if not (meta.is_file() and meta.with_suffix(".parquet").is_file()):
+        return None
+    return SignalCacheEntry.model_validate_json(meta.read_text())
+
+
+def load_signals(workspace: Path, key: str) -> pl.DataFrame:
+    """キャッシュされたシグナル（datetime, symbol, signal）を読み込む。
+
+    読み込んだエントリは最後に使用された時刻を更新する（保持期間の判定に使用）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        key: キャッシュのキー（``SignalCacheEntry.key``）。
+
+    Returns:
+        シグナルの DataFrame。
+
+    Raises:
+        FileNotFoundError: キャッシュが存在しない場合。
+    """
+    import polars as pl
+
+    path = get_signal_cache_dir(workspace) / f"{key}.parquet"
+    if not path.is_file():
+        msg = f"シグナルキャッシュが見つかりません: {path}"
+        raise FileNotFoundError(msg)
+    frame = pl.read_parquet(path)
+    os.utime(path)
+    return frame
@@ -5,9 +5,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import inspect
+import json
 import logging
+import os
+import time
+import uuid
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -18,12 +23,18 @@ if TYPE_CHECKING:
     from mixseek.round_controller.controller import RoundController
     from mixseek.round_controller.models import RoundState
 
+    from quant_insight_plus.runtime_config import DiversitySettings, SignalCacheSettings, WalkForwardSettings
+    from quant_insight_plus.signal_cache import SignalCapture
+
 logger = logging.getLogger(__name__)
 
 # --- 名前付き定数 ---
 SUBMISSION_FILENAME = "submission.py"
+SUBMISSION_STAMP_FILENAME = "submission_stamp.json"
 ANALYSIS_FILENAME = "analysis.md"
 SUBMISSIONS_DIR_NAME = "submissions"
+SUBMISSION_ERROR_SCORE = -100.0
+LEADER_AGENT_NAME = "leader"
 EXPECTED_UPSTREAM_METHOD_HASH = "2a4f43ae89b3de20258933001ce370c249d8c48fa9a07d2840cf1c8422266bd7"
 
 
@@ -87,6 +98,236 @@ def get_submission_content(round_dir: Path) -> str:
     return f"```python\n{code}\n```"
 
 
+def _submission_sha256(round_dir: Path) -> str:
+    return hashlib.sha256((round_dir / SUBMISSION_FILENAME).read_bytes()).hexdigest()
+
+
+def write_submission_stamp(round_dir: Path, *, execution_id: str, team_id: str, round_number: int) -> None:
+    """submission.py がどの実行・チーム・ラウンドの提出かを記録する。
+
+    ``submissions/round_{N}/`` は実行・チームをまたいで再利用されるため、
+    ``read_stamped_submission()`` は記録と内容が一致する場合のみ submission.py を返す。
+
+    Args:
+        round_dir: ラウンドディレクトリのパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+    """
+    stamp = {
+        "execution_id": execution_id,
+        "team_id": team_id,
+        "round_number": round_number,
+        "sha256": _submission_sha256(round_dir),
+    }
+    path = round_dir / SUBMISSION_STAMP_FILENAME
+    tmp = round_dir / f".{SUBMISSION_STAMP_FILENAME}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(json.dumps(stamp), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_stamped_submission(round_dir: Path, *, execution_id: str, team_id: str, round_number: int) -> str | None:
+    """``write_submission_stamp()`` の記録と一致する場合のみ submission.py の内容を返す。
+
+    Args:
+        round_dir: ラウンドディレクトリのパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+
+    Returns:
+        ``get_submission_content()`` 形式の内容（記録が無い・実行/チーム/ラウンドが異なる・
+        記録後に submission.py が書き換えられた場合は None）。
+    """
+    expected = {"execution_id": execution_id, "team_id": team_id, "round_number": round_number}
+    try:
+        stamp = json.loads((round_dir / SUBMISSION_STAMP_FILENAME).read_text(encoding="utf-8"))
+        if stamp != {**expected, "sha256": _submission_sha256(round_dir)}:
+            return None
+        return get_submission_content(round_dir)
+    except (OSError, ValueError):
+        return None
+
+
+async def flush_round_usage(
+    workspace: Path,
+    *,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    leader_messages: list[Any],
+    leader_wall_seconds: float,
+) -> int:
+    """ラウンド分の使用量（Leader + 蓄積済み Member）を DuckDB に一括書き込みする。
+
+    使用量の記録失敗でラウンド結果を失わないよう、例外は警告ログに留める。
+    書き込めなかったレコードは ``UsageWriter`` が保持し、次のラウンドの書き込みで再試行する。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+        leader_messages: Leader の ``result.all_messages()``。
+        leader_wall_seconds: Leader 実行の所要時間（秒）。
+
+    Returns:
+        書き込んだ件数（失敗時は 0）。
+    """
+    from quant_insight_plus.db import get_db_path
+    from quant_insight_plus.usage import ROLE_LEADER, build_usage_record, get_usage_recorder, save_usage_records
+
+    records = get_usage_recorder().drain(execution_id, team_id, round_number)
+    records.append(
+        build_usage_record(
+            leader_messages,
+            execution_id=execution_id,
+            team_id=team_id,
+            round_number=round_number,
+            agent_name=LEADER_AGENT_NAME,
+            agent_role=ROLE_LEADER,
+            model="",
+            wall_seconds=leader_wall_seconds,
+        )
+    )
+    try:
+        return await asyncio.to_thread(save_usage_records, get_db_path(workspace), records)
+    except Exception:
+        logger.warning(
+            "使用量の書き込みに失敗しました。次回の書き込みで再試行します (round=%d)", round_number, exc_info=True
+        )
+        return 0
+
+
+def start_signal_capture(workspace: Path, round_dir: Path, settings: SignalCacheSettings) -> SignalCapture | None:
+    """評価時のシグナルの記録を開始する（``[signal_cache]`` 無効時は None）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_dir: ラウンドディレクトリのパス。
+        settings: ``[signal_cache]`` の設定。
+
+    Returns:
+        シグナルの記録（無効時・開始に失敗した場合は None）。
+    """
+    if not settings.enabled:
+        return None
+    from quant_insight_plus.signal_cache import SignalCapture
+
+    try:
+        return SignalCapture(workspace, (round_dir / SUBMISSION_FILENAME).read_text(), settings)
+    except OSError:
+        logger.warning("シグナルの記録を開始できません: %s", round_dir, exc_info=True)
+        return None
+
+
+async def finalize_signal_capture(
+    capture: SignalCapture,
+    *,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    score: float,
+) -> None:
+    """評価時のシグナルをキャッシュに保存する（提出エラー時は破棄する）。
+
+    キャッシュの保存失敗でラウンド結果を失わないよう、例外は警告ログに留める。
+
+    Args:
+        capture: シグナルの記録。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+        score: 評価スコア。
+    """
+    if score == SUBMISSION_ERROR_SCORE:
+        capture.discard()
+        return
+    try:
+        await asyncio.to_thread(
+            capture.finalize, execution_id=execution_id, team_id=team_id, round_number=round_number, score=score
+        )
+    except Exception:
+        logger.warning("シグナルキャッシュの保存に失敗しました (round=%d)", round_number, exc_info=True)
+
+
+async def score_walk_forward(
+    capture: SignalCapture,
+    settings: WalkForwardSettings,
+    round_number: int,
+) -> dict[str, Any] | None:
+    """評価時に記録したシグナルを期間ごとに採点する（``score_details["walk_forward"]`` 用）。
+
+    ``[walk_forward]`` 無効時は何もしない。採点の失敗でラウンド結果を失わないよう、例外は警告ログに留める。
+
+    Args:
+        capture: シグナルの記録（``finalize_signal_capture()`` の前に呼び出すこと）。
+        settings: ``[walk_forward]`` の設定。
+        round_number: ラウンド番号（ログ用）。
+
+    Returns:
+        期間別の採点結果（無効時・失敗時・シグナルが記録されなかった場合は None）。
+    """
+    if not settings.enabled:
+        return None
+    from quant_insight_plus.walk_forward import score_capture
+
+    try:
+        result = await asyncio.to_thread(score_capture, capture, settings)
+    except Exception:
+        logger.warning("期間別の採点に失敗しました (round=%d)", round_number, exc_info=True)
+        return None
+    return result.model_dump(mode="json") if result is not None else None
+
+
+async def refresh_round_leaderboard(workspace: Path, *, execution_id: str, team_id: str, round_number: int) -> None:
+    """チームの最高スコア（``team_best_scores``）とリーダーボードのスナップショットを更新する。
+
+    集計の失敗でラウンド結果を失わないよう、例外は警告ログに留める。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号（ログ用）。
+    """
+    from quant_insight_plus.leaderboard import refresh_leaderboard
+
+    try:
+        await asyncio.to_thread(refresh_leaderboard, workspace, execution_id, team_id)
+    except Exception:
+        logger.warning("リーダーボードの更新に失敗しました (round=%d)", round_number, exc_info=True)
+
+
+async def write_round_diversity(
+    workspace: Path,
+    round_number: int,
+    *,
+    execution_id: str,
+    settings: DiversitySettings,
+) -> None:
+    """ラウンドディレクトリに提出間のシグナル相関の要約（``diversity.md``）を書き出す。
+
+    ``[diversity]`` 無効時は何もしない。要約の失敗でラウンドを止めないよう、例外は警告ログに留める。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_number: 開始するラウンド番号。
+        execution_id: 実行 ID。
+        settings: ``[diversity]`` の設定。
+    """
+    if not settings.enabled:
+        return
+    from quant_insight_plus.diversity import write_diversity_summary
+
+    try:
+        await asyncio.to_thread(
+            write_diversity_summary, workspace, get_round_dir(workspace, round_number), execution_id, settings
+        )
+    except Exception:
+        logger.warning("提出の多様性の要約に失敗しました (round=%d)", round_number, exc_info=True)
+
+
 # --- Monkey-Patch ---
 
 _original_execute_single_round: Callable[..., Coroutine[Any, Any, RoundState]] | None = None
@@ -118,6 +359,18 @@ def patch_submission_relay() -> None:
 
         Leader 実行後、submission_content をファイルから直接読み取り、
         Leader の出力テキストではなく原本コードを Evaluator に渡す。
+        runtime.toml の ``[scheduler]`` 有効時は、Leader 実行を ``llm``、
+        評価を ``cpu`` の容量プール内で実行する。
+        ``[successive_halving]`` 有効時は、チェックポイントで下位と判定したチームの
+        以降のラウンドを Leader / Evaluator を実行せずに終える。
+        ``[phase_timeouts]`` 設定時は、Leader 実行・評価・保存をフェーズごとの期限で
+        打ち切り、書き込み済みの成果物でラウンドを続行する。
+        ``[diversity]`` 有効時は、ラウンド開始時に提出間のシグナル相関の要約を
+        ラウンドディレクトリに書き出す。
+        ``[submission_watch]`` 有効時は、Leader 実行中に submission.py を早期検証し、
+        コンパイル・シグネチャの検証に失敗した提出は評価せずに提出エラーとする。
+        ``qip exec --resume`` による再開時は、再開元の実行で完了済みのラウンドを
+        復元して返す（Leader / Evaluator を実行しない）。
         """
         from mixseek.agents.leader.agent import create_leader_agent
         from mixseek.agents.leader.dependencies import TeamDependencies
@@ -128,8 +381,40 @@ def patch_submission_relay() -> None:
         from mixseek.models.evaluation_request import EvaluationRequest
         from mixseek.round_controller.models import RoundState
 
+        from quant_insight_plus.early_stopping import check_successive_halving, end_eliminated_round
+        from quant_insight_plus.phase_timeouts import (
+            PHASE_EVALUATION,
+            PHASE_LEADER,
+            PhaseTimeoutError,
+            persist_with_deadline,
+            phase_deadline,
+        )
+        from quant_insight_plus.resume import restore_completed_round
+        from quant_insight_plus.runtime_config import load_runtime_settings
+        from quant_insight_plus.scheduler import POOL_CPU, POOL_LLM, scheduler_slot
+        from quant_insight_plus.submission_watch import find_static_failure, watch_submission
+
+        # 再開時: 完了済みのラウンドは復元して返す
+        restored = await restore_completed_round(self, round_number)
+        if restored is not None:
+            return restored
+
+        # 0. successive halving: チェックポイントで下位のチームは以降のラウンドを実行しない
+        elimination = await check_successive_halving(
+            self.workspace, self.task.execution_id, self.team_config.team_id, round_number
+        )
+        if elimination is not None:
+            return await end_eliminated_round(self, round_number, elimination, SUBMISSION_ERROR_SCORE)
+
+        runtime_settings = load_runtime_settings(self.workspace)
+        timeouts = runtime_settings.phase_timeouts
         round_started_at = datetime.now(UTC)
 
+        # 評価済みの提出のシグナル相関をラウンドディレクトリに書き出す（Member のタスクに埋め込まれる）
+        await write_round_diversity(
+            self.workspace, round_number, execution_id=self.task.execution_id, settings=runtime_settings.diversity
+        )
+
         # 1. Create Member Agents
         member_agents: dict[str, object] = {}
         for member_settings in self.team_settings.members:
@@ -148,15 +433,37 @@ def patch_submission_relay() -> None:
             round_number=round_number,
         )
 
-        result = await leader_agent.run(user_prompt, deps=deps)
+        # LLM フェーズ（Leader + Member 委譲）は scheduler の llm スロット内で実行
+        # （実行中に書き込まれた submission.py は早期検証する）
+        async with (
+            scheduler_slot(POOL_LLM, self.team_config.team_id, round_number),
+            watch_submission(self.workspace, round_number, runtime_settings.submission_watch),
+        ):
+            leader_started = time.perf_counter()
+            try:
+                async with phase_deadline(PHASE_LEADER, timeouts.leader_seconds):
+                    result = await leader_agent.run(user_prompt, deps=deps)
+                message_history = result.all_messages()
+            except PhaseTimeoutError as e:
+                # 期限切れでも、それまでに書き込まれた submission.py で評価を続行する
+                logger.warning("%s (round=%d)", e, round_number)
+                message_history = []
+            leader_wall_seconds = time.perf_counter() - leader_started
 
         # --- FS RELAY: ファイルから直接読み取り ---
         workspace = self.workspace
         round_dir = get_round_dir(workspace, round_number)
         submission_content = get_submission_content(round_dir)
         logger.info("FS Relay: submission.py から直接読み取り (round=%d)", round_number)
-
-        message_history = result.all_messages()
+        try:
+            write_submission_stamp(
+                round_dir,
+                execution_id=self.task.execution_id,
+                team_id=self.team_config.team_id,
+                round_number=round_number,
+            )
+        except OSError:
+            logger.warning("submission.py の記録に失敗しました (round=%d)", round_number, exc_info=True)
 
         self._write_progress_file(round_number, status="running", current_agent=None)
 
@@ -170,7 +477,24 @@ def patch_submission_relay() -> None:
         )
 
         if self.store is not None:
-            await self.store.save_aggregation(self.task.execution_id, member_record, message_history)
+            await persist_with_deadline(
+                "集約結果",
+                timeouts.persistence_seconds,
+                self.store.save_aggregation(self.task.execution_id, member_record, message_history),
+            )
+        # 使用量は store に依存しない共有の書き込み口で記録する（store が無いラウンドも失わない）
+        await persist_with_deadline(
+            "使用量",
+            timeouts.persistence_seconds,
+            flush_round_usage(
+                workspace,
+                execution_id=self.task.execution_id,
+                team_id=self.team_config.team_id,
+                round_number=round_number,
+                leader_messages=message_history,
+                leader_wall_seconds=leader_wall_seconds,
+            ),
+        )
 
         # 4. Execute Evaluator
         self._write_progress_file(round_number, status="running", current_agent="evaluator")
@@ -179,58 +503,116 @@ def patch_submission_relay() -> None:
             settings=self.evaluator_settings,
             prompt_builder_settings=self.prompt_builder_settings,
         )
+        # コンパイル・シグネチャの検証に失敗した提出は Evaluator に渡さない
+        static_failure = await asyncio.to_thread(
+            find_static_failure, workspace, round_dir, runtime_settings.submission_watch
+        )
+        signal_capture = None
+        if static_failure is None:
+            signal_capture = start_signal_capture(workspace, round_dir, runtime_settings.signal_cache)
         request = EvaluationRequest(
             user_query=original_user_prompt,
-            submission=submission_content,
+            submission=signal_capture.instrument(submission_content) if signal_capture else submission_content,
             team_id=self.team_config.team_id,
         )
 
-        evaluation_result = await evaluator.evaluate(request)
-        evaluation_score = evaluation_result.overall_score
+        score_details: dict[str, Any]
+        if static_failure is not None:
+            logger.warning("submission.py の検証に失敗したため評価を省略します (round=%d)", round_number)
+            evaluation_score = SUBMISSION_ERROR_SCORE
+            score_details = {
+                "overall_score": evaluation_score,
+                "metrics": [],
+                "error": f"提出前検証（{static_failure.stage}）: {static_failure.error}",
+            }
+        else:
+            try:
+                async with scheduler_slot(POOL_CPU, self.team_config.team_id, round_number):
+                    async with phase_deadline(PHASE_EVALUATION, timeouts.evaluation_seconds):
+                        evaluation_result = await evaluator.evaluate(request)
+                evaluation_score = evaluation_result.overall_score
+                score_details = {
+                    "overall_score": evaluation_score,
+                    "metrics": [
+                        {
+                            "metric_name": metric.metric_name,
+                            "score": metric.score,
+                            "evaluator_comment": metric.evaluator_comment,
+                        }
+                        for metric in evaluation_result.metrics
+                    ],
+                }
+            except PhaseTimeoutError as e:
+                logger.warning("%s (round=%d)", e, round_number)
+                evaluation_score = SUBMISSION_ERROR_SCORE
+                score_details = {"overall_score": evaluation_score, "metrics": [], "error": str(e)}
+            except BaseException:
+                if signal_capture is not None:
+                    signal_capture.discard()
+                raise
+
+        if signal_capture is not None:
+            if evaluation_score != SUBMISSION_ERROR_SCORE:
+                walk_forward = await score_walk_forward(signal_capture, runtime_settings.walk_forward, round_number)
+                if walk_forward is not None:
+                    score_details["walk_forward"] = walk_forward
+            await finalize_signal_capture(
+                signal_capture,
+                execution_id=self.task.execution_id,
+                team_id=self.team_config.team_id,
+                round_number=round_number,
+                score=evaluation_score,
+            )
 
         self._write_progress_file(round_number, status="running", current_agent=None)
 
-        score_details: dict[str, Any] = {
-            "overall_score": evaluation_score,
-            "metrics": [
-                {
-                    "metric_name": metric.metric_name,
-                    "score": metric.score,
-                    "evaluator_comment": metric.evaluator_comment,
-                }
-                for metric in evaluation_result.metrics
-            ],
-        }
-
         round_ended_at = datetime.now(UTC)
 
         # 5. Save to leader_board
         if self.store is not None:
-            await self.store.save_to_leader_board(
-                execution_id=self.task.execution_id,
-                team_id=self.team_config.team_id,
-                team_name=self.team_config.team_name,
-                round_number=round_number,
-                submission_content=submission_content,
-                submission_format="md",
-                score=evaluation_score,
-                score_details=score_details,
-                final_submission=False,
-                exit_reason=None,
+            await persist_with_deadline(
+                "leader_board",
+                timeouts.persistence_seconds,
+                self.store.save_to_leader_board(
+                    execution_id=self.task.execution_id,
+                    team_id=self.team_config.team_id,
+                    team_name=self.team_config.team_name,
+                    round_number=round_number,
+                    submission_content=submission_content,
+                    submission_format="md",
+                    score=evaluation_score,
+                    score_details=score_details,
+                    final_submission=False,
+                    exit_reason=None,
+                ),
             )
 
         # 6. Save to round_status
         if self.store is not None:
-            await self.store.save_round_status(
-                execution_id=self.task.execution_id,
-                team_id=self.team_config.team_id,
-                team_name=self.team_config.team_name,
-                round_number=round_number,
-                should_continue=None,
-                reasoning=None,
-                confidence_score=None,
-                round_started_at=round_started_at.isoformat(),
-                round_ended_at=round_ended_at.isoformat(),
+            await persist_with_deadline(
+                "round_status",
+                timeouts.persistence_seconds,
+                self.store.save_round_status(
+                    execution_id=self.task.execution_id,
+                    team_id=self.team_config.team_id,
+                    team_name=self.team_config.team_name,
+                    round_number=round_number,
+                    should_continue=None,
+                    reasoning=None,
+                    confidence_score=None,
+                    round_started_at=round_started_at.isoformat(),
+                    round_ended_at=round_ended_at.isoformat(),
+                ),
+            )
+            await persist_with_deadline(
+                "リーダーボード",
+                timeouts.persistence_seconds,
+                refresh_round_leaderboard(
+                    workspace,
+                    execution_id=self.task.execution_id,
+                    team_id=self.team_config.team_id,
+                    round_number=round_number,
+                ),
             )
 
         # 7. Create RoundState
@@ -254,7 +636,40 @@ def patch_submission_relay() -> None:
 
         return round_state
 
-    RoundController._execute_single_round = _patched_execute_single_round  # type: ignore[method-assign]
+    async def _budgeted_execute_single_round(
+        self: RoundController,
+        round_number: int,
+        user_prompt: str,
+        original_user_prompt: str,
+        timeout_seconds: int,
+    ) -> RoundState:
+        """``[cpu_budget]`` 有効時は、ラウンドの実行中にチームを稼働チームとして登録する。
+
+        ラウンド内で作成する Member Agent の ``python_command`` に、
+        稼働チーム数から求めた ``POLARS_MAX_THREADS``（とアフィニティ）と、
+        ``qip kernel exec`` の場合はチーム・メンバーごとのセッション ID を付加する。
+        ``[scheduler]`` 有効時は、ラウンドディレクトリ（``submissions/round_{N}``）を同じラウンド番号の
+        他チームと同時に使わないよう ``round_dir`` スロットを保持して実行し、容量プールのスロット待ちの時間を
+        チームの持ち時間から除く。
+        """
+        from quant_insight_plus.cpu_budget import team_lease
+        from quant_insight_plus.kernel import team_session
+        from quant_insight_plus.runtime_config import load_runtime_settings
+        from quant_insight_plus.scheduler import POOL_ROUND_DIR, run_with_team_clock, scheduler_slot
+
+        settings = load_runtime_settings(self.workspace).cpu_budget
+        team_id = self.team_config.team_id
+
+        async def run_round() -> RoundState:
+            async with scheduler_slot(POOL_ROUND_DIR, team_id, round_number):
+                with team_lease(self.workspace, team_id, settings), team_session(team_id):
+                    return await _patched_execute_single_round(
+                        self, round_number, user_prompt, original_user_prompt, timeout_seconds
+                    )
+
+        return await run_with_team_clock(self.task.execution_id, team_id, timeout_seconds, run_round())
+
+    RoundController._execute_single_round = _budgeted_execute_single_round  # type: ignore[method-assign]
 
 
 def reset_submission_relay_patch() -> None:
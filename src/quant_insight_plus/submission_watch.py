@@ -0,0 +1,286 @@
+"""ラウンド実行中の submission.py の早期検証。
+
+Leader Agent の実行中にラウンドディレクトリの ``submission.py`` を監視し、書き込まれた時点で
+プリフライト検証（コンパイル・シグネチャ・valid 分割でのスモークテスト）を行う:
+
+- 失敗した場合は ``submissions/round_{N}/submission_check.md`` にエラーを書き出す。
+  ラウンドディレクトリのファイルは Member Agent のタスクに埋め込まれるため、
+  Leader の実行中に次の委譲で修正させられる（成功時は削除する）
+- 結果は内容のハッシュをキーに ``{workspace}/.qip/submission_checks/`` にキャッシュし、
+  Member Agent のプリフライトと Submission Relay が再利用する
+
+Submission Relay は Leader の実行後、キャッシュ（無い場合は静的検証）でコンパイル・
+シグネチャの失敗が分かった提出を Evaluator に渡さずに提出エラーとして記録する。
+
+監視は inotify 等の OS 依存の仕組みを使わず、更新時刻・サイズのポーリングで行う
+（ネットワークファイルシステム上のワークスペースでも動作する）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+from quant_insight_plus.preflight import (
+    SMOKE_SPLIT,
+    STAGE_COMPILE,
+    STAGE_EXISTS,
+    STAGE_SIGNATURE,
+    PreflightResult,
+    PreflightSettings,
+    check_static,
+    validate_submission,
+)
+from quant_insight_plus.submission_relay import SUBMISSION_FILENAME, get_round_dir
+
+if TYPE_CHECKING:
+    from quant_insight_plus.runtime_config import SubmissionWatchSettings
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+CHECKS_DIR_NAME = "submission_checks"
+FEEDBACK_FILENAME = "submission_check.md"
+STATIC_STAGES = frozenset({STAGE_EXISTS, STAGE_COMPILE, STAGE_SIGNATURE})
+_HASH_LENGTH = 16
+_DATA_INPUTS_DIR = Path("data") / "inputs"
+
+
+class SubmissionCheck(BaseModel):
+    """キャッシュした検証結果。"""
+
+    key: str
+    result: PreflightResult
+    checked_at: datetime
+    duration_seconds: float
+
+
+def get_checks_dir(workspace: Path) -> Path:
+    """検証結果のキャッシュのディレクトリを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/submission_checks``。
+    """
+    return workspace / KERNEL_DIR_NAME / CHECKS_DIR_NAME
+
+
+def check_key(workspace: Path, code: str, settings: PreflightSettings) -> str:
+    """検証結果のキーを返す（コード・valid 分割のデータ・スモークテストの設定から算出）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+        settings: プリフライトの設定。
+
+    Returns:
+        ``{コードのハッシュ}-{データ・設定のハッシュ}``。
+    """
+    from quant_insight_plus.signal_cache import code_fingerprint, data_fingerprint
+
+    context = f"{data_fingerprint(workspace, SMOKE_SPLIT)}:{settings.smoke_days}:{settings.timeout_seconds}"
+    return f"{code_fingerprint(code)}-{hashlib.sha256(context.encode()).hexdigest()[:_HASH_LENGTH]}"
+
+
+def find_submission_check(workspace: Path, code: str, settings: PreflightSettings) -> SubmissionCheck | None:
+    """キャッシュした検証結果を返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        code: submission.py の内容。
+        settings: プリフライトの設定。
+
+    Returns:
+        検証結果（未検証の場合は None）。
+    """
+    path = get_checks_dir(workspace) / f"{check_key(workspace, code, settings)}.json"
+    try:
+        return SubmissionCheck.model_validate_json(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def validate_cached(workspace: Path, submission_path: Path, settings: PreflightSettings) -> PreflightResult:
+    """キャッシュを使って submission.py を検証する（未検証の内容のみ実行する）。
+
+    検証中にファイルが書き換えられた場合と、スモークテストをスキップした場合はキャッシュしない。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        submission_path: submission.py のパス。
+        settings: プリフライトの設定。
+
+    Returns:
+        検証結果。
+    """
+    if not submission_path.is_file():
+        return validate_submission(submission_path, None, settings)
+    code = submission_path.read_text()
+    cached = find_submission_check(workspace, code, settings)
+    if cached is not None:
+        return cached.result
+
+    started = time.perf_counter()
+    result = validate_submission(submission_path, workspace / _DATA_INPUTS_DIR, settings)
+    if result.smoke_skipped or not submission_path.is_file() or submission_path.read_text() != code:
+        return result
+    check = SubmissionCheck(
+        key=check_key(workspace, code, settings),
+        result=result,
+        checked_at=datetime.now(UTC),
+        duration_seconds=time.perf_counter() - started,
+    )
+    checks_dir = get_checks_dir(workspace)
+    checks_dir.mkdir(parents=True, exist_ok=True)
+    tmp = checks_dir / f".{check.key}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(check.model_dump_json() + "\n")
+    os.replace(tmp, checks_dir / f"{check.key}.json")
+    return result
+
+
+def render_feedback(result: PreflightResult) -> str:
+    """検証失敗を Member Agent 向けの Markdown にする。"""
+    return (
+        "# submission.py の検証エラー\n\n"
+        f"ラウンド実行中の提出前検証（{result.stage}）で、現在の submission.py のエラーが検出されました。"
+        "このままでは提出エラー（スコア -100.0）になります。submission.py を修正してください。\n\n"
+        f"```\n{result.error}\n```\n"
+    )
+
+
+def write_feedback(round_dir: Path, result: PreflightResult) -> None:
+    """検証失敗時は ``submission_check.md`` を書き出し、成功時は削除する。
+
+    Args:
+        round_dir: ラウンドディレクトリのパス。
+        result: 検証結果。
+    """
+    path = round_dir / FEEDBACK_FILENAME
+    if result.ok:
+        path.unlink(missing_ok=True)
+        return
+    tmp = round_dir / f".{FEEDBACK_FILENAME}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(render_feedback(result))
+    os.replace(tmp, path)
+
+
+def preflight_settings(settings: SubmissionWatchSettings) -> PreflightSettings:
+    """``[submission_watch]`` の設定からプリフライトの設定を作成する。"""
+    return PreflightSettings(smoke_days=settings.smoke_days, timeout_seconds=settings.timeout_seconds)
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+async def _poll_submission(
+    workspace: Path,
+    round_dir: Path,
+    settings: SubmissionWatchSettings,
+    checked: tuple[int, int] | None,
+) -> None:
+    path = round_dir / SUBMISSION_FILENAME
+    preflight = preflight_settings(settings)
+    observed: tuple[int, int] | None = None
+    observed_at = 0.0
+    while True:
+        await asyncio.sleep(settings.poll_interval_seconds)
+        signature = _signature(path)
+        if signature is None or signature == checked:
+            continue
+        if signature != observed:
+            # 書き込み途中のファイルを検証しないよう、更新が止まるまで待つ
+            observed, observed_at = signature, time.monotonic()
+            continue
+        if time.monotonic() - observed_at < settings.settle_seconds:
+            continue
+        checked = signature
+        try:
+            result = await asyncio.to_thread(validate_cached, workspace, path, preflight)
+            await asyncio.to_thread(write_feedback, round_dir, result)
+        except OSError:
+            logger.warning("submission.py の早期検証に失敗しました (%s)", round_dir.name, exc_info=True)
+            continue
+        if result.ok:
+            logger.info("submission.py の早期検証に成功しました (%s)", round_dir.name)
+        else:
+            logger.warning("submission.py の早期検証に失敗しました (%s, %s)", round_dir.name, result.stage)
+
+
+@contextlib.asynccontextmanager
+async def watch_submission(
+    workspace: Path,
+    round_number: int,
+    settings: SubmissionWatchSettings,
+) -> AsyncIterator[None]:
+    """コンテキスト内でラウンドディレクトリの submission.py を監視・検証する。
+
+    ``[submission_watch]`` 無効時は何もしない。終了時に実行中の検証は待たない
+    （スモークテストのサブプロセスは ``timeout_seconds`` で終了する）。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_number: ラウンド番号。
+        settings: ``[submission_watch]`` の設定。
+    """
+    if not settings.enabled:
+        yield
+        return
+    round_dir = get_round_dir(workspace, round_number)
+    # ラウンド開始前から有る submission.py（前回の実行の残り）は検証しない
+    initial = _signature(round_dir / SUBMISSION_FILENAME)
+    task = asyncio.create_task(_poll_submission(workspace, round_dir, settings, initial))
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def find_static_failure(
+    workspace: Path,
+    round_dir: Path,
+    settings: SubmissionWatchSettings,
+) -> PreflightResult | None:
+    """Evaluator に渡さずに提出エラーとする、コンパイル・シグネチャの失敗を返す。
+
+    キャッシュに検証結果が無い場合は静的検証のみ行う。スモークテストの失敗
+    （valid 分割での実行エラー・タイムアウト）は評価データでの結果が異なりうるため対象外。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+        round_dir: ラウンドディレクトリのパス。
+        settings: ``[submission_watch]`` の設定。
+
+    Returns:
+        失敗した検証結果（無効時・失敗が無い場合は None）。
+    """
+    if not settings.enabled:
+        return None
+    path = round_dir / SUBMISSION_FILENAME
+    cached = None
+    if path.is_file():
+        cached = find_submission_check(workspace, path.read_text(), preflight_settings(settings))
+    result = cached.result if cached is not None else check_static(path)
+    if result.ok or result.stage not in STATIC_STAGES:
+        return None
+    return result
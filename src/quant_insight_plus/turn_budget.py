@@ -0,0 +1,278 @@
+"""Member Agent ごとの max_turns 設定とターン使用量テレメトリ。
+
+``cli.py`` は構造化出力セッション全体の ``DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA``
+を一律に引き上げている。本モジュールは Member Agent TOML の
+``[agent.metadata.turn_budget]`` で上書きする手段と、実際に使用したターン数の
+記録（``logs/turn_usage.jsonl``）、および過去実績からの上限算出を提供する。
+
+``max_turns`` に達して打ち切られた実行（失敗した実行を含む）は、上限値を使用ターン数とし
+``censored`` を付けて記録する。必要なターン数は上限値以上であるため、上限に達する実行が
+続くと算出する上限は ``headroom`` の分だけ上がる。
+履歴はファイルごとに読み込み済みの位置を保持し、前回以降に追記された行のみ読み込む。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError
+from pydantic_ai.messages import ModelMessage, ModelResponse
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+TURN_BUDGET_METADATA_KEY = "turn_budget"
+TURN_USAGE_LOG_PATH = "logs/turn_usage.jsonl"
+_PROVIDER_NUM_TURNS_KEY = "num_turns"
+# Claude Code の結果の subtype（max_turns 到達時）。claudecode-model の例外は subtype 属性かメッセージに含む
+_MAX_TURNS_SUBTYPE = "error_max_turns"
+
+
+class TurnBudgetSettings(BaseModel):
+    """``[agent.metadata.turn_budget]`` セクションの設定。"""
+
+    max_turns: int | None = Field(default=None, ge=1)
+    adaptive: bool = False
+    percentile: float = Field(default=0.95, gt=0.0, le=1.0)
+    headroom: float = Field(default=1.2, ge=1.0)
+    min_samples: int = Field(default=5, ge=1)
+    min_turns: int = Field(default=5, ge=1)
+    history_size: int = Field(default=50, ge=1)
+
+
+class TurnUsageRecord(BaseModel):
+    """1 回の execute() で使用したターン数の記録。
+
+    ``censored`` は ``max_turns`` に達して打ち切られた実行（必要ターン数は ``turns_used`` 以上）。
+    """
+
+    agent_name: str
+    model: str
+    execution_id: str = ""
+    team_id: str = ""
+    round_number: int = 0
+    turns_used: int
+    max_turns: int | None
+    censored: bool = False
+    recorded_at: str
+
+
+def load_turn_budget_settings(metadata: dict[str, Any]) -> TurnBudgetSettings:
+    """MemberAgentConfig.metadata から turn_budget 設定を読み込む。
+
+    Args:
+        metadata: Member Agent TOML の ``[agent.metadata]``。
+
+    Returns:
+        turn_budget 設定（未指定時はデフォルト値）。
+
+    Raises:
+        ValueError: 設定値が不正な場合。
+    """
+    raw = metadata.get(TURN_BUDGET_METADATA_KEY, {})
+    try:
+        return TurnBudgetSettings.model_validate(raw)
+    except ValidationError as e:
+        msg = f"[agent.metadata.{TURN_BUDGET_METADATA_KEY}] の設定が不正です: {e}"
+        raise ValueError(msg) from e
+
+
+def count_turns(messages: list[ModelMessage]) -> int:
+    """メッセージ履歴から使用ターン数を算出する。
+
+    ClaudeCode モデルは 1 回のリクエスト内で複数ターンを消費するため、
+    ``provider_details["num_turns"]`` があればそれを合算し、
+    無ければ ModelResponse 1 件を 1 ターンとして数える。
+
+    Args:
+        messages: ``result.all_messages()`` の戻り値。
+
+    Returns:
+        使用ターン数。
+    """
+    turns = 0
+    for message in messages:
+        if not isinstance(message, ModelResponse):
+            continue
+        details = message.provider_details or {}
+        num_turns = details.get(_PROVIDER_NUM_TURNS_KEY)
+        turns += num_turns if isinstance(num_turns, int) and num_turns > 0 else 1
+    return turns
+
+
+def is_turn_limit_error(error: BaseException) -> bool:
+    """例外が ``max_turns`` への到達によるものかを返す。
+
+    設定名（``max_turns``）を含むだけの例外（設定の検証エラーなど）は対象外。
+    ``__cause__`` をたどり、ラップされた例外も判定する。
+
+    Args:
+        error: ``agent.run()`` が送出した例外。
+
+    Returns:
+        pydantic-ai の ``UsageLimitExceeded``、または結果の subtype が
+        ``error_max_turns`` の例外（claudecode-model）の場合は True。
+    """
+    from pydantic_ai.exceptions import UsageLimitExceeded
+
+    current: BaseException | None = error
+    while current is not None:
+        if isinstance(current, UsageLimitExceeded):
+            return True
+        if getattr(current, "subtype", None) == _MAX_TURNS_SUBTYPE or _MAX_TURNS_SUBTYPE in str(current):
+            return True
+        current = current.__cause__
+    return False
+
+
+def get_turn_usage_path(workspace: Path) -> Path:
+    """ターン使用量ログのパスを返す。"""
+    return workspace / TURN_USAGE_LOG_PATH
+
+
+def append_turn_usage(path: Path, record: TurnUsageRecord) -> None:
+    """ターン使用量を JSONL に追記する。
+
+    テレメトリの書き込み失敗で実行結果を失わないよう、OSError は警告に留める。
+
+    Args:
+        path: ターン使用量ログのパス。
+        record: 記録内容。
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(record.model_dump_json() + "\n")
+    except OSError:
+        logger.warning("ターン使用量の書き込みに失敗しました: %s", path, exc_info=True)
+
+
+class _TurnHistory:
+    """1 つのターン使用量ログの読み込み済みの位置と、エージェントごとの使用ターン数。"""
+
+    def __init__(self) -> None:
+        self.offset = 0
+        self.turns: dict[str, list[int]] = defaultdict(list)
+
+
+_histories: dict[Path, _TurnHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def _read_appended(path: Path, history: _TurnHistory) -> None:
+    """前回以降に追記された（改行まで書き込まれた）行を読み込む。"""
+    with path.open("rb") as f:
+        f.seek(history.offset)
+        chunk = f.read()
+    complete = chunk[: chunk.rfind(b"\n") + 1]
+    history.offset += len(complete)
+    for line in complete.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("ターン使用量ログの不正な行をスキップしました: %s", path)
+            continue
+        history.turns[record.get("agent_name", "")].append(int(record["turns_used"]))
+
+
+def load_turn_history(path: Path, agent_name: str, limit: int) -> list[int]:
+    """指定エージェントの直近のターン使用量を返す。
+
+    ファイルごとに読み込み済みの位置を保持し、前回以降に追記された行のみ読み込む
+    （ファイルが縮んだ場合は先頭から読み直す）。打ち切られた実行は上限値で含まれる。
+
+    Args:
+        path: ターン使用量ログのパス。
+        agent_name: Member Agent 名。
+        limit: 返す最大件数（新しいものから）。
+
+    Returns:
+        使用ターン数のリスト（古い順）。ログが無い場合は空リスト。
+    """
+    with _histories_lock:
+        if not path.is_file():
+            _histories.pop(path, None)
+            return []
+        history = _histories.get(path)
+        if history is None or path.stat().st_size < history.offset:
+            history = _histories[path] = _TurnHistory()
+        _read_appended(path, history)
+        return history.turns[agent_name][-limit:]
+
+
+def resolve_max_turns(settings: TurnBudgetSettings, history: list[int]) -> int | None:
+    """今回の実行に適用する max_turns を決定する。
+
+    adaptive 有効時は、履歴が ``min_samples`` 件以上あれば
+    ``ceil(percentile 値 × headroom)`` を ``[min_turns, max_turns]`` に収めて返す
+    （打ち切られた実行は上限値として含まれるため、上限に達する実行が続くと上限が上がる）。
+    履歴不足または adaptive 無効時は ``max_turns`` をそのまま返す。
+
+    Args:
+        settings: turn_budget 設定。
+        history: 過去の使用ターン数。
+
+    Returns:
+        max_turns（None の場合は claudecode-model のデフォルトを使用）。
+    """
+    if not settings.adaptive or len(history) < settings.min_samples:
+        return settings.max_turns
+
+    ordered = sorted(history)
+    index = min(len(ordered) - 1, math.ceil(settings.percentile * len(ordered)) - 1)
+    limit = max(settings.min_turns, math.ceil(ordered[index] * settings.headroom))
+    if settings.max_turns is not None:
+        limit = min(limit, settings.max_turns)
+    return limit
+
+
+def build_turn_usage_record(
+    *,
+    agent_name: str,
+    model: str,
+    messages: list[ModelMessage],
+    max_turns: int | None,
+    context: dict[str, Any] | None,
+    limit_reached: bool = False,
+) -> TurnUsageRecord:
+    """execute() の結果からターン使用量レコードを構築する。
+
+    ``max_turns`` に達した実行（``limit_reached`` または使用ターン数が上限以上）は、
+    上限値以上の使用ターン数で ``censored`` を付ける。
+
+    Args:
+        agent_name: Member Agent 名。
+        model: モデル ID。
+        messages: ``result.all_messages()`` の戻り値（失敗時は空）。
+        max_turns: 適用した max_turns。
+        context: 実行コンテキスト。
+        limit_reached: ``max_turns`` への到達で失敗した場合は True。
+
+    Returns:
+        ターン使用量レコード。
+    """
+    ctx = context or {}
+    turns_used = count_turns(messages)
+    censored = max_turns is not None and (limit_reached or turns_used >= max_turns)
+    if censored and max_turns is not None:
+        turns_used = max(turns_used, max_turns)
+    return TurnUsageRecord(
+        agent_name=agent_name,
+        model=model,
+        execution_id=ctx.get("execution_id", ""),
+        team_id=ctx.get("team_id", ""),
+        round_number=ctx.get("round_number", 0),
+        turns_used=turns_used,
+        max_turns=max_turns,
+        censored=censored,
+        recorded_at=datetime.now(UTC).isoformat(),
+    )
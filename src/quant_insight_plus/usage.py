@@ -0,0 +1,381 @@
+"""エージェント実行ごとのトークン・コスト・所要時間の集計。
+
+Member Agent の execute() と Leader Agent の実行ごとに ``UsageRecord`` を作成し、
+プロセス内の ``UsageRecorder`` に蓄積する。ラウンド終了時に Submission Relay が
+当該ラウンド分をまとめて DuckDB の ``agent_usage`` テーブルへ一括書き込みする。
+
+書き込みはプロセス共有の ``UsageWriter`` が DuckDB ファイルごとに 1 つの接続で直列に行う
+（ラウンドごとに接続を開かない）。書き込みに失敗したレコードは破棄せず、次回の書き込みで再試行する。
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from quant_insight_plus.db import connect, table_exists
+from quant_insight_plus.submission_relay import SUBMISSION_ERROR_SCORE
+
+if TYPE_CHECKING:
+    import duckdb
+    from pydantic_ai.messages import ModelMessage
+
+# --- 名前付き定数 ---
+USAGE_TABLE_NAME = "agent_usage"
+ROLE_LEADER = "leader"
+ROLE_MEMBER = "member"
+_PROVIDER_COST_KEY = "total_cost_usd"
+_SECONDS_PER_HOUR = 3600.0
+
+_CREATE_USAGE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {USAGE_TABLE_NAME} (
+    execution_id VARCHAR NOT NULL,
+    team_id VARCHAR NOT NULL,
+    round_number INTEGER NOT NULL,
+    agent_name VARCHAR NOT NULL,
+    agent_role VARCHAR NOT NULL,
+    model VARCHAR NOT NULL,
+    requests INTEGER NOT NULL,
+    input_tokens BIGINT NOT NULL,
+    output_tokens BIGINT NOT NULL,
+    cache_read_tokens BIGINT NOT NULL,
+    cache_write_tokens BIGINT NOT NULL,
+    cost_usd DOUBLE,
+    wall_seconds DOUBLE NOT NULL,
+    status VARCHAR NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL
+)
+"""
+
+
+class UsageRecord(BaseModel):
+    """1 回のエージェント実行の使用量。"""
+
+    execution_id: str
+    team_id: str
+    round_number: int
+    agent_name: str
+    agent_role: str
+    model: str
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost_usd: float | None = None
+    wall_seconds: float
+    status: str = "success"
+    recorded_at: datetime
+
+
+def build_usage_record(
+    messages: list[ModelMessage],
+    *,
+    execution_id: str,
+    team_id: str,
+    round_number: int,
+    agent_name: str,
+    agent_role: str,
+    model: str,
+    wall_seconds: float,
+    status: str = "success",
+) -> UsageRecord:
+    """メッセージ履歴の ModelResponse.usage を合算して UsageRecord を作成する。
+
+    コストは ``provider_details["total_cost_usd"]``（ClaudeCode が返す場合）を合算する。
+
+    Args:
+        messages: ``result.all_messages()`` の戻り値。
+        execution_id: 実行 ID。
+        team_id: チーム ID。
+        round_number: ラウンド番号。
+        agent_name: エージェント名。
+        agent_role: ``"leader"`` または ``"member"``。
+        model: モデル ID（応答に model_name があればそちらを優先）。
+        wall_seconds: 実行の所要時間（秒）。
+        status: 実行結果（``"success"`` / ``"error"``）。
+
+    Returns:
+        使用量レコード。
+    """
+    from pydantic_ai.messages import ModelResponse
+
+    record = UsageRecord(
+        execution_id=execution_id,
+        team_id=team_id,
+        round_number=round_number,
+        agent_name=agent_name,
+        agent_role=agent_role,
+        model=model,
+        wall_seconds=wall_seconds,
+        status=status,
+        recorded_at=datetime.now(UTC),
+    )
+    for message in messages:
+        if not isinstance(message, ModelResponse):
+            continue
+        record.requests += 1
+        record.input_tokens += message.usage.input_tokens
+        record.output_tokens += message.usage.output_tokens
+        record.cache_read_tokens += message.usage.cache_read_tokens
+        record.cache_write_tokens += message.usage.cache_write_tokens
+        if message.model_name:
+            record.model = message.model_name
+        cost = (message.provider_details or {}).get(_PROVIDER_COST_KEY)
+        if isinstance(cost, int | float):
+            record.cost_usd = (record.cost_usd or 0.0) + float(cost)
+    return record
+
+
+class UsageRecorder:
+    """ラウンド終了まで UsageRecord を蓄積するスレッドセーフなバッファ。"""
+
+    def __init__(self) -> None:
+        """空のバッファを作成する。"""
+        self._records: list[UsageRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: UsageRecord) -> None:
+        """レコードを追加する。"""
+        with self._lock:
+            self._records.append(record)
+
+    def drain(self, execution_id: str, team_id: str, round_number: int) -> list[UsageRecord]:
+        """指定ラウンドのレコードを取り出してバッファから削除する。"""
+        key = (execution_id, team_id, round_number)
+        matched: list[UsageRecord] = []
+        remaining: list[UsageRecord] = []
+        with self._lock:
+            for r in self._records:
+                (matched if (r.execution_id, r.team_id, r.round_number) == key else remaining).append(r)
+            self._records = remaining
+        return matched
+
+
+_recorder = UsageRecorder()
+
+
+def get_usage_recorder() -> UsageRecorder:
+    """プロセス共有の UsageRecorder を返す。"""
+    return _recorder
+
+
+class UsageWriter:
+    """``agent_usage`` テーブルへのプロセス共有の書き込み口。
+
+    DuckDB ファイルごとに接続を 1 つ保持し（テーブルの作成は接続時の 1 回のみ）、
+    チーム間の書き込みを直列化する。同一プロセスの store と同じ接続設定（読み書き）で開くため、
+    DuckDB のデータベースインスタンスを store と共有し、ロックを取り合わない。
+    """
+
+    def __init__(self) -> None:
+        """接続を持たない状態で初期化する。"""
+        self._lock = threading.Lock()
+        self._connections: dict[Path, duckdb.DuckDBPyConnection] = {}
+        self._pending: dict[Path, list[UsageRecord]] = {}
+
+    def _connection(self, db_path: Path) -> duckdb.DuckDBPyConnection:
+        conn = self._connections.get(db_path)
+        if conn is None:
+            conn = connect(db_path)
+            conn.execute(_CREATE_USAGE_TABLE_SQL)
+            self._connections[db_path] = conn
+        return conn
+
+    def write(self, db_path: Path, records: list[UsageRecord]) -> int:
+        """前回失敗したレコードとあわせて一括書き込みする。
+
+        Args:
+            db_path: DuckDB ファイルのパス。
+            records: 書き込むレコード。
+
+        Returns:
+            書き込んだ件数（再試行分を含む）。
+
+        Raises:
+            duckdb.Error: 書き込みに失敗した場合（レコードは保持し、次回の書き込みで再試行する）。
+        """
+        key = db_path.resolve()
+        with self._lock:
+            pending = [*self._pending.pop(key, []), *records]
+            if not pending:
+                return 0
+            columns = list(UsageRecord.model_fields)
+            placeholders = ", ".join("?" for _ in columns)
+            try:
+                self._connection(key).executemany(
+                    f"INSERT INTO {USAGE_TABLE_NAME} ({', '.join(columns)}) VALUES ({placeholders})",
+                    [tuple(getattr(r, c) for c in columns) for r in pending],
+                )
+            except Exception:
+                self._pending[key] = pending
+                self._close(key)
+                raise
+            return len(pending)
+
+    def pending(self) -> int:
+        """書き込みに失敗して再試行を待つレコード数を返す。"""
+        with self._lock:
+            return sum(len(records) for records in self._pending.values())
+
+    def _close(self, key: Path) -> None:
+        conn = self._connections.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    def close(self) -> None:
+        """保持している接続を閉じる（再試行待ちのレコードは保持する）。"""
+        with self._lock:
+            for key in list(self._connections):
+                self._close(key)
+
+
+_writer = UsageWriter()
+
+
+def get_usage_writer() -> UsageWriter:
+    """プロセス共有の UsageWriter を返す。"""
+    return _writer
+
+
+def save_usage_records(db_path: Path, records: list[UsageRecord]) -> int:
+    """UsageRecord を ``agent_usage`` テーブルへ一括書き込みする（``UsageWriter`` 経由）。
+
+    Args:
+        db_path: DuckDB ファイルのパス。
+        records: 書き込むレコード。
+
+    Returns:
+        書き込んだ件数（前回失敗したレコードの再試行分を含む）。
+    """
+    return get_usage_writer().write(db_path, records)
+
+
+class UsageBreakdownRow(BaseModel):
+    """チーム・エージェント・モデル単位の使用量集計。"""
+
+    team_id: str
+    agent_name: str
+    agent_role: str
+    model: str
+    executions: int
+    input_tokens: int
+    output_tokens: int
+    cache_read_tokens: int
+    cache_write_tokens: int
+    cost_usd: float | None
+    wall_seconds: float
+
+
+class UsageReport(BaseModel):
+    """``qip usage`` のレポート。
+
+    ``total_tokens`` は入力トークンと出力トークンの合計
+    （キャッシュトークンは入力トークンに含まれる）。
+    """
+
+    execution_id: str
+    rows: list[UsageBreakdownRow]
+    total_tokens: int
+    total_cost_usd: float | None
+    accepted_submissions: int
+    tokens_per_accepted_submission: float | None
+    rounds: int
+    elapsed_hours: float | None
+    rounds_per_hour: float | None
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+    parsed = datetime.fromisoformat(str(value))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def build_usage_report(conn: duckdb.DuckDBPyConnection, execution_id: str) -> UsageReport:
+    """実行 ID 単位の使用量・スループットレポートを作成する。
+
+    - 採用提出数: ``leader_board`` のうちスコアが提出エラー値（-100.0）でない件数
+    - ラウンド/時: ``round_status`` の件数 ÷（最終終了時刻 − 最初の開始時刻）
+
+    Args:
+        conn: DuckDB 接続。
+        execution_id: 実行 ID。
+
+    Returns:
+        使用量レポート。
+
+    Raises:
+        ValueError: ``agent_usage`` テーブルが存在しない場合。
+    """
+    if not table_exists(conn, USAGE_TABLE_NAME):
+        msg = f"{USAGE_TABLE_NAME} テーブルが存在しません。ラウンドを実行してから再度お試しください"
+        raise ValueError(msg)
+
+    fetched = conn.execute(
+        f"""
+        SELECT team_id, agent_name, agent_role, model, COUNT(*),
+               SUM(input_tokens), SUM(output_tokens), SUM(cache_read_tokens), SUM(cache_write_tokens),
+               SUM(cost_usd), SUM(wall_seconds)
+        FROM {USAGE_TABLE_NAME}
+        WHERE execution_id = ?
+        GROUP BY team_id, agent_name, agent_role, model
+        ORDER BY team_id, agent_role, agent_name
+        """,
+        [execution_id],
+    ).fetchall()
+    rows = [
+        UsageBreakdownRow(
+            team_id=r[0],
+            agent_name=r[1],
+            agent_role=r[2],
+            model=r[3],
+            executions=r[4],
+            input_tokens=r[5],
+            output_tokens=r[6],
+            cache_read_tokens=r[7],
+            cache_write_tokens=r[8],
+            cost_usd=r[9],
+            wall_seconds=r[10],
+        )
+        for r in fetched
+    ]
+    total_tokens = sum(r.input_tokens + r.output_tokens for r in rows)
+    costs = [r.cost_usd for r in rows if r.cost_usd is not None]
+
+    accepted = 0
+    if table_exists(conn, "leader_board"):
+        row = conn.execute(
+            "SELECT COUNT(*) FROM leader_board WHERE execution_id = ? AND score > ?",
+            [execution_id, SUBMISSION_ERROR_SCORE],
+        ).fetchone()
+        accepted = row[0] if row is not None else 0
+
+    rounds = 0
+    elapsed_hours: float | None = None
+    if table_exists(conn, "round_status"):
+        spans = conn.execute(
+            "SELECT round_started_at, round_ended_at FROM round_status WHERE execution_id = ?",
+            [execution_id],
+        ).fetchall()
+        rounds = len(spans)
+        if spans:
+            started = min(_to_datetime(s[0]) for s in spans)
+            ended = max(_to_datetime(s[1]) for s in spans)
+            elapsed_hours = (ended - started).total_seconds() / _SECONDS_PER_HOUR
+
+    return UsageReport(
+        execution_id=execution_id,
+        rows=rows,
+        total_tokens=total_tokens,
+        total_cost_usd=sum(costs) if costs else None,
+        accepted_submissions=accepted,
+        tokens_per_accepted_submission=total_tokens / accepted if accepted else None,
+        rounds=rounds,
+        elapsed_hours=elapsed_hours,
+        rounds_per_hour=rounds / elapsed_hours if elapsed_hours else None,
+    )
@@ -0,0 +1,157 @@
+"""評価期間を分けた期間別の採点（ウォークフォワード）。
+
+評価期間全体のシャープレシオは 1 つの推定値でしかなく、期間によって大きく変わる。
+期間ごとに評価し直すとデータの読み込みと ``generate_signal`` の呼び出しが期間の数だけ
+増えるため、評価時に記録したシグナル（:mod:`quant_insight_plus.signal_cache`）から次の手順で求める:
+
+1. 日時ごとの断面の Spearman 順位相関を 1 回の結合・集計で求める（Evaluator と同じ欠損値の扱い）
+2. 評価した日時（シグナルの日時）を連続した ``windows`` 個の期間に等分し、期間ごとの相関の平均 / 標準偏差を
+   1 回の集計で求める
+3. 期間ごとのシャープレシオの平均・標準偏差・最小値・正の期間の割合と、
+   安定性（平均 / 標準偏差）を求める
+
+``patch_submission_relay()`` の置換メソッドが、結果を ``score_details["walk_forward"]`` に記録する。
+"""
+
+from __future__ import annotations
+
+import statistics
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from quant_insight_plus.ensemble import RETURNS_DATASET, daily_correlations, read_split
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from quant_insight_plus.runtime_config import WalkForwardSettings
+    from quant_insight_plus.signal_cache import SignalCapture
+
+
+class WindowScore(BaseModel):
+    """1 期間の採点結果。"""
+
+    window: int
+    start: datetime
+    end: datetime
+    dates: int
+    iterations: int
+    sharpe_ratio: float | None
+    mean_correlation: float | None
+    std_correlation: float | None
+
+
+class WalkForwardResult(BaseModel):
+    """期間別の採点結果と期間間の安定性。
+
+    集計は ``min_window_dates`` 以上の有効な日時がある期間（``sharpe_ratio`` が None でない期間）のみ対象。
+    """
+
+    windows: list[WindowScore]
+    mean_sharpe: float | None
+    std_sharpe: float | None
+    min_sharpe: float | None
+    positive_fraction: float | None
+    stability: float | None
+
+
+def evaluate_windows(
+    signals: pl.DataFrame,
+    returns: pl.DataFrame,
+    settings: WalkForwardSettings,
+) -> WalkForwardResult:
+    """シグナルを連続した期間ごとに採点する。
+
+    期間ごとのシャープレシオは Evaluator と同じ定義（有効な日時の相関の平均 / 標準偏差。
+    有効日時が 1 件・標準偏差 0 の場合は 0.0）。有効な日時が ``min_window_dates`` 未満の期間は None。
+
+    Args:
+        signals: シグナル（datetime, symbol, signal）。
+        returns: リターン（datetime, symbol, return_value）。
+        settings: ``[walk_forward]`` の設定。
+
+    Returns:
+        期間別の採点結果。
+
+    Raises:
+        ValueError: シグナルとリターンが結合できる日時が無い場合。
+    """
+    import polars as pl
+
+    daily = daily_correlations(signals, returns)
+    if daily.is_empty():
+        msg = "シグナルとリターンが結合できる日時がありません"
+        raise ValueError(msg)
+    # 期間は相関の有無に依らず、評価した日時（シグナルの日時）で等分する
+    dates = signals.select(pl.col("datetime").cast(pl.Datetime("us")).unique().sort())
+    windows = min(settings.windows, dates.height)
+    frame = (
+        dates.with_row_index("index")
+        .with_columns((pl.col("index").cast(pl.Int64) * windows // dates.height + 1).alias("window"))
+        .join(daily, on="datetime", how="left")
+        .group_by("window")
+        .agg(
+            pl.col("datetime").min().alias("start"),
+            pl.col("datetime").max().alias("end"),
+            pl.len().alias("dates"),
+            pl.col("correlation").count().alias("iterations"),
+            pl.col("correlation").mean().alias("mean_correlation"),
+            pl.col("correlation").std(ddof=1).alias("std_correlation"),
+        )
+        .sort("window")
+    )
+
+    scores: list[WindowScore] = []
+    for row in frame.iter_rows(named=True):
+        enough = row["iterations"] >= settings.min_window_dates
+        mean, std = row["mean_correlation"], row["std_correlation"]
+        scores.append(WindowScore(**row, sharpe_ratio=(mean / std if std else 0.0) if enough else None))
+    return summarize_windows(scores)
+
+
+def summarize_windows(windows: list[WindowScore]) -> WalkForwardResult:
+    """期間ごとのシャープレシオから期間間の安定性を求める。
+
+    Args:
+        windows: 期間別の採点結果。
+
+    Returns:
+        安定性を含む結果（対象の期間が無い場合は None、1 期間・標準偏差 0 の場合の安定性は 0.0）。
+    """
+    sharpes = [window.sharpe_ratio for window in windows if window.sharpe_ratio is not None]
+    if not sharpes:
+        return WalkForwardResult(
+            windows=windows, mean_sharpe=None, std_sharpe=None, min_sharpe=None, positive_fraction=None, stability=None
+        )
+    mean = statistics.fmean(sharpes)
+    std = statistics.stdev(sharpes) if len(sharpes) > 1 else None
+    return WalkForwardResult(
+        windows=windows,
+        mean_sharpe=mean,
+        std_sharpe=std,
+        min_sharpe=min(sharpes),
+        positive_fraction=sum(sharpe > 0 for sharpe in sharpes) / len(sharpes),
+        stability=mean / std if std else 0.0,
+    )
+
+
+def score_capture(capture: SignalCapture, settings: WalkForwardSettings) -> WalkForwardResult | None:
+    """評価時に記録したシグナルを、評価データのリターンで期間ごとに採点する。
+
+    Args:
+        capture: 評価時のシグナルの記録（``finalize()`` の前に呼び出すこと）。
+        settings: ``[walk_forward]`` の設定。
+
+    Returns:
+        期間別の採点結果（シグナルが記録されなかった場合は None）。
+
+    Raises:
+        FileNotFoundError: 評価データのリターンが存在しない場合。
+        ValueError: シグナルとリターンが結合できる日時が無い場合。
+    """
+    signals = capture.collect()
+    if signals is None:
+        return None
+    return evaluate_windows(signals, read_split(capture.workspace, RETURNS_DATASET), settings)
@@ -0,0 +1,513 @@
+"""ワークスペース上のファイルキューによるチーム実行の分散。
+
+``qip queue submit`` が orchestrator.toml のチームをジョブとしてキューに登録し、
+ネットワークファイルシステムでワークスペースを共有する各ノードの ``qip worker`` が
+ジョブを取得して ``qip team`` で実行する。
+
+``qip team`` はワークスペースの ``mixseek.db``（DuckDB は 1 プロセスのみ書き込み可能）と
+``submissions/round_{N}/`` をチーム間で共有するため、1 ワークスペースで同時に実行するジョブは
+1 件に制限する。複数のワーカーは順に 1 件ずつ実行し、異常終了したワーカーのジョブを引き継ぐ。
+
+キューは ``{workspace}/.qip/queue/`` 配下のディレクトリで、ジョブ 1 件を
+JSON ファイル 1 つで表す::
+
+    pending/  未実行
+    running/  実行中（ワーカーがハートビートで mtime を更新する）
+    done/     正常終了
+    failed/   異常終了・試行回数超過
+
+ジョブの取得は ``pending/`` から ``running/`` への ``os.rename()`` で行う。
+rename はファイルシステム上でアトミックなため（NFS でもサーバー側で単一の操作）、
+ロックファイルや SQLite のロックに頼らずに複数ワーカー間の排他が成り立つ。
+同時実行の制限は ``O_EXCL`` で作成する ``running.lock``（保持中のジョブ ID を書き込む）で行う。
+ハートビートが ``lease_seconds`` 以上途絶えたジョブ（ワーカーの異常終了等）は、
+次に取得を試みたワーカーが ``pending/`` に戻し、``running.lock`` を解放する。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tomllib
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from quant_insight_plus.kernel import KERNEL_DIR_NAME
+
+logger = logging.getLogger(__name__)
+
+# --- 名前付き定数 ---
+QUEUE_DIR_NAME = "queue"
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUSES = (STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED)
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+WORKER_LOG_DIR = Path("logs") / "worker"
+_JOB_SUFFIX = ".json"
+_RUN_SLOT_NAME = "running.lock"
+_WORKSPACE_ENV_VAR = "MIXSEEK_WORKSPACE"
+
+
+class QueueJob(BaseModel):
+    """キュー上の 1 チーム分の実行ジョブ。"""
+
+    job_id: str
+    batch_id: str
+    task: str
+    team_config: str
+    timeout_seconds: float | None = None
+    max_attempts: int = 1
+    attempts: int = 0
+    status: str = STATUS_PENDING
+    worker_id: str | None = None
+    enqueued_at: float
+    claimed_at: float | None = None
+    finished_at: float | None = None
+    exit_code: int | None = None
+    error: str | None = None
+
+
+def get_queue_dir(workspace: Path) -> Path:
+    """キューディレクトリのパスを返す。
+
+    Args:
+        workspace: ワークスペースのルートパス。
+
+    Returns:
+        ``{workspace}/.qip/queue`` のパス。
+    """
+    return workspace / KERNEL_DIR_NAME / QUEUE_DIR_NAME
+
+
+def _write_atomic(path: Path, job: QueueJob) -> None:
+    """一時ファイル経由でジョブファイルを書き込む（読み手に途中の内容を見せない）。"""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(job.model_dump_json(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class WorkQueue:
+    """ディレクトリベースのジョブキュー。"""
+
+    def __init__(self, queue_dir: Path, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        """キューを初期化する（ディレクトリが無ければ作成する）。
+
+        Args:
+            queue_dir: キューディレクトリのパス。
+            lease_seconds: ハートビートが途絶えたジョブを再取得可能とみなすまでの秒数。
+        """
+        self.queue_dir = queue_dir
+        self.lease_seconds = lease_seconds
+        for status in STATUSES:
+            (queue_dir / status).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, status: str, job_id: str) -> Path:
+        return self.queue_dir / status / f"{job_id}{_JOB_SUFFIX}"
+
+    def _read(self, path: Path) -> QueueJob:
+        return QueueJob.model_validate(json.loads(path.read_text(encoding="utf-8")))
+
+    @property
+    def _slot(self) -> Path:
+        return self.queue_dir / _RUN_SLOT_NAME
+
+    def _acquire_slot(self) -> bool:
+        """ワークスペースの実行枠を取得する（``O_EXCL`` の作成で他ワーカーと排他する）。"""
+        try:
+            fd = os.open(self._slot, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    def _slot_holder(self) -> str | None:
+        try:
+            return self._slot.read_text(encoding="utf-8") or None
+        except FileNotFoundError:
+            return None
+
+    def _release_slot(self, job_id: str | None = None) -> None:
+        """実行枠を解放する（``job_id`` 指定時は当該ジョブが保持している場合のみ）。"""
+        if job_id is None or self._slot_holder() == job_id:
+            self._slot.unlink(missing_ok=True)
+
+    def has_pending(self) -> bool:
+        """pending のジョブがあるかを返す。"""
+        return any((self.queue_dir / STATUS_PENDING).glob(f"*{_JOB_SUFFIX}"))
+
+    def enqueue(
+        self,
+        task: str,
+        team_configs: list[str],
+        *,
+        timeout_seconds: float | None = None,
+        max_attempts: int = 1,
+    ) -> list[QueueJob]:
+        """チームごとのジョブを登録する。
+
+        Args:
+            task: ``qip team`` に渡すタスク。
+            team_configs: チーム設定ファイルのパス（ワークスペースからの相対パス推奨）。
+            timeout_seconds: 1 ジョブの実行タイムアウト秒数。
+            max_attempts: ワーカーの異常終了時を含めた最大試行回数。
+
+        Returns:
+            登録したジョブ（登録順）。
+        """
+        batch_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        now = time.time()
+        jobs: list[QueueJob] = []
+        for index, team_config in enumerate(team_configs):
+            job = QueueJob(
+                job_id=f"{batch_id}-{index:03d}",
+                batch_id=batch_id,
+                task=task,
+                team_config=team_config,
+                timeout_seconds=timeout_seconds,
+                max_attempts=max_attempts,
+                enqueued_at=now,
+            )
+            _write_atomic(self._path(STATUS_PENDING, job.job_id), job)
+            jobs.append(job)
+        return jobs
+
+    def reclaim_stale(self) -> list[str]:
+        """ハートビートが途絶えた実行中ジョブを pending（試行回数超過時は failed）に戻す。
+
+        当該ジョブが保持していた実行枠と、ハートビートが途絶えた実行枠（取得直後の異常終了等）も解放する。
+
+        Returns:
+            戻したジョブの ID。
+        """
+        reclaimed: list[str] = []
+        deadline = time.time() - self.lease_seconds
+        for path in sorted((self.queue_dir / STATUS_RUNNING).glob(f"*{_JOB_SUFFIX}")):
+            try:
+                if path.stat().st_mtime >= deadline:
+                    continue
+                # 回収用の一時名に rename して、同時に回収を試みる他ワーカーと排他する
+                reclaiming = path.with_name(f".{path.name}.{uuid.uuid4().hex}.reclaim")
+                os.rename(path, reclaiming)
+            except FileNotFoundError:
+                continue
+            job = self._read(reclaiming)
+            lost_worker = job.worker_id
+            if job.attempts >= job.max_attempts:
+                job.status = STATUS_FAILED
+                job.finished_at = time.time()
+                job.error = f"ワーカー {lost_worker} のハートビートが {self.lease_seconds:.0f} 秒以上途絶えました"
+            else:
+                job.status = STATUS_PENDING
+                job.worker_id = None
+            _write_atomic(reclaiming, job)
+            os.rename(reclaiming, self._path(job.status, job.job_id))
+            self._release_slot(job.job_id)
+            logger.warning(
+                "ジョブ %s を %s に移動しました（ワーカー %s 応答なし）", job.job_id, job.status, lost_worker
+            )
+            reclaimed.append(job.job_id)
+        try:
+            if self._slot.stat().st_mtime < deadline:
+                logger.warning("ハートビートが途絶えた実行枠（%s）を解放します", self._slot_holder())
+                self._release_slot()
+        except FileNotFoundError:
+            pass
+        return reclaimed
+
+    def claim(self, worker_id: str) -> QueueJob | None:
+        """pending のジョブを登録順に 1 件取得する。
+
+        Args:
+            worker_id: 取得するワーカーの ID。
+
+        Returns:
+            取得したジョブ（pending が無い場合・他のジョブが実行中の場合は None）。
+        """
+        self.reclaim_stale()
+        if not self._acquire_slot():
+            return None
+        for path in sorted((self.queue_dir / STATUS_PENDING).glob(f"*{_JOB_SUFFIX}")):
+            running = self.queue_dir / STATUS_RUNNING / path.name
+            try:
+                os.rename(path, running)
+                # rename はファイルの mtime を更新しないため、直ちにリースを開始する
+                os.utime(running)
+                job = self._read(running)
+            except FileNotFoundError:
+                # 別ワーカーが先に取得した
+                continue
+            job.status = STATUS_RUNNING
+            job.worker_id = worker_id
+            job.attempts += 1
+            job.claimed_at = time.time()
+            _write_atomic(running, job)
+            self._slot.write_text(job.job_id, encoding="utf-8")
+            return job
+        self._release_slot()
+        return None
+
+    def heartbeat(self, job: QueueJob) -> bool:
+        """実行中ジョブのリースを延長する。
+
+        Args:
+            job: 実行中のジョブ。
+
+        Returns:
+            ジョブがまだ running にある場合は True（回収済みの場合は False）。
+        """
+        try:
+            os.utime(self._path(STATUS_RUNNING, job.job_id))
+        except FileNotFoundError:
+            return False
+        if self._slot_holder() == job.job_id:
+            try:
+                os.utime(self._slot)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def finish(self, job: QueueJob, exit_code: int, error: str | None = None) -> QueueJob:
+        """ジョブの結果を記録し、done / failed に移動する。
+
+        リース切れで回収されたジョブを他のワーカーが再取得して実行中の場合は、
+        実行中の記録を上書きしないよう結果を破棄する。
+
+        Args:
+            job: 実行したジョブ。
+            exit_code: ``qip team`` の終了コード。
+            error: エラー内容（異常終了時）。
+
+        Returns:
+            結果を記録したジョブ（破棄した場合も結果は設定する）。
+        """
+        job.status = STATUS_DONE if exit_code == 0 else STATUS_FAILED
+        job.exit_code = exit_code
+        job.error = error
+        job.finished_at = time.time()
+        running = self._path(STATUS_RUNNING, job.job_id)
+        try:
+            current = self._read(running)
+        except FileNotFoundError:
+            # リース切れで回収済み: 結果を優先し、pending に戻されたジョブの再実行を防ぐ
+            logger.warning("ジョブ %s はリース切れで回収済みでしたが、結果を記録します", job.job_id)
+            self._path(STATUS_PENDING, job.job_id).unlink(missing_ok=True)
+            _write_atomic(self._path(job.status, job.job_id), job)
+            return job
+        if (current.worker_id, current.claimed_at) != (job.worker_id, job.claimed_at):
+            logger.warning(
+                "ジョブ %s はワーカー %s が再取得して実行中のため、ワーカー %s の結果を破棄します",
+                job.job_id,
+                current.worker_id,
+                job.worker_id,
+            )
+            return job
+        _write_atomic(running, job)
+        os.rename(running, self._path(job.status, job.job_id))
+        self._release_slot(job.job_id)
+        return job
+
+    def list_jobs(self, batch_id: str | None = None) -> list[QueueJob]:
+        """全ステータスのジョブを登録順に返す。
+
+        Args:
+            batch_id: 指定時はそのバッチのジョブのみ返す。
+
+        Returns:
+            ジョブのリスト。
+        """
+        jobs: list[QueueJob] = []
+        for status in STATUSES:
+            for path in (self.queue_dir / status).glob(f"*{_JOB_SUFFIX}"):
+                try:
+                    job = self._read(path)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    # ステータス遷移中のファイル
+                    continue
+                if batch_id is None or job.batch_id == batch_id:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda j: j.job_id)
+
+
+def load_orchestrator_teams(config: Path) -> tuple[list[str], float | None]:
+    """orchestrator.toml からチーム設定ファイルとチームごとのタイムアウトを読み込む。
+
+    Args:
+        config: orchestrator.toml のパス。
+
+    Returns:
+        ``([[orchestrator.teams]] の config のリスト, timeout_per_team_seconds)``。
+
+    Raises:
+        FileNotFoundError: 設定ファイルが存在しない場合。
+        ValueError: チームが定義されていない場合。
+    """
+    if not config.is_file():
+        msg = f"オーケストレーター設定ファイルが見つかりません: {config}"
+        raise FileNotFoundError(msg)
+    with config.open("rb") as f:
+        orchestrator = tomllib.load(f).get("orchestrator", {})
+    team_configs = [str(team["config"]) for team in orchestrator.get("teams", []) if "config" in team]
+    if not team_configs:
+        msg = f"[[orchestrator.teams]] にチームが定義されていません: {config}"
+        raise ValueError(msg)
+    timeout = orchestrator.get("timeout_per_team_seconds")
+    return team_configs, float(timeout) if timeout is not None else None
+
+
+# (job, workspace, log_path) -> 終了コード
+JobRunner = Callable[[QueueJob, Path, Path], int]
+
+
+def build_team_command(job: QueueJob, workspace: Path) -> list[str]:
+    """ジョブを実行する ``qip team`` のコマンドラインを返す。
+
+    Args:
+        job: 実行するジョブ。
+        workspace: ワーカーから見たワークスペースのルートパス。
+
+    Returns:
+        コマンドライン引数のリスト。
+    """
+    team_config = Path(job.team_config)
+    if not team_config.is_absolute():
+        team_config = workspace / team_config
+    return [sys.executable, "-m", "quant_insight_plus", "team", job.task, "--config", str(team_config)]
+
+
+def run_team_subprocess(job: QueueJob, workspace: Path, log_path: Path) -> int:
+    """``qip team`` をサブプロセスで実行し、出力をログファイルに書き込む。
+
+    Args:
+        job: 実行するジョブ。
+        workspace: ワーカーから見たワークスペースのルートパス。
+        log_path: 標準出力・標準エラーの書き込み先。
+
+    Returns:
+        終了コード。
+
+    Raises:
+        subprocess.TimeoutExpired: ``timeout_seconds`` を超えた場合。
+    """
+    from quant_insight_plus.cpu_budget import allocate_for_new_team
+    from quant_insight_plus.runtime_config import load_runtime_settings
+
+    env = {**os.environ, _WORKSPACE_ENV_VAR: str(workspace)}
+    command = build_team_command(job, workspace)
+    budget = load_runtime_settings(workspace).cpu_budget
+    if budget.enabled:
+        # チームプロセス内の Evaluator（polars）のスレッド数・アフィニティを CPU 予算に合わせる
+        allocation = allocate_for_new_team(workspace, budget)
+        env.update(allocation.environment())
+        command = [*allocation.affinity_prefix(), *command]
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("w", encoding="utf-8") as log:
+        completed = subprocess.run(
+            command,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env=env,
+            timeout=job.timeout_seconds,
+            check=False,
+        )
+    return completed.returncode
+
+
+def default_worker_id() -> str:
+    """ホスト名とプロセス ID からワーカー ID を生成する。"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_job(
+    queue: WorkQueue,
+    job: QueueJob,
+    workspace: Path,
+    *,
+    runner: JobRunner = run_team_subprocess,
+    heartbeat_interval: float | None = None,
+) -> QueueJob:
+    """ジョブを実行し、実行中はハートビートでリースを延長する。
+
+    Args:
+        queue: ジョブを取得したキュー。
+        job: 実行するジョブ。
+        workspace: ワーカーから見たワークスペースのルートパス。
+        runner: ジョブの実行関数（テスト用に差し替え可能）。
+        heartbeat_interval: ハートビート間隔（未指定時は ``lease_seconds / 3``）。
+
+    Returns:
+        結果を記録したジョブ。
+    """
+    interval = heartbeat_interval or queue.lease_seconds / 3
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(interval):
+            if not queue.heartbeat(job):
+                logger.warning("ジョブ %s は他のワーカーに回収されました", job.job_id)
+                return
+
+    heartbeat_thread = threading.Thread(target=beat, name=f"heartbeat-{job.job_id}", daemon=True)
+    heartbeat_thread.start()
+    try:
+        exit_code = runner(job, workspace, workspace / WORKER_LOG_DIR / f"{job.job_id}.log")
+        error = None if exit_code == 0 else f"qip team が終了コード {exit_code} で終了しました"
+    except subprocess.TimeoutExpired:
+        exit_code, error = -1, f"タイムアウト（{job.timeout_seconds:.0f} 秒）しました"
+    except Exception as e:
+        exit_code, error = -1, f"{type(e).__name__}: {e}"
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+    return queue.finish(job, exit_code, error)
+
+
+def run_worker(
+    queue: WorkQueue,
+    workspace: Path,
+    *,
+    worker_id: str | None = None,
+    runner: JobRunner = run_team_subprocess,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    once: bool = False,
+    stop_event: threading.Event | None = None,
+) -> list[QueueJob]:
+    """キューからジョブを取得して実行し続ける。
+
+    Args:
+        queue: ジョブキュー。
+        workspace: ワーカーから見たワークスペースのルートパス。
+        worker_id: ワーカー ID（未指定時はホスト名とプロセス ID）。
+        runner: ジョブの実行関数。
+        poll_interval: pending が無い場合の再確認間隔（秒）。
+        once: True の場合、pending が無くなった時点で終了する。
+        stop_event: セットされると次のジョブを取得せずに終了する。
+
+    Returns:
+        このワーカーが実行したジョブ（結果記録済み）。
+    """
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    finished: list[QueueJob] = []
+    while not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            # 他のジョブの実行中は、once でも pending が残る限り待機する
+            if once and not queue.has_pending():
+                break
+            stop_event.wait(poll_interval)
+            continue
+        logger.info("ワーカー %s がジョブ %s（%s）を開始します", worker_id, job.job_id, job.team_config)
+        finished.append(run_job(queue, job, workspace, runner=runner))
+    return finished
@@ -52,6 +52,36 @@ class TestClaudeCodeLocalCodeExecutorAgentInit:
         assert agent.agent.output_type is str
 
 
+class TestKernelSession:
+    """_apply_kernel_session のテスト。"""
+
+    @patch(MODEL_PATCH)
+    def test_teams_get_different_sessions(
+        self,
+        mock_create_model: MagicMock,
+        member_agent_config: MemberAgentConfig,
+        mock_model: MagicMock,
+    ) -> None:
+        """qip kernel exec の python_command に、チームごとに異なるセッション ID が付加されること。"""
+        from quant_insight_plus.kernel import SESSION_ENV_VAR, team_session
+
+        mock_create_model.return_value = mock_model
+        metadata = {"tool_settings": {"local_code_executor": {"python_command": "qip kernel exec"}}}
+        config = member_agent_config.model_copy(
+            update={"metadata": metadata, "system_instruction": "{python_command} submission.py"}
+        )
+
+        commands: list[str] = []
+        for team_id in ("team-a", "team-b"):
+            with team_session(team_id):
+                agent = ClaudeCodeLocalCodeExecutorAgent(config)
+            commands.append(agent.executor_config.python_command)
+
+        assert commands[0] == f"env {SESSION_ENV_VAR}=team-a.test-agent qip kernel exec"
+        assert commands[1] == f"env {SESSION_ENV_VAR}=team-b.test-agent qip kernel exec"
+        assert ClaudeCodeLocalCodeExecutorAgent(config).executor_config.python_command == "qip kernel exec"
+
+
 class TestEnsureRoundDirectory:
     """_ensure_round_directory のテスト。"""
 
@@ -1,14 +1,11 @@
 """CLI ラッパーモジュールのユニットテスト。
 
-quant-insight-plus CLI が以下を自動実行することを検証:
-- patch_core() によるプロバイダー拡張
-- register_claudecode_quant_agents() によるエージェント登録
+quant-insight-plus CLI が以下を実行することを検証:
+- bootstrap_agents() による patch_core() の適用とエージェント登録
 - mixseek-core CLI コマンドへの委譲
 - quant-insight サブコマンド（setup, data, db, export）の統合
 """
 
-import importlib
-
 import pytest
 from typer.testing import CliRunner
 
@@ -38,29 +35,40 @@ class TestCLIWrapper:
 
 
 class TestCLIAutoRegistration:
-    """CLI インポート時の自動登録テスト。"""
+    """エージェント登録・パッチの遅延適用テスト。"""
 
-    def test_patch_core_applied_on_import(self) -> None:
-        """CLI インポート時に patch_core() が適用されること。"""
+    def test_patch_core_applied_by_bootstrap(self) -> None:
+        """bootstrap_agents() で patch_core() が適用されること。"""
         from mixseek_plus.core_patch import is_patched
 
-        import quant_insight_plus.cli
+        from quant_insight_plus.cli import bootstrap_agents
 
-        importlib.reload(quant_insight_plus.cli)
+        bootstrap_agents()
 
         assert is_patched() is True
 
-    def test_agent_type_registered_on_import(self) -> None:
-        """CLI インポート時に claudecode_local_code_executor が登録されること。"""
+    def test_agent_type_registered_by_bootstrap(self) -> None:
+        """bootstrap_agents() で claudecode_local_code_executor が登録されること。"""
         from mixseek.agents.member.factory import MemberAgentFactory
 
-        import quant_insight_plus.cli
+        from quant_insight_plus.cli import bootstrap_agents
 
-        importlib.reload(quant_insight_plus.cli)
+        bootstrap_agents()
 
         supported_types = MemberAgentFactory.get_supported_types()
         assert "claudecode_local_code_executor" in supported_types
 
+    def test_app_attribute_applies_patches(self) -> None:
+        """モジュール属性 app の参照時に OrchestratorSettings の上限緩和パッチが適用されること。"""
+        from mixseek.config.schema import OrchestratorSettings
+
+        import quant_insight_plus.cli
+
+        _ = quant_insight_plus.cli.app
+
+        metadata = OrchestratorSettings.model_fields["timeout_per_team_seconds"].metadata
+        assert [m.le for m in metadata if hasattr(m, "le")] == [14400]
+
 
 class TestMainFunction:
     """main() 関数のデッドコード不在テスト。"""
@@ -68,8 +76,8 @@ class TestMainFunction:
     def test_main_has_no_is_patched_check(self) -> None:
         """main() 内に is_patched() の冗長チェックがないこと。
 
-        patch_core() はモジュールレベルで実行されるため、
-        main() 内での is_patched() チェックは到達不能コード。
+        patch_core() はサブコマンド解決時に bootstrap_agents() で適用されるため、
+        main() 内での is_patched() チェックは不要。
         """
         import inspect
 
@@ -0,0 +1,77 @@
+"""execute() の並列実行安全性のテスト。
+
+Leader Agent が同一メンバーへ複数タスクを並列委譲した場合でも、
+各実行が自身のラウンドコンテキストを参照し、共有設定を変更しないことを検証する。
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+from quant_insight.agents.local_code_executor.models import LocalCodeExecutorConfig
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+
+
+def _context(round_number: int) -> dict[str, Any]:
+    return {"execution_id": "exec-1", "team_id": "team-1", "round_number": round_number}
+
+
+class TestConcurrentExecute:
+    """execute() の並列呼び出しテスト。"""
+
+    async def test_parallel_calls_receive_own_context(
+        self, agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """並列実行時に各呼び出しが自身のラウンドコンテキストで実行されること。"""
+        for round_number in (1, 2, 3):
+            rd = mock_workspace_env / "submissions" / f"round_{round_number}"
+            rd.mkdir(parents=True)
+            (rd / "analysis.md").write_text(f"round {round_number} analysis")
+
+        observed: dict[str, tuple[LocalCodeExecutorConfig, str]] = {}
+
+        async def fake_run(prompt: str, deps: LocalCodeExecutorConfig) -> MagicMock:
+            # 他の呼び出しへ制御を渡し、インターリーブを発生させる
+            await asyncio.sleep(0.01)
+            observed[prompt.split("\n", 1)[0]] = (deps, prompt)
+            result = MagicMock()
+            result.output = "ok"
+            result.all_messages.return_value = []
+            return result
+
+        agent.agent.run = fake_run  # type: ignore[method-assign]
+
+        results = await asyncio.gather(*(agent.execute(f"task-{n}", context=_context(n)) for n in (1, 2, 3)))
+
+        assert all(r.content == "ok" for r in results)
+        for n in (1, 2, 3):
+            deps, prompt = observed[f"task-{n}"]
+            assert deps.implementation_context is not None
+            assert deps.implementation_context.round_number == n
+            assert f"round {n} analysis" in prompt
+            assert all(f"round {m} analysis" not in prompt for m in (1, 2, 3) if m != n)
+
+    async def test_shared_config_not_mutated(self, agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """execute() が共有の executor_config を変更しないこと。"""
+        captured: list[LocalCodeExecutorConfig] = []
+
+        async def fake_run(prompt: str, deps: LocalCodeExecutorConfig) -> MagicMock:
+            captured.append(deps)
+            result = MagicMock()
+            result.output = "ok"
+            result.all_messages.return_value = []
+            return result
+
+        agent.agent.run = fake_run  # type: ignore[method-assign]
+
+        await agent.execute("task", context=_context(5))
+
+        assert agent.executor_config.implementation_context is None
+        assert captured[0] is not agent.executor_config
+        assert captured[0].timeout_seconds == agent.executor_config.timeout_seconds
+
+    def test_build_invocation_config_without_context(self, agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """context 未指定時は共有設定をそのまま返すこと。"""
+        assert agent._build_invocation_config(None) is agent.executor_config
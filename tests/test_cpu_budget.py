@@ -0,0 +1,174 @@
+"""cpu_budget モジュール（ホスト単位の CPU 予算）のテスト。"""
+
+import json
+import os
+import socket
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from mixseek.models.member_agent import MemberAgentConfig
+
+from quant_insight_plus.cpu_budget import (
+    CpuAllocation,
+    allocate,
+    allocate_for_new_team,
+    allocate_workers,
+    current_allocation,
+    get_cpu_budget_dir,
+    live_leases,
+    substitute_python_command,
+    team_lease,
+)
+from quant_insight_plus.runtime_config import CpuBudgetSettings, get_runtime_config_path
+
+CORES = list(range(8))
+ENABLED = CpuBudgetSettings(enabled=True)
+
+
+def _write_lease(workspace: Path, name: str, pid: int, host: str | None = None) -> Path:
+    directory = get_cpu_budget_dir(workspace)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    lease = {"host": host or socket.gethostname(), "pid": pid, "team_id": name, "started_at": "2026-01-01T00:00:00Z"}
+    path.write_text(json.dumps(lease))
+    return path
+
+
+@pytest.fixture
+def dead_pid() -> int:
+    """終了済みのプロセスの PID。"""
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+class TestAllocate:
+    """allocate のテスト。"""
+
+    @pytest.mark.parametrize(("active_teams", "threads"), [(1, 7), (2, 3), (3, 2), (10, 1)])
+    def test_threads_split_usable_cores(self, active_teams: int, threads: int) -> None:
+        """予約分を除いたコアを稼働チーム数で割ること（1 以上）。"""
+        settings = CpuBudgetSettings(enabled=True, max_concurrent_teams=1)
+
+        allocation = allocate(settings, active_teams=active_teams, slot=0, cores=CORES)
+
+        assert allocation.threads == threads
+        assert allocation.cores == []
+
+    def test_shares_reserve_later_teams(self) -> None:
+        """順に開始したチームの割り当ての合計が、利用可能なコア数を超えないこと。"""
+        settings = CpuBudgetSettings(enabled=True, max_concurrent_teams=3)
+
+        # 割り当てはラウンドの開始時に決まるため、i 番目のチームは i + 1 チームの稼働中に割り当てられる
+        allocations = [allocate(settings, active_teams=slot + 1, slot=slot, cores=CORES) for slot in range(3)]
+
+        assert [a.threads for a in allocations] == [2, 2, 2]
+        assert sum(a.threads for a in allocations) <= len(CORES) - settings.reserved_cores
+
+    def test_max_threads_per_team(self) -> None:
+        """max_threads_per_team で上限を設けること。"""
+        settings = CpuBudgetSettings(enabled=True, max_concurrent_teams=1, max_threads_per_team=2)
+
+        assert allocate(settings, active_teams=1, slot=0, cores=CORES).threads == 2
+
+    def test_pin_affinity_uses_distinct_cores(self) -> None:
+        """pin_affinity 有効時はチームごとに異なるコアを割り当てること。"""
+        settings = CpuBudgetSettings(enabled=True, reserved_cores=2, max_concurrent_teams=3, pin_affinity=True)
+
+        allocations = [allocate(settings, active_teams=3, slot=slot, cores=CORES) for slot in range(3)]
+
+        assert [a.cores for a in allocations] == [[0, 1], [2, 3], [4, 5]]
+
+
+class TestCommand:
+    """wrap_command / substitute_python_command のテスト。"""
+
+    def test_wrap_command_sets_threads(self) -> None:
+        """python_command の前に POLARS_MAX_THREADS を付加すること。"""
+        allocation = CpuAllocation(threads=3, active_teams=2)
+
+        assert allocation.wrap_command("uv run python") == "env POLARS_MAX_THREADS=3 uv run python"
+
+    def test_substitutes_placeholder_and_expanded_command(self) -> None:
+        """プレースホルダーと行頭の展開済みコマンドを置き換えること。"""
+        budgeted = "env POLARS_MAX_THREADS=3 uv run python"
+        instructions = "```bash\n{python_command} a.py\n  uv run python b.py\n```\nuv run pythonic"
+
+        result = substitute_python_command(instructions, "uv run python", budgeted)
+
+        assert result == f"```bash\n{budgeted} a.py\n  {budgeted} b.py\n```\nuv run pythonic"
+
+
+class TestTeamLease:
+    """team_lease / live_leases のテスト。"""
+
+    def test_disabled_registers_nothing(self, mock_workspace_env: Path) -> None:
+        """[cpu_budget] 無効時はリースを作成しないこと。"""
+        with team_lease(mock_workspace_env, "team-a", CpuBudgetSettings()) as allocation:
+            assert allocation is None
+            assert current_allocation() is None
+        assert not get_cpu_budget_dir(mock_workspace_env).exists()
+
+    def test_lease_counts_active_teams(self, mock_workspace_env: Path) -> None:
+        """稼働チーム数に応じた割り当てを設定し、終了時にリースを削除すること。"""
+        _write_lease(mock_workspace_env, "team-other", os.getpid())
+
+        with team_lease(mock_workspace_env, "team-a", ENABLED) as allocation:
+            assert allocation is not None
+            assert allocation.active_teams == 2
+            assert current_allocation() == allocation
+            assert len(live_leases(mock_workspace_env)) == 2
+
+        assert current_allocation() is None
+        assert [lease.team_id for lease in live_leases(mock_workspace_env)] == ["team-other"]
+
+    def test_stale_and_remote_leases_are_ignored(self, mock_workspace_env: Path, dead_pid: int) -> None:
+        """終了したプロセスのリースは削除し、他のホストのリースは数えないこと。"""
+        stale = _write_lease(mock_workspace_env, "team-stale", dead_pid)
+        _write_lease(mock_workspace_env, "team-remote", os.getpid(), host="other-host")
+
+        assert live_leases(mock_workspace_env) == []
+        assert not stale.exists()
+
+    def test_workers_count_as_teams(self, mock_workspace_env: Path) -> None:
+        """起動するワーカー・チームプロセスを稼働チームとして数えること。"""
+        _write_lease(mock_workspace_env, "team-other", os.getpid())
+
+        assert allocate_for_new_team(mock_workspace_env, ENABLED).active_teams == 2
+        assert allocate_workers(mock_workspace_env, ENABLED, 3).active_teams == 4
+
+
+class TestIntegration:
+    """Member Agent・qip worker への適用のテスト。"""
+
+    @patch("mixseek.core.auth.create_authenticated_model")
+    def test_member_python_command(
+        self,
+        mock_create_model: MagicMock,
+        member_agent_config: MemberAgentConfig,
+        mock_workspace_env: Path,
+    ) -> None:
+        """ラウンド実行中に作成した Member Agent の python_command に予算を付加すること。"""
+        from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+
+        with team_lease(mock_workspace_env, "team-a", ENABLED) as allocation:
+            assert allocation is not None
+            agent = ClaudeCodeLocalCodeExecutorAgent(member_agent_config)
+
+        assert agent.executor_config.python_command.startswith(f"env POLARS_MAX_THREADS={allocation.threads} ")
+
+    def test_worker_subprocess_environment(self, mock_workspace_env: Path) -> None:
+        """qip worker のチームプロセスに POLARS_MAX_THREADS を渡すこと。"""
+        from quant_insight_plus.work_queue import QueueJob, run_team_subprocess
+
+        path = get_runtime_config_path(mock_workspace_env)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("[cpu_budget]\nenabled = true\n")
+        job = QueueJob(job_id="job-1", batch_id="batch-1", task="p", team_config="configs/team.toml", enqueued_at=0.0)
+
+        with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0)) as run:
+            run_team_subprocess(job, mock_workspace_env, mock_workspace_env / "logs" / "job-1.log")
+
+        assert "POLARS_MAX_THREADS" in run.call_args.kwargs["env"]
@@ -0,0 +1,183 @@
+"""data_compaction モジュールと qip data compact コマンドのテスト。
+
+- Categorical 化: symbol・セクターコード等の文字列カラム
+- Float32 化: 相対誤差が許容範囲内の浮動小数点カラムのみ
+- Datetime 精度: マイクロ秒に統一
+- 精度損失レポート
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.data_compaction import (
+    COMPACTION_REPORT_FILENAME,
+    compact_frame,
+    compact_parquet,
+    compact_split_outputs,
+)
+
+COMPETITION_TOML = """\
+[competition]
+name = "test competition"
+
+[[competition.data]]
+name = "ohlcv"
+datetime_column = "datetime"
+"""
+
+
+@pytest.fixture
+def ohlcv_frame() -> pl.DataFrame:
+    """テスト用の OHLCV DataFrame（ナノ秒精度・Float64）。"""
+    return pl.DataFrame(
+        {
+            "datetime": pl.Series(
+                [datetime(2023, 1, 4), datetime(2023, 1, 4), datetime(2023, 1, 5)],
+                dtype=pl.Datetime("ns"),
+            ),
+            "symbol": ["7203", "6758", "7203"],
+            "close": [2000.5, 12000.25, 2010.0],
+            "volume": [100, 200, 300],
+        }
+    )
+
+
+class TestCompactFrame:
+    """compact_frame の dtype 変換テスト。"""
+
+    def test_symbol_becomes_categorical(self, ohlcv_frame: pl.DataFrame) -> None:
+        """symbol カラムが Categorical に変換されること。"""
+        compact, _ = compact_frame(ohlcv_frame)
+        assert compact.schema["symbol"] == pl.Categorical
+
+    def test_float64_becomes_float32(self, ohlcv_frame: pl.DataFrame) -> None:
+        """許容誤差内の Float64 カラムが Float32 に変換されること。"""
+        compact, reports = compact_frame(ohlcv_frame)
+        assert compact.schema["close"] == pl.Float32
+        close_report = next(r for r in reports if r.column == "close")
+        assert close_report.max_rel_error <= 1e-6
+
+    def test_datetime_normalized_to_microseconds(self, ohlcv_frame: pl.DataFrame) -> None:
+        """Datetime がマイクロ秒精度に統一されること。"""
+        compact, _ = compact_frame(ohlcv_frame)
+        assert compact.schema["datetime"] == pl.Datetime("us")
+
+    def test_integer_columns_unchanged(self, ohlcv_frame: pl.DataFrame) -> None:
+        """整数カラムは変換されないこと。"""
+        compact, reports = compact_frame(ohlcv_frame)
+        assert compact.schema["volume"] == pl.Int64
+        assert all(r.column != "volume" for r in reports)
+
+    def test_out_of_range_float_kept_as_float64(self) -> None:
+        """Float32 で表現できない値を含むカラムは Float64 のまま残ること。"""
+        df = pl.DataFrame({"turnover": [1e300, 1.0]})
+        compact, reports = compact_frame(df)
+        assert compact.schema["turnover"] == pl.Float64
+        assert reports == []
+
+    def test_decimal_reported_with_precision_loss(self) -> None:
+        """Decimal カラムの変換と精度損失がレポートされること。"""
+        df = pl.DataFrame({"open": pl.Series([Decimal("1234.5678")], dtype=pl.Decimal(10, 4))})
+        compact, reports = compact_frame(df)
+        assert compact.schema["open"] == pl.Float32
+        assert reports[0].original_dtype.startswith("Decimal")
+        assert reports[0].max_abs_error > 0
+
+    def test_tolerance_zero_keeps_lossy_columns(self) -> None:
+        """許容誤差 0 では損失のある Float64 カラムを変換しないこと。"""
+        df = pl.DataFrame({"close": [0.1]})
+        compact, _ = compact_frame(df, rel_tolerance=0.0)
+        assert compact.schema["close"] == pl.Float64
+
+
+class TestCompactParquet:
+    """compact_parquet のファイル書き換えテスト。"""
+
+    def test_rewrites_file(self, tmp_path: Path, ohlcv_frame: pl.DataFrame) -> None:
+        """parquet が compact プロファイルで書き換えられること。"""
+        path = tmp_path / "valid.parquet"
+        ohlcv_frame.write_parquet(path)
+
+        report = compact_parquet(path)
+
+        assert pl.read_parquet(path).schema["close"] == pl.Float32
+        assert report.rows == 3
+        assert report.bytes_after < report.bytes_before
+
+    def test_dry_run_does_not_modify(self, tmp_path: Path, ohlcv_frame: pl.DataFrame) -> None:
+        """dry_run 時はファイルを書き換えないこと。"""
+        path = tmp_path / "valid.parquet"
+        ohlcv_frame.write_parquet(path)
+
+        compact_parquet(path, dry_run=True)
+
+        assert pl.read_parquet(path).schema["close"] == pl.Float64
+
+    def test_raises_on_missing_file(self, tmp_path: Path) -> None:
+        """ファイルが存在しない場合に FileNotFoundError を送出すること。"""
+        with pytest.raises(FileNotFoundError):
+            compact_parquet(tmp_path / "missing.parquet")
+
+
+class TestCompactSplitOutputs:
+    """compact_split_outputs のテスト。"""
+
+    def test_default_splits_exclude_test(self, tmp_path: Path, ohlcv_frame: pl.DataFrame) -> None:
+        """デフォルトでは train/valid のみ変換し、test は変換しないこと。"""
+        ohlcv_dir = tmp_path / "ohlcv"
+        ohlcv_dir.mkdir()
+        for split in ("train", "valid", "test"):
+            ohlcv_frame.write_parquet(ohlcv_dir / f"{split}.parquet")
+
+        reports = compact_split_outputs(tmp_path, ["ohlcv"])
+
+        assert len(reports) == 2
+        assert pl.read_parquet(ohlcv_dir / "test.parquet").schema["close"] == pl.Float64
+
+    def test_writes_report_file(self, tmp_path: Path, ohlcv_frame: pl.DataFrame) -> None:
+        """レポートが JSON として書き出されること。"""
+        (tmp_path / "ohlcv").mkdir()
+        ohlcv_frame.write_parquet(tmp_path / "ohlcv" / "train.parquet")
+
+        compact_split_outputs(tmp_path, ["ohlcv", "missing"])
+
+        payload = json.loads((tmp_path / COMPACTION_REPORT_FILENAME).read_text())
+        assert len(payload) == 1
+        assert payload[0]["path"].endswith("train.parquet")
+
+
+class TestCompactCommand:
+    """qip data compact コマンドのテスト。"""
+
+    def test_compacts_split_files(self, mock_workspace_env: Path, ohlcv_frame: pl.DataFrame, tmp_path: Path) -> None:
+        """competition.toml のデータセットが変換されること。"""
+        from quant_insight_plus.cli import app
+
+        config = tmp_path / "competition.toml"
+        config.write_text(COMPETITION_TOML)
+        ohlcv_dir = mock_workspace_env / "data" / "inputs" / "ohlcv"
+        ohlcv_dir.mkdir(parents=True)
+        ohlcv_frame.write_parquet(ohlcv_dir / "train.parquet")
+
+        result = CliRunner().invoke(app, ["data", "compact", "--config", str(config)])
+
+        assert result.exit_code == 0, result.output
+        assert "symbol: String → Categorical" in result.output
+        assert pl.read_parquet(ohlcv_dir / "train.parquet").schema["symbol"] == pl.Categorical
+
+    def test_exits_when_no_split_files(self, tmp_path: Path) -> None:
+        """分割ファイルが無い場合に終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        config = tmp_path / "competition.toml"
+        config.write_text(COMPETITION_TOML)
+
+        result = CliRunner().invoke(app, ["data", "compact", "--config", str(config)])
+
+        assert result.exit_code == 1
@@ -0,0 +1,131 @@
+"""diversity モジュール（提出間のシグナル相関の要約）のテスト。"""
+
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from quant_insight_plus.diversity import (
+    DIVERSITY_FILENAME,
+    build_diversity_summary,
+    correlation_pairs,
+    render_diversity,
+    write_diversity_summary,
+)
+from quant_insight_plus.prompt_layout import build_artifacts_section
+from quant_insight_plus.runtime_config import DiversitySettings, SignalCacheSettings
+from quant_insight_plus.signal_cache import store_signals
+from quant_insight_plus.submission_relay import get_round_dir, write_round_diversity
+
+EXECUTION_ID = "exec-1"
+DATES = [datetime(2026, 1, d) for d in (5, 6, 7)]
+SYMBOLS = ["1301", "1332", "1333", "1334"]
+
+
+def _signals(values: list[float]) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "datetime": [d for d in DATES for _ in SYMBOLS],
+            "symbol": SYMBOLS * len(DATES),
+            "signal": values,
+        }
+    )
+
+
+BASE = [1.0, 2.0, 3.0, 4.0, 4.0, 3.0, 2.0, 1.0, 2.0, 1.0, 4.0, 3.0]
+SCALED = [v * 10 for v in BASE]
+INVERSE = [-v for v in BASE]
+
+
+@pytest.fixture
+def workspace(mock_workspace_env: Path) -> Path:
+    """同じ実行の 3 提出（うち 2 件は同じ順位）をキャッシュしたワークスペース。"""
+    inputs = mock_workspace_env / "data" / "inputs" / "ohlcv"
+    inputs.mkdir(parents=True)
+    (inputs / "test.parquet").write_bytes(b"test-data")
+    settings = SignalCacheSettings(enabled=True)
+    for round_number, (values, score) in enumerate([(BASE, 0.5), (SCALED, 0.6), (INVERSE, 0.1)], start=1):
+        store_signals(
+            mock_workspace_env,
+            f"# round {round_number}\n",
+            _signals(values),
+            execution_id=EXECUTION_ID,
+            team_id="team-a",
+            round_number=round_number,
+            score=score,
+            settings=settings,
+        )
+    return mock_workspace_env
+
+
+class TestCorrelationPairs:
+    """correlation_pairs のテスト。"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 8])
+    def test_chunking_does_not_change_result(self, chunk_size: int) -> None:
+        """chunk の大きさによらず同じ上三角のペアが求まること。"""
+        pairs = correlation_pairs([_signals(BASE), _signals(SCALED), _signals(INVERSE)], chunk_size)
+
+        assert pairs.select("member", "other").rows() == [(0, 1), (0, 2), (1, 2)]
+        assert pairs.get_column("correlation").to_list() == pytest.approx([1.0, -1.0, -1.0])
+        assert pairs.get_column("observations").to_list() == [12, 12, 12]
+
+    def test_constant_ranks_are_null(self) -> None:
+        """順位が一定の提出との相関は null になること。"""
+        pairs = correlation_pairs([_signals(BASE), _signals([1.0] * 12)], 8)
+
+        assert pairs.get_column("correlation").to_list() == [None]
+
+
+class TestSummary:
+    """build_diversity_summary / render_diversity のテスト。"""
+
+    def test_nearest_and_redundant_pairs(self, workspace: Path) -> None:
+        """最も相関の高い提出と冗長なペアが求まること。"""
+        summary = build_diversity_summary(workspace, EXECUTION_ID, DiversitySettings(enabled=True))
+
+        assert summary is not None
+        nearest = {(s.round_number, s.nearest_round) for s in summary.submissions}
+        assert nearest == {(1, 2), (2, 1), (3, 1)}
+        assert [(a, b) for a, b, _ in summary.redundant_pairs] == [(0, 1)]
+
+        text = render_diversity(summary)
+        assert "| team-a R2 | 0.6000 | team-a R1 | 1.00 |" in text
+        assert "- team-a R1 ↔ team-a R2: 1.00" in text
+
+    def test_max_submissions_keeps_top_scores(self, workspace: Path) -> None:
+        """max_submissions を超える場合はスコア上位を対象にすること。"""
+        summary = build_diversity_summary(workspace, EXECUTION_ID, DiversitySettings(max_submissions=2))
+
+        assert summary is not None
+        assert [s.round_number for s in summary.submissions] == [1, 2]
+
+    def test_other_execution_is_ignored(self, workspace: Path) -> None:
+        """別の実行の提出は対象にしないこと。"""
+        assert build_diversity_summary(workspace, "exec-other", DiversitySettings()) is None
+
+
+class TestRoundDirectory:
+    """ラウンドディレクトリへの書き出しのテスト。"""
+
+    def test_summary_is_embedded_in_artifacts(self, workspace: Path) -> None:
+        """diversity.md がワークスペースファイルとしてタスクに埋め込まれること。"""
+        round_dir = get_round_dir(workspace, 4)
+
+        path = write_diversity_summary(workspace, round_dir, EXECUTION_ID, DiversitySettings(enabled=True))
+
+        assert path == round_dir / DIVERSITY_FILENAME
+        assert f"### {DIVERSITY_FILENAME}" in build_artifacts_section(round_dir)
+
+    async def test_disabled_writes_nothing(self, workspace: Path) -> None:
+        """[diversity] 無効時は書き出さないこと。"""
+        await write_round_diversity(workspace, 4, execution_id=EXECUTION_ID, settings=DiversitySettings())
+
+        assert not (get_round_dir(workspace, 4) / DIVERSITY_FILENAME).exists()
+
+    async def test_enabled_writes_summary(self, workspace: Path) -> None:
+        """[diversity] 有効時はラウンド開始時の要約を書き出すこと。"""
+        await write_round_diversity(workspace, 4, execution_id=EXECUTION_ID, settings=DiversitySettings(enabled=True))
+
+        assert (get_round_dir(workspace, 4) / DIVERSITY_FILENAME).is_file()
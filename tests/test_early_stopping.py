@@ -0,0 +1,219 @@
+"""early_stopping モジュール（successive halving による早期打ち切り）のテスト。"""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import duckdb
+import pytest
+
+from quant_insight_plus.db import connect, get_db_path
+from quant_insight_plus.early_stopping import (
+    EXIT_REASON_ELIMINATED,
+    check_successive_halving,
+    decide_checkpoint,
+    elimination_from_score_details,
+    end_eliminated_round,
+    load_elimination,
+    rank_teams_at_checkpoint,
+    register_team,
+    select_survivors,
+)
+from quant_insight_plus.runtime_config import SuccessiveHalvingSettings, get_runtime_config_path
+
+SETTINGS = SuccessiveHalvingSettings(enabled=True, checkpoints=[2], keep_fraction=0.5)
+
+
+def _create_leader_board(db_path: Path, rows: list[tuple[str, int, float]]) -> None:
+    """leader_board の最小スキーマを作成する（mixseek-core の store 相当）。"""
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE leader_board (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, score DOUBLE)"
+    )
+    conn.executemany("INSERT INTO leader_board VALUES ('exec-1', ?, ?, ?)", rows)
+    conn.close()
+
+
+@pytest.fixture
+def four_teams(mock_workspace_env: Path) -> Path:
+    """ラウンド 2 まで到達した 4 チームと、ラウンド 1 のみの 1 チーム。"""
+    _create_leader_board(
+        get_db_path(mock_workspace_env),
+        [
+            ("team-a", 1, 0.9),
+            ("team-a", 2, 1.2),
+            ("team-b", 1, 0.5),
+            ("team-b", 2, -100.0),
+            ("team-c", 1, 0.1),
+            ("team-c", 2, 0.2),
+            ("team-d", 1, 0.7),
+            ("team-d", 2, 0.3),
+            ("team-e", 1, 2.0),
+        ],
+    )
+    return mock_workspace_env
+
+
+class TestRanking:
+    """rank_teams_at_checkpoint / select_survivors のテスト。"""
+
+    def test_ranks_teams_reaching_checkpoint_by_best_score(self, four_teams: Path) -> None:
+        """チェックポイント到達済みのチームのみ、最高スコア順に並ぶこと。"""
+        conn = connect(get_db_path(four_teams))
+        ranking = rank_teams_at_checkpoint(conn, "exec-1", 2)
+        conn.close()
+
+        assert ranking == [("team-a", 1.2), ("team-d", 0.7), ("team-b", 0.5), ("team-c", 0.2)]
+
+    def test_keeps_top_fraction(self) -> None:
+        """上位 keep_fraction のチームが残ること。"""
+        ranking = [("a", 3.0), ("b", 2.0), ("c", 1.0)]
+        assert select_survivors(ranking, SETTINGS) == {"a", "b"}
+
+    def test_keeps_all_when_too_few_compared(self) -> None:
+        """比較対象が min_compared 未満の場合は全チームが残ること。"""
+        assert select_survivors([("a", 1.0)], SETTINGS) == {"a"}
+
+    def test_min_teams(self) -> None:
+        """min_teams 以上のチームが残ること。"""
+        settings = SuccessiveHalvingSettings(enabled=True, keep_fraction=0.1, min_teams=2)
+        assert select_survivors([("a", 3.0), ("b", 2.0), ("c", 1.0)], settings) == {"a", "b"}
+
+
+class TestCheckSuccessiveHalving:
+    """check_successive_halving のテスト。"""
+
+    @staticmethod
+    def _register(workspace: Path, *team_ids: str) -> None:
+        for team_id in team_ids:
+            register_team(workspace, "exec-1", team_id)
+
+    async def test_bottom_team_is_eliminated(self, four_teams: Path) -> None:
+        """全チームがチェックポイントに到達している場合、下位チームは打ち切られること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+
+        elimination = await check_successive_halving(four_teams, "exec-1", "team-c", 3, SETTINGS)
+
+        assert elimination is not None
+        assert (elimination.rank, elimination.teams, elimination.round_number) == (4, 4, 3)
+        assert "team-c" in elimination.message
+
+    async def test_top_team_continues(self, four_teams: Path) -> None:
+        """上位チームは継続すること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+
+        assert await check_successive_halving(four_teams, "exec-1", "team-d", 3, SETTINGS) is None
+
+    async def test_only_at_checkpoints(self, four_teams: Path) -> None:
+        """チェックポイント以外のラウンドでは判定しないこと。"""
+        assert await check_successive_halving(four_teams, "exec-1", "team-c", 4, SETTINGS) is None
+
+    async def test_waits_for_every_live_team(self, four_teams: Path) -> None:
+        """未到達のチームがある間は判定せず、全チームの到達後に全チームで順位付けすること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d", "team-e")
+        settings = SETTINGS.model_copy(update={"cohort_timeout_seconds": 30.0})
+        task = asyncio.create_task(
+            check_successive_halving(four_teams, "exec-1", "team-d", 3, settings, poll_interval=0.01)
+        )
+        await asyncio.sleep(0.1)
+        assert not task.done()
+
+        conn = duckdb.connect(str(get_db_path(four_teams)))
+        conn.execute("INSERT INTO leader_board VALUES ('exec-1', 'team-e', 2, 0.0)")
+        conn.close()
+        elimination = await asyncio.wait_for(task, timeout=5)
+
+        # team-e（最高 2.0）を含む 5 チーム中 3 位で、上位 ceil(5 × 0.5) = 3 に残る
+        assert elimination is None
+        decision = decide_checkpoint(four_teams, "exec-1", 2, settings)
+        assert decision is not None and decision.complete
+        assert decision.survivors == ["team-e", "team-a", "team-d"]
+
+    async def test_timeout_decides_with_reached_teams(self, four_teams: Path) -> None:
+        """cohort_timeout_seconds を超えた場合は到達済みのチームで判定すること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d", "team-e")
+        settings = SETTINGS.model_copy(update={"cohort_timeout_seconds": 0.05})
+
+        elimination = await check_successive_halving(four_teams, "exec-1", "team-c", 3, settings, poll_interval=0.01)
+
+        assert elimination is not None and elimination.teams == 4
+        decision = decide_checkpoint(four_teams, "exec-1", 2, settings)
+        assert decision is not None and not decision.complete
+
+    async def test_decision_is_shared_and_late_team_uses_cutoff(self, four_teams: Path) -> None:
+        """判定は到着順に依らず共有され、判定後に到達したチームは残ったチームの最低スコアと比較されること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+        assert await check_successive_halving(four_teams, "exec-1", "team-a", 3, SETTINGS) is None
+
+        conn = duckdb.connect(str(get_db_path(four_teams)))
+        conn.execute("INSERT INTO leader_board VALUES ('exec-1', 'team-f', 1, 0.6), ('exec-1', 'team-f', 2, 0.0)")
+        conn.execute("INSERT INTO leader_board VALUES ('exec-1', 'team-e', 2, 0.0)")
+        conn.close()
+
+        # 残ったチームは team-a (1.2), team-d (0.7): 0.6 は打ち切り、2.0 は継続
+        late = await check_successive_halving(four_teams, "exec-1", "team-f", 3, SETTINGS)
+        assert late is not None and late.rank is None
+        assert await check_successive_halving(four_teams, "exec-1", "team-e", 3, SETTINGS) is None
+        assert await check_successive_halving(four_teams, "exec-1", "team-b", 3, SETTINGS) is not None
+
+    async def test_eliminated_team_stays_eliminated(self, four_teams: Path) -> None:
+        """打ち切られたチームは以降のラウンドでも同じ記録が返ること。"""
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+        first = await check_successive_halving(four_teams, "exec-1", "team-c", 3, SETTINGS)
+
+        assert await check_successive_halving(four_teams, "exec-1", "team-c", 4, SETTINGS) == first
+        assert load_elimination(four_teams, "exec-1", "team-c") == first
+
+    async def test_eliminated_team_is_not_ranked_again(self, four_teams: Path) -> None:
+        """打ち切ったラウンドを leader_board に記録したチームは、以降のチェックポイントで順位付けされないこと。"""
+        settings = SETTINGS.model_copy(update={"checkpoints": [2, 3]})
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+        assert await check_successive_halving(four_teams, "exec-1", "team-c", 3, settings) is not None
+
+        conn = duckdb.connect(str(get_db_path(four_teams)))
+        conn.execute(
+            "INSERT INTO leader_board VALUES "
+            "('exec-1', 'team-a', 3, 1.0), ('exec-1', 'team-d', 3, 0.1), ('exec-1', 'team-c', 3, -100.0)"
+        )
+        conn.close()
+        decision = decide_checkpoint(four_teams, "exec-1", 3, settings, force=True)
+
+        assert decision is not None
+        assert [team_id for team_id, _ in decision.ranking] == ["team-a", "team-d"]
+
+    async def test_disabled_without_runtime_config(self, four_teams: Path) -> None:
+        """runtime.toml が無い場合は打ち切らないこと。"""
+        assert await check_successive_halving(four_teams, "exec-1", "team-c", 3) is None
+
+    async def test_reads_runtime_config(self, four_teams: Path) -> None:
+        """runtime.toml の [successive_halving] が使用されること。"""
+        path = get_runtime_config_path(four_teams)
+        path.parent.mkdir(parents=True)
+        path.write_text("[successive_halving]\nenabled = true\ncheckpoints = [2]\nkeep_fraction = 0.25\n")
+        self._register(four_teams, "team-a", "team-b", "team-c", "team-d")
+
+        assert await check_successive_halving(four_teams, "exec-1", "team-d", 3) is not None
+
+
+class TestEndEliminatedRound:
+    """end_eliminated_round のテスト。"""
+
+    async def test_persists_terminal_round(self, four_teams: Path) -> None:
+        """打ち切ったラウンドを leader_board と round_status に終了済みとして記録すること。"""
+        register_team(four_teams, "exec-1", "team-c")
+        elimination = await check_successive_halving(four_teams, "exec-1", "team-c", 3, SETTINGS)
+        assert elimination is not None
+        controller = MagicMock()
+        controller.workspace = four_teams
+        controller.task.execution_id = "exec-1"
+        controller.team_config.team_id = "team-c"
+        controller.store = AsyncMock()
+
+        state = await end_eliminated_round(controller, 4, elimination, -100.0)
+
+        board = controller.store.save_to_leader_board.call_args.kwargs
+        assert (board["round_number"], board["score"], board["exit_reason"]) == (4, -100.0, EXIT_REASON_ELIMINATED)
+        status = controller.store.save_round_status.call_args.kwargs
+        assert (status["round_number"], status["should_continue"]) == (4, False)
+        assert status["reasoning"] == elimination.message
+        assert elimination_from_score_details(state.score_details) == elimination
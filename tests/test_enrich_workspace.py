@@ -7,6 +7,7 @@ _enrich_task_with_workspace_context の受け入れ基準を独立テストで
 - 空白のみファイルの素通り
 - 単一ファイル埋め込み
 - 複数ファイル埋め込み
+- タスクをプロンプト末尾に配置（プロンプトキャッシュ用）
 - サブディレクトリのスキップ（ファイルのみ埋め込み）
 - MIXSEEK_WORKSPACE 未設定時の RuntimeError
 """
@@ -93,7 +94,7 @@ class TestEnrichTaskWithWorkspaceContext:
 
         result = agent._enrich_task_with_workspace_context("original task")
 
-        assert result.startswith("original task")
+        assert result.endswith("original task")
         assert "ワークスペースファイル" in result
         assert "### analysis.md" in result
         assert "# Analysis Report" in result
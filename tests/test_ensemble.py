@@ -0,0 +1,242 @@
+"""ensemble モジュール（上位提出の順位平均アンサンブル）のテスト。"""
+
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.db import get_db_path
+from quant_insight_plus.ensemble import (
+    WEIGHTING_SCORE,
+    blend_signals,
+    compute_signals,
+    extract_code,
+    run_ensemble,
+    score_signals,
+    select_submissions,
+)
+from quant_insight_plus.leaderboard import load_standings
+from quant_insight_plus.runtime_config import SignalCacheSettings, get_runtime_config_path
+from quant_insight_plus.signal_cache import store_signals
+
+EXECUTION_ID = "exec-1"
+DATES = [datetime(2026, 1, d) for d in (5, 6, 7)]
+SYMBOLS = ["1301", "1332", "1333"]
+
+# 当日の値幅（close - open）を返す
+MOMENTUM_CODE = """\
+import polars as pl
+
+
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol", (pl.col("close") - pl.col("open")).alias("signal"))
+"""
+
+# 銘柄コードの逆順を返す
+REVERSAL_CODE = """\
+import polars as pl
+
+
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol", (-pl.col("symbol").cast(pl.Int64)).alias("signal"))
+"""
+
+
+def _content(code: str) -> str:
+    return f"```python\n{code}\n```"
+
+
+def _signals(values: list[float], dates: list[datetime] | None = None) -> pl.DataFrame:
+    dates = dates or DATES[:1]
+    return pl.DataFrame(
+        {
+            "datetime": [d for d in dates for _ in SYMBOLS],
+            "symbol": SYMBOLS * len(dates),
+            "signal": values,
+        }
+    )
+
+
+@pytest.fixture
+def workspace(mock_workspace_env: Path) -> Path:
+    """評価データと leader_board を配置したワークスペース。"""
+    inputs = mock_workspace_env / "data" / "inputs"
+    (inputs / "ohlcv").mkdir(parents=True)
+    (inputs / "returns").mkdir(parents=True)
+    pl.DataFrame(
+        {
+            "datetime": [d for d in DATES for _ in SYMBOLS],
+            "symbol": SYMBOLS * len(DATES),
+            "open": [100.0, 100.0, 100.0] * len(DATES),
+            "close": [101.0, 103.0, 102.0, 99.0, 104.0, 100.5, 102.0, 101.0, 103.0],
+        }
+    ).write_parquet(inputs / "ohlcv" / "test.parquet")
+    pl.DataFrame(
+        {
+            "datetime": [d for d in DATES for _ in SYMBOLS],
+            "symbol": SYMBOLS * len(DATES),
+            "return_value": [0.01, 0.03, 0.02, -0.01, 0.04, 0.005, 0.02, 0.01, 0.03],
+        }
+    ).write_parquet(inputs / "returns" / "test.parquet")
+
+    conn = duckdb.connect(str(get_db_path(mock_workspace_env)))
+    conn.execute(
+        "CREATE TABLE leader_board (execution_id VARCHAR, team_id VARCHAR, team_name VARCHAR, "
+        "round_number INTEGER, submission_content VARCHAR, score DOUBLE)"
+    )
+    conn.executemany(
+        "INSERT INTO leader_board VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (EXECUTION_ID, "team-a", "A", 1, _content(MOMENTUM_CODE), 0.8),
+            (EXECUTION_ID, "team-a", "A", 2, _content(MOMENTUM_CODE), 0.7),
+            (EXECUTION_ID, "team-a", "A", 3, _content(REVERSAL_CODE), 0.6),
+            (EXECUTION_ID, "team-b", "B", 1, _content("x = 1\n"), -100.0),
+        ],
+    )
+    conn.close()
+    return mock_workspace_env
+
+
+class TestSelectSubmissions:
+    """select_submissions / extract_code のテスト。"""
+
+    def test_extract_code_round_trips_submission_content(self) -> None:
+        """get_submission_content() 形式から submission.py のコードを取り出せること。"""
+        assert extract_code(_content(MOMENTUM_CODE)) == MOMENTUM_CODE
+
+    def test_skips_duplicate_code_and_errors(self, workspace: Path) -> None:
+        """同一コードの提出とエラーの提出を除き、スコア降順に選ぶこと。"""
+        selected = select_submissions(workspace, EXECUTION_ID, 5)
+
+        assert [(m.team_id, m.round_number) for m, _ in selected] == [("team-a", 1), ("team-a", 3)]
+        assert selected[0][1] == MOMENTUM_CODE
+
+    def test_per_team(self, workspace: Path) -> None:
+        """per_team 指定時は各チームの最高スコアの提出のみを選ぶこと。"""
+        selected = select_submissions(workspace, EXECUTION_ID, 5, per_team=True)
+
+        assert [(m.team_id, m.round_number) for m, _ in selected] == [("team-a", 1)]
+
+
+class TestBlendAndScore:
+    """blend_signals / score_signals のテスト。"""
+
+    def test_rank_average(self) -> None:
+        """提出ごとの断面順位（件数で正規化）の平均になること。"""
+        blended = blend_signals([_signals([1.0, 2.0, 3.0]), _signals([30.0, 20.0, 10.0])], [1.0, 1.0])
+
+        assert blended.get_column("signal").to_list() == pytest.approx([2 / 3, 2 / 3, 2 / 3])
+
+    def test_weights_and_missing_values(self) -> None:
+        """重みで加重し、NaN のシグナルはその提出から除外すること。"""
+        blended = blend_signals([_signals([1.0, 2.0, 3.0]), _signals([float("nan"), 20.0, 10.0])], [3.0, 1.0])
+
+        assert blended.get_column("signal").to_list() == pytest.approx(
+            [1 / 3, (3 * 2 / 3 + 1.0) / 4, (3 * 1.0 + 1 / 2) / 4]
+        )
+
+    def test_spearman_sharpe(self) -> None:
+        """日時ごとの Spearman 順位相関の平均 / 標準偏差になること。"""
+        returns = _signals([0.1, 0.2, 0.3, 0.1, 0.2, 0.3], DATES[:2]).rename({"signal": "return_value"})
+        signals = _signals([1.0, 2.0, 3.0, 1.0, 3.0, 2.0], DATES[:2])
+
+        score = score_signals(signals, returns)
+
+        assert score.iterations == 2
+        assert score.mean_correlation == pytest.approx(0.75)
+        assert score.sharpe_ratio == pytest.approx(0.75 / score.std_correlation)
+
+    def test_single_iteration_scores_zero(self) -> None:
+        """有効な日時が 1 件の場合はシャープレシオ 0.0 になること。"""
+        returns = _signals([0.1, 0.2, 0.3]).rename({"signal": "return_value"})
+
+        score = score_signals(_signals([1.0, 2.0, 3.0]), returns)
+
+        assert (score.sharpe_ratio, score.std_correlation) == (0.0, None)
+
+    def test_no_valid_iteration_raises(self) -> None:
+        """有効な日時が無い場合は ValueError になること。"""
+        returns = _signals([0.1, None, None]).rename({"signal": "return_value"})
+
+        with pytest.raises(ValueError, match="有効な相関"):
+            score_signals(_signals([1.0, 2.0, 3.0]), returns)
+
+
+class TestRunEnsemble:
+    """compute_signals / run_ensemble のテスト。"""
+
+    def test_compute_signals_uses_current_rows(self, workspace: Path) -> None:
+        """日時ごとに当該日時の行のみを採ること。"""
+        signals = compute_signals(workspace, MOMENTUM_CODE)
+
+        assert signals.height == len(DATES) * len(SYMBOLS)
+        assert signals.get_column("signal").to_list()[:3] == pytest.approx([1.0, 3.0, 2.0])
+
+    def test_records_synthetic_standing(self, workspace: Path) -> None:
+        """結果が合成エントリとしてリーダーボードに記録されること。"""
+        result = run_ensemble(workspace, EXECUTION_ID, top_k=2, jobs=1)
+
+        assert result.team_id == "ensemble-top2-equal"
+        assert result.signal_path.is_file()
+        [standing] = load_standings(workspace, EXECUTION_ID)
+        assert (standing.team_id, standing.best_round) == (result.team_id, 0)
+        assert standing.best_score == pytest.approx(result.score.sharpe_ratio)
+
+    def test_uses_cached_signals(self, workspace: Path) -> None:
+        """シグナルキャッシュにある提出は計算せずに読み込むこと。"""
+        store_signals(
+            workspace,
+            MOMENTUM_CODE,
+            compute_signals(workspace, MOMENTUM_CODE),
+            execution_id=EXECUTION_ID,
+            team_id="team-a",
+            round_number=1,
+            score=0.8,
+            settings=SignalCacheSettings(enabled=True),
+        )
+
+        result = run_ensemble(workspace, EXECUTION_ID, top_k=2, weighting=WEIGHTING_SCORE, jobs=1)
+
+        assert [m.cached for m in result.members] == [True, False]
+        assert [m.weight for m in result.members] == [0.8, 0.6]
+
+    def test_computed_signals_are_cached_when_enabled(self, workspace: Path) -> None:
+        """[signal_cache] が有効な場合、計算したシグナルをキャッシュに保存すること。"""
+        path = get_runtime_config_path(workspace)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("[signal_cache]\nenabled = true\n")
+
+        run_ensemble(workspace, EXECUTION_ID, top_k=1, jobs=1)
+        result = run_ensemble(workspace, EXECUTION_ID, top_k=1, jobs=1)
+
+        assert result.members[0].cached
+
+    def test_invalid_weighting_raises(self, workspace: Path) -> None:
+        """不正な重み付けは ValueError になること。"""
+        with pytest.raises(ValueError, match="重み付け"):
+            run_ensemble(workspace, EXECUTION_ID, top_k=2, weighting="median")
+
+
+class TestEnsembleCommand:
+    """qip ensemble コマンドのテスト。"""
+
+    def test_shows_result(self, workspace: Path) -> None:
+        """採用した提出とスコアが表示されること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["ensemble", EXECUTION_ID, "--top", "2", "--jobs", "1"])
+
+        assert result.exit_code == 0, result.output
+        assert "アンサンブル: ensemble-top2-equal" in result.output
+        assert "team-a round 3" in result.output
+
+    def test_without_submissions_exits(self, workspace: Path) -> None:
+        """対象の提出が無い場合は終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["ensemble", "exec-missing"])
+
+        assert result.exit_code == 1
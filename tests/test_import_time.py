@@ -0,0 +1,66 @@
+"""CLI 起動時のインポート予算のテスト。
+
+``qip --version`` や ``import quant_insight_plus`` で重い依存
+（mixseek-core, mixseek-plus, claudecode-model, quant-insight, pydantic-ai）を
+インポートしないこと、累積インポート時間が予算内であることを検証する。
+計測はインポート済みモジュールの影響を受けないよう、新しいサブプロセスで行う。
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# --- 名前付き定数 ---
+# 累積インポート時間の予算（マイクロ秒）。pydantic を含む軽量依存のみの想定
+IMPORT_TIME_BUDGET_US = 1_000_000
+HEAVY_PACKAGES = ("mixseek", "mixseek_plus", "claudecode_model", "quant_insight", "pydantic_ai")
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """``-X importtime`` でステートメントを実行し、モジュールごとの累積時間を返す。"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        times[name] = int(cumulative)
+    return times
+
+
+def _heavy_modules(times: dict[str, int]) -> list[str]:
+    return sorted(name for name in times if name.split(".")[0] in HEAVY_PACKAGES)
+
+
+class TestImportBudget:
+    """インポート予算のテスト。"""
+
+    @pytest.mark.parametrize("module", ["quant_insight_plus", "quant_insight_plus.cli"])
+    def test_import_skips_heavy_dependencies(self, module: str) -> None:
+        """パッケージ・CLI モジュールのインポートで重い依存を読み込まないこと。"""
+        times = _import_times(f"import {module}")
+
+        assert _heavy_modules(times) == []
+        assert times[module] < IMPORT_TIME_BUDGET_US
+
+    def test_version_skips_heavy_dependencies(self) -> None:
+        """qip --version で重い依存を読み込まないこと。"""
+        times = _import_times(
+            "import sys; sys.argv = ['qip', '--version']\n"
+            "from quant_insight_plus.cli import main\n"
+            "try:\n    main()\nexcept SystemExit:\n    pass"
+        )
+
+        assert _heavy_modules(times) == []
+
+    def test_library_attribute_is_resolved_lazily(self) -> None:
+        """ライブラリとしての属性参照時にのみエージェントモジュールを読み込むこと。"""
+        times = _import_times("import quant_insight_plus; quant_insight_plus.FileSubmitterOutput")
+
+        assert "quant_insight_plus.agents.agent" not in times
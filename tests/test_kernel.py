@@ -0,0 +1,310 @@
+"""kernel モジュール（常駐 Python カーネル）のテスト。
+
+- load_kernel_settings: Member Agent TOML からの設定構築
+- KernelServer: セッションごとの名前空間分離・永続化・タイムアウト
+- parquet キャッシュ: available_data_paths の事前ロード
+- run_in_kernel: Unix ソケット経由の往復
+- team_session / with_session: チーム・メンバーごとのセッション ID
+"""
+
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from quant_insight_plus.kernel import (
+    TIMEOUT_EXIT_CODE,
+    KernelRequest,
+    KernelServer,
+    KernelSettings,
+    _execute_script,
+    get_default_socket_path,
+    load_kernel_settings,
+    member_session_id,
+    run_in_kernel,
+    serve,
+    team_session,
+    with_session,
+)
+
+MEMBER_TOML = """\
+[agent]
+type = "claudecode_local_code_executor"
+name = "train-analyzer"
+model = "claudecode:claude-opus-4-6"
+
+[agent.metadata.tool_settings.local_code_executor]
+available_data_paths = ["data/inputs/ohlcv/train.parquet"]
+timeout_seconds = 42
+"""
+
+
+@pytest.fixture
+def settings(tmp_path: Path) -> KernelSettings:
+    """事前ロードなしの軽量カーネル設定。"""
+    return KernelSettings(socket_path=str(tmp_path / "kernel.sock"), timeout_seconds=5, preload_modules=[])
+
+
+@pytest.fixture
+def kernel(settings: KernelSettings) -> Iterator[KernelServer]:
+    """テスト用 KernelServer。"""
+    server = KernelServer(settings)
+    yield server
+    server.shutdown()
+
+
+def _write_script(directory: Path, name: str, code: str) -> str:
+    (directory / name).write_text(code)
+    return name
+
+
+class TestLoadKernelSettings:
+    """load_kernel_settings のテスト。"""
+
+    def test_reads_executor_settings(self, tmp_path: Path) -> None:
+        """available_data_paths と timeout_seconds を引き継ぐこと。"""
+        config = tmp_path / "member.toml"
+        config.write_text(MEMBER_TOML)
+
+        settings = load_kernel_settings(config, tmp_path)
+
+        assert settings.timeout_seconds == 42
+        assert settings.data_paths == [str((tmp_path / "data/inputs/ohlcv/train.parquet").resolve())]
+        assert settings.socket_path == str(get_default_socket_path(tmp_path))
+
+
+class TestKernelServer:
+    """KernelServer のテスト。"""
+
+    def test_executes_script_and_captures_output(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """スクリプトの標準出力と終了コードを返すこと。"""
+        script = _write_script(tmp_path, "hello.py", "print('hello')")
+
+        response = kernel.handle(KernelRequest(script=script, cwd=str(tmp_path)))
+
+        assert response.stdout == "hello\n"
+        assert response.exit_code == 0
+
+    def test_namespace_persists_within_session(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """同一セッション内では名前空間が保持されること。"""
+        _write_script(tmp_path, "set.py", "value = 41")
+        _write_script(tmp_path, "get.py", "print(value + 1)")
+
+        kernel.handle(KernelRequest(session="s1", script="set.py", cwd=str(tmp_path)))
+        response = kernel.handle(KernelRequest(session="s1", script="get.py", cwd=str(tmp_path)))
+
+        assert response.stdout == "42\n"
+
+    def test_sessions_are_isolated(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """異なるセッション間で名前空間が共有されないこと。"""
+        _write_script(tmp_path, "set.py", "value = 41")
+        _write_script(tmp_path, "get.py", "print(value)")
+
+        kernel.handle(KernelRequest(session="s1", script="set.py", cwd=str(tmp_path)))
+        response = kernel.handle(KernelRequest(session="s2", script="get.py", cwd=str(tmp_path)))
+
+        assert response.exit_code == 1
+        assert "NameError" in response.stderr
+
+    def test_exception_returns_traceback(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """例外発生時にトレースバックと終了コード 1 を返すこと。"""
+        script = _write_script(tmp_path, "fail.py", "raise ValueError('boom')")
+
+        response = kernel.handle(KernelRequest(script=script, cwd=str(tmp_path)))
+
+        assert response.exit_code == 1
+        assert "ValueError: boom" in response.stderr
+
+    def test_sys_exit_code_propagates(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """sys.exit() の終了コードが返ること。"""
+        script = _write_script(tmp_path, "exit.py", "import sys\nsys.exit(3)")
+
+        response = kernel.handle(KernelRequest(script=script, cwd=str(tmp_path)))
+
+        assert response.exit_code == 3
+
+    def test_argv_is_passed(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """スクリプト引数が sys.argv に設定されること。"""
+        script = _write_script(tmp_path, "argv.py", "import sys\nprint(sys.argv[1:])")
+
+        response = kernel.handle(KernelRequest(script=script, argv=["a", "b"], cwd=str(tmp_path)))
+
+        assert response.stdout == "['a', 'b']\n"
+
+    def test_imports_sibling_module_like_python(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """スクリプトと同じディレクトリのモジュールを import でき、編集後は読み込み直されること。"""
+        scripts = tmp_path / "scripts"
+        scripts.mkdir()
+        (scripts / "helper.py").write_text("VALUE = 1\n")
+        _write_script(scripts, "main.py", "import helper\nprint(helper.VALUE)")
+
+        first = kernel.handle(KernelRequest(session="s1", script="scripts/main.py", cwd=str(tmp_path)))
+        (scripts / "helper.py").write_text("VALUE = 2\n")
+        second = kernel.handle(KernelRequest(session="s1", script="scripts/main.py", cwd=str(tmp_path)))
+
+        assert (first.stdout, second.stdout) == ("1\n", "2\n")
+
+    def test_restores_interpreter_state(self, tmp_path: Path) -> None:
+        """実行後に sys.path / sys.argv / カレントディレクトリを戻し、補助モジュールを sys.modules から除くこと。"""
+        (tmp_path / "qip_test_helper.py").write_text("VALUE = 1\n")
+        script = _write_script(tmp_path, "main.py", "import qip_test_helper\nprint(qip_test_helper.VALUE)")
+        before = (list(sys.path), sys.argv, os.getcwd())
+
+        response = _execute_script(KernelRequest(script=script, argv=["x"], cwd=str(tmp_path)), {})
+
+        assert response.stdout == "1\n"
+        assert (list(sys.path), sys.argv, os.getcwd()) == before
+        assert "qip_test_helper" not in sys.modules
+
+    def test_runs_module_like_python_m(self, kernel: KernelServer, tmp_path: Path) -> None:
+        """module 指定時は python -m と同様にモジュールを __main__ として実行すること。"""
+        package = tmp_path / "qip_test_pkg"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "__main__.py").write_text("import sys\nprint(__name__, sys.argv[1:])")
+
+        response = kernel.handle(
+            KernelRequest(script="qip_test_pkg", argv=["proxy-score", "submission.py"], cwd=str(tmp_path), module=True)
+        )
+
+        assert response.exit_code == 0, response.stderr
+        assert response.stdout == "__main__ ['proxy-score', 'submission.py']\n"
+
+    def test_timeout_kills_session(self, settings: KernelSettings, tmp_path: Path) -> None:
+        """タイムアウト時に終了コード 124 を返し、セッションを破棄すること。"""
+        server = KernelServer(settings.model_copy(update={"timeout_seconds": 1}))
+        try:
+            _write_script(tmp_path, "set.py", "value = 1")
+            _write_script(tmp_path, "sleep.py", "import time\ntime.sleep(30)")
+            _write_script(tmp_path, "get.py", "print(value)")
+            server.handle(KernelRequest(session="s", script="set.py", cwd=str(tmp_path)))
+
+            started = time.monotonic()
+            response = server.handle(KernelRequest(session="s", script="sleep.py", cwd=str(tmp_path)))
+
+            assert response.exit_code == TIMEOUT_EXIT_CODE
+            assert time.monotonic() - started < 10
+            after = server.handle(KernelRequest(session="s", script="get.py", cwd=str(tmp_path)))
+            assert "NameError" in after.stderr
+        finally:
+            server.shutdown()
+
+
+class TestParquetCache:
+    """available_data_paths の事前ロードテスト。"""
+
+    def test_read_parquet_returns_preloaded_frame(self, tmp_path: Path) -> None:
+        """事前ロード済みパスの read_parquet がキャッシュを返すこと。"""
+        data_path = tmp_path / "train.parquet"
+        pl.DataFrame({"x": [1, 2, 3]}).write_parquet(data_path)
+        settings = KernelSettings(
+            socket_path=str(tmp_path / "kernel.sock"),
+            data_paths=[str(data_path)],
+            preload_modules=["polars"],
+        )
+        server = KernelServer(settings)
+        try:
+            # 事前ロード後にファイルを削除しても読めること = キャッシュから返っている
+            server.handle(KernelRequest(script=_write_script(tmp_path, "noop.py", "pass"), cwd=str(tmp_path)))
+            data_path.unlink()
+            code = "import polars as pl\nprint(pl.read_parquet('train.parquet').height)"
+            script = _write_script(tmp_path, "read.py", code)
+
+            response = server.handle(KernelRequest(script=script, cwd=str(tmp_path)))
+
+            assert response.stdout == "3\n", response.stderr
+        finally:
+            server.shutdown()
+
+
+def _start_service(settings: KernelSettings) -> Path:
+    thread = threading.Thread(target=serve, args=(settings,), daemon=True)
+    thread.start()
+    socket_path = Path(settings.socket_path)
+    deadline = time.monotonic() + 10
+    while not socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return socket_path
+
+
+class TestSocketRoundTrip:
+    """serve / run_in_kernel の往復テスト。"""
+
+    def test_run_in_kernel_via_socket(self, settings: KernelSettings, tmp_path: Path) -> None:
+        """ソケット経由でスクリプトを実行できること。"""
+        socket_path = _start_service(settings)
+        script = _write_script(tmp_path, "hello.py", "print('via socket')")
+
+        response = run_in_kernel(socket_path, script, cwd=tmp_path)
+
+        assert response.stdout == "via socket\n"
+
+    def test_raises_when_service_not_running(self, tmp_path: Path) -> None:
+        """サービス未起動時に FileNotFoundError を送出すること。"""
+        with pytest.raises(FileNotFoundError, match="qip kernel serve"):
+            run_in_kernel(tmp_path / "missing.sock", "script.py")
+
+    def test_exec_command_passes_script_flags(self, settings: KernelSettings, tmp_path: Path) -> None:
+        """qip kernel exec がスクリプトの --flag 形式の引数をそのまま渡すこと。"""
+        from typer.testing import CliRunner
+
+        from quant_insight_plus.cli import app
+
+        socket_path = _start_service(settings)
+        _write_script(tmp_path, "args.py", "import sys\nprint(sys.argv[1:])")
+
+        result = CliRunner().invoke(
+            app,
+            ["kernel", "exec", str(tmp_path / "args.py"), "--verbose", "-n", "3", "--socket", str(socket_path)],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "['--verbose', '-n', '3']" in result.output
+
+    def test_exec_command_runs_module(
+        self, settings: KernelSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """qip kernel exec -m がモジュール名以降の引数をモジュールに渡すこと。"""
+        from typer.testing import CliRunner
+
+        from quant_insight_plus.cli import app
+
+        socket_path = _start_service(settings)
+        package = tmp_path / "qip_test_cli_pkg"
+        package.mkdir()
+        (package / "__main__.py").write_text("import sys\nprint(sys.argv[1:])")
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(
+            app, ["kernel", "exec", "--socket", str(socket_path), "-m", "qip_test_cli_pkg", "run", "--full"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "['run', '--full']" in result.output
+
+
+class TestTeamSession:
+    """team_session / member_session_id / with_session のテスト。"""
+
+    def test_session_is_scoped_per_team_and_member(self) -> None:
+        """チーム・メンバーごとに異なるセッション ID になり、ラウンド外では None であること。"""
+        with team_session("team-a"):
+            first = member_session_id("train-analyzer")
+            other_member = member_session_id("submission-creator")
+        with team_session("team-b"):
+            other_team = member_session_id("train-analyzer")
+
+        assert len({first, other_member, other_team}) == 3
+        assert member_session_id("train-analyzer") is None
+
+    def test_with_session_only_for_kernel_command(self) -> None:
+        """qip kernel exec のコマンドのみ QIP_KERNEL_SESSION を付加すること。"""
+        assert with_session("uv run qip kernel exec", "team-a.x") == (
+            "env QIP_KERNEL_SESSION=team-a.x uv run qip kernel exec"
+        )
+        assert with_session("uv run python", "team-a.x") == "uv run python"
@@ -0,0 +1,152 @@
+"""leaderboard モジュール（チーム別最高スコアとスナップショット）のテスト。"""
+
+from pathlib import Path
+
+import duckdb
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.db import get_db_path
+from quant_insight_plus.leaderboard import (
+    BEST_SCORES_TABLE,
+    LEADER_BOARD_INDEX,
+    get_snapshot_path,
+    latest_snapshot_execution_id,
+    load_standings,
+    refresh_leaderboard,
+)
+
+EXECUTION_ID = "exec-1"
+
+
+def _insert(db_path: Path, rows: list[tuple[str, str, int, float]]) -> None:
+    """leader_board（mixseek-core の store 相当の最小スキーマ）に行を追加する。"""
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leader_board "
+        "(execution_id VARCHAR, team_id VARCHAR, team_name VARCHAR, round_number INTEGER, score DOUBLE)"
+    )
+    conn.executemany(
+        "INSERT INTO leader_board VALUES (?, ?, ?, ?, ?)",
+        [(execution_id, team_id, team_id.upper(), n, score) for execution_id, team_id, n, score in rows],
+    )
+    conn.close()
+
+
+@pytest.fixture
+def db_path(mock_workspace_env: Path) -> Path:
+    """team-a が 3 ラウンド、team-b が 1 ラウンド完了した DuckDB。"""
+    path = get_db_path(mock_workspace_env)
+    _insert(
+        path,
+        [
+            (EXECUTION_ID, "team-a", 1, 0.5),
+            (EXECUTION_ID, "team-a", 2, 0.8),
+            (EXECUTION_ID, "team-a", 3, 0.8),
+            (EXECUTION_ID, "team-b", 1, 0.9),
+            ("exec-other", "team-a", 1, 9.9),
+        ],
+    )
+    return path
+
+
+class TestRefreshLeaderboard:
+    """refresh_leaderboard のテスト。"""
+
+    def test_materializes_best_per_team(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """チーム別の最高スコア（同点は早いラウンド）が集計されること。"""
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+
+        standings = load_standings(mock_workspace_env, EXECUTION_ID)
+
+        assert [(s.team_id, s.best_score, s.best_round) for s in standings] == [
+            ("team-b", 0.9, 1),
+            ("team-a", 0.8, 2),
+        ]
+        assert standings[1].rounds == 3
+        assert standings[1].latest_round == 3
+
+    def test_creates_index(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """leader_board にインデックスが作成されること。"""
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+
+        conn = duckdb.connect(str(db_path), read_only=True)
+        indexes = [row[0] for row in conn.execute("SELECT index_name FROM duckdb_indexes()").fetchall()]
+        conn.close()
+        assert LEADER_BOARD_INDEX in indexes
+
+    def test_team_refresh_updates_snapshot(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """書き込み後のチーム単位の再集計がスナップショットに反映されること。"""
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+        _insert(db_path, [(EXECUTION_ID, "team-a", 4, 1.2)])
+
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID, "team-a")
+
+        [top, _] = load_standings(mock_workspace_env, EXECUTION_ID)
+        assert (top.team_id, top.best_score, top.best_round, top.rounds) == ("team-a", 1.2, 4, 4)
+
+        conn = duckdb.connect(str(db_path), read_only=True)
+        count = conn.execute(f"SELECT COUNT(*) FROM {BEST_SCORES_TABLE}").fetchone()
+        conn.close()
+        assert count == (2,)
+
+    def test_without_database_returns_none(self, mock_workspace_env: Path) -> None:
+        """データベースが無い場合は何もしないこと。"""
+        assert refresh_leaderboard(mock_workspace_env, EXECUTION_ID) is None
+
+
+class TestLoadStandings:
+    """load_standings / latest_snapshot_execution_id のテスト。"""
+
+    def test_reads_snapshot_while_database_is_locked(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """mixseek.db を開かずにスナップショットから読み込むこと。"""
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+        db_path.rename(db_path.with_suffix(".moved"))
+
+        assert len(load_standings(mock_workspace_env, EXECUTION_ID, limit=1)) == 1
+
+    def test_latest_snapshot(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """最後に更新された実行のスナップショットが選ばれること。"""
+        refresh_leaderboard(mock_workspace_env, "exec-other")
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+
+        assert latest_snapshot_execution_id(mock_workspace_env) == EXECUTION_ID
+        assert get_snapshot_path(mock_workspace_env, "exec-other").is_file()
+
+    def test_missing_snapshot_raises(self, mock_workspace_env: Path) -> None:
+        """スナップショットが無い場合は FileNotFoundError になること。"""
+        with pytest.raises(FileNotFoundError, match="スナップショット"):
+            load_standings(mock_workspace_env, EXECUTION_ID)
+
+
+class TestLeaderboardCommand:
+    """qip leaderboard コマンドのテスト。"""
+
+    def test_shows_standings(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """スナップショットの順位が表示されること。"""
+        from quant_insight_plus.cli import app
+
+        refresh_leaderboard(mock_workspace_env, EXECUTION_ID)
+
+        result = CliRunner().invoke(app, ["leaderboard"])
+
+        assert result.exit_code == 0, result.output
+        assert f"リーダーボード: {EXECUTION_ID}" in result.output
+        assert "1. team-b (TEAM-B): best=0.9000 (round 1)" in result.output
+
+    def test_refresh_builds_snapshot(self, mock_workspace_env: Path, db_path: Path) -> None:
+        """--refresh で mixseek.db からスナップショットを作成すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["leaderboard", EXECUTION_ID, "--refresh", "--limit", "1"])
+
+        assert result.exit_code == 0, result.output
+        assert "team-a" not in result.output
+
+    def test_without_snapshot_exits(self, mock_workspace_env: Path) -> None:
+        """スナップショットが無い場合は終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["leaderboard"])
+
+        assert result.exit_code == 1
@@ -0,0 +1,134 @@
+"""phase_timeouts モジュール（ラウンド内のフェーズ単位の期限）のテスト。"""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mixseek.models.member_agent import MemberAgentConfig, ResultStatus
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.phase_timeouts import (
+    PHASE_EVALUATION,
+    PHASE_MEMBER,
+    PhaseTimeoutError,
+    persist_with_deadline,
+    phase_deadline,
+)
+from quant_insight_plus.runtime_config import get_runtime_config_path, load_runtime_settings
+from quant_insight_plus.salvage import SALVAGED_NOTICE
+from quant_insight_plus.submission_relay import SUBMISSION_FILENAME, SUBMISSIONS_DIR_NAME
+from tests.conftest import MODEL_PATCH
+
+VALID_CODE = """\
+def generate_signal(ohlcv, additional_data):
+    return ohlcv
+"""
+
+CONTEXT = {"execution_id": "exec-1", "team_id": "team-1", "round_number": 1}
+
+
+class TestPhaseDeadline:
+    """phase_deadline / persist_with_deadline のテスト。"""
+
+    async def test_no_deadline(self) -> None:
+        """seconds が None の場合は期限なしで実行されること。"""
+        async with phase_deadline(PHASE_EVALUATION, None):
+            await asyncio.sleep(0.01)
+
+    async def test_expired_phase_raises(self) -> None:
+        """期限を超えた場合に PhaseTimeoutError が送出され、処理がキャンセルされること。"""
+        finished = False
+
+        with pytest.raises(PhaseTimeoutError, match="evaluation") as exc_info:
+            async with phase_deadline(PHASE_EVALUATION, 0.01):
+                await asyncio.sleep(1)
+                finished = True
+
+        assert exc_info.value.phase == PHASE_EVALUATION
+        assert not finished
+
+    async def test_inner_timeout_error_is_not_converted(self) -> None:
+        """ブロック内で送出された TimeoutError は PhaseTimeoutError に変換しないこと。"""
+        with pytest.raises(TimeoutError) as exc_info:
+            async with phase_deadline(PHASE_EVALUATION, 10):
+                raise TimeoutError("backtest")
+
+        assert not isinstance(exc_info.value, PhaseTimeoutError)
+
+    async def test_persist_gives_up_after_deadline(self) -> None:
+        """保存が期限を超えた場合は False を返して続行すること。"""
+        assert not await persist_with_deadline("leader_board", 0.01, asyncio.sleep(1))
+        assert await persist_with_deadline("leader_board", 1, asyncio.sleep(0))
+
+    def test_reads_phase_timeouts_section(self, mock_workspace_env: Path) -> None:
+        """[phase_timeouts] セクションが読み込まれること。"""
+        path = get_runtime_config_path(mock_workspace_env)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("[phase_timeouts]\nmember_seconds = 900\n")
+
+        settings = load_runtime_settings().phase_timeouts
+
+        assert settings.member_seconds == 900
+        assert settings.leader_seconds is None
+
+
+class TestMemberTimeout:
+    """Member Agent の委譲期限のテスト。"""
+
+    @pytest.fixture
+    @patch(MODEL_PATCH)
+    def submitter_agent(self, mock_create_model: MagicMock) -> ClaudeCodeLocalCodeExecutorAgent:
+        """委譲期限 0.05 秒の submission-creator 相当のエージェント。"""
+        config = MemberAgentConfig(
+            name="submission-creator",
+            type="custom",
+            model="claudecode:claude-opus-4-6",
+            description="Test submitter",
+            system_instruction="You are a test agent.",
+            metadata={
+                "tool_settings": {
+                    "local_code_executor": {
+                        "available_data_paths": [],
+                        "output_model": {
+                            "module_path": "quant_insight_plus.agents.output_models",
+                            "class_name": "FileSubmitterOutput",
+                        },
+                    }
+                },
+            },
+        )
+        agent = ClaudeCodeLocalCodeExecutorAgent(config)
+        agent.member_timeout_seconds = 0.05
+        return agent
+
+    async def test_timeout_salvages_written_submission(
+        self, submitter_agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """期限切れ時に書き込み済みの submission.py を部分結果として返すこと。"""
+        submission = mock_workspace_env / SUBMISSIONS_DIR_NAME / "round_1" / SUBMISSION_FILENAME
+
+        async def run(*args: object, **kwargs: object) -> None:
+            submission.write_text(VALID_CODE)
+            await asyncio.sleep(10)
+
+        submitter_agent.agent.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+
+        result = await submitter_agent.execute("task", context=CONTEXT)
+
+        assert result.status == ResultStatus.WARNING
+        assert SALVAGED_NOTICE in result.content
+        assert PHASE_MEMBER in (result.error_message or "")
+
+    async def test_timeout_without_artifact_is_error(self, submitter_agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """成果物が無い場合は ERROR を返すこと。"""
+
+        async def run(*args: object, **kwargs: object) -> None:
+            await asyncio.sleep(10)
+
+        submitter_agent.agent.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+
+        result = await submitter_agent.execute("task", context=CONTEXT)
+
+        assert result.status == ResultStatus.ERROR
+        assert "期限" in (result.error_message or "")
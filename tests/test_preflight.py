@@ -0,0 +1,215 @@
+"""preflight モジュール（submission.py の事前検証）のテスト。
+
+- check_static: 存在・コンパイル・generate_signal のシグネチャ
+- run_smoke_test: valid 直近 K 日のサブプロセス実行
+- execute(): 検証失敗時の同一セッション内リトライ
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import polars as pl
+import pytest
+from mixseek.models.member_agent import ResultStatus
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.agents.output_models import FileSubmitterOutput
+from quant_insight_plus.preflight import (
+    STAGE_COMPILE,
+    STAGE_EXISTS,
+    STAGE_SIGNATURE,
+    STAGE_SMOKE,
+    PreflightSettings,
+    check_static,
+    load_preflight_settings,
+    run_smoke_test,
+    validate_submission,
+)
+
+VALID_CODE = """\
+import polars as pl
+
+def generate_signal(ohlcv: pl.DataFrame, additional_data: dict[str, pl.DataFrame]) -> pl.DataFrame:
+    return ohlcv.select("datetime", "symbol", pl.col("close").alias("signal"))
+"""
+
+FAILING_CODE = """\
+def generate_signal(ohlcv, additional_data):
+    raise KeyError("no_such_column")
+"""
+
+MISSING_COLUMN_CODE = """\
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol")
+"""
+
+SLOW_CODE = """\
+import time
+
+def generate_signal(ohlcv, additional_data):
+    time.sleep(30)
+"""
+
+
+def _write(tmp_path: Path, code: str) -> Path:
+    path = tmp_path / "submission.py"
+    path.write_text(code)
+    return path
+
+
+@pytest.fixture
+def inputs_dir(tmp_path: Path) -> Path:
+    """valid 分割の OHLCV / master を配置した data/inputs。"""
+    inputs = tmp_path / "inputs"
+    (inputs / "ohlcv").mkdir(parents=True)
+    (inputs / "master").mkdir()
+    dates = [datetime(2024, 1, d) for d in range(1, 11)]
+    pl.DataFrame(
+        {
+            "datetime": [d for d in dates for _ in range(2)],
+            "symbol": ["7203", "6758"] * len(dates),
+            "close": [float(i) for i in range(len(dates) * 2)],
+        }
+    ).write_parquet(inputs / "ohlcv" / "valid.parquet")
+    pl.DataFrame({"symbol": ["7203", "6758"], "sector33_code": ["3700", "3650"]}).write_parquet(
+        inputs / "master" / "valid.parquet"
+    )
+    return inputs
+
+
+class TestLoadPreflightSettings:
+    """load_preflight_settings のテスト。"""
+
+    def test_enabled_by_default(self) -> None:
+        """未指定時は有効・リトライ 2 回であること。"""
+        settings = load_preflight_settings({})
+        assert settings.enabled is True
+        assert settings.max_retries == 2
+
+    def test_invalid_value_raises_value_error(self) -> None:
+        """不正な値は ValueError になること。"""
+        with pytest.raises(ValueError, match="preflight"):
+            load_preflight_settings({"preflight": {"smoke_days": 0}})
+
+
+class TestCheckStatic:
+    """check_static のテスト。"""
+
+    def test_valid_submission(self, tmp_path: Path) -> None:
+        """正しい submission.py は成功すること。"""
+        assert check_static(_write(tmp_path, VALID_CODE)).ok
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        """ファイルが無い場合は exists 段階で失敗すること。"""
+        result = check_static(tmp_path / "submission.py")
+        assert result.stage == STAGE_EXISTS
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """空ファイルは exists 段階で失敗すること。"""
+        assert check_static(_write(tmp_path, "  \n")).stage == STAGE_EXISTS
+
+    def test_syntax_error(self, tmp_path: Path) -> None:
+        """構文エラーは compile 段階で失敗すること。"""
+        result = check_static(_write(tmp_path, "def generate_signal(a, b)\n    pass\n"))
+        assert result.stage == STAGE_COMPILE
+        assert "SyntaxError" in (result.error or "")
+
+    def test_missing_function(self, tmp_path: Path) -> None:
+        """generate_signal が無い場合は signature 段階で失敗すること。"""
+        assert check_static(_write(tmp_path, "def other(a, b):\n    pass\n")).stage == STAGE_SIGNATURE
+
+    @pytest.mark.parametrize(
+        "signature",
+        ["def generate_signal(ohlcv):", "def generate_signal(ohlcv, extra, other):", "def generate_signal(*args):"],
+    )
+    def test_wrong_arity(self, tmp_path: Path, signature: str) -> None:
+        """引数が 2 つでない場合は signature 段階で失敗すること。"""
+        result = check_static(_write(tmp_path, f"{signature}\n    pass\n"))
+        assert result.stage == STAGE_SIGNATURE
+
+
+class TestRunSmokeTest:
+    """run_smoke_test のテスト。"""
+
+    def test_valid_submission_passes(self, tmp_path: Path, inputs_dir: Path) -> None:
+        """正しい submission.py は直近 K 日の実行に成功すること。"""
+        result = run_smoke_test(_write(tmp_path, VALID_CODE), inputs_dir, PreflightSettings(smoke_days=3))
+        assert result.ok, result.error
+        assert result.smoke_skipped is False
+
+    def test_runtime_error_reported(self, tmp_path: Path, inputs_dir: Path) -> None:
+        """実行時例外のトレースバックが返ること。"""
+        result = run_smoke_test(_write(tmp_path, FAILING_CODE), inputs_dir, PreflightSettings())
+        assert result.stage == STAGE_SMOKE
+        assert "no_such_column" in (result.error or "")
+
+    def test_missing_columns_reported(self, tmp_path: Path, inputs_dir: Path) -> None:
+        """必須カラム不足が検出されること。"""
+        result = run_smoke_test(_write(tmp_path, MISSING_COLUMN_CODE), inputs_dir, PreflightSettings())
+        assert result.stage == STAGE_SMOKE
+        assert "signal" in (result.error or "")
+
+    def test_timeout(self, tmp_path: Path, inputs_dir: Path) -> None:
+        """タイムアウト時に smoke 段階で失敗すること。"""
+        result = run_smoke_test(_write(tmp_path, SLOW_CODE), inputs_dir, PreflightSettings(timeout_seconds=1))
+        assert result.stage == STAGE_SMOKE
+        assert "タイムアウト" in (result.error or "")
+
+    def test_skipped_without_valid_data(self, tmp_path: Path) -> None:
+        """valid データが無い場合はスキップ（成功扱い）されること。"""
+        result = run_smoke_test(_write(tmp_path, FAILING_CODE), tmp_path / "missing", PreflightSettings())
+        assert result.ok
+        assert result.smoke_skipped is True
+
+    def test_validate_stops_at_static_failure(self, tmp_path: Path, inputs_dir: Path) -> None:
+        """静的検証に失敗した場合はスモークテストを実行しないこと。"""
+        result = validate_submission(_write(tmp_path, "x = (\n"), inputs_dir, PreflightSettings())
+        assert result.stage == STAGE_COMPILE
+
+
+class TestExecutePreflightRetry:
+    """execute() のプリフライト・リトライのテスト。"""
+
+    @staticmethod
+    def _result(output: Any) -> MagicMock:
+        result = MagicMock()
+        result.output = output
+        result.all_messages.return_value = []
+        return result
+
+    async def test_retries_in_same_session(
+        self, agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """検証失敗時に message_history 付きで再実行され、修正後に成功すること。"""
+        submission = _write(mock_workspace_env, "def generate_signal(ohlcv):\n    pass\n")
+        output = FileSubmitterOutput(submission_path=str(submission), description="test")
+
+        async def run(*args: Any, **kwargs: Any) -> MagicMock:
+            if "message_history" in kwargs:
+                submission.write_text(VALID_CODE)
+            return self._result(output)
+
+        agent.agent.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+
+        result = await agent.execute("task")
+
+        assert result.status == ResultStatus.SUCCESS
+        assert agent.agent.run.call_count == 2
+        retry_call = agent.agent.run.call_args_list[1]
+        assert "signature" in retry_call.args[0]
+
+    async def test_error_after_retries_exhausted(
+        self, agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """リトライ上限到達後は ERROR ステータスを返すこと。"""
+        submission = _write(mock_workspace_env, "x = (\n")
+        output = FileSubmitterOutput(submission_path=str(submission), description="test")
+        agent.agent.run = AsyncMock(return_value=self._result(output))  # type: ignore[method-assign]
+
+        result = await agent.execute("task")
+
+        assert result.status == ResultStatus.ERROR
+        assert "提出前検証" in result.content
+        assert agent.agent.run.call_count == 3
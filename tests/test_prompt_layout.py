@@ -0,0 +1,101 @@
+"""prompt_layout モジュール（プロンプトキャッシュ向けのプロンプト配置）のテスト。"""
+
+from pathlib import Path
+
+import polars as pl
+from quant_insight.agents.local_code_executor.models import ImplementationContext
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.prompt_layout import (
+    ARTIFACTS_HEADING,
+    DATA_CATALOG_HEADING,
+    TASK_HEADING,
+    build_artifacts_section,
+    build_data_catalog,
+    compose_task_prompt,
+)
+from quant_insight_plus.submission_relay import SUBMISSIONS_DIR_NAME
+
+OHLCV_PATH = "data/inputs/ohlcv/train.parquet"
+
+
+def _write_ohlcv(workspace: Path) -> None:
+    path = workspace / OHLCV_PATH
+    path.parent.mkdir(parents=True)
+    pl.DataFrame({"symbol": ["7203", "6758"], "close": [1.0, 2.0]}).write_parquet(path)
+
+
+class TestBuildDataCatalog:
+    """build_data_catalog のテスト。"""
+
+    def test_describes_schema_and_rows(self, tmp_path: Path) -> None:
+        """カラム・型・行数が記述されること。"""
+        _write_ohlcv(tmp_path)
+
+        catalog = build_data_catalog(tmp_path, [OHLCV_PATH])
+
+        assert catalog.startswith(DATA_CATALOG_HEADING)
+        assert f"### {OHLCV_PATH}" in catalog
+        assert "行数: 2" in catalog
+        assert "- `close`: Float64" in catalog
+
+    def test_stable_across_calls(self, tmp_path: Path) -> None:
+        """データが変わらない限り同一の文字列を返すこと。"""
+        _write_ohlcv(tmp_path)
+
+        assert build_data_catalog(tmp_path, [OHLCV_PATH]) == build_data_catalog(tmp_path, [OHLCV_PATH])
+
+    def test_skips_missing_and_non_parquet(self, tmp_path: Path) -> None:
+        """存在しないパス・parquet 以外は省略し、対象が無ければ空文字列を返すこと。"""
+        assert build_data_catalog(tmp_path, ["data/test", "data/inputs/missing.parquet"]) == ""
+
+
+class TestComposeTaskPrompt:
+    """compose_task_prompt のテスト。"""
+
+    def test_task_is_last(self, tmp_path: Path) -> None:
+        """カタログ、成果物、タスクの順に配置されること。"""
+        (tmp_path / "analysis.md").write_text("analysis")
+
+        prompt = compose_task_prompt(
+            "do it", catalog=f"{DATA_CATALOG_HEADING}\n\nx", artifacts=build_artifacts_section(tmp_path)
+        )
+
+        assert prompt.index(DATA_CATALOG_HEADING) < prompt.index(ARTIFACTS_HEADING) < prompt.index(TASK_HEADING)
+        assert prompt.endswith("do it")
+
+    def test_prefix_unchanged_when_task_changes(self, tmp_path: Path) -> None:
+        """タスクが異なっても先頭部分が一致すること。"""
+        (tmp_path / "analysis.md").write_text("analysis")
+        artifacts = build_artifacts_section(tmp_path)
+
+        first = compose_task_prompt("task A", artifacts=artifacts)
+        second = compose_task_prompt("task B", artifacts=artifacts)
+
+        assert first.removesuffix("task A") == second.removesuffix("task B")
+
+    def test_returns_task_without_prefix(self) -> None:
+        """カタログ・成果物が無い場合はタスクをそのまま返すこと。"""
+        assert compose_task_prompt("task") == "task"
+
+
+class TestEnrichIncludesDataCatalog:
+    """_enrich_task_with_workspace_context のデータカタログ埋め込みのテスト。"""
+
+    def test_catalog_precedes_artifacts(
+        self,
+        agent: ClaudeCodeLocalCodeExecutorAgent,
+        implementation_context: ImplementationContext,
+        mock_workspace_env: Path,
+    ) -> None:
+        """available_data_paths のカタログがラウンド成果物より前に配置されること。"""
+        _write_ohlcv(mock_workspace_env)
+        agent.executor_config.available_data_paths = [OHLCV_PATH]
+        round_dir = mock_workspace_env / SUBMISSIONS_DIR_NAME / "round_1"
+        round_dir.mkdir(parents=True)
+        (round_dir / "analysis.md").write_text("analysis")
+
+        result = agent._enrich_task_with_workspace_context("original task", implementation_context)
+
+        assert result.index(DATA_CATALOG_HEADING) < result.index("### analysis.md")
+        assert result.endswith("original task")
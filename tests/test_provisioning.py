@@ -0,0 +1,177 @@
+"""provisioning モジュール（冪等な qip setup とデータ共有）のテスト。"""
+
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.provisioning import (
+    ACTION_ADDED,
+    ACTION_CONFLICT,
+    ACTION_KEPT,
+    ACTION_UNCHANGED,
+    ACTION_UPDATED,
+    DATA_INPUTS_DIR,
+    file_sha256,
+    get_manifest_path,
+    load_manifest,
+    share_data_files,
+    sync_templates,
+)
+
+
+@pytest.fixture
+def templates_dir(tmp_path: Path) -> Path:
+    """2 ファイルのテンプレートディレクトリ。"""
+    templates = tmp_path / "templates"
+    (templates / "agents").mkdir(parents=True)
+    (templates / "orchestrator.toml").write_text("max_rounds = 3\n")
+    (templates / "agents" / "team.toml").write_text('name = "team"\n')
+    return templates
+
+
+def _actions(templates_dir: Path, workspace: Path, **kwargs: bool) -> dict[str, str]:
+    report = sync_templates(templates_dir, workspace, **kwargs)
+    return {a.rel_path.as_posix(): a.action for a in report.actions}
+
+
+class TestSyncTemplates:
+    """sync_templates の 3 方向比較のテスト。"""
+
+    def test_first_run_adds_and_records_manifest(self, templates_dir: Path, tmp_path: Path) -> None:
+        """初回はすべて追加され、マニフェストにハッシュが記録されること。"""
+        workspace = tmp_path / "ws"
+
+        actions = _actions(templates_dir, workspace)
+
+        assert set(actions.values()) == {ACTION_ADDED}
+        assert load_manifest(workspace)["agents/team.toml"] == file_sha256(templates_dir / "agents" / "team.toml")
+
+    def test_second_run_is_unchanged(self, templates_dir: Path, tmp_path: Path) -> None:
+        """変更が無ければ何も書き込まないこと。"""
+        workspace = tmp_path / "ws"
+        _actions(templates_dir, workspace)
+        mtime = (workspace / "configs" / "orchestrator.toml").stat().st_mtime_ns
+
+        actions = _actions(templates_dir, workspace)
+
+        assert set(actions.values()) == {ACTION_UNCHANGED}
+        assert (workspace / "configs" / "orchestrator.toml").stat().st_mtime_ns == mtime
+
+    def test_template_change_updates_unedited_file(self, templates_dir: Path, tmp_path: Path) -> None:
+        """ユーザーが編集していないファイルはテンプレートの変更で更新されること。"""
+        workspace = tmp_path / "ws"
+        _actions(templates_dir, workspace)
+        (templates_dir / "orchestrator.toml").write_text("max_rounds = 5\n")
+
+        actions = _actions(templates_dir, workspace)
+
+        assert actions["orchestrator.toml"] == ACTION_UPDATED
+        assert (workspace / "configs" / "orchestrator.toml").read_text() == "max_rounds = 5\n"
+
+    def test_user_edit_is_kept(self, templates_dir: Path, tmp_path: Path) -> None:
+        """テンプレートが変わっていなければユーザーの編集を保持すること。"""
+        workspace = tmp_path / "ws"
+        _actions(templates_dir, workspace)
+        (workspace / "configs" / "orchestrator.toml").write_text("max_rounds = 10\n")
+
+        actions = _actions(templates_dir, workspace)
+
+        assert actions["orchestrator.toml"] == ACTION_KEPT
+        assert (workspace / "configs" / "orchestrator.toml").read_text() == "max_rounds = 10\n"
+
+    def test_conflict_writes_new_file(self, templates_dir: Path, tmp_path: Path) -> None:
+        """両方が変更された場合はユーザーのファイルを保持し、テンプレートを .new に出力すること。"""
+        workspace = tmp_path / "ws"
+        _actions(templates_dir, workspace)
+        (workspace / "configs" / "orchestrator.toml").write_text("max_rounds = 10\n")
+        (templates_dir / "orchestrator.toml").write_text("max_rounds = 5\n")
+
+        actions = _actions(templates_dir, workspace)
+
+        configs = workspace / "configs"
+        assert actions["orchestrator.toml"] == ACTION_CONFLICT
+        assert (configs / "orchestrator.toml").read_text() == "max_rounds = 10\n"
+        assert (configs / "orchestrator.toml.new").read_text() == "max_rounds = 5\n"
+        # 通知済みの conflict は以降ユーザーの編集として保持する
+        assert _actions(templates_dir, workspace)["orchestrator.toml"] == ACTION_KEPT
+
+    def test_dry_run_writes_nothing(self, templates_dir: Path, tmp_path: Path) -> None:
+        """dry_run では判定のみ行い、ファイル・マニフェストを書き込まないこと。"""
+        workspace = tmp_path / "ws"
+
+        actions = _actions(templates_dir, workspace, dry_run=True)
+
+        assert set(actions.values()) == {ACTION_ADDED}
+        assert not (workspace / "configs").exists()
+        assert not get_manifest_path(workspace).exists()
+
+
+class TestShareDataFiles:
+    """share_data_files のテスト。"""
+
+    @pytest.fixture
+    def source(self, tmp_path: Path) -> Path:
+        """data/inputs にファイルを持つ共有元ワークスペース。"""
+        source = tmp_path / "source"
+        ohlcv = source / DATA_INPUTS_DIR / "ohlcv"
+        ohlcv.mkdir(parents=True)
+        (ohlcv / "train.parquet").write_bytes(b"train")
+        (ohlcv / "valid.parquet").write_bytes(b"valid")
+        return source
+
+    def test_hardlinks_files(self, source: Path, tmp_path: Path) -> None:
+        """ファイルがハードリンクで共有されること。"""
+        workspace = tmp_path / "ws"
+
+        shared = share_data_files(source, workspace)
+
+        assert shared == [Path("ohlcv/train.parquet"), Path("ohlcv/valid.parquet")]
+        linked = workspace / DATA_INPUTS_DIR / "ohlcv" / "train.parquet"
+        assert os.path.samefile(linked, source / DATA_INPUTS_DIR / "ohlcv" / "train.parquet")
+
+    def test_existing_files_are_not_replaced(self, source: Path, tmp_path: Path) -> None:
+        """共有先に既にあるファイルは変更しないこと。"""
+        workspace = tmp_path / "ws"
+        own = workspace / DATA_INPUTS_DIR / "ohlcv" / "train.parquet"
+        own.parent.mkdir(parents=True)
+        own.write_bytes(b"own")
+
+        shared = share_data_files(source, workspace)
+
+        assert shared == [Path("ohlcv/valid.parquet")]
+        assert own.read_bytes() == b"own"
+
+    def test_missing_source_raises(self, tmp_path: Path) -> None:
+        """共有元に data/inputs が無い場合は FileNotFoundError になること。"""
+        with pytest.raises(FileNotFoundError, match="共有元"):
+            share_data_files(tmp_path / "missing", tmp_path / "ws")
+
+
+class TestSetupOptions:
+    """qip setup --dry-run / --share-data-from のテスト。"""
+
+    def test_dry_run_reports_without_writing(self, tmp_path: Path) -> None:
+        """--dry-run は配置予定を表示し、ワークスペースを作成しないこと。"""
+        from quant_insight_plus.cli import app
+
+        workspace = tmp_path / "ws"
+
+        result = CliRunner().invoke(app, ["setup", "--workspace", str(workspace), "--dry-run"])
+
+        assert result.exit_code == 0, result.output
+        assert f"{ACTION_ADDED:<9} configs/orchestrator.toml" in result.output
+        assert not workspace.exists()
+
+    def test_missing_share_source_exits(self, tmp_path: Path) -> None:
+        """共有元が存在しない場合は終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(
+            app,
+            ["setup", "--workspace", str(tmp_path / "ws"), "--share-data-from", str(tmp_path / "missing")],
+        )
+
+        assert result.exit_code == 1
+        assert not (tmp_path / "ws").exists()
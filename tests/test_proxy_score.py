@@ -0,0 +1,173 @@
+"""proxy_score モジュール（valid 分割の日時の層化サンプルによる代理スコア）のテスト。"""
+
+import random
+import shlex
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.ensemble import load_generate_signal, load_split, score_signals, signal_at
+from quant_insight_plus.kernel import KernelSettings, serve
+from quant_insight_plus.proxy_score import (
+    PROXY_SPLIT,
+    load_cached_correlations,
+    run_proxy_score,
+    stratified_dates,
+)
+from quant_insight_plus.runtime_config import ProxyScoreSettings
+
+CODE = """\
+import polars as pl
+
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol", pl.col("close").alias("signal"))
+"""
+
+NUM_DATES = 24
+SETTINGS = ProxyScoreSettings(sample_dates=8, strata=4)
+DATES = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(NUM_DATES)]
+
+
+@pytest.fixture
+def workspace(mock_workspace_env: Path) -> Path:
+    """valid 分割の OHLCV・リターン（3 銘柄 × 24 日）を配置したワークスペース。"""
+    rng = random.Random(1)
+    symbols = ["7203", "6758", "9984"]
+    rows = [(d, s, rng.random(), rng.random()) for d in DATES for s in symbols]
+    inputs = mock_workspace_env / "data" / "inputs"
+    for dataset in ("ohlcv", "returns"):
+        (inputs / dataset).mkdir(parents=True)
+    pl.DataFrame(
+        {"datetime": [r[0] for r in rows], "symbol": [r[1] for r in rows], "close": [r[2] for r in rows]}
+    ).write_parquet(inputs / "ohlcv" / f"{PROXY_SPLIT}.parquet")
+    pl.DataFrame(
+        {"datetime": [r[0] for r in rows], "symbol": [r[1] for r in rows], "return_value": [r[3] for r in rows]}
+    ).write_parquet(inputs / "returns" / f"{PROXY_SPLIT}.parquet")
+    return mock_workspace_env
+
+
+class TestStratifiedDates:
+    """stratified_dates のテスト。"""
+
+    def test_covers_every_stratum_first(self) -> None:
+        """先頭 strata 件は各期間から 1 件ずつになること。"""
+        sample = stratified_dates(DATES, 8, 4)
+
+        assert len(sample) == len(set(sample)) == 8
+        assert sorted((d - DATES[0]).days // 6 for d in sample[:4]) == [0, 1, 2, 3]
+        assert sorted((d - DATES[0]).days // 6 for d in sample) == [0, 0, 1, 1, 2, 2, 3, 3]
+
+    def test_deterministic(self) -> None:
+        """同じ入力では同じ日時を返すこと。"""
+        assert stratified_dates(DATES, 8, 4) == stratified_dates(DATES, 8, 4)
+
+    def test_sample_larger_than_dates(self) -> None:
+        """日時の総数以上を指定した場合は全日時を返すこと。"""
+        assert sorted(stratified_dates(DATES[:3], 10, 4)) == DATES[:3]
+
+
+class TestRunProxyScore:
+    """run_proxy_score のテスト。"""
+
+    def test_second_run_uses_cache(self, workspace: Path) -> None:
+        """同じ提出の再実行は日時ごとの相関をキャッシュから読むこと。"""
+        first = run_proxy_score(workspace, CODE, SETTINGS)
+        second = run_proxy_score(workspace, CODE, SETTINGS)
+
+        assert (first.sampled_dates, first.evaluated_dates, first.cached_dates) == (8, 8, 0)
+        assert (second.evaluated_dates, second.cached_dates) == (0, 8)
+        assert second.score == first.score
+
+    def test_full_reuses_sampled_dates(self, workspace: Path) -> None:
+        """--full は計算済みの日時を再利用し、全日時の採点と一致すること。"""
+        run_proxy_score(workspace, CODE, SETTINGS)
+        result = run_proxy_score(workspace, CODE, SETTINGS, full=True)
+
+        ohlcv, additional = load_split(workspace, PROXY_SPLIT)
+        generate_signal = load_generate_signal(CODE)
+        signals = pl.concat([signal_at(generate_signal, ohlcv, additional, d) for d in DATES])
+        returns = pl.read_parquet(workspace / "data" / "inputs" / "returns" / f"{PROXY_SPLIT}.parquet")
+        assert (result.evaluated_dates, result.cached_dates) == (NUM_DATES - 8, 8)
+        assert result.score.sharpe_ratio == pytest.approx(score_signals(signals, returns).sharpe_ratio)
+
+    def test_budget_keeps_one_date_per_stratum(self, workspace: Path) -> None:
+        """時間予算を超えても各期間の 1 日目までは計算し、再実行で続きを計算すること。"""
+        settings = SETTINGS.model_copy(update={"time_budget_seconds": 1e-9})
+
+        first = run_proxy_score(workspace, CODE, settings)
+        second = run_proxy_score(workspace, CODE, settings)
+
+        assert first.budget_exhausted
+        assert first.evaluated_dates == 4
+        assert (second.evaluated_dates, second.cached_dates) == (0, 4)
+        cached = load_cached_correlations(workspace, CODE)
+        assert cached is not None
+        assert cached.height == 4
+
+    def test_missing_generate_signal_raises(self, workspace: Path) -> None:
+        """generate_signal の無いコードは ValueError になること。"""
+        with pytest.raises(ValueError, match="generate_signal"):
+            run_proxy_score(workspace, "x = 1\n", SETTINGS)
+
+
+class TestProxyScoreCommand:
+    """qip proxy-score コマンドのテスト。"""
+
+    def test_prints_score(self, workspace: Path) -> None:
+        """代理スコアと日時の内訳を表示すること。"""
+        from quant_insight_plus.cli import app
+
+        path = workspace / "submission.py"
+        path.write_text(CODE)
+        runner = CliRunner()
+        result = runner.invoke(app, ["proxy-score", str(path), "--dates", "8"])
+
+        assert result.exit_code == 0, result.output
+        assert "代理スコア:" in result.output
+        assert f"8 / {NUM_DATES} 日を抽出" in result.output
+
+    def test_generate_signal_error_is_summarized(self, workspace: Path) -> None:
+        """generate_signal の例外はトレースバックではなく 1 行のメッセージで報告すること。"""
+        from quant_insight_plus.cli import app
+
+        path = workspace / "submission.py"
+        path.write_text("def generate_signal(ohlcv, additional_data):\n    raise KeyError('close')\n")
+        runner = CliRunner()
+        result = runner.invoke(app, ["proxy-score", str(path)])
+
+        assert result.exit_code == 1
+        assert "generate_signal の実行に失敗しました: KeyError" in result.output
+        assert "Traceback" not in result.output
+
+    def test_member_instruction_runs_through_kernel(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """python_command が qip kernel exec の場合も、submission-creator の代理スコアのコマンドが実行できること。"""
+        from quant_insight_plus.cli import _TEMPLATES_DIR, app
+
+        socket_path = workspace / "kernel.sock"
+        settings = KernelSettings(socket_path=str(socket_path), timeout_seconds=60, preload_modules=[])
+        threading.Thread(target=serve, args=(settings,), daemon=True).start()
+        deadline = time.monotonic() + 10
+        while not socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        template = _TEMPLATES_DIR / "agents" / "members" / "submission_creator_claudecode.toml"
+        line = next(line for line in template.read_text().splitlines() if "proxy-score" in line)
+        command = shlex.split(line.replace("{python_command}", f"qip kernel exec --socket {socket_path}"))
+        (workspace / "submission.py").write_text(CODE)
+        monkeypatch.chdir(workspace)
+
+        result = CliRunner().invoke(app, command[1:])
+
+        assert result.exit_code == 0, result.output
+        assert "代理スコア:" in result.output
+
+    def test_member_instruction_mentions_command(self) -> None:
+        """submission-creator の指示に python_command で実行する代理スコアのコマンドが含まれること。"""
+        from quant_insight_plus.cli import _TEMPLATES_DIR
+
+        path = _TEMPLATES_DIR / "agents" / "members" / "submission_creator_claudecode.toml"
+        assert "{python_command} -m quant_insight_plus proxy-score submission.py" in path.read_text()
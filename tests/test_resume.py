@@ -0,0 +1,260 @@
+"""resume モジュール（中断した qip exec の再開）のテスト。"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import duckdb
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from quant_insight_plus.db import connect, get_db_path
+from quant_insight_plus.early_stopping import EXIT_REASON_ELIMINATED, Elimination, load_elimination
+from quant_insight_plus.resume import (
+    RESUME_ENV_VAR,
+    CompletedRound,
+    add_resume_option,
+    find_completed_round,
+    get_completed_rounds,
+    load_completed_rounds,
+    restore_completed_round,
+    resume_from,
+)
+from quant_insight_plus.submission_relay import SUBMISSION_FILENAME, ensure_round_dir, write_submission_stamp
+
+SOURCE_ID = "exec-crashed"
+CODE_BLOCK = "```python\ndef generate_signal(ohlcv, additional_data):\n    return ohlcv\n```"
+
+
+def _create_store(db_path: Path) -> None:
+    """leader_board / round_status の最小スキーマ（mixseek-core の store 相当）。
+
+    team-a はラウンド 1, 2 が完了し、ラウンド 3 は評価前に中断（round_status のみ）。
+    """
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE leader_board (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, "
+        "submission_content VARCHAR, score DOUBLE, score_details JSON)"
+    )
+    conn.execute(
+        "CREATE TABLE round_status (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, "
+        "round_started_at TIMESTAMP, round_ended_at TIMESTAMP)"
+    )
+    details = json.dumps({"overall_score": 0.5, "metrics": []})
+    conn.executemany(
+        "INSERT INTO leader_board VALUES (?, 'team-a', ?, ?, ?, ?)",
+        [(SOURCE_ID, 1, CODE_BLOCK, 0.5, details), (SOURCE_ID, 2, "", 0.8, details)],
+    )
+    conn.executemany(
+        "INSERT INTO round_status VALUES (?, 'team-a', ?, ?, ?)",
+        [(SOURCE_ID, n, datetime(2026, 1, 1, n), datetime(2026, 1, 1, n, 30)) for n in (1, 2, 3)],
+    )
+    conn.close()
+
+
+ELIMINATION = Elimination(
+    team_id="team-b", checkpoint=2, round_number=3, rank=2, teams=2, best_score=0.1, message="打ち切り"
+)
+
+
+def _add_eliminated_round(db_path: Path) -> None:
+    """team-b のラウンド 3 を successive halving で打ち切られたラウンドとして記録する。"""
+    details = {"overall_score": -100.0, "metrics": [], "exit_reason": EXIT_REASON_ELIMINATED}
+    details["successive_halving"] = ELIMINATION.model_dump(mode="json")
+    conn = duckdb.connect(str(db_path))
+    conn.execute("INSERT INTO leader_board VALUES (?, 'team-b', 3, '', -100.0, ?)", [SOURCE_ID, json.dumps(details)])
+    conn.execute(
+        "INSERT INTO round_status VALUES (?, 'team-b', 3, ?, ?)",
+        [SOURCE_ID, datetime(2026, 1, 1, 3), datetime(2026, 1, 1, 3)],
+    )
+    conn.close()
+
+
+@pytest.fixture
+def crashed_workspace(mock_workspace_env: Path) -> Path:
+    """ラウンド 2 まで完了した状態で中断した実行のワークスペース。"""
+    _create_store(get_db_path(mock_workspace_env))
+    round_dir = ensure_round_dir(mock_workspace_env, 2)
+    (round_dir / SUBMISSION_FILENAME).write_text("def generate_signal(ohlcv, additional_data):\n    return ohlcv\n")
+    write_submission_stamp(round_dir, execution_id=SOURCE_ID, team_id="team-a", round_number=2)
+    return mock_workspace_env
+
+
+def _find(workspace: Path, team_id: str, round_number: int) -> CompletedRound | None:
+    return find_completed_round(
+        workspace, get_completed_rounds(workspace, SOURCE_ID), SOURCE_ID, team_id, round_number
+    )
+
+
+class TestLoadCompletedRounds:
+    """load_completed_rounds / find_completed_round のテスト。"""
+
+    def test_requires_both_tables(self, crashed_workspace: Path) -> None:
+        """leader_board と round_status の両方にあるラウンドのみ完了済みとなること。"""
+        conn = connect(get_db_path(crashed_workspace))
+        rounds = load_completed_rounds(conn, SOURCE_ID)
+        conn.close()
+
+        assert [r.round_number for r in rounds] == [1, 2]
+        assert rounds[0].score_details["overall_score"] == 0.5
+
+    def test_other_team_has_no_rounds(self, crashed_workspace: Path) -> None:
+        """他チームのラウンドは返さないこと。"""
+        assert _find(crashed_workspace, "team-b", 1) is None
+
+    def test_empty_content_falls_back_to_round_dir(self, crashed_workspace: Path) -> None:
+        """submission_content が空の場合、同じ実行・チーム・ラウンドの submission.py から復元すること。"""
+        completed = _find(crashed_workspace, "team-a", 2)
+
+        assert completed is not None
+        assert completed.submission_content.startswith("```python\ndef generate_signal")
+
+    def test_round_dir_of_other_team_is_not_used(self, crashed_workspace: Path) -> None:
+        """ラウンドディレクトリが他チーム・他実行の提出で上書きされている場合は再実行対象となること。"""
+        round_dir = ensure_round_dir(crashed_workspace, 2)
+        write_submission_stamp(round_dir, execution_id="exec-later", team_id="team-b", round_number=2)
+
+        assert _find(crashed_workspace, "team-a", 2) is None
+
+    def test_rewritten_submission_is_not_used(self, crashed_workspace: Path) -> None:
+        """記録後に submission.py が書き換えられた場合は再実行対象となること。"""
+        (ensure_round_dir(crashed_workspace, 2) / SUBMISSION_FILENAME).write_text(
+            "def generate_signal(o, a):\n    pass\n"
+        )
+
+        assert _find(crashed_workspace, "team-a", 2) is None
+
+    def test_eliminated_round_is_completed(self, crashed_workspace: Path) -> None:
+        """打ち切られたラウンドは提出内容が空でも完了済みとなること（ラウンドディレクトリを読まない）。"""
+        _add_eliminated_round(get_db_path(crashed_workspace))
+
+        completed = _find(crashed_workspace, "team-b", 3)
+
+        assert completed is not None
+        assert completed.submission_content == ""
+        assert completed.score_details["exit_reason"] == EXIT_REASON_ELIMINATED
+
+    def test_interrupted_round_is_not_completed(self, crashed_workspace: Path) -> None:
+        """評価前に中断したラウンドは再実行対象となること。"""
+        assert _find(crashed_workspace, "team-a", 3) is None
+
+
+class TestRestoreCompletedRound:
+    """restore_completed_round のテスト。"""
+
+    @pytest.fixture
+    def controller(self, crashed_workspace: Path) -> MagicMock:
+        """新しい実行 ID で起動した RoundController 相当のモック。"""
+        controller = MagicMock()
+        controller.workspace = crashed_workspace
+        controller.task.execution_id = "exec-resumed"
+        controller.team_config.team_id = "team-a"
+        controller.team_config.team_name = "Team A"
+        controller.store = AsyncMock()
+        controller._on_round_complete = AsyncMock()
+        return controller
+
+    async def test_not_resuming_returns_none(self, controller: MagicMock) -> None:
+        """--resume 未指定時は何もしないこと。"""
+        assert await restore_completed_round(controller, 1) is None
+        controller.store.save_to_leader_board.assert_not_called()
+
+    async def test_restores_and_copies_to_new_execution(self, controller: MagicMock) -> None:
+        """完了済みラウンドを RoundState として返し、新しい実行 ID に書き込むこと。"""
+        with resume_from(SOURCE_ID):
+            state = await restore_completed_round(controller, 1)
+
+        assert state is not None
+        assert state.evaluation_score == 0.5
+        assert state.submission_content == CODE_BLOCK
+        assert controller.store.save_to_leader_board.call_args.kwargs["execution_id"] == "exec-resumed"
+        controller.store.save_round_status.assert_awaited_once()
+        controller._on_round_complete.assert_awaited_once()
+
+    async def test_eliminated_round_carries_over(self, controller: MagicMock) -> None:
+        """打ち切られたラウンドは再実行せず、打ち切りを新しい実行に引き継ぐこと。"""
+        _add_eliminated_round(get_db_path(controller.workspace))
+        controller.team_config.team_id = "team-b"
+
+        with resume_from(SOURCE_ID):
+            state = await restore_completed_round(controller, 3)
+
+        assert state is not None and state.evaluation_score == -100.0
+        assert controller.store.save_to_leader_board.call_args.kwargs["exit_reason"] == EXIT_REASON_ELIMINATED
+        assert controller.store.save_round_status.call_args.kwargs["should_continue"] is False
+        assert load_elimination(controller.workspace, "exec-resumed", "team-b") == ELIMINATION
+
+    async def test_reads_database_once_per_execution(
+        self, controller: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """完了済みラウンドはラウンドごとではなく、再開元の実行ごとに 1 回だけ読み込むこと。"""
+        calls: list[str] = []
+
+        def counting_load(conn: duckdb.DuckDBPyConnection, execution_id: str) -> list[CompletedRound]:
+            calls.append(execution_id)
+            return load_completed_rounds(conn, execution_id)
+
+        monkeypatch.setattr("quant_insight_plus.resume.load_completed_rounds", counting_load)
+        with resume_from(SOURCE_ID):
+            for round_number in (1, 2, 3):
+                await restore_completed_round(controller, round_number)
+
+        assert calls == [SOURCE_ID]
+
+    async def test_incomplete_round_runs_normally(self, controller: MagicMock) -> None:
+        """未完了のラウンドは None を返し、通常どおり実行されること。"""
+        with resume_from(SOURCE_ID):
+            assert await restore_completed_round(controller, 3) is None
+
+
+class TestResumeOption:
+    """add_resume_option（qip exec --resume）のテスト。"""
+
+    @pytest.fixture
+    def app(self, crashed_workspace: Path) -> tuple[typer.Typer, list[tuple[str, str | None]]]:
+        """exec コマンドのみを持つ CLI アプリと、exec の呼び出し記録。"""
+        app = typer.Typer()
+        calls: list[tuple[str, str | None]] = []
+
+        @app.command(name="exec")
+        def exec_(task: str, config: Path = typer.Option(..., "--config")) -> None:
+            calls.append((task, os.environ.get(RESUME_ENV_VAR)))
+
+        @app.command(name="noop")
+        def noop() -> None:
+            pass
+
+        add_resume_option(app, lambda: crashed_workspace)
+        return app, calls
+
+    def test_sets_resume_id_during_exec(self, app: tuple[typer.Typer, list[tuple[str, str | None]]]) -> None:
+        """--resume 指定時、exec 実行中のみ再開元の実行 ID が設定されること。"""
+        cli, calls = app
+
+        result = CliRunner().invoke(cli, ["exec", "task", "--config", "o.toml", "--resume", SOURCE_ID])
+
+        assert result.exit_code == 0, result.output
+        assert "team-a のラウンド 1, 2 を復元します" in result.output
+        assert calls == [("task", SOURCE_ID)]
+        assert RESUME_ENV_VAR not in os.environ
+
+    def test_without_resume(self, app: tuple[typer.Typer, list[tuple[str, str | None]]]) -> None:
+        """--resume 未指定時は元の exec がそのまま実行されること。"""
+        cli, calls = app
+
+        result = CliRunner().invoke(cli, ["exec", "task", "--config", "o.toml"])
+
+        assert result.exit_code == 0, result.output
+        assert calls == [("task", None)]
+
+    def test_unknown_execution_exits(self, app: tuple[typer.Typer, list[tuple[str, str | None]]]) -> None:
+        """完了済みラウンドが無い実行 ID は終了コード 1 で終了すること。"""
+        cli, calls = app
+
+        result = CliRunner().invoke(cli, ["exec", "task", "--config", "o.toml", "--resume", "unknown"])
+
+        assert result.exit_code == 1
+        assert calls == []
@@ -0,0 +1,214 @@
+"""round_archive モジュール（ラウンドディレクトリの保持とアーカイブ）のテスト。"""
+
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.db import get_db_path
+from quant_insight_plus.round_archive import (
+    BLOBS_DIR_NAME,
+    archive_round,
+    collect_garbage,
+    get_archive_dir,
+    list_archives,
+    plan_retention,
+    read_archived_file,
+    restore_round,
+)
+from quant_insight_plus.runtime_config import SubmissionRetentionSettings
+from quant_insight_plus.submission_relay import get_round_dir
+
+SETTINGS = SubmissionRetentionSettings(keep_last_rounds=2, keep_best_per_team=1)
+BASE_TIME = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _write_file(path: Path, content: str, modified: datetime) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    os.utime(path, (modified.timestamp(), modified.timestamp()))
+
+
+def _write_database(workspace: Path, rounds: list[tuple[str, int, datetime]], scores: list[tuple]) -> None:
+    """round_status（各ラウンド 1 時間）と leader_board を書き込む。"""
+    conn = duckdb.connect(str(get_db_path(workspace)))
+    conn.execute(
+        "CREATE TABLE round_status (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, "
+        "round_started_at TIMESTAMP, round_ended_at TIMESTAMP)"
+    )
+    conn.executemany(
+        "INSERT INTO round_status VALUES (?, 'team-a', ?, ?, ?)",
+        [
+            (execution_id, n, started.replace(tzinfo=None), (started + timedelta(hours=1)).replace(tzinfo=None))
+            for execution_id, n, started in rounds
+        ],
+    )
+    conn.execute(
+        "CREATE TABLE leader_board (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, score DOUBLE)"
+    )
+    conn.executemany("INSERT INTO leader_board VALUES (?, ?, ?, ?)", scores)
+    conn.close()
+
+
+@pytest.fixture
+def workspace(mock_workspace_env: Path) -> Path:
+    """exec-1 の round_1〜round_5 と round_status / leader_board を配置したワークスペース。
+
+    team-a の最高スコアは round_2、team-b の最高スコアは round_5。
+    """
+    rounds = [("exec-1", n, BASE_TIME + timedelta(hours=n)) for n in range(1, 6)]
+    for _, round_number, started in rounds:
+        round_dir = get_round_dir(mock_workspace_env, round_number)
+        modified = started + timedelta(minutes=10)
+        _write_file(round_dir / "submission.py", f"# round {round_number}\n", modified)
+        _write_file(round_dir / "script.py", "print('same script')\n", modified)
+        _write_file(round_dir / "logs" / "run.log", f"log {round_number}\n", modified)
+    _write_database(
+        mock_workspace_env,
+        rounds,
+        [
+            ("exec-1", "team-a", 1, 0.1),
+            ("exec-1", "team-a", 2, 0.5),
+            ("exec-1", "team-b", 3, -100.0),
+            ("exec-1", "team-b", 5, 0.2),
+        ],
+    )
+    return mock_workspace_env
+
+
+class TestPlan:
+    """plan_retention のテスト。"""
+
+    def test_keeps_latest_and_best_rounds(self, workspace: Path) -> None:
+        """新しいラウンドはそのまま、各チームの最高スコアのラウンドはコンパクト化すること。"""
+        plan = plan_retention(workspace, SETTINGS)
+
+        assert (plan.keep, plan.compact, plan.archive) == ([4, 5], [2], [1, 3])
+
+    def test_without_database(self, mock_workspace_env: Path) -> None:
+        """データベースが無い場合はファイルの更新時刻が新しいラウンドのみ残すこと。"""
+        for round_number in range(1, 4):
+            modified = BASE_TIME + timedelta(hours=round_number)
+            _write_file(get_round_dir(mock_workspace_env, round_number) / "submission.py", "", modified)
+
+        plan = plan_retention(mock_workspace_env, SETTINGS)
+
+        assert (plan.keep, plan.compact, plan.archive) == ([2, 3], [], [1])
+
+    def test_round_dirs_reused_across_executions(self, mock_workspace_env: Path) -> None:
+        """round_1〜round_3 を再利用した複数の実行では、ファイルを書いた実行ごとに判定すること。
+
+        exec-2 が submission.py を上書きし、exec-1 のログは残っている。
+        """
+        rounds = [
+            (execution_id, n, BASE_TIME + timedelta(days=day, hours=n))
+            for day, execution_id in enumerate(["exec-1", "exec-2"])
+            for n in range(1, 4)
+        ]
+        for execution_id, round_number, started in rounds:
+            round_dir = get_round_dir(mock_workspace_env, round_number)
+            modified = started + timedelta(minutes=10)
+            _write_file(round_dir / "submission.py", f"# {execution_id}\n", modified)
+            _write_file(round_dir / "logs" / f"{execution_id}.log", "log\n", modified)
+        _write_database(
+            mock_workspace_env,
+            rounds,
+            [
+                ("exec-1", "team-a", 2, 0.5),
+                ("exec-1", "team-a", 3, 0.1),
+                ("exec-2", "team-a", 1, 0.3),
+                ("exec-2", "team-a", 3, 0.2),
+            ],
+        )
+
+        plan = plan_retention(mock_workspace_env, SETTINGS)
+
+        assert [(r.round_number, r.keep, r.archive) for r in plan.rounds] == [
+            (1, ["submission.py"], ["logs/exec-1.log", "logs/exec-2.log"]),
+            (2, ["logs/exec-2.log", "submission.py"], ["logs/exec-1.log"]),
+            (3, ["logs/exec-2.log", "submission.py"], ["logs/exec-1.log"]),
+        ]
+        collect_garbage(mock_workspace_env, SETTINGS)
+        assert not (get_round_dir(mock_workspace_env, 2) / "logs" / "exec-1.log").exists()
+        assert (get_round_dir(mock_workspace_env, 1) / "submission.py").read_text() == "# exec-2\n"
+
+
+class TestCollectGarbage:
+    """collect_garbage / archive_round のテスト。"""
+
+    def test_dry_run_changes_nothing(self, workspace: Path) -> None:
+        """--dry-run では計画のみ返すこと。"""
+        result = collect_garbage(workspace, SETTINGS, dry_run=True)
+
+        assert result.archives == []
+        assert get_round_dir(workspace, 1).is_dir()
+        assert not get_archive_dir(workspace).exists()
+
+    def test_applies_plan(self, workspace: Path) -> None:
+        """アーカイブしたラウンドは削除し、コンパクト化したラウンドは keep_files のみ残すこと。"""
+        collect_garbage(workspace, SETTINGS)
+
+        assert not get_round_dir(workspace, 1).exists()
+        assert [p.name for p in get_round_dir(workspace, 2).iterdir()] == ["submission.py"]
+        assert (get_round_dir(workspace, 4) / "script.py").is_file()
+        assert [(a.round_number, a.compacted) for a in list_archives(workspace)] == [
+            (1, False),
+            (2, True),
+            (3, False),
+        ]
+
+    def test_identical_files_share_blobs(self, workspace: Path) -> None:
+        """同じ内容のファイルは 1 つのブロブを共有すること。"""
+        archive_round(workspace, 1)
+        archive_round(workspace, 3)
+
+        blobs = list((get_archive_dir(workspace) / BLOBS_DIR_NAME).rglob("*.gz"))
+        assert len(blobs) == 5  # submission.py x2 + run.log x2 + script.py
+
+    def test_missing_round_raises(self, workspace: Path) -> None:
+        """存在しないラウンドは FileNotFoundError になること。"""
+        with pytest.raises(FileNotFoundError, match="ラウンドディレクトリ"):
+            archive_round(workspace, 99)
+
+
+class TestLookup:
+    """read_archived_file / restore_round のテスト。"""
+
+    def test_read_and_restore(self, workspace: Path, tmp_path: Path) -> None:
+        """アーカイブしたファイルを読み出し・展開できること。"""
+        archive = archive_round(workspace, 1)
+
+        assert read_archived_file(workspace, archive.archive_id, "logs/run.log") == b"log 1\n"
+        restored = restore_round(workspace, archive.archive_id, tmp_path / "restored")
+        assert sorted(p.relative_to(restored).as_posix() for p in restored.rglob("*") if p.is_file()) == [
+            "logs/run.log",
+            "script.py",
+            "submission.py",
+        ]
+
+    def test_missing_file_raises(self, workspace: Path) -> None:
+        """アーカイブに無いファイルは FileNotFoundError になること。"""
+        archive = archive_round(workspace, 1)
+
+        with pytest.raises(FileNotFoundError, match="analysis.md"):
+            read_archived_file(workspace, archive.archive_id, "analysis.md")
+
+
+class TestSubmissionsCommand:
+    """qip submissions コマンドのテスト。"""
+
+    def test_gc_and_cat(self, workspace: Path) -> None:
+        """gc でアーカイブし、cat で内容を表示できること。"""
+        from quant_insight_plus.cli import app
+
+        runner = CliRunner()
+        result = runner.invoke(app, ["submissions", "gc", "--keep-last", "2", "--keep-best", "1"])
+
+        assert result.exit_code == 0, result.output
+        assert "アーカイブ: round_1, round_3" in result.output
+        [archive] = list_archives(workspace, 1)
+        result = runner.invoke(app, ["submissions", "cat", archive.archive_id, "submission.py"])
+        assert result.output == "# round 1\n"
@@ -0,0 +1,42 @@
+"""runtime_config モジュール（runtime.toml の読み込み）のテスト。"""
+
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from quant_insight_plus.runtime_config import get_runtime_config_path, load_runtime_settings
+
+
+class TestLoadRuntimeSettings:
+    """load_runtime_settings のテスト。"""
+
+    def test_defaults_when_file_missing(self, mock_workspace_env: Path) -> None:
+        """runtime.toml が存在しない場合はデフォルト値になること。"""
+        settings = load_runtime_settings()
+        assert settings.session_limit.enabled is False
+
+    def test_defaults_when_workspace_unset(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """MIXSEEK_WORKSPACE 未設定時もデフォルト値になること。"""
+        monkeypatch.delenv("MIXSEEK_WORKSPACE")
+        assert load_runtime_settings().session_limit.max_member_sessions == 4
+
+    def test_reads_session_limit_section(self, mock_workspace_env: Path) -> None:
+        """[session_limit] セクションが読み込まれること。"""
+        path = get_runtime_config_path(mock_workspace_env)
+        path.parent.mkdir(parents=True)
+        path.write_text("[session_limit]\nenabled = true\nmax_member_sessions = 8\n")
+
+        settings = load_runtime_settings()
+
+        assert settings.session_limit.enabled is True
+        assert settings.session_limit.max_member_sessions == 8
+
+    def test_invalid_value_raises(self, mock_workspace_env: Path) -> None:
+        """不正な値は ValidationError になること。"""
+        path = get_runtime_config_path(mock_workspace_env)
+        path.parent.mkdir(parents=True)
+        path.write_text("[session_limit]\nmax_member_sessions = 0\n")
+
+        with pytest.raises(ValidationError):
+            load_runtime_settings()
@@ -0,0 +1,161 @@
+"""salvage モジュール（失敗実行の成果物回収・再実行バックオフ）のテスト。"""
+
+import os
+import random
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mixseek.models.member_agent import MemberAgentConfig, ResultStatus
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.salvage import (
+    SALVAGED_NOTICE,
+    RetrySettings,
+    backoff_delay,
+    find_fresh_artifact,
+    load_retry_settings,
+)
+from quant_insight_plus.submission_relay import SUBMISSION_FILENAME, SUBMISSIONS_DIR_NAME
+from tests.conftest import MODEL_PATCH
+
+VALID_CODE = """\
+def generate_signal(ohlcv, additional_data):
+    return ohlcv
+"""
+
+CONTEXT = {"execution_id": "exec-1", "team_id": "team-1", "round_number": 1}
+
+
+@pytest.fixture
+@patch(MODEL_PATCH)
+def submitter_agent(mock_create_model: MagicMock) -> ClaudeCodeLocalCodeExecutorAgent:
+    """FileSubmitterOutput を返す submission-creator 相当のエージェント（再実行の待機は最小）。"""
+    config = MemberAgentConfig(
+        name="submission-creator",
+        type="custom",
+        model="claudecode:claude-opus-4-6",
+        description="Test submitter",
+        system_instruction="You are a test agent.",
+        metadata={
+            "retry": {"max_retries": 2, "base_delay_seconds": 0.01},
+            "tool_settings": {
+                "local_code_executor": {
+                    "available_data_paths": [],
+                    "output_model": {
+                        "module_path": "quant_insight_plus.agents.output_models",
+                        "class_name": "FileSubmitterOutput",
+                    },
+                }
+            },
+        },
+    )
+    return ClaudeCodeLocalCodeExecutorAgent(config)
+
+
+class TestBackoffDelay:
+    """backoff_delay のテスト。"""
+
+    def test_within_exponential_cap(self) -> None:
+        """待機時間が 0 以上 base * 2**attempt 以下であること。"""
+        settings = RetrySettings(base_delay_seconds=1.0, max_delay_seconds=100.0)
+        rng = random.Random(0)
+        for attempt in range(5):
+            assert 0 <= backoff_delay(attempt, settings, rng) <= 2**attempt
+
+    def test_capped_by_max_delay(self) -> None:
+        """max_delay_seconds を超えないこと。"""
+        settings = RetrySettings(base_delay_seconds=1.0, max_delay_seconds=3.0)
+        rng = random.Random(0)
+        assert all(backoff_delay(10, settings, rng) <= 3.0 for _ in range(100))
+
+    def test_jitter_spreads_delays(self) -> None:
+        """同じ試行回数でも待機時間がばらつくこと。"""
+        settings = RetrySettings(base_delay_seconds=1.0)
+        rng = random.Random(0)
+        assert len({backoff_delay(3, settings, rng) for _ in range(10)}) > 1
+
+    def test_invalid_settings_raise_value_error(self) -> None:
+        """不正な設定は ValueError になること。"""
+        with pytest.raises(ValueError, match="retry"):
+            load_retry_settings({"retry": {"max_retries": -1}})
+
+
+class TestFindFreshArtifact:
+    """find_fresh_artifact のテスト。"""
+
+    def test_returns_file_written_after_start(self, tmp_path: Path) -> None:
+        """開始後に書き込まれたファイルを返すこと。"""
+        since = time.time()
+        (tmp_path / SUBMISSION_FILENAME).write_text(VALID_CODE)
+        assert find_fresh_artifact(tmp_path, SUBMISSION_FILENAME, since) == tmp_path / SUBMISSION_FILENAME
+
+    def test_ignores_stale_file(self, tmp_path: Path) -> None:
+        """開始前から存在するファイルは対象外であること。"""
+        path = tmp_path / SUBMISSION_FILENAME
+        path.write_text(VALID_CODE)
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+        assert find_fresh_artifact(tmp_path, SUBMISSION_FILENAME, time.time()) is None
+
+    def test_ignores_blank_file(self, tmp_path: Path) -> None:
+        """空白のみのファイルは対象外であること。"""
+        since = time.time()
+        (tmp_path / SUBMISSION_FILENAME).write_text("  \n")
+        assert find_fresh_artifact(tmp_path, SUBMISSION_FILENAME, since) is None
+
+
+class TestExecuteSalvage:
+    """execute() の成果物回収と再実行のテスト。"""
+
+    async def test_salvages_submission_written_before_failure(
+        self, submitter_agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """submission.py 書き込み後に失敗した場合、再実行せず部分結果を返すこと。"""
+        submission = mock_workspace_env / SUBMISSIONS_DIR_NAME / "round_1" / SUBMISSION_FILENAME
+
+        async def run(*args: object, **kwargs: object) -> None:
+            submission.write_text(VALID_CODE)
+            raise RuntimeError("output validation retries exhausted")
+
+        submitter_agent.agent.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+
+        result = await submitter_agent.execute("task", context=CONTEXT)
+
+        assert result.status == ResultStatus.WARNING
+        assert SALVAGED_NOTICE in result.content
+        assert VALID_CODE in result.content
+        assert "retries exhausted" in (result.error_message or "")
+        assert submitter_agent.agent.run.call_count == 1
+
+    async def test_broken_submission_is_not_salvaged(
+        self, submitter_agent: ClaudeCodeLocalCodeExecutorAgent, mock_workspace_env: Path
+    ) -> None:
+        """静的検証に失敗する submission.py は回収せず、再実行後に ERROR を返すこと。"""
+        submission = mock_workspace_env / SUBMISSIONS_DIR_NAME / "round_1" / SUBMISSION_FILENAME
+
+        async def run(*args: object, **kwargs: object) -> None:
+            submission.write_text("def generate_signal(ohlcv):\n")
+            raise RuntimeError("timeout")
+
+        submitter_agent.agent.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+
+        result = await submitter_agent.execute("task", context=CONTEXT)
+
+        assert result.status == ResultStatus.ERROR
+        assert submitter_agent.agent.run.call_count == 3
+
+    async def test_retries_then_succeeds(self, submitter_agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """一時的な失敗の後、再実行で成功すること。"""
+        mock_result = MagicMock()
+        mock_result.output = "done"
+        mock_result.all_messages.return_value = []
+        submitter_agent.agent.run = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[RuntimeError("overloaded"), mock_result]
+        )
+
+        result = await submitter_agent.execute("task")
+
+        assert result.status == ResultStatus.SUCCESS
+        assert submitter_agent.agent.run.call_count == 2
@@ -0,0 +1,249 @@
+"""scheduler モジュール（複数チーム実行の容量プール）のテスト。
+
+- 容量上限
+- 優先度とフェアシェアによる獲得順
+- キャンセル時のスロット返却
+- キュー待ちメトリクスの記録・集計と qip scheduler stats
+- チームの期限からのスロット待ちの除外
+"""
+
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.runtime_config import SchedulerSettings, get_runtime_config_path, load_runtime_settings
+from quant_insight_plus.scheduler import (
+    POOL_CPU,
+    POOL_LLM,
+    POOL_ROUND_DIR,
+    CapacityPool,
+    Scheduler,
+    load_queue_metrics,
+    reset_scheduler,
+    run_with_team_clock,
+    scheduler_slot,
+    summarize_queue_waits,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_scheduler() -> Iterator[None]:
+    """テスト間でプロセス共有スケジューラを持ち越さない。"""
+    reset_scheduler()
+    yield
+    reset_scheduler()
+
+
+def _write_runtime_toml(workspace: Path, body: str) -> None:
+    path = get_runtime_config_path(workspace)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body)
+
+
+class TestCapacityPool:
+    """CapacityPool のテスト。"""
+
+    async def test_concurrency_is_capped(self) -> None:
+        """同時保持数が capacity を超えないこと。"""
+        pool = CapacityPool(POOL_LLM, 2)
+        active = 0
+        peak = 0
+
+        async def work(team_id: str) -> None:
+            nonlocal active, peak
+            await pool.acquire(team_id)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            pool.release()
+
+        await asyncio.gather(*(work(f"team-{i}") for i in range(6)))
+
+        assert peak == 2
+        assert pool.in_use == 0
+
+    async def test_priority_then_fair_share(self) -> None:
+        """優先度の高いチーム、次に獲得回数の少ないチームが先に獲得すること。"""
+        pool = CapacityPool(POOL_CPU, 1)
+        order: list[str] = []
+
+        async def wait_for_slot(team_id: str, priority: int = 0) -> None:
+            await pool.acquire(team_id, priority)
+            order.append(team_id)
+
+        await pool.acquire("busy")  # busy は獲得回数 1
+        waiters = [
+            asyncio.create_task(wait_for_slot("busy")),
+            asyncio.create_task(wait_for_slot("fresh")),
+            asyncio.create_task(wait_for_slot("vip", priority=10)),
+        ]
+        await asyncio.sleep(0)
+        assert pool.waiting == 3
+
+        for _ in waiters:
+            pool.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+
+        assert order == ["vip", "fresh", "busy"]
+
+    async def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        """待機中にキャンセルされたエントリがスロットを消費しないこと。"""
+        pool = CapacityPool(POOL_LLM, 1)
+        await pool.acquire("a")
+        waiter = asyncio.create_task(pool.acquire("b"))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        pool.release()
+
+        assert pool.in_use == 0
+        assert pool.waiting == 0
+
+
+class TestScheduler:
+    """Scheduler のテスト。"""
+
+    async def test_records_queue_wait(self, tmp_path: Path) -> None:
+        """スロット待ちの時間が記録され、JSONL から集計できること。"""
+        metrics_file = tmp_path / "logs" / "scheduler_metrics.jsonl"
+        scheduler = Scheduler(SchedulerSettings(enabled=True, llm_slots=1), metrics_file=metrics_file)
+
+        async def round_(team_id: str) -> None:
+            async with scheduler.slot(POOL_LLM, team_id, round_number=1):
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(round_("team-1"), round_("team-2"))
+
+        metrics = load_queue_metrics(metrics_file)
+        assert len(metrics) == 2
+        assert max(m.wait_seconds for m in metrics) >= 0.015
+        summary = summarize_queue_waits(metrics)[POOL_LLM]
+        assert summary["acquisitions"] == 2
+        assert summary["wait_max"] >= 0.015
+
+    async def test_team_priorities_from_settings(self) -> None:
+        """team_priorities の値がメトリクスに記録されること。"""
+        scheduler = Scheduler(SchedulerSettings(enabled=True, team_priorities={"team-1": 5}))
+
+        async with scheduler.slot(POOL_CPU, "team-1"):
+            pass
+
+        assert scheduler.metrics()[0].priority == 5
+
+    async def test_disabled_by_default(self) -> None:
+        """runtime.toml が無い場合はスロットを取らずに実行されること。"""
+        async with scheduler_slot(POOL_LLM, "team-1"):
+            pass
+
+    def test_reads_scheduler_section(self, mock_workspace_env: Path) -> None:
+        """[scheduler] セクションが読み込まれること。"""
+        _write_runtime_toml(
+            mock_workspace_env,
+            '[scheduler]\nenabled = true\nllm_slots = 8\n\n[scheduler.team_priorities]\n"team-a" = 3\n',
+        )
+
+        settings = load_runtime_settings().scheduler
+
+        assert settings.llm_slots == 8
+        assert settings.team_priorities == {"team-a": 3}
+
+    async def test_round_dir_is_used_by_one_team(self) -> None:
+        """同じラウンド番号は 1 チームずつ、異なるラウンド番号は同時に実行されること。"""
+        scheduler = Scheduler(SchedulerSettings(enabled=True))
+        active: dict[int, int] = {1: 0, 2: 0}
+        peak: dict[int, int] = {1: 0, 2: 0}
+
+        async def round_(team_id: str, round_number: int) -> None:
+            async with scheduler.slot(POOL_ROUND_DIR, team_id, round_number):
+                active[round_number] += 1
+                peak[round_number] = max(peak[round_number], active[round_number])
+                await asyncio.sleep(0.01)
+                active[round_number] -= 1
+
+        await asyncio.gather(round_("team-a", 1), round_("team-b", 1), round_("team-c", 2))
+
+        assert peak == {1: 1, 2: 1}
+        assert [m.wait_seconds < 0.005 for m in scheduler.metrics() if m.team_id == "team-c"] == [True]
+
+
+class TestTeamClock:
+    """run_with_team_clock のテスト。"""
+
+    @pytest.fixture(autouse=True)
+    def _single_llm_slot(self, mock_workspace_env: Path) -> None:
+        _write_runtime_toml(
+            mock_workspace_env, "[scheduler]\nenabled = true\nllm_slots = 1\nteam_timeout_seconds = 0.4\n"
+        )
+
+    @staticmethod
+    async def _run_team(team_id: str, work_seconds: float) -> str:
+        async def round_() -> str:
+            async with scheduler_slot(POOL_LLM, team_id, 1):
+                await asyncio.sleep(work_seconds)
+            return team_id
+
+        return await run_with_team_clock("exec-1", team_id, 3600, round_())
+
+    async def test_slot_wait_is_not_charged(self) -> None:
+        """スロット待ちの間に持ち時間を過ぎても、待ち時間の分だけ実行を続けること。"""
+        results = await asyncio.gather(self._run_team("team-a", 0.3), self._run_team("team-b", 0.3))
+
+        assert results == ["team-a", "team-b"]
+
+    async def test_times_out_after_extended_deadline(self) -> None:
+        """スロット待ちの時間だけ延ばした期限を過ぎた時点で TimeoutError になること。"""
+        started = asyncio.get_running_loop().time()
+        results = await asyncio.gather(
+            self._run_team("team-a", 0.2), self._run_team("team-b", 2.0), return_exceptions=True
+        )
+
+        assert results[0] == "team-a"
+        assert isinstance(results[1], TimeoutError)
+        assert asyncio.get_running_loop().time() - started < 1.0
+
+    async def test_external_cancellation_propagates(self) -> None:
+        """延ばした期限の前でも、外部からのキャンセル（Orchestrator のタイムアウト）は保留しないこと。"""
+        first = asyncio.create_task(self._run_team("team-a", 0.3))
+        second = asyncio.create_task(self._run_team("team-b", 0.3))
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(second, 0.4)
+        assert await first == "team-a"
+        assert second.cancelled()
+
+
+class TestSchedulerStatsCommand:
+    """qip scheduler stats コマンドのテスト。"""
+
+    async def test_prints_summary(self, mock_workspace_env: Path) -> None:
+        """プールごとの待ち時間が表示されること。"""
+        from quant_insight_plus.cli import app
+
+        _write_runtime_toml(mock_workspace_env, "[scheduler]\nenabled = true\n")
+        scheduler = Scheduler(
+            load_runtime_settings().scheduler,
+            metrics_file=mock_workspace_env / "logs" / "scheduler_metrics.jsonl",
+        )
+        async with scheduler.slot(POOL_CPU, "team-1"):
+            pass
+
+        result = CliRunner().invoke(app, ["scheduler", "stats", "--team"])
+
+        assert result.exit_code == 0, result.output
+        assert "cpu: 1 回" in result.output
+        assert "team-1 / cpu" in result.output
+
+    def test_missing_metrics_exits(self) -> None:
+        """メトリクスが無い場合に終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["scheduler", "stats"])
+
+        assert result.exit_code == 1
@@ -0,0 +1,153 @@
+"""session_limit モジュール（Member Agent の ClaudeCode セッションの同時実行上限）のテスト。
+
+- ホスト単位の同時セッション上限
+- 待ち時間・所要時間・キャッシュトークンのメトリクス記録と JSONL 出力
+- resolve_member_model の有効/無効切り替え
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCalls, FunctionModel
+from pydantic_ai.usage import RequestUsage
+
+from quant_insight_plus.runtime_config import SessionLimitSettings
+from quant_insight_plus.session_limit import (
+    LimitedModel,
+    SessionLimiter,
+    get_session_limiter,
+    reset_session_limiter,
+    resolve_member_model,
+)
+from tests.conftest import MODEL_PATCH
+
+MODEL_ID = "claudecode:claude-opus-4-6"
+
+
+@pytest.fixture(autouse=True)
+def _reset_limiter() -> Iterator[None]:
+    """テスト間でプロセス共有の上限を持ち越さない。"""
+    reset_session_limiter()
+    yield
+    reset_session_limiter()
+
+
+class _ConcurrencyProbe:
+    """FunctionModel の同時実行数を計測する。"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    def model(self) -> FunctionModel:
+        async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return ModelResponse(parts=[TextPart("ok")])
+
+        async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str | DeltaToolCalls]:
+            yield "ok"
+
+        return FunctionModel(respond, stream_function=stream, model_name=MODEL_ID)
+
+
+class TestSessionLimiter:
+    """SessionLimiter / LimitedModel のテスト。"""
+
+    async def test_concurrency_is_capped(self) -> None:
+        """同時セッション数が max_member_sessions を超えないこと。"""
+        probe = _ConcurrencyProbe()
+        limiter = SessionLimiter(SessionLimitSettings(max_member_sessions=2))
+        agent = Agent(LimitedModel(limiter, MODEL_ID, probe.model()))
+
+        await asyncio.gather(*(agent.run(f"task-{i}") for i in range(6)))
+
+        assert probe.peak == 2
+        assert max(m.wait_seconds for m in limiter.metrics()) > 0
+
+    async def test_metrics_written_as_jsonl(self, tmp_path: Path) -> None:
+        """メトリクスが JSONL に追記され、モデルごとに集計されること。"""
+        metrics_file = tmp_path / "logs" / "session_metrics.jsonl"
+        limiter = SessionLimiter(SessionLimitSettings(), metrics_file=metrics_file)
+        agent = Agent(LimitedModel(limiter, MODEL_ID, _ConcurrencyProbe().model()))
+
+        await agent.run("task")
+        await agent.run("task")
+
+        lines = metrics_file.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["model_id"] == MODEL_ID
+        summary = limiter.summary()[MODEL_ID]
+        assert summary["requests"] == 2
+        assert summary["duration_p50"] > 0
+
+    async def test_streamed_request_recorded(self) -> None:
+        """ストリーミング応答も上限内で実行し、応答の使用量を記録すること。"""
+        limiter = SessionLimiter(SessionLimitSettings())
+        agent = Agent(LimitedModel(limiter, MODEL_ID, _ConcurrencyProbe().model()))
+
+        async with agent.run_stream("task") as result:
+            assert await result.get_output() == "ok"
+
+        [metric] = limiter.metrics()
+        assert metric.streamed
+        assert metric.input_tokens > 0
+
+    async def test_cache_tokens_recorded(self) -> None:
+        """応答の cache_read/cache_write トークンが記録され、キャッシュヒット率が集計されること。"""
+
+        def cached(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+            usage = RequestUsage(input_tokens=1000, cache_read_tokens=800, cache_write_tokens=100)
+            return ModelResponse(parts=[TextPart("ok")], usage=usage)
+
+        limiter = SessionLimiter(SessionLimitSettings())
+        agent = Agent(LimitedModel(limiter, MODEL_ID, FunctionModel(cached)))
+
+        await agent.run("task")
+
+        metric = limiter.metrics()[0]
+        assert (metric.input_tokens, metric.cache_read_tokens, metric.cache_write_tokens) == (1000, 800, 100)
+        assert limiter.summary()[MODEL_ID]["cache_hit_ratio"] == pytest.approx(0.8)
+
+
+class TestResolveMemberModel:
+    """resolve_member_model のテスト。"""
+
+    @patch(MODEL_PATCH)
+    def test_disabled_by_default(self, mock_create_model: MagicMock) -> None:
+        """runtime.toml が無い場合は上限を適用しないこと。"""
+        model = resolve_member_model(MODEL_ID)
+        assert model is mock_create_model.return_value
+
+    @patch(MODEL_PATCH)
+    def test_enabled_via_runtime_toml(self, mock_create_model: MagicMock, mock_workspace_env: Path) -> None:
+        """runtime.toml で有効化すると LimitedModel が返ること。"""
+        mock_create_model.side_effect = lambda model_id: FunctionModel(lambda m, i: ModelResponse(parts=[]))
+        configs = mock_workspace_env / "configs"
+        configs.mkdir()
+        (configs / "runtime.toml").write_text("[session_limit]\nenabled = true\nmax_member_sessions = 2\n")
+
+        model = resolve_member_model(MODEL_ID)
+
+        assert isinstance(model, LimitedModel)
+        assert get_session_limiter().settings.max_member_sessions == 2
+        assert get_session_limiter().metrics_file == mock_workspace_env / "logs" / "session_metrics.jsonl"
+
+    @patch(MODEL_PATCH)
+    def test_non_claudecode_model_not_limited(self, mock_create_model: MagicMock, mock_workspace_env: Path) -> None:
+        """claudecode: 以外のモデルは上限の対象外であること。"""
+        configs = mock_workspace_env / "configs"
+        configs.mkdir()
+        (configs / "runtime.toml").write_text("[session_limit]\nenabled = true\n")
+
+        model = resolve_member_model("groq:llama-3.3-70b")
+
+        assert model is mock_create_model.return_value
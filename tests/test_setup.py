@@ -108,17 +108,26 @@ class TestInstallTemplates:
         assert (mock_workspace_env / "configs" / "agents" / "members").is_dir()
         assert (mock_workspace_env / "configs" / "agents" / "teams").is_dir()
 
-    def test_overwrites_existing_files(self, mock_workspace_env: Path) -> None:
-        """既存のファイルを上書きすること。"""
+    def test_preserves_edited_files(self, mock_workspace_env: Path) -> None:
+        """マニフェストの無い既存ファイルはユーザー編集として保持し、テンプレートを .new に出力すること。"""
         from quant_insight_plus.cli import _install_templates
 
         orchestrator = mock_workspace_env / "configs" / "orchestrator.toml"
         orchestrator.write_text('model = "google-gla:gemini-3-flash-preview"')
 
+        copied = _install_templates(mock_workspace_env)
+
+        assert Path("orchestrator.toml") not in copied
+        assert "gemini" in orchestrator.read_text()
+        assert "claudecode" in orchestrator.with_name("orchestrator.toml.new").read_text()
+
+    def test_second_run_copies_nothing(self, mock_workspace_env: Path) -> None:
+        """再実行時は変更のないテンプレートをコピーしないこと。"""
+        from quant_insight_plus.cli import _install_templates
+
         _install_templates(mock_workspace_env)
 
-        content = orchestrator.read_text()
-        assert "claudecode" in content
+        assert _install_templates(mock_workspace_env) == []
 
     def test_raises_on_missing_templates_dir(self, mock_workspace_env: Path) -> None:
         """templates/ が存在しない場合に FileNotFoundError を送出すること。"""
@@ -176,7 +185,7 @@ class TestSetupCommand:
         """全ステップが正しい順序で呼ばれること。
 
         init_workspace → install_templates → data_dirs → next_steps
-        (patch_submission_relay はモジュールレベルで実行済み)
+        (setup はエージェント登録・パッチを必要としない)
         """
         from typer.testing import CliRunner
 
@@ -184,10 +193,10 @@ class TestSetupCommand:
 
         call_order: list[str] = []
 
-        def _track_init_workspace(ws: Path) -> None:
+        def _track_init_workspace(ws: Path, **kwargs: object) -> None:
             call_order.append("init_workspace")
 
-        def _track_install_templates(ws: Path) -> list[Path]:
+        def _track_install_templates(ws: Path, **kwargs: object) -> list[Path]:
             call_order.append("install_templates")
             return [Path("orchestrator.toml")]
 
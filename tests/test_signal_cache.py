@@ -0,0 +1,251 @@
+"""signal_cache モジュール（評価時のシグナルのキャッシュ）のテスト。"""
+
+import inspect
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from quant_insight_plus.runtime_config import SignalCacheSettings, get_runtime_config_path, load_runtime_settings
+from quant_insight_plus.signal_cache import (
+    SignalCapture,
+    capture_signal,
+    code_fingerprint,
+    data_fingerprint,
+    enforce_retention,
+    find_cached_signals,
+    get_signal_cache_dir,
+    list_cached_signals,
+    load_signals,
+)
+from quant_insight_plus.submission_relay import (
+    SUBMISSION_ERROR_SCORE,
+    SUBMISSION_FILENAME,
+    ensure_round_dir,
+    finalize_signal_capture,
+    get_submission_content,
+    start_signal_capture,
+)
+
+# 全期間のシグナルを返す（評価側で当該日時の行のみが使われる）
+SUBMISSION_CODE = """\
+import polars as pl
+
+
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol", (pl.col("close") / pl.col("open")).alias("signal"))
+"""
+
+DATES = [datetime(2026, 1, d) for d in (5, 6, 7)]
+
+
+@pytest.fixture
+def ohlcv() -> pl.DataFrame:
+    """3 日 × 2 銘柄の OHLCV。"""
+    return pl.DataFrame(
+        {
+            "datetime": [d for d in DATES for _ in range(2)],
+            "symbol": ["1301", "1332"] * len(DATES),
+            "open": [100.0, 200.0, 101.0, 198.0, 103.0, 205.0],
+            "close": [101.0, 199.0, 103.0, 201.0, 102.0, 207.0],
+        }
+    )
+
+
+@pytest.fixture
+def round_dir(mock_workspace_env: Path) -> Path:
+    """submission.py と評価データを配置したラウンドディレクトリ。"""
+    test_dir = mock_workspace_env / "data" / "inputs" / "ohlcv"
+    test_dir.mkdir(parents=True)
+    (test_dir / "test.parquet").write_bytes(b"test-data")
+    round_dir = ensure_round_dir(mock_workspace_env, 1)
+    (round_dir / SUBMISSION_FILENAME).write_text(SUBMISSION_CODE)
+    return round_dir
+
+
+def _load(submission_content: str) -> dict[str, Any]:
+    """Evaluator 相当: 提出内容のコードブロックを実行する。"""
+    match = re.search(r"```python\n(.*)```", submission_content, re.DOTALL)
+    assert match is not None
+    namespace: dict[str, Any] = {}
+    exec(match.group(1), namespace)  # noqa: S102
+    return namespace
+
+
+def _evaluate(submission_content: str, ohlcv: pl.DataFrame) -> None:
+    """Evaluator 相当: 各日時までのデータで generate_signal を呼び出す。"""
+    namespace = _load(submission_content)
+    for current in DATES:
+        namespace["generate_signal"](ohlcv.filter(pl.col("datetime") <= current), {})
+
+
+class TestSignalCapture:
+    """SignalCapture（シムによる記録と統合）のテスト。"""
+
+    def test_captures_current_rows_per_date(
+        self, mock_workspace_env: Path, round_dir: Path, ohlcv: pl.DataFrame
+    ) -> None:
+        """各日時のシグナルのうち当該日時の行のみがコンパクト dtype で保存されること。"""
+        capture = SignalCapture(mock_workspace_env, SUBMISSION_CODE, SignalCacheSettings(enabled=True))
+        _evaluate(capture.instrument(get_submission_content(round_dir)), ohlcv)
+
+        entry = capture.finalize(execution_id="exec-1", team_id="team-a", round_number=1, score=0.5)
+
+        assert entry is not None
+        assert (entry.rows, entry.dates) == (6, 3)
+        signals = load_signals(mock_workspace_env, entry.key)
+        assert signals.schema["symbol"] == pl.Categorical
+        assert signals.schema["signal"] == pl.Float32
+        assert signals.get_column("datetime").to_list() == [d for d in DATES for _ in range(2)]
+        assert not capture.capture_dir.exists()
+
+    def test_instrumented_function_keeps_signature(self, mock_workspace_env: Path, round_dir: Path) -> None:
+        """シム付加後も generate_signal のシグネチャが変わらないこと。"""
+        capture = SignalCapture(mock_workspace_env, SUBMISSION_CODE, SignalCacheSettings(enabled=True))
+        namespace = _load(capture.instrument(get_submission_content(round_dir)))
+
+        assert list(inspect.signature(namespace["generate_signal"]).parameters) == ["ohlcv", "additional_data"]
+        capture.discard()
+
+    def test_code_without_generate_signal_still_runs(self, mock_workspace_env: Path) -> None:
+        """generate_signal が無いコードでもシムがエラーにならないこと。"""
+        capture = SignalCapture(mock_workspace_env, "x = 1\n", SignalCacheSettings(enabled=True))
+        namespace = _load(capture.instrument("```python\nx = 1\n```"))
+
+        assert "generate_signal" not in namespace
+        assert capture.finalize(execution_id="e", team_id="t", round_number=1, score=0.0) is None
+
+    def test_buffers_until_collect(self, mock_workspace_env: Path, round_dir: Path, ohlcv: pl.DataFrame) -> None:
+        """バックテスト中はファイルを書き出さず、collect() で 1 ファイルにまとめること。"""
+        capture = SignalCapture(mock_workspace_env, SUBMISSION_CODE, SignalCacheSettings(enabled=True))
+        _evaluate(capture.instrument(get_submission_content(round_dir)), ohlcv)
+
+        assert list(capture.capture_dir.iterdir()) == []
+        signals = capture.collect()
+
+        assert signals is not None
+        assert signals.height == 6
+        assert len(list(capture.capture_dir.glob("*.parquet"))) == 1
+        capture.discard()
+
+    def test_shim_keeps_original_when_import_fails(self, mock_workspace_env: Path, round_dir: Path) -> None:
+        """quant_insight_plus をインポートできない環境では元の generate_signal のまま評価すること。"""
+        capture = SignalCapture(mock_workspace_env, SUBMISSION_CODE, SignalCacheSettings(enabled=True))
+        with patch.dict(sys.modules, {"quant_insight_plus.signal_cache": None}):
+            namespace = _load(capture.instrument(get_submission_content(round_dir)))
+
+        assert namespace["generate_signal"].__code__.co_name == "generate_signal"
+        capture.discard()
+
+    def test_capture_signal_never_raises(self, tmp_path: Path) -> None:
+        """不正なシグナルでも例外を送出しないこと。"""
+        capture_dir = tmp_path / "capture"
+        capture_dir.mkdir()
+
+        capture_signal("not a frame", pl.DataFrame(), str(capture_dir))
+
+        assert list(capture_dir.iterdir()) == []
+
+
+class TestLoaderApi:
+    """find_cached_signals / list_cached_signals / data_fingerprint のテスト。"""
+
+    @pytest.fixture
+    def cached(self, mock_workspace_env: Path, round_dir: Path, ohlcv: pl.DataFrame) -> str:
+        """キャッシュ済みの 1 エントリのキー。"""
+        capture = SignalCapture(mock_workspace_env, SUBMISSION_CODE, SignalCacheSettings(enabled=True))
+        _evaluate(capture.instrument(get_submission_content(round_dir)), ohlcv)
+        entry = capture.finalize(execution_id="exec-1", team_id="team-a", round_number=1, score=0.5)
+        assert entry is not None
+        return entry.key
+
+    def test_find_by_code(self, mock_workspace_env: Path, cached: str) -> None:
+        """submission.py のコードからキャッシュが見つかること。"""
+        entry = find_cached_signals(mock_workspace_env, SUBMISSION_CODE)
+
+        assert entry is not None
+        assert entry.key == cached
+        assert entry.code_hash == code_fingerprint(SUBMISSION_CODE)
+        assert [e.key for e in list_cached_signals(mock_workspace_env)] == [cached]
+
+    def test_data_change_misses_cache(self, mock_workspace_env: Path, cached: str) -> None:
+        """評価データが変わった場合はキャッシュに該当しないこと。"""
+        before = data_fingerprint(mock_workspace_env)
+        (mock_workspace_env / "data" / "inputs" / "ohlcv" / "test.parquet").write_bytes(b"new-test-data")
+
+        assert data_fingerprint(mock_workspace_env) != before
+        assert find_cached_signals(mock_workspace_env, SUBMISSION_CODE) is None
+
+    def test_load_missing_raises(self, mock_workspace_env: Path) -> None:
+        """存在しないキーは FileNotFoundError になること。"""
+        with pytest.raises(FileNotFoundError, match="シグナルキャッシュ"):
+            load_signals(mock_workspace_env, "missing")
+
+
+class TestRetention:
+    """enforce_retention のテスト。"""
+
+    def test_removes_least_recently_used(self, tmp_path: Path) -> None:
+        """件数の上限を超えた場合、最後に使用された時刻が古い順に削除すること。"""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        for i, key in enumerate(["old", "mid", "new"]):
+            path = cache_dir / f"{key}.parquet"
+            path.write_bytes(b"x")
+            path.with_suffix(".json").write_text("{}")
+            os.utime(path, (1_000_000 + i, 1_000_000 + i))
+
+        removed = enforce_retention(cache_dir, SignalCacheSettings(max_entries=2))
+
+        assert removed == ["old"]
+        assert sorted(p.name for p in cache_dir.iterdir()) == ["mid.json", "mid.parquet", "new.json", "new.parquet"]
+
+    def test_byte_limit_keeps_requested_entry(self, tmp_path: Path) -> None:
+        """容量の上限を超えても keep に指定したエントリは削除しないこと。"""
+        for i, key in enumerate(["a", "b"]):
+            path = tmp_path / f"{key}.parquet"
+            path.write_bytes(b"x" * 1024)
+            os.utime(path, (1_000_000 + i, 1_000_000 + i))
+
+        removed = enforce_retention(tmp_path, SignalCacheSettings(max_megabytes=0.0001), keep={"a"})
+
+        assert removed == ["b"]
+
+
+class TestRelayIntegration:
+    """submission_relay のシグナル記録ヘルパーのテスト。"""
+
+    def test_disabled_by_default(self, mock_workspace_env: Path, round_dir: Path) -> None:
+        """[signal_cache] が無効の場合は記録しないこと。"""
+        settings = load_runtime_settings().signal_cache
+
+        assert start_signal_capture(mock_workspace_env, round_dir, settings) is None
+
+    def test_reads_signal_cache_section(self, mock_workspace_env: Path) -> None:
+        """[signal_cache] セクションが読み込まれること。"""
+        path = get_runtime_config_path(mock_workspace_env)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("[signal_cache]\nenabled = true\nmax_entries = 10\n")
+
+        settings = load_runtime_settings().signal_cache
+
+        assert settings.enabled
+        assert settings.max_entries == 10
+
+    async def test_error_score_discards_capture(self, mock_workspace_env: Path, round_dir: Path) -> None:
+        """提出エラーのスコアの場合はキャッシュに保存しないこと。"""
+        capture = start_signal_capture(mock_workspace_env, round_dir, SignalCacheSettings(enabled=True))
+        assert capture is not None
+
+        await finalize_signal_capture(
+            capture, execution_id="exec-1", team_id="team-a", round_number=1, score=SUBMISSION_ERROR_SCORE
+        )
+
+        assert not capture.capture_dir.exists()
+        assert list(get_signal_cache_dir(mock_workspace_env).glob("*.parquet")) == []
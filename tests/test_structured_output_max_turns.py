@@ -1,7 +1,7 @@
 """構造化出力時の max_turns パッチのテスト。
 
 claudecode_model.model.DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA が
-cli.py のインポート時に上書きされることを検証する。
+cli.bootstrap_agents() で上書きされることを検証する。
 """
 
 import claudecode_model.model as claudecode_model_module
@@ -18,8 +18,10 @@ def _get_patched_value() -> int:
 class TestStructuredOutputMaxTurnsPatch:
     """DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA のパッチテスト。"""
 
-    def test_default_max_turns_patched_on_cli_import(self) -> None:
-        """cli.py インポート後に DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA が 50 であること。"""
-        import quant_insight_plus.cli  # noqa: F401
+    def test_default_max_turns_patched_by_bootstrap(self) -> None:
+        """bootstrap_agents() 適用後に DEFAULT_MAX_TURNS_WITH_JSON_SCHEMA が 50 であること。"""
+        from quant_insight_plus.cli import bootstrap_agents
+
+        bootstrap_agents()
 
         assert _get_patched_value() == EXPECTED_MAX_TURNS
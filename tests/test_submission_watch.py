@@ -0,0 +1,154 @@
+"""submission_watch モジュール（ラウンド実行中の submission.py の早期検証）のテスト。"""
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from quant_insight_plus.preflight import STAGE_COMPILE, STAGE_SMOKE, PreflightSettings
+from quant_insight_plus.runtime_config import SubmissionWatchSettings
+from quant_insight_plus.submission_relay import SUBMISSION_FILENAME, ensure_round_dir
+from quant_insight_plus.submission_watch import (
+    FEEDBACK_FILENAME,
+    find_static_failure,
+    find_submission_check,
+    validate_cached,
+    watch_submission,
+)
+
+VALID_CODE = """\
+import polars as pl
+
+def generate_signal(ohlcv, additional_data):
+    return ohlcv.select("datetime", "symbol", pl.col("close").alias("signal"))
+"""
+
+FAILING_CODE = """\
+def generate_signal(ohlcv, additional_data):
+    raise KeyError("no_such_column")
+"""
+
+BROKEN_CODE = "def generate_signal(ohlcv, additional_data):\n    return (\n"
+
+WATCH = SubmissionWatchSettings(enabled=True, poll_interval_seconds=0.01, settle_seconds=0.0)
+PREFLIGHT = PreflightSettings()
+
+
+@pytest.fixture
+def workspace(mock_workspace_env: Path) -> Path:
+    """valid 分割の OHLCV を配置したワークスペース。"""
+    ohlcv = mock_workspace_env / "data" / "inputs" / "ohlcv"
+    ohlcv.mkdir(parents=True)
+    dates = [datetime(2024, 1, d) for d in range(1, 6)]
+    pl.DataFrame(
+        {
+            "datetime": [d for d in dates for _ in range(2)],
+            "symbol": ["7203", "6758"] * len(dates),
+            "close": [float(i) for i in range(len(dates) * 2)],
+        }
+    ).write_parquet(ohlcv / "valid.parquet")
+    return mock_workspace_env
+
+
+async def _wait_for(condition: Callable[[], bool], timeout: float = 30.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+class TestValidateCached:
+    """validate_cached / find_submission_check のテスト。"""
+
+    def test_result_is_cached_by_content(self, workspace: Path) -> None:
+        """同じ内容の 2 回目の検証はキャッシュを返すこと。"""
+        path = ensure_round_dir(workspace, 1) / SUBMISSION_FILENAME
+        path.write_text(FAILING_CODE)
+
+        first = validate_cached(workspace, path, PREFLIGHT)
+        with patch("quant_insight_plus.submission_watch.validate_submission") as validate:
+            second = validate_cached(workspace, path, PREFLIGHT)
+
+        assert (first.ok, first.stage) == (False, STAGE_SMOKE)
+        assert second == first
+        validate.assert_not_called()
+
+    def test_settings_are_part_of_key(self, workspace: Path) -> None:
+        """スモークテストの設定が異なる場合はキャッシュを使わないこと。"""
+        path = ensure_round_dir(workspace, 1) / SUBMISSION_FILENAME
+        path.write_text(VALID_CODE)
+        validate_cached(workspace, path, PREFLIGHT)
+
+        assert find_submission_check(workspace, VALID_CODE, PREFLIGHT) is not None
+        assert find_submission_check(workspace, VALID_CODE, PreflightSettings(smoke_days=1)) is None
+
+    def test_skipped_smoke_is_not_cached(self, mock_workspace_env: Path) -> None:
+        """データが無くスモークテストをスキップした結果はキャッシュしないこと。"""
+        path = ensure_round_dir(mock_workspace_env, 1) / SUBMISSION_FILENAME
+        path.write_text(VALID_CODE)
+
+        assert validate_cached(mock_workspace_env, path, PREFLIGHT).smoke_skipped
+        assert find_submission_check(mock_workspace_env, VALID_CODE, PREFLIGHT) is None
+
+
+class TestWatchSubmission:
+    """watch_submission のテスト。"""
+
+    async def test_feedback_follows_submission(self, workspace: Path) -> None:
+        """壊れた submission.py でフィードバックを書き出し、修正後に削除すること。"""
+        round_dir = ensure_round_dir(workspace, 1)
+        path = round_dir / SUBMISSION_FILENAME
+        feedback = round_dir / FEEDBACK_FILENAME
+
+        async with watch_submission(workspace, 1, WATCH):
+            path.write_text(BROKEN_CODE)
+            await _wait_for(feedback.is_file)
+            assert STAGE_COMPILE in feedback.read_text()
+
+            path.write_text(VALID_CODE)
+            await _wait_for(lambda: not feedback.exists())
+
+        assert find_submission_check(workspace, VALID_CODE, PREFLIGHT) is not None
+
+    async def test_existing_submission_is_not_checked(self, workspace: Path) -> None:
+        """ラウンド開始前から有る submission.py は検証しないこと。"""
+        round_dir = ensure_round_dir(workspace, 1)
+        (round_dir / SUBMISSION_FILENAME).write_text(BROKEN_CODE)
+
+        async with watch_submission(workspace, 1, WATCH):
+            await asyncio.sleep(0.1)
+
+        assert not (round_dir / FEEDBACK_FILENAME).exists()
+
+
+class TestFindStaticFailure:
+    """find_static_failure のテスト。"""
+
+    def test_compile_error_skips_evaluation(self, workspace: Path) -> None:
+        """コンパイルできない提出は評価対象外として返すこと。"""
+        round_dir = ensure_round_dir(workspace, 1)
+        (round_dir / SUBMISSION_FILENAME).write_text(BROKEN_CODE)
+
+        failure = find_static_failure(workspace, round_dir, WATCH)
+
+        assert failure is not None
+        assert failure.stage == STAGE_COMPILE
+
+    def test_smoke_failure_is_still_evaluated(self, workspace: Path) -> None:
+        """スモークテストの失敗は評価対象のままにすること。"""
+        round_dir = ensure_round_dir(workspace, 1)
+        path = round_dir / SUBMISSION_FILENAME
+        path.write_text(FAILING_CODE)
+        validate_cached(workspace, path, PREFLIGHT)
+
+        assert find_static_failure(workspace, round_dir, WATCH) is None
+
+    def test_disabled(self, workspace: Path) -> None:
+        """[submission_watch] 無効時は検証しないこと。"""
+        round_dir = ensure_round_dir(workspace, 1)
+        (round_dir / SUBMISSION_FILENAME).write_text(BROKEN_CODE)
+
+        assert find_static_failure(workspace, round_dir, SubmissionWatchSettings()) is None
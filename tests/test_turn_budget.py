@@ -0,0 +1,204 @@
+"""turn_budget モジュール（max_turns 設定とターン使用量テレメトリ）のテスト。"""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mixseek.models.member_agent import MemberAgentConfig, ResultStatus
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.turn_budget import (
+    TurnBudgetSettings,
+    TurnUsageRecord,
+    append_turn_usage,
+    count_turns,
+    get_turn_usage_path,
+    is_turn_limit_error,
+    load_turn_budget_settings,
+    load_turn_history,
+    resolve_max_turns,
+)
+from tests.conftest import MODEL_PATCH
+
+
+def _record(agent_name: str, turns: int) -> TurnUsageRecord:
+    return TurnUsageRecord(
+        agent_name=agent_name,
+        model="claudecode:claude-opus-4-6",
+        turns_used=turns,
+        max_turns=None,
+        recorded_at="2026-01-01T00:00:00+00:00",
+    )
+
+
+class TestLoadTurnBudgetSettings:
+    """load_turn_budget_settings のテスト。"""
+
+    def test_defaults_when_missing(self) -> None:
+        """turn_budget 未指定時は max_turns=None・adaptive 無効であること。"""
+        settings = load_turn_budget_settings({})
+        assert settings.max_turns is None
+        assert settings.adaptive is False
+
+    def test_invalid_value_raises_value_error(self) -> None:
+        """不正な値は ValueError になること。"""
+        with pytest.raises(ValueError, match="turn_budget"):
+            load_turn_budget_settings({"turn_budget": {"max_turns": 0}})
+
+
+class TestCountTurns:
+    """count_turns のテスト。"""
+
+    def test_uses_provider_num_turns(self) -> None:
+        """provider_details の num_turns を合算すること。"""
+        messages = [
+            ModelRequest(parts=[UserPromptPart("task")]),
+            ModelResponse(parts=[TextPart("ok")], provider_details={"num_turns": 12}),
+        ]
+        assert count_turns(messages) == 12
+
+    def test_falls_back_to_response_count(self) -> None:
+        """num_turns が無い場合は ModelResponse 数を数えること。"""
+        messages = [
+            ModelRequest(parts=[UserPromptPart("task")]),
+            ModelResponse(parts=[TextPart("a")]),
+            ModelResponse(parts=[TextPart("b")]),
+        ]
+        assert count_turns(messages) == 2
+
+
+class TestResolveMaxTurns:
+    """resolve_max_turns のテスト。"""
+
+    def test_static_when_not_adaptive(self) -> None:
+        """adaptive 無効時は max_turns をそのまま返すこと。"""
+        assert resolve_max_turns(TurnBudgetSettings(max_turns=30), [100] * 10) == 30
+
+    def test_static_when_history_insufficient(self) -> None:
+        """履歴が min_samples 未満の場合は max_turns を返すこと。"""
+        settings = TurnBudgetSettings(max_turns=30, adaptive=True, min_samples=5)
+        assert resolve_max_turns(settings, [3, 4]) == 30
+
+    def test_adaptive_uses_percentile_with_headroom(self) -> None:
+        """p95 × headroom を切り上げた値を返すこと。"""
+        settings = TurnBudgetSettings(max_turns=50, adaptive=True, headroom=1.5, min_turns=1)
+        history = list(range(1, 21))  # p95 = 19
+        assert resolve_max_turns(settings, history) == 29
+
+    def test_adaptive_clamped_to_bounds(self) -> None:
+        """算出値が [min_turns, max_turns] に収まること。"""
+        settings = TurnBudgetSettings(max_turns=20, adaptive=True, min_turns=8)
+        assert resolve_max_turns(settings, [40] * 10) == 20
+        assert resolve_max_turns(settings, [1] * 10) == 8
+
+
+class TestIsTurnLimitError:
+    """is_turn_limit_error のテスト。"""
+
+    def test_matches_max_turns_subtype(self) -> None:
+        """結果の subtype が error_max_turns の例外（ラップされたものを含む）を上限到達とみなすこと。"""
+        error = RuntimeError("Claude Code の実行に失敗しました")
+        error.subtype = "error_max_turns"  # type: ignore[attr-defined]
+        wrapped = ValueError("member failed")
+        wrapped.__cause__ = RuntimeError("result subtype: error_max_turns")
+
+        assert is_turn_limit_error(error)
+        assert is_turn_limit_error(wrapped)
+
+    def test_setting_name_is_not_a_turn_limit(self) -> None:
+        """設定名 max_turns を含むだけの例外は上限到達とみなさないこと。"""
+        assert not is_turn_limit_error(ValueError("max_turns must be greater than or equal to 1"))
+
+
+class TestTurnHistory:
+    """ターン使用量ログの読み書きテスト。"""
+
+    def test_filters_by_agent_and_limits(self, tmp_path: Path) -> None:
+        """指定エージェントの直近 limit 件のみ返すこと。"""
+        path = get_turn_usage_path(tmp_path)
+        for turns in (1, 2, 3):
+            append_turn_usage(path, _record("train-analyzer", turns))
+        append_turn_usage(path, _record("submission-creator", 99))
+
+        assert load_turn_history(path, "train-analyzer", limit=2) == [2, 3]
+
+    def test_missing_log_returns_empty(self, tmp_path: Path) -> None:
+        """ログが無い場合は空リストを返すこと。"""
+        assert load_turn_history(get_turn_usage_path(tmp_path), "train-analyzer", limit=10) == []
+
+    def test_reads_only_appended_lines(self, tmp_path: Path) -> None:
+        """2 回目以降は追記された行のみ読み込み、縮んだファイルは読み直すこと。"""
+        path = get_turn_usage_path(tmp_path)
+        append_turn_usage(path, _record("train-analyzer", 1))
+        assert load_turn_history(path, "train-analyzer", limit=10) == [1]
+
+        # 読み込み済みの行を同じ長さで書き換えても、再読み込みしない
+        path.write_text(path.read_text().replace('"turns_used":1', '"turns_used":9'))
+        append_turn_usage(path, _record("train-analyzer", 2))
+        assert load_turn_history(path, "train-analyzer", limit=10) == [1, 2]
+
+        path.write_text("")
+        append_turn_usage(path, _record("train-analyzer", 3))
+        assert load_turn_history(path, "train-analyzer", limit=10) == [3]
+
+
+class TestExecuteTurnBudget:
+    """execute() での max_turns 適用とテレメトリ記録のテスト。"""
+
+    @patch(MODEL_PATCH)
+    async def test_passes_max_turns_and_records_usage(
+        self,
+        mock_create_model: MagicMock,
+        member_agent_config: MemberAgentConfig,
+        mock_workspace_env: Path,
+    ) -> None:
+        """max_turns が model_settings で渡され、使用ターン数が記録されること。"""
+        metadata = {**member_agent_config.metadata, "turn_budget": {"max_turns": 15}}
+        agent = ClaudeCodeLocalCodeExecutorAgent(member_agent_config.model_copy(update={"metadata": metadata}))
+        mock_result = MagicMock()
+        mock_result.output = "done"
+        mock_result.all_messages.return_value = [
+            ModelResponse(parts=[TextPart("done")], provider_details={"num_turns": 7}),
+        ]
+        agent.agent.run = AsyncMock(return_value=mock_result)  # type: ignore[method-assign]
+
+        await agent.execute("task", context={"execution_id": "exec-1", "team_id": "team-1", "round_number": 2})
+
+        assert agent.agent.run.call_args.kwargs["model_settings"] == {"max_turns": 15}
+        lines = get_turn_usage_path(mock_workspace_env).read_text().splitlines()
+        record = json.loads(lines[0])
+        assert record["turns_used"] == 7
+        assert record["max_turns"] == 15
+        assert record["censored"] is False
+        assert record["round_number"] == 2
+
+    @patch(MODEL_PATCH)
+    async def test_turn_limit_failure_is_censored(
+        self,
+        mock_create_model: MagicMock,
+        member_agent_config: MemberAgentConfig,
+        mock_workspace_env: Path,
+    ) -> None:
+        """max_turns に達して失敗した実行は、上限値で censored として記録されること。"""
+        metadata = {**member_agent_config.metadata, "turn_budget": {"max_turns": 15}, "retry": {"max_retries": 0}}
+        agent = ClaudeCodeLocalCodeExecutorAgent(member_agent_config.model_copy(update={"metadata": metadata}))
+        agent.agent.run = AsyncMock(side_effect=RuntimeError("result subtype: error_max_turns"))  # type: ignore[method-assign]
+
+        result = await agent.execute("task")
+
+        assert result.status == ResultStatus.ERROR
+        [record] = [json.loads(line) for line in get_turn_usage_path(mock_workspace_env).read_text().splitlines()]
+        assert (record["turns_used"], record["max_turns"], record["censored"]) == (15, 15, True)
+
+    async def test_no_model_settings_without_turn_budget(self, agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """turn_budget 未指定時は model_settings を渡さないこと。"""
+        mock_result = MagicMock()
+        mock_result.output = "done"
+        mock_result.all_messages.return_value = []
+        agent.agent.run = AsyncMock(return_value=mock_result)  # type: ignore[method-assign]
+
+        await agent.execute("task")
+
+        assert "model_settings" not in agent.agent.run.call_args.kwargs
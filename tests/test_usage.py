@@ -0,0 +1,263 @@
+"""usage モジュール（使用量の集計・DuckDB 永続化）と qip usage コマンドのテスト。"""
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import duckdb
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.usage import RequestUsage
+from typer.testing import CliRunner
+
+from quant_insight_plus.agents.agent import ClaudeCodeLocalCodeExecutorAgent
+from quant_insight_plus.db import connect, get_db_path
+from quant_insight_plus.submission_relay import flush_round_usage
+from quant_insight_plus.usage import (
+    ROLE_MEMBER,
+    UsageRecord,
+    UsageRecorder,
+    UsageWriter,
+    build_usage_record,
+    build_usage_report,
+    get_usage_recorder,
+    get_usage_writer,
+    save_usage_records,
+)
+
+CONTEXT = {"execution_id": "exec-1", "team_id": "team-1", "round_number": 1}
+
+
+@pytest.fixture(autouse=True)
+def _close_usage_writer() -> Iterator[None]:
+    """テストごとに共有の書き込み口の接続を閉じる。"""
+    yield
+    get_usage_writer().close()
+
+
+def _response(input_tokens: int, output_tokens: int, **provider_details: float) -> ModelResponse:
+    return ModelResponse(
+        parts=[TextPart("ok")],
+        usage=RequestUsage(input_tokens=input_tokens, output_tokens=output_tokens, cache_read_tokens=10),
+        model_name="claude-opus-4-6",
+        provider_details=provider_details or None,
+    )
+
+
+def _member_record(team_id: str, round_number: int, input_tokens: int) -> UsageRecord:
+    return build_usage_record(
+        [_response(input_tokens, 100)],
+        execution_id="exec-1",
+        team_id=team_id,
+        round_number=round_number,
+        agent_name="train-analyzer",
+        agent_role=ROLE_MEMBER,
+        model="claudecode:claude-opus-4-6",
+        wall_seconds=30.0,
+    )
+
+
+def _create_round_tables(db_path: Path) -> None:
+    """leader_board / round_status の最小スキーマを作成する（mixseek-core の store 相当）。"""
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE leader_board (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, score DOUBLE)"
+    )
+    conn.execute(
+        "CREATE TABLE round_status (execution_id VARCHAR, team_id VARCHAR, round_number INTEGER, "
+        "round_started_at TIMESTAMP, round_ended_at TIMESTAMP)"
+    )
+    conn.executemany(
+        "INSERT INTO leader_board VALUES (?, ?, ?, ?)",
+        [("exec-1", "team-1", 1, 0.8), ("exec-1", "team-1", 2, -100.0)],
+    )
+    conn.executemany(
+        "INSERT INTO round_status VALUES (?, ?, ?, ?, ?)",
+        [
+            ("exec-1", "team-1", 1, datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 1, 0, 30)),
+            ("exec-1", "team-1", 2, datetime(2026, 1, 1, 0, 30), datetime(2026, 1, 1, 1, 0)),
+        ],
+    )
+    conn.close()
+
+
+class TestBuildUsageRecord:
+    """build_usage_record のテスト。"""
+
+    def test_sums_response_usage(self) -> None:
+        """ModelResponse の usage を合算し、モデル名を応答から取ること。"""
+        messages = [
+            ModelRequest(parts=[UserPromptPart("task")]),
+            _response(1000, 200, total_cost_usd=0.5),
+            _response(500, 100, total_cost_usd=0.25),
+        ]
+
+        record = build_usage_record(
+            messages,
+            execution_id="exec-1",
+            team_id="team-1",
+            round_number=1,
+            agent_name="train-analyzer",
+            agent_role=ROLE_MEMBER,
+            model="claudecode:claude-opus-4-6",
+            wall_seconds=12.5,
+        )
+
+        assert record.requests == 2
+        assert record.input_tokens == 1500
+        assert record.output_tokens == 300
+        assert record.cache_read_tokens == 20
+        assert record.cost_usd == pytest.approx(0.75)
+        assert record.model == "claude-opus-4-6"
+
+    def test_cost_none_without_provider_details(self) -> None:
+        """プロバイダがコストを返さない場合は None であること。"""
+        assert _member_record("team-1", 1, 100).cost_usd is None
+
+
+class TestUsageRecorder:
+    """UsageRecorder のテスト。"""
+
+    def test_drain_returns_only_matching_round(self) -> None:
+        """指定ラウンドのレコードのみ取り出し、他は残すこと。"""
+        recorder = UsageRecorder()
+        recorder.add(_member_record("team-1", 1, 100))
+        recorder.add(_member_record("team-1", 2, 100))
+        recorder.add(_member_record("team-2", 1, 100))
+
+        drained = recorder.drain("exec-1", "team-1", 1)
+
+        assert len(drained) == 1
+        assert recorder.drain("exec-1", "team-1", 1) == []
+        assert len(recorder.drain("exec-1", "team-2", 1)) == 1
+
+
+class TestUsagePersistence:
+    """DuckDB への一括書き込みとレポートのテスト。"""
+
+    def test_save_and_report(self, tmp_path: Path) -> None:
+        """保存したレコードが集計され、スループット指標が算出されること。"""
+        db_path = tmp_path / "mixseek.db"
+        _create_round_tables(db_path)
+        records = [_member_record("team-1", r, 1000) for r in (1, 2)]
+
+        assert save_usage_records(db_path, records) == 2
+
+        # 書き込み口と同じプロセスでは、同じ接続設定（読み書き）で開く
+        conn = connect(db_path)
+        report = build_usage_report(conn, "exec-1")
+        conn.close()
+        assert report.total_tokens == 2200
+        assert report.accepted_submissions == 1
+        assert report.tokens_per_accepted_submission == 2200
+        assert report.rounds == 2
+        assert report.rounds_per_hour == pytest.approx(2.0)
+        assert report.rows[0].executions == 2
+
+    def test_report_requires_usage_table(self, tmp_path: Path) -> None:
+        """agent_usage テーブルが無い場合は ValueError になること。"""
+        conn = connect(tmp_path / "mixseek.db")
+        with pytest.raises(ValueError, match="agent_usage"):
+            build_usage_report(conn, "exec-1")
+        conn.close()
+
+    async def test_flush_round_usage_writes_leader_and_members(self, mock_workspace_env: Path) -> None:
+        """flush_round_usage が蓄積済み Member 分と Leader 分を書き込むこと。"""
+        get_usage_recorder().add(_member_record("team-flush", 3, 100))
+
+        written = await flush_round_usage(
+            mock_workspace_env,
+            execution_id="exec-1",
+            team_id="team-flush",
+            round_number=3,
+            leader_messages=[_response(50, 5)],
+            leader_wall_seconds=60.0,
+        )
+
+        assert written == 2
+        conn = connect(get_db_path(mock_workspace_env))
+        roles = conn.execute("SELECT agent_role FROM agent_usage ORDER BY agent_role").fetchall()
+        conn.close()
+        assert roles == [("leader",), ("member",)]
+
+    def test_writer_keeps_failed_records_for_retry(self, tmp_path: Path) -> None:
+        """書き込みに失敗したレコードを保持し、次回の書き込みで再試行すること。"""
+        db_path = tmp_path / "missing" / "mixseek.db"
+        writer = UsageWriter()
+
+        with pytest.raises(duckdb.Error):
+            writer.write(db_path, [_member_record("team-1", 1, 100)])
+        assert writer.pending() == 1
+
+        db_path.parent.mkdir()
+        assert writer.write(db_path, [_member_record("team-1", 2, 100)]) == 2
+        assert writer.write(db_path, [_member_record("team-1", 3, 100)]) == 1
+        assert writer.pending() == 0
+        writer.close()
+
+        conn = connect(db_path, read_only=True)
+        rounds = conn.execute("SELECT round_number FROM agent_usage ORDER BY round_number").fetchall()
+        conn.close()
+        assert rounds == [(1,), (2,), (3,)]
+
+
+class TestExecuteRecordsUsage:
+    """execute() が使用量を蓄積することのテスト。"""
+
+    async def test_member_usage_recorded(self, agent: ClaudeCodeLocalCodeExecutorAgent) -> None:
+        """context 付きの execute() で Member 分が UsageRecorder に蓄積されること。"""
+        mock_result = MagicMock()
+        mock_result.output = "done"
+        mock_result.all_messages.return_value = [_response(300, 30)]
+        agent.agent.run = AsyncMock(return_value=mock_result)  # type: ignore[method-assign]
+        context = {**CONTEXT, "team_id": "team-exec"}
+
+        await agent.execute("task", context=context)
+
+        drained = get_usage_recorder().drain("exec-1", "team-exec", 1)
+        assert len(drained) == 1
+        assert drained[0].input_tokens == 300
+        assert drained[0].agent_name == "test-agent"
+        assert drained[0].recorded_at <= datetime.now(UTC)
+
+
+class TestUsageCommand:
+    """qip usage コマンドのテスト。"""
+
+    def test_prints_report(self, mock_workspace_env: Path) -> None:
+        """使用量とスループットが表示されること。"""
+        from quant_insight_plus.cli import app
+
+        db_path = get_db_path(mock_workspace_env)
+        _create_round_tables(db_path)
+        save_usage_records(db_path, [_member_record("team-1", 1, 1000)])
+        get_usage_writer().close()
+
+        result = CliRunner().invoke(app, ["usage", "exec-1"])
+
+        assert result.exit_code == 0, result.output
+        assert "採用提出あたりトークン: 1,100" in result.output
+        assert "ラウンド/時: 2.00" in result.output
+
+    def test_missing_database_exits(self) -> None:
+        """データベースが無い場合に終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["usage", "exec-1"])
+
+        assert result.exit_code == 1
+
+    def test_locked_database_exits(self, mock_workspace_env: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """実行中の qip exec がロックを保持している場合に、使用中である旨を表示して終了すること。"""
+        from quant_insight_plus.cli import app
+
+        def locked(db_path: Path, *, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+            raise duckdb.IOException("Could not set lock on file")
+
+        monkeypatch.setattr("quant_insight_plus.commands.usage.connect", locked)
+
+        result = CliRunner().invoke(app, ["usage", "exec-1"])
+
+        assert result.exit_code == 1
+        assert "データベースが使用中です" in result.output
@@ -0,0 +1,120 @@
+"""walk_forward モジュール（評価期間を分けた期間別の採点）のテスト。"""
+
+import random
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from quant_insight_plus.ensemble import score_signals
+from quant_insight_plus.runtime_config import SignalCacheSettings, WalkForwardSettings
+from quant_insight_plus.signal_cache import SignalCapture, capture_signal
+from quant_insight_plus.submission_relay import score_walk_forward
+from quant_insight_plus.walk_forward import evaluate_windows, score_capture
+
+NUM_DATES = 20
+SYMBOLS = ["7203", "6758", "9984", "8306"]
+DATES = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(NUM_DATES)]
+SETTINGS = WalkForwardSettings(enabled=True, windows=4, min_window_dates=3)
+
+
+@pytest.fixture
+def frames() -> tuple[pl.DataFrame, pl.DataFrame]:
+    """20 日 × 4 銘柄のシグナルとリターン。"""
+    rng = random.Random(7)
+    keys = [(d, s) for d in DATES for s in SYMBOLS]
+    signals = pl.DataFrame(
+        {"datetime": [d for d, _ in keys], "symbol": [s for _, s in keys], "signal": [rng.random() for _ in keys]}
+    )
+    returns = pl.DataFrame(
+        {
+            "datetime": [d for d, _ in keys],
+            "symbol": [s for _, s in keys],
+            "return_value": [rng.random() for _ in keys],
+        }
+    )
+    return signals, returns
+
+
+class TestEvaluateWindows:
+    """evaluate_windows のテスト。"""
+
+    def test_windows_match_separate_scoring(self, frames: tuple[pl.DataFrame, pl.DataFrame]) -> None:
+        """各期間のシャープレシオが期間ごとに採点した結果と一致すること。"""
+        signals, returns = frames
+
+        result = evaluate_windows(signals, returns, SETTINGS)
+
+        assert [window.dates for window in result.windows] == [5, 5, 5, 5]
+        for window in result.windows:
+            in_window = pl.col("datetime").is_between(window.start, window.end)
+            expected = score_signals(signals.filter(in_window), returns.filter(in_window))
+            assert window.sharpe_ratio == pytest.approx(expected.sharpe_ratio)
+        sharpes = [window.sharpe_ratio for window in result.windows]
+        assert result.mean_sharpe == pytest.approx(statistics.fmean(sharpes))
+        assert result.stability == pytest.approx(statistics.fmean(sharpes) / statistics.stdev(sharpes))
+
+    def test_short_window_is_excluded(self, frames: tuple[pl.DataFrame, pl.DataFrame]) -> None:
+        """有効な日時が min_window_dates 未満の期間はシャープレシオを None にし、集計から除くこと。"""
+        signals, returns = frames
+        # 最後の期間（16〜20 日目）のうち 3 日のリターンを欠損させる
+        missing = pl.col("datetime").is_in(DATES[-3:])
+        returns = returns.with_columns(pl.when(~missing).then(pl.col("return_value")).alias("return_value"))
+
+        result = evaluate_windows(signals, returns, SETTINGS)
+
+        assert (result.windows[-1].dates, result.windows[-1].iterations) == (5, 2)
+        assert result.windows[-1].sharpe_ratio is None
+        assert result.min_sharpe == min(window.sharpe_ratio for window in result.windows[:-1])
+
+    def test_no_overlap_raises(self, frames: tuple[pl.DataFrame, pl.DataFrame]) -> None:
+        """シグナルとリターンが結合できない場合は ValueError になること。"""
+        signals, returns = frames
+
+        with pytest.raises(ValueError, match="結合できる日時"):
+            evaluate_windows(signals, returns.with_columns(pl.lit("0000").alias("symbol")), SETTINGS)
+
+
+class TestScoreCapture:
+    """score_capture / score_walk_forward のテスト。"""
+
+    @pytest.fixture
+    def capture(self, mock_workspace_env: Path, frames: tuple[pl.DataFrame, pl.DataFrame]) -> SignalCapture:
+        """評価データのリターンと、各日時のシグナルを記録した SignalCapture。"""
+        signals, returns = frames
+        returns_dir = mock_workspace_env / "data" / "inputs" / "returns"
+        returns_dir.mkdir(parents=True)
+        returns.write_parquet(returns_dir / "test.parquet")
+        capture = SignalCapture(mock_workspace_env, "code", SignalCacheSettings(enabled=True))
+        for current in DATES:
+            available = signals.filter(pl.col("datetime") <= current)
+            capture_signal(available, available, str(capture.capture_dir))
+        return capture
+
+    def test_scores_captured_signals(self, capture: SignalCapture) -> None:
+        """記録したシグナルを期間ごとに採点し、記録は finalize まで残すこと。"""
+        result = score_capture(capture, SETTINGS)
+
+        assert result is not None
+        assert sum(window.dates for window in result.windows) == NUM_DATES
+        assert capture.capture_dir.is_dir()
+        capture.discard()
+
+    async def test_score_details(self, capture: SignalCapture) -> None:
+        """score_details 用に JSON 互換の dict を返し、[walk_forward] 無効時は採点しないこと。"""
+        assert await score_walk_forward(capture, WalkForwardSettings(), 1) is None
+        details = await score_walk_forward(capture, SETTINGS, 1)
+        capture.discard()
+
+        assert details is not None
+        assert len(details["windows"]) == SETTINGS.windows
+        assert isinstance(details["windows"][0]["start"], str)
+
+    async def test_failure_returns_none(self, capture: SignalCapture) -> None:
+        """採点に失敗した場合は None を返し、ラウンドを止めないこと。"""
+        (capture.workspace / "data" / "inputs" / "returns" / "test.parquet").unlink()
+
+        assert await score_walk_forward(capture, SETTINGS, 1) is None
+        capture.discard()
@@ -0,0 +1,302 @@
+"""work_queue モジュール（ワークスペース共有キューによる分散チーム実行）のテスト。
+
+- ジョブの登録・取得・結果記録
+- 複数ワーカーの同時実行で各ジョブが 1 回だけ、1 件ずつ実行されること
+- ハートビートが途絶えたジョブの回収
+- qip queue submit / status コマンド
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from quant_insight_plus.work_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_RUNNING,
+    QueueJob,
+    WorkQueue,
+    build_team_command,
+    get_queue_dir,
+    load_orchestrator_teams,
+    run_job,
+    run_worker,
+)
+
+ORCHESTRATOR_TOML = """\
+[orchestrator]
+max_rounds = 3
+timeout_per_team_seconds = 1800
+evaluator_config = "configs/evaluator.toml"
+
+[[orchestrator.teams]]
+config = "configs/agents/teams/team_a.toml"
+
+[[orchestrator.teams]]
+config = "configs/agents/teams/team_b.toml"
+"""
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> WorkQueue:
+    """一時ディレクトリ上のキュー。"""
+    return WorkQueue(tmp_path / "queue")
+
+
+def _expire(queue: WorkQueue, job: QueueJob) -> None:
+    """実行中ジョブの最終ハートビートをリース切れの時刻にする。"""
+    old = time.time() - queue.lease_seconds - 1
+    os.utime(queue.queue_dir / STATUS_RUNNING / f"{job.job_id}.json", (old, old))
+
+
+class TestWorkQueue:
+    """WorkQueue のテスト。"""
+
+    def test_claim_in_enqueue_order(self, queue: WorkQueue) -> None:
+        """登録順に取得され、取得済みのジョブは再取得されないこと。"""
+        queue.enqueue("task", ["a.toml", "b.toml"])
+
+        first = queue.claim("w1")
+        assert first is not None
+        queue.finish(first, 0)
+        second = queue.claim("w2")
+
+        assert first.team_config == "a.toml" and first.attempts == 1
+        assert second is not None and second.team_config == "b.toml"
+        assert second.status == STATUS_RUNNING
+        assert queue.claim("w3") is None
+
+    def test_one_running_job_per_workspace(self, queue: WorkQueue) -> None:
+        """実行中のジョブがある間は、pending があっても他のワーカーが取得しないこと。"""
+        queue.enqueue("task", ["a.toml", "b.toml"])
+        first = queue.claim("w1")
+        assert first is not None
+
+        assert queue.claim("w2") is None
+        assert queue.has_pending()
+        queue.finish(first, 0)
+        assert queue.claim("w2") is not None
+
+    def test_finish_moves_job(self, queue: WorkQueue) -> None:
+        """終了コードに応じて done / failed に移動すること。"""
+        queue.enqueue("task", ["a.toml", "b.toml"])
+        ok = queue.claim("w1")
+        assert ok is not None
+        queue.finish(ok, 0)
+        ng = queue.claim("w1")
+        assert ng is not None
+        queue.finish(ng, 2, "failed")
+
+        statuses = {job.team_config: job.status for job in queue.list_jobs()}
+        assert statuses == {"a.toml": STATUS_DONE, "b.toml": STATUS_FAILED}
+
+    def test_stale_job_is_reclaimed(self, queue: WorkQueue) -> None:
+        """ハートビートが途絶えたジョブが他のワーカーに再取得されること。"""
+        queue.enqueue("task", ["a.toml"], max_attempts=2)
+        lost = queue.claim("w1")
+        assert lost is not None
+        _expire(queue, lost)
+
+        job = queue.claim("w2")
+
+        assert job is not None
+        assert job.worker_id == "w2"
+        assert job.attempts == 2
+
+    def test_stale_job_fails_after_max_attempts(self, queue: WorkQueue) -> None:
+        """試行回数を使い切ったジョブは failed になること。"""
+        queue.enqueue("task", ["a.toml"])
+        lost = queue.claim("w1")
+        assert lost is not None
+        _expire(queue, lost)
+
+        assert queue.claim("w2") is None
+        [job] = queue.list_jobs()
+        assert job.status == STATUS_FAILED
+        assert "w1" in (job.error or "")
+
+    def test_heartbeat_keeps_lease(self, queue: WorkQueue) -> None:
+        """ハートビートしたジョブは回収されないこと。"""
+        queue.enqueue("task", ["a.toml"])
+        job = queue.claim("w1")
+        assert job is not None
+        _expire(queue, job)
+
+        assert queue.heartbeat(job)
+        assert queue.reclaim_stale() == []
+
+    def test_finish_after_reclaim_prevents_rerun(self, queue: WorkQueue) -> None:
+        """回収後に元のワーカーが終了した場合、結果が記録され再実行されないこと。"""
+        queue.enqueue("task", ["a.toml"], max_attempts=2)
+        slow = queue.claim("w1")
+        assert slow is not None
+        _expire(queue, slow)
+        queue.reclaim_stale()
+
+        queue.finish(slow, 0)
+
+        assert queue.claim("w2") is None
+        assert [job.status for job in queue.list_jobs()] == [STATUS_DONE]
+
+    def test_finish_after_reclaim_keeps_new_run(self, queue: WorkQueue) -> None:
+        """回収後に他のワーカーが再取得した場合、元のワーカーの結果で実行中の記録を上書きしないこと。"""
+        queue.enqueue("task", ["a.toml"], max_attempts=2)
+        slow = queue.claim("w1")
+        assert slow is not None
+        _expire(queue, slow)
+        rerun = queue.claim("w2")
+        assert rerun is not None
+
+        queue.finish(slow, 1, "late")
+
+        [job] = queue.list_jobs()
+        assert (job.status, job.worker_id, job.error) == (STATUS_RUNNING, "w2", None)
+        queue.finish(rerun, 0)
+        assert [job.status for job in queue.list_jobs()] == [STATUS_DONE]
+
+    def test_orphan_slot_is_released(self, queue: WorkQueue) -> None:
+        """ジョブを取得せずにハートビートが途絶えた実行枠は解放されること。"""
+        queue.enqueue("task", ["a.toml"])
+        slot = queue.queue_dir / "running.lock"
+        slot.touch()
+        old = time.time() - queue.lease_seconds - 1
+        os.utime(slot, (old, old))
+
+        assert queue.claim("w1") is not None
+
+
+class TestRunWorker:
+    """run_worker / run_job のテスト。"""
+
+    def test_multiple_workers_run_each_job_once(self, queue: WorkQueue, tmp_path: Path) -> None:
+        """複数ワーカーが同時に動作しても各ジョブが 1 回だけ、同時に 1 件ずつ実行されること。"""
+        team_configs = [f"team_{i}.toml" for i in range(12)]
+        queue.enqueue("task", team_configs)
+        executed: list[tuple[str, str]] = []
+        active: list[int] = [0]
+        max_active: list[int] = [0]
+        lock = threading.Lock()
+
+        def runner(job: QueueJob, workspace: Path, log_path: Path) -> int:
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+                executed.append((job.worker_id or "", job.team_config))
+            return 0
+
+        workers = [
+            threading.Thread(
+                target=run_worker,
+                args=(WorkQueue(queue.queue_dir), tmp_path),
+                kwargs={"worker_id": f"w{i}", "runner": runner, "once": True, "poll_interval": 0.005},
+            )
+            for i in range(4)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        assert sorted(config for _, config in executed) == sorted(team_configs)
+        assert max_active[0] == 1
+        assert Counter(job.status for job in queue.list_jobs()) == {STATUS_DONE: len(team_configs)}
+
+    def test_runner_exception_marks_failed(self, queue: WorkQueue, tmp_path: Path) -> None:
+        """実行関数の例外はジョブの failed として記録されること。"""
+        queue.enqueue("task", ["a.toml"])
+        job = queue.claim("w1")
+        assert job is not None
+
+        def runner(job: QueueJob, workspace: Path, log_path: Path) -> int:
+            raise OSError("disk full")
+
+        result = run_job(queue, job, tmp_path, runner=runner)
+
+        assert result.status == STATUS_FAILED
+        assert "disk full" in (result.error or "")
+
+    def test_heartbeat_during_long_job(self, queue: WorkQueue, tmp_path: Path) -> None:
+        """実行中はハートビートでリースが延長されること。"""
+        short_lease = WorkQueue(queue.queue_dir, lease_seconds=0.2)
+        short_lease.enqueue("task", ["a.toml"])
+        job = short_lease.claim("w1")
+        assert job is not None
+
+        def runner(job: QueueJob, workspace: Path, log_path: Path) -> int:
+            time.sleep(0.5)
+            assert short_lease.reclaim_stale() == []
+            return 0
+
+        result = run_job(short_lease, job, tmp_path, runner=runner, heartbeat_interval=0.05)
+
+        assert result.status == STATUS_DONE
+
+
+class TestHelpers:
+    """設定読み込み・コマンド生成のテスト。"""
+
+    def test_load_orchestrator_teams(self, tmp_path: Path) -> None:
+        """[[orchestrator.teams]] とタイムアウトが読み込まれること。"""
+        config = tmp_path / "orchestrator.toml"
+        config.write_text(ORCHESTRATOR_TOML)
+
+        team_configs, timeout = load_orchestrator_teams(config)
+
+        assert team_configs == ["configs/agents/teams/team_a.toml", "configs/agents/teams/team_b.toml"]
+        assert timeout == 1800
+
+    def test_no_teams_raises(self, tmp_path: Path) -> None:
+        """チームが無い場合は ValueError になること。"""
+        config = tmp_path / "orchestrator.toml"
+        config.write_text("[orchestrator]\nmax_rounds = 1\n")
+
+        with pytest.raises(ValueError, match="orchestrator.teams"):
+            load_orchestrator_teams(config)
+
+    def test_build_team_command_resolves_relative_config(self, tmp_path: Path) -> None:
+        """相対パスのチーム設定がワーカー側のワークスペースで解決されること。"""
+        job = QueueJob(job_id="j", batch_id="b", task="分析", team_config="configs/t.toml", enqueued_at=0.0)
+
+        command = build_team_command(job, tmp_path)
+
+        assert command[:3] == [sys.executable, "-m", "quant_insight_plus"]
+        assert command[3:] == ["team", "分析", "--config", str(tmp_path / "configs/t.toml")]
+
+
+class TestQueueCommands:
+    """qip queue submit / status コマンドのテスト。"""
+
+    def test_submit_and_status(self, mock_workspace_env: Path) -> None:
+        """submit でチーム数分のジョブが登録され、status に表示されること。"""
+        from quant_insight_plus.cli import app
+
+        config = mock_workspace_env / "orchestrator.toml"
+        config.write_text(ORCHESTRATOR_TOML)
+
+        submitted = CliRunner().invoke(app, ["queue", "submit", "分析", "--config", str(config)])
+        status = CliRunner().invoke(app, ["queue", "status"])
+
+        assert submitted.exit_code == 0, submitted.output
+        assert "2 ジョブを登録しました" in submitted.output
+        assert status.exit_code == 0, status.output
+        assert f"{STATUS_PENDING}=2" in status.output
+        jobs = WorkQueue(get_queue_dir(mock_workspace_env)).list_jobs()
+        assert {job.timeout_seconds for job in jobs} == {1800}
+
+    def test_status_without_jobs_exits(self) -> None:
+        """ジョブが無い場合に終了コード 1 で終了すること。"""
+        from quant_insight_plus.cli import app
+
+        result = CliRunner().invoke(app, ["queue", "status"])
+
+        assert result.exit_code == 1